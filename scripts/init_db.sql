@@ -21,7 +21,10 @@ CREATE TABLE IF NOT EXISTS work_items (
   jira_issue_key TEXT,
   raw_payload TEXT,
   story_points INTEGER,
-  impact TEXT
+  impact TEXT,
+  parent_work_item_id TEXT REFERENCES work_items(id),  -- alert-storm parent this item was coalesced into
+  coalesced_count INTEGER NOT NULL DEFAULT 0,
+  last_coalesced_at TIMESTAMP
 );
 
 CREATE TABLE IF NOT EXISTS humans (
@@ -35,11 +38,46 @@ CREATE TABLE IF NOT EXISTS humans (
   embedding_3d_z REAL
 );
 
+-- Ingest outbox (Weaviate upserts / decision triggers written with the work item, drained by Ingest)
+CREATE TABLE IF NOT EXISTS ingest_outbox (
+  id BIGSERIAL PRIMARY KEY,
+  work_item_id TEXT NOT NULL REFERENCES work_items(id) ON DELETE CASCADE,
+  kind TEXT NOT NULL, -- vector_upsert, decision
+  payload TEXT, -- JSON: vector_upsert carries description, service, severity, embedding
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, running, done, dead
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at TIMESTAMP, -- set while running; expired leases are reclaimed
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  UNIQUE (work_item_id, kind)
+);
+
+-- PagerDuty webhook spill table (overflow and retries of the Ingest PagerDuty queue)
+CREATE TABLE IF NOT EXISTS pagerduty_event_queue (
+  incident_id TEXT PRIMARY KEY, -- PagerDuty incident ID (dedupes redelivered webhooks)
+  payload TEXT NOT NULL, -- JSON: normalized incident
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, running, failed (rows are deleted once processed)
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  received_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at TIMESTAMP, -- set while running; expired leases are reclaimed
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_work_items_service ON work_items(service);
 CREATE INDEX IF NOT EXISTS idx_work_items_severity ON work_items(severity);
-CREATE INDEX IF NOT EXISTS idx_work_items_created_at ON work_items(created_at);
+-- Keyset pagination for GET /work-items: (created_at, id) order, optionally after a service or severity filter
+CREATE INDEX IF NOT EXISTS idx_work_items_created_at_id ON work_items(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_work_items_service_created_at_id ON work_items(service, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_work_items_severity_created_at_id ON work_items(severity, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_work_items_jira_issue_key ON work_items(jira_issue_key);
+CREATE INDEX IF NOT EXISTS idx_work_items_parent_work_item_id ON work_items(parent_work_item_id);
+CREATE INDEX IF NOT EXISTS idx_ingest_outbox_kind_status_next_attempt ON ingest_outbox(kind, status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_pagerduty_event_queue_status_next_attempt ON pagerduty_event_queue(status, next_attempt_at);
 
 CREATE INDEX IF NOT EXISTS idx_humans_jira_account_id ON humans(jira_account_id);
 
@@ -95,6 +133,7 @@ CREATE TABLE IF NOT EXISTS decisions (
   primary_human_id TEXT NOT NULL,
   backup_human_ids TEXT, -- JSON array
   confidence REAL NOT NULL CHECK (confidence >= 0 AND confidence <= 1),
+  stage_timings TEXT, -- JSON: {stages_ms: {work_item_load: 3.1, candidates: 41.0, ...}, total_ms, deadline_ms, degraded: [...]}
   created_at TIMESTAMP NOT NULL DEFAULT NOW(),
   FOREIGN KEY (work_item_id) REFERENCES work_items(id)
 );
@@ -122,6 +161,25 @@ CREATE TABLE IF NOT EXISTS constraint_results (
   FOREIGN KEY (decision_id) REFERENCES decisions(id) ON DELETE CASCADE
 );
 
+-- Orchestration jobs (Explain + Executor after a decision, run by the Decision Service worker pool)
+CREATE TABLE IF NOT EXISTS orchestration_jobs (
+  decision_id TEXT PRIMARY KEY,
+  work_item_id TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, running, succeeded, failed
+  explain_status TEXT NOT NULL DEFAULT 'pending', -- pending, succeeded, failed (executed without evidence)
+  execute_status TEXT NOT NULL DEFAULT 'pending', -- pending, succeeded, failed
+  explain_attempts INTEGER NOT NULL DEFAULT 0,
+  execute_attempts INTEGER NOT NULL DEFAULT 0,
+  evidence TEXT, -- JSON: Explain evidence, reused across Executor retries
+  jira_issue_key TEXT,
+  last_error TEXT,
+  next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at TIMESTAMP, -- set while running; expired leases are reclaimed
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  FOREIGN KEY (decision_id) REFERENCES decisions(id) ON DELETE CASCADE
+);
+
 -- Indexes for Decision Service
 CREATE INDEX IF NOT EXISTS idx_decisions_work_item_id ON decisions(work_item_id);
 CREATE INDEX IF NOT EXISTS idx_decisions_primary_human_id ON decisions(primary_human_id);
@@ -129,6 +187,7 @@ CREATE INDEX IF NOT EXISTS idx_decisions_created_at ON decisions(created_at);
 CREATE INDEX IF NOT EXISTS idx_decision_candidates_decision_id ON decision_candidates(decision_id);
 CREATE INDEX IF NOT EXISTS idx_decision_candidates_human_id ON decision_candidates(human_id);
 CREATE INDEX IF NOT EXISTS idx_constraint_results_decision_id ON constraint_results(decision_id);
+CREATE INDEX IF NOT EXISTS idx_orchestration_jobs_status_next_attempt ON orchestration_jobs(status, next_attempt_at);
 
 -- Learner Service Tables
 CREATE TABLE IF NOT EXISTS human_service_stats (
@@ -156,6 +215,36 @@ CREATE TABLE IF NOT EXISTS outcomes_dedupe (
   processed_at TIMESTAMP NOT NULL DEFAULT NOW()
 );
 
+-- Jira sync (POST /sync/jira): tickets already counted into human_service_stats,
+-- and the incremental watermark per scope
+CREATE TABLE IF NOT EXISTS jira_synced_issues (
+  issue_key TEXT PRIMARY KEY,
+  human_id TEXT NOT NULL,
+  service TEXT NOT NULL,
+  resolved_at TIMESTAMP,
+  synced_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS jira_sync_state (
+  scope TEXT PRIMARY KEY, -- project key, or '*' for all projects
+  watermark TIMESTAMP NOT NULL, -- newest Jira updated timestamp seen
+  last_synced_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Running capability embedding per human x service: exponentially time-decayed sum of
+-- resolved work item embeddings (centroid = sum_vector / weight), as of reference_at
+CREATE TABLE IF NOT EXISTS human_embedding_centroids (
+  human_id TEXT NOT NULL,
+  service TEXT NOT NULL,
+  sum_vector DOUBLE PRECISION[] NOT NULL,
+  weight DOUBLE PRECISION NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  reference_at TIMESTAMP NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (human_id, service),
+  FOREIGN KEY (human_id) REFERENCES humans(id) ON DELETE CASCADE
+);
+
 -- Indexes for Learner Service
 CREATE INDEX IF NOT EXISTS idx_human_service_stats_human_id ON human_service_stats(human_id);
 CREATE INDEX IF NOT EXISTS idx_human_service_stats_service ON human_service_stats(service);
@@ -181,5 +270,5 @@ CREATE TABLE IF NOT EXISTS executed_actions (
 CREATE INDEX IF NOT EXISTS idx_executed_actions_decision_id ON executed_actions(decision_id);
 CREATE INDEX IF NOT EXISTS idx_executed_actions_jira_issue_key ON executed_actions(jira_issue_key);
 CREATE INDEX IF NOT EXISTS idx_executed_actions_assigned_human_id ON executed_actions(assigned_human_id);
-CREATE INDEX IF NOT EXISTS idx_executed_actions_created_at ON executed_actions(created_at);
+CREATE INDEX IF NOT EXISTS idx_executed_actions_created_at_id ON executed_actions(created_at DESC, id DESC);
 
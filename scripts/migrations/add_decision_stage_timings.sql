@@ -0,0 +1,7 @@
+-- Migration: Record per-stage decision latency in the audit trail
+-- Decision Service writes a JSON record of how long each stage of make_decision took
+-- (work item load, candidate fetch, embedding, similarity search, scoring) and which
+-- optional stages were cut short by the per-decision deadline.
+
+ALTER TABLE decisions
+ADD COLUMN IF NOT EXISTS stage_timings TEXT;
@@ -0,0 +1,16 @@
+-- Migration: Incremental human capability embeddings for the Learner Service
+-- A resolved outcome folds the work item's stored embedding into a persisted running
+-- centroid per human x service (exponential recency decay) instead of re-encoding the
+-- human's last 50 resolved items. Existing humans: run services/learner/scripts/backfill_human_centroids.py.
+
+CREATE TABLE IF NOT EXISTS human_embedding_centroids (
+  human_id TEXT NOT NULL,
+  service TEXT NOT NULL,
+  sum_vector DOUBLE PRECISION[] NOT NULL,
+  weight DOUBLE PRECISION NOT NULL,
+  count INTEGER NOT NULL DEFAULT 0,
+  reference_at TIMESTAMP NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (human_id, service),
+  FOREIGN KEY (human_id) REFERENCES humans(id) ON DELETE CASCADE
+);
@@ -0,0 +1,21 @@
+-- Migration: Transactional outbox for Ingest Service
+-- Work item endpoints write the work item and its Weaviate upsert / decision trigger
+-- in one transaction; a background drainer in Ingest delivers them (batched Weaviate
+-- imports, bounded /decide concurrency, retries with backoff, dead-lettering).
+
+CREATE TABLE IF NOT EXISTS ingest_outbox (
+  id BIGSERIAL PRIMARY KEY,
+  work_item_id TEXT NOT NULL REFERENCES work_items(id) ON DELETE CASCADE,
+  kind TEXT NOT NULL, -- vector_upsert, decision
+  payload TEXT, -- JSON: vector_upsert carries description, service, severity, embedding
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, running, done, dead
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at TIMESTAMP, -- set while running; expired leases are reclaimed
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  UNIQUE (work_item_id, kind)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingest_outbox_kind_status_next_attempt ON ingest_outbox(kind, status, next_attempt_at);
@@ -0,0 +1,17 @@
+-- Migration: Incremental Jira sync for the Learner Service
+-- POST /sync/jira records every ticket it counts (so re-reads never count a ticket
+-- twice) and keeps a watermark per scope so each run only fetches new changes.
+
+CREATE TABLE IF NOT EXISTS jira_synced_issues (
+  issue_key TEXT PRIMARY KEY,
+  human_id TEXT NOT NULL,
+  service TEXT NOT NULL,
+  resolved_at TIMESTAMP,
+  synced_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS jira_sync_state (
+  scope TEXT PRIMARY KEY, -- project key, or '*' for all projects
+  watermark TIMESTAMP NOT NULL, -- newest Jira updated timestamp seen
+  last_synced_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,23 @@
+-- Migration: Keyset pagination for GET /work-items (Ingest) and GET /executed_actions (Executor)
+-- Pages are read in (created_at DESC, id DESC) order with WHERE (created_at, id) < (cursor),
+-- so each page is an index range scan regardless of depth. The composite indexes
+-- supersede the single-column created_at indexes.
+
+CREATE INDEX IF NOT EXISTS idx_work_items_created_at_id
+ON work_items(created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_work_items_service_created_at_id
+ON work_items(service, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_work_items_severity_created_at_id
+ON work_items(severity, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_executed_actions_created_at_id
+ON executed_actions(created_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_work_items_created_at;
+DROP INDEX IF EXISTS idx_executed_actions_created_at;
+
+-- Fresh statistics for the planner-estimated totals
+ANALYZE work_items;
+ANALYZE executed_actions;
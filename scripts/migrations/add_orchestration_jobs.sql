@@ -0,0 +1,24 @@
+-- Migration: Durable Explain + Executor orchestration jobs
+-- Decision Service enqueues one job per decision in the same transaction as the
+-- decision and runs them with a background worker pool (retries with backoff,
+-- leases reclaimed after restarts). GET /decisions/{id}/status reads this table.
+
+CREATE TABLE IF NOT EXISTS orchestration_jobs (
+  decision_id TEXT PRIMARY KEY,
+  work_item_id TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, running, succeeded, failed
+  explain_status TEXT NOT NULL DEFAULT 'pending', -- pending, succeeded, failed (executed without evidence)
+  execute_status TEXT NOT NULL DEFAULT 'pending', -- pending, succeeded, failed
+  explain_attempts INTEGER NOT NULL DEFAULT 0,
+  execute_attempts INTEGER NOT NULL DEFAULT 0,
+  evidence TEXT, -- JSON: Explain evidence, reused across Executor retries
+  jira_issue_key TEXT,
+  last_error TEXT,
+  next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at TIMESTAMP, -- set while running; expired leases are reclaimed
+  created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  FOREIGN KEY (decision_id) REFERENCES decisions(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_orchestration_jobs_status_next_attempt ON orchestration_jobs(status, next_attempt_at);
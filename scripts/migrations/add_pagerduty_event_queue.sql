@@ -0,0 +1,17 @@
+-- Migration: Spill table for the Ingest PagerDuty webhook queue
+-- POST /webhooks/pagerduty acks with 202 and queues incidents in memory; overflow,
+-- retries and events queued at shutdown are kept here and claimed by the workers.
+
+CREATE TABLE IF NOT EXISTS pagerduty_event_queue (
+  incident_id TEXT PRIMARY KEY, -- PagerDuty incident ID (dedupes redelivered webhooks)
+  payload TEXT NOT NULL, -- JSON: normalized incident
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, running, failed (rows are deleted once processed)
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  received_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+  locked_at TIMESTAMP, -- set while running; expired leases are reclaimed
+  updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_pagerduty_event_queue_status_next_attempt ON pagerduty_event_queue(status, next_attempt_at);
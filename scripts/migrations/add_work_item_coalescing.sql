@@ -0,0 +1,16 @@
+-- Migration: Alert-storm coalescing at ingest
+-- Near-duplicate work items (same service, within the coalescing window) are stored
+-- as children of the first routed item and are not routed again
+
+ALTER TABLE work_items
+ADD COLUMN IF NOT EXISTS parent_work_item_id TEXT REFERENCES work_items(id);
+
+-- Number of children coalesced into this item, and when the last one arrived
+ALTER TABLE work_items
+ADD COLUMN IF NOT EXISTS coalesced_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE work_items
+ADD COLUMN IF NOT EXISTS last_coalesced_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_work_items_parent_work_item_id
+ON work_items(parent_work_item_id);
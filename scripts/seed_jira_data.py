@@ -925,6 +925,13 @@ async def seed_jira_data():
             )
         """)
         
+        # Learner GET /profiles: resolved counts per (assignee, priority) for one project
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jira_issues_done_project_assignee
+            ON jira_issues(project_key, assignee_account_id, resolved_at, priority_name)
+            WHERE status_name = 'Done'
+        """)
+        
         conn.commit()
         print("  ✅ Tables created")
         
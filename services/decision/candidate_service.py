@@ -2,13 +2,36 @@
 Candidate generation service - fetches candidates from Learner Service.
 """
 import os
+import time
+import asyncio
 import httpx
 import logging
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from db import execute_query
+from http_client import http_request
+from metrics import DEPENDENCY_DURATION, FALLBACKS
 
 logger = logging.getLogger(__name__)
 
+# Candidate profile cache (Learner /profiles responses keyed by service)
+CANDIDATE_CACHE_TTL_SECONDS = float(os.getenv("CANDIDATE_CACHE_TTL_SECONDS", "30"))
+CANDIDATE_CACHE_MAX_SERVICES = int(os.getenv("CANDIDATE_CACHE_MAX_SERVICES", "256"))
+
+_profile_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_inflight_fetches: Dict[str, asyncio.Future] = {}
+_service_generations: Dict[str, int] = {}
+_cache_generation = 0
+_cache_stats = {
+    "hits": 0,
+    "misses": 0,
+    "stale": 0,
+    "revalidated": 0,
+    "coalesced": 0,
+    "invalidations": 0,
+    "evictions": 0
+}
+
 
 def _get_fallback_candidates(service: str) -> List[Dict[str, Any]]:
     """
@@ -97,11 +120,194 @@ def _get_fallback_candidates(service: str) -> List[Dict[str, Any]]:
         return []
 
 
+async def _fetch_learner_profiles(service: str, etag: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Call Learner /profiles for a service.
+    
+    Args:
+        service: Service name
+        etag: ETag of the cached response; sent as If-None-Match to revalidate it
+    
+    Returns:
+        Learner response body (humans + version stamp) with the response
+        ETag under "etag", or None if Learner answered 304 Not Modified
+    
+    Raises:
+        httpx.TimeoutException, httpx.HTTPStatusError, or any transport error
+    """
+    learner_url = os.getenv("LEARNER_SERVICE_URL", "http://learner:8000")
+    
+    outcome = "error"
+    start = time.perf_counter()
+    try:
+        response = await http_request(
+            "learner", "GET", f"{learner_url}/profiles",
+            params={"service": service},
+            headers={"If-None-Match": etag} if etag else None,
+            timeout=5.0
+        )
+        if response.status_code == 304:
+            outcome = "ok"
+            return None
+        response.raise_for_status()
+        outcome = "ok"
+        return {**response.json(), "etag": response.headers.get("etag")}
+    finally:
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency="learner", outcome=outcome)
+
+
+def _profiles_from_response(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Candidate profiles from a Learner /profiles body.
+
+    Learner returns {"service", "version", "humans"} with each human keyed by
+    human_id; candidates are keyed by id. "profiles" is accepted for older Learners.
+    """
+    humans = data.get("humans")
+    if humans is None:
+        humans = data.get("profiles", [])
+    return [
+        human if "id" in human else {**human, "id": human.get("human_id")}
+        for human in humans
+    ]
+
+
+class ProfileFetchCancelled(Exception):
+    """The Learner call a waiter was sharing was cancelled by its caller."""
+
+
+def _cache_key_generation(service: str) -> tuple:
+    """Invalidation generation for a service (changes on every invalidation that touches it)."""
+    return (_cache_generation, _service_generations.get(service, 0))
+
+
+async def _get_profiles_cached(service: str) -> List[Dict[str, Any]]:
+    """
+    Get Learner profiles for a service through the TTL/LRU cache.
+    
+    An expired entry is revalidated with If-None-Match; a 304 re-arms its TTL
+    without transferring the profiles again. Concurrent misses for the same
+    service share one Learner call. Errors are not cached and propagate to
+    every waiter; if the caller making the shared call is cancelled, waiters
+    get ProfileFetchCancelled.
+    """
+    now = time.monotonic()
+    entry = _profile_cache.get(service)
+    if entry is not None:
+        if entry["expires_at"] > now:
+            _profile_cache.move_to_end(service)
+            _cache_stats["hits"] += 1
+            return entry["profiles"]
+        # Expired: keep it around to revalidate
+        _cache_stats["stale"] += 1
+    else:
+        _cache_stats["misses"] += 1
+    
+    inflight = _inflight_fetches.get(service)
+    if inflight is not None:
+        _cache_stats["coalesced"] += 1
+        return await asyncio.shield(inflight)
+    
+    generation = _cache_key_generation(service)
+    future = asyncio.get_running_loop().create_future()
+    _inflight_fetches[service] = future
+    try:
+        data = await _fetch_learner_profiles(service, entry.get("etag") if entry else None)
+        if data is None:
+            # 304: the expired entry is still current (unless invalidated meanwhile)
+            profiles = entry["profiles"]
+            if generation == _cache_key_generation(service) and _profile_cache.get(service) is entry:
+                entry["expires_at"] = time.monotonic() + CANDIDATE_CACHE_TTL_SECONDS
+                _profile_cache.move_to_end(service)
+            _cache_stats["revalidated"] += 1
+            future.set_result(profiles)
+            return profiles
+        
+        profiles = _profiles_from_response(data)
+        # Don't cache empty results, and don't cache a response that may predate
+        # an invalidation received while it was in flight
+        if profiles and CANDIDATE_CACHE_TTL_SECONDS > 0 and generation == _cache_key_generation(service):
+            _profile_cache[service] = {
+                "profiles": profiles,
+                "version": data.get("version"),
+                "etag": data.get("etag"),
+                "expires_at": time.monotonic() + CANDIDATE_CACHE_TTL_SECONDS
+            }
+            _profile_cache.move_to_end(service)
+            while len(_profile_cache) > CANDIDATE_CACHE_MAX_SERVICES:
+                _profile_cache.popitem(last=False)
+                _cache_stats["evictions"] += 1
+        elif entry is not None and _profile_cache.get(service) is entry:
+            del _profile_cache[service]
+        future.set_result(profiles)
+        return profiles
+    except asyncio.CancelledError:
+        # Only this caller was cancelled: waiters get an error they fall back on
+        future.set_exception(ProfileFetchCancelled(f"Learner profile fetch for {service} was cancelled"))
+        future.exception()  # mark retrieved so an unawaited future doesn't warn
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved so an unawaited future doesn't warn
+        raise
+    finally:
+        _inflight_fetches.pop(service, None)
+
+
+def invalidate_candidates(service: Optional[str] = None, version: Optional[int] = None) -> bool:
+    """
+    Invalidate cached candidate profiles (called by Learner after process_outcome).
+    
+    Args:
+        service: Service to invalidate; None clears the whole cache
+        version: Learner profile version stamp for the change. If the cached entry
+            already carries this version (or newer) it is kept.
+    
+    Returns:
+        True if anything was invalidated
+    """
+    global _cache_generation
+    
+    if service is None:
+        _cache_generation += 1
+        _cache_stats["invalidations"] += len(_profile_cache)
+        _profile_cache.clear()
+        return True
+    
+    entry = _profile_cache.get(service)
+    if (
+        entry is not None and version is not None
+        and entry.get("version") is not None and entry["version"] >= version
+    ):
+        return False
+    
+    _service_generations[service] = _service_generations.get(service, 0) + 1
+    if entry is not None:
+        del _profile_cache[service]
+        _cache_stats["invalidations"] += 1
+        return True
+    # Nothing cached, but an in-flight fetch may predate the change
+    return service in _inflight_fetches
+
+
+def get_candidate_cache_stats() -> Dict[str, Any]:
+    """Candidate profile cache counters (hits, misses, stale, revalidated, coalesced, invalidations, evictions)."""
+    return {
+        **_cache_stats,
+        "size": len(_profile_cache),
+        "max_size": CANDIDATE_CACHE_MAX_SERVICES,
+        "ttl_seconds": CANDIDATE_CACHE_TTL_SECONDS
+    }
+
+
 async def get_candidates(service: str, use_fallback: bool = True) -> List[Dict[str, Any]]:
     """
     Get candidate humans from Learner Service for a given service.
     Falls back to database if Learner Service is unavailable.
     
+    Learner profiles are served from an in-process TTL cache (see
+    CANDIDATE_CACHE_TTL_SECONDS); callers get their own copies of the profile dicts.
+    
     Args:
         service: Service name (e.g., "api-service")
         use_fallback: If True, use database fallback when Learner is down
@@ -109,43 +315,39 @@ async def get_candidates(service: str, use_fallback: bool = True) -> List[Dict[s
     Returns:
         List of human profiles with fit_score, resolves_count, transfers_count
     """
-    learner_url = os.getenv("LEARNER_SERVICE_URL", "http://learner:8000")
-    
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                f"{learner_url}/profiles",
-                params={"service": service}
-            )
-            response.raise_for_status()
-            data = response.json()
-            profiles = data.get("profiles", [])
-            
-            if profiles:
-                return profiles
-            else:
-                # Empty response - try fallback
-                if use_fallback:
-                    logger.warning(f"Learner Service returned empty profiles for {service}, using fallback")
-                    return _get_fallback_candidates(service)
-                return []
+        profiles = await _get_profiles_cached(service)
+        
+        if profiles:
+            # Scoring/constraints annotate candidates in place
+            return [dict(p) for p in profiles]
+        else:
+            # Empty response - try fallback
+            if use_fallback:
+                logger.warning(f"Learner Service returned empty profiles for {service}, using fallback")
+                FALLBACKS.inc(kind="candidates", reason="empty")
+                return _get_fallback_candidates(service)
+            return []
                 
     except httpx.TimeoutException:
         logger.error(f"Learner Service timeout when fetching candidates for {service}")
         if use_fallback:
             logger.warning("Using fallback candidates due to timeout")
+            FALLBACKS.inc(kind="candidates", reason="timeout")
             return _get_fallback_candidates(service)
         return []
     except httpx.HTTPStatusError as e:
         logger.error(f"Learner Service error: {e.response.status_code}")
         if use_fallback:
             logger.warning("Using fallback candidates due to HTTP error")
+            FALLBACKS.inc(kind="candidates", reason="http_error")
             return _get_fallback_candidates(service)
         return []
     except Exception as e:
         logger.error(f"Failed to get candidates from Learner Service: {e}")
         if use_fallback:
             logger.warning("Using fallback candidates due to exception")
+            FALLBACKS.inc(kind="candidates", reason="error")
             return _get_fallback_candidates(service)
         return []
 
@@ -1,39 +1,89 @@
 """
 Core decision engine - orchestrates the decision-making process.
 """
+import os
+import time
+import asyncio
 import logging
+from collections import defaultdict
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import uuid
 
 from db import (
-    get_work_item, save_decision, save_decision_candidate,
-    save_constraint_result, get_decision
+    get_work_item, get_decision, get_work_items,
+    get_decisions_for_work_items, save_decisions_batch,
+    save_decision_with_audit, get_constraint_results_for_decisions,
+    run_in_db_executor
 )
 from candidate_service import get_candidates
 from constraint_service import apply_constraints
 from scoring_service import score_candidates, calculate_confidence
-from weaviate_client import search_similar_work_items, store_work_item
-from llm_client import generate_embedding, extract_entities
+from weaviate_client import search_similar_work_items
+from embedding_service import get_work_item_embedding, get_work_item_embeddings
+from llm_client import extract_entities
+from metrics import DECISION_DURATION, STAGE_DURATION, FALLBACKS, FAILURES
 
 logger = logging.getLogger(__name__)
 
+# Per-decision latency budget. Required stages (work item, candidates) always
+# complete; optional stages (similarity) are cancelled once the budget is spent.
+DECISION_DEADLINE_MS = float(os.getenv("DECISION_DEADLINE_MS", "1500"))
+
+
+async def _timed(stage: str, timings: Dict[str, float], awaitable):
+    """Await a stage and record its wall time (ms) in timings, even if it fails or is cancelled."""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        elapsed = time.perf_counter() - start
+        timings[stage] = round(elapsed * 1000, 2)
+        STAGE_DURATION.observe(elapsed, stage=stage)
+
+
+async def _find_similar_incidents(work_item: Dict[str, Any], timings: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Optional similarity stage: embedding lookup, then vector search.
+    
+    Never raises - any failure means the decision continues without similarity data.
+    """
+    try:
+        embedding = await _timed("embedding", timings, asyncio.to_thread(get_work_item_embedding, work_item))
+    except Exception as e:
+        FAILURES.inc(stage="embedding")
+        logger.warning(f"Embedding lookup failed: {e}, continuing without vector similarity")
+        return []
+    if not embedding:
+        FALLBACKS.inc(kind="similarity", reason="no_embedding")
+        logger.warning("No embedding available for work item, continuing without vector similarity")
+        return []
+    
+    try:
+        similar_incidents = await _timed(
+            "similarity_search", timings,
+            asyncio.to_thread(search_similar_work_items, embedding, service=work_item.get("service"), limit=20)
+        )
+        logger.info(f"Found {len(similar_incidents)} similar incidents")
+        return similar_incidents
+    except Exception as e:
+        FAILURES.inc(stage="similarity_search")
+        logger.warning(f"Vector similarity search failed: {e}, continuing without similarity data")
+        return []
+
 
 async def make_decision(work_item_id: str) -> Dict[str, Any]:
     """
     Make a decision for a work item.
     
-    Processing flow:
-    1. Retrieve WorkItem from database
-    2. Generate embedding for work item description
-    3. Vector similarity search in Weaviate for similar incidents
-    4. Call Learner Service for candidates
-    5. Apply constraint filtering
-    6. Score remaining candidates
-    7. Select primary + backups
-    8. Calculate confidence
-    9. Store decision + audit trail
-    10. Return decision
+    Processing flow (stage graph, under a DECISION_DEADLINE_MS budget):
+    1. Existing-decision check || load WorkItem from database
+    2. Learner candidates (required) || embedding + vector similarity search (optional)
+       - if the budget runs out before similarity finishes, it is cancelled and the
+         decision is made without similarity data
+    3. Apply constraint filtering, score, select primary + backups, calculate confidence
+    4. Store decision + audit trail + per-stage timings (single transaction)
+    5. Return decision
     
     Args:
         work_item_id: Work item ID
@@ -41,143 +91,324 @@ async def make_decision(work_item_id: str) -> Dict[str, Any]:
     Returns:
         Decision with primary_human_id, backup_human_ids, confidence, etc.
     """
-    # Check if decision already exists
-    existing_decision = get_decision(work_item_id)
+    started = time.perf_counter()
+    deadline = started + DECISION_DEADLINE_MS / 1000
+    timings: Dict[str, float] = {}
+    degraded: List[str] = []
+    
+    # 1. Existing decision check and work item load are independent reads
+    existing_decision, work_item = await asyncio.gather(
+        _timed("existing_check", timings, run_in_db_executor(get_decision, work_item_id)),
+        _timed("work_item_load", timings, run_in_db_executor(get_work_item, work_item_id))
+    )
     if existing_decision:
         logger.info(f"Decision already exists for work_item {work_item_id}, returning existing")
         return existing_decision
-    
-    # 1. Get work item
-    work_item = get_work_item(work_item_id)
     if not work_item:
         raise ValueError(f"Work item {work_item_id} not found")
     
     service = work_item.get("service")
-    description = work_item.get("description", "")
-    severity = work_item.get("severity", "sev3")
     
-    # 2. Generate embedding (non-blocking - continue if it fails)
-    embedding = None
+    # 2. Candidate fetch doesn't depend on the vector search - run them concurrently
+    similarity_task = asyncio.create_task(_find_similar_incidents(work_item, timings))
     try:
-        if description:
-            embedding = generate_embedding(description)
-            if not embedding:
-                logger.warning("Failed to generate embedding, continuing without vector similarity")
-        else:
-            logger.warning("No description provided, skipping embedding generation")
-    except Exception as e:
-        logger.warning(f"Embedding generation failed: {e}, continuing without vector similarity")
+        candidates = await _timed("candidates", timings, get_candidates(service, use_fallback=True))
+    except BaseException:
+        similarity_task.cancel()
+        raise
     
-    # 3. Vector similarity search (non-blocking - continue if it fails)
-    similar_incidents = []
-    if embedding:
-        try:
-            similar_incidents = search_similar_work_items(embedding, service=service, limit=20)
-            logger.info(f"Found {len(similar_incidents)} similar incidents")
-        except Exception as e:
-            logger.warning(f"Vector similarity search failed: {e}, continuing without similarity data")
-    
-    # 4. Get candidates from Learner Service (with fallback)
-    candidates = await get_candidates(service, use_fallback=True)
     if not candidates:
+        similarity_task.cancel()
         logger.error(f"No candidates found for service {service} (even with fallback)")
         raise ValueError(f"No candidates found for service {service}. Learner Service may be down and no fallback candidates available.")
     
     logger.info(f"Retrieved {len(candidates)} candidates from Learner Service (or fallback)")
     
-    # 5. Apply constraints
+    # Similarity is optional: give it whatever budget is left, then cancel it
+    similar_incidents = []
+    try:
+        similar_incidents = await asyncio.wait_for(similarity_task, timeout=max(0.0, deadline - time.perf_counter()))
+    except asyncio.TimeoutError:
+        degraded.append("similarity")
+        FALLBACKS.inc(kind="similarity", reason="deadline")
+        logger.warning(
+            f"Similarity stage exceeded the {DECISION_DEADLINE_MS:.0f}ms decision budget for {work_item_id}, "
+            f"continuing without similarity data"
+        )
+    
+    # 3. Apply constraints, score, select primary + backups, calculate confidence
+    plan = _plan_decision(work_item, candidates, similar_incidents, timings)
+    primary = plan["primary"]
+    backups = plan["backups"]
+    confidence = plan["confidence"]
+    
+    decision_id = f"dec-{uuid.uuid4().hex[:12]}"
+    stage_timings = {
+        "stages_ms": dict(timings),
+        "total_ms": round((time.perf_counter() - started) * 1000, 2),
+        "deadline_ms": DECISION_DEADLINE_MS,
+        "degraded": degraded
+    }
+    
+    # 4. Store decision + audit trail (all candidates) + constraint results + timings in one transaction
+    audit = _build_audit_rows(plan)
+    with STAGE_DURATION.time(stage="audit_write"):
+        decision_id = await run_in_db_executor(
+            save_decision_with_audit,
+            decision_id=decision_id,
+            work_item_id=work_item_id,
+            primary_human_id=primary["id"],
+            backup_human_ids=[b["id"] for b in backups],
+            confidence=confidence,
+            candidates=audit["candidates"],
+            constraints=audit["constraints"],
+            stage_timings=stage_timings
+        )
+    DECISION_DURATION.observe(time.perf_counter() - started)
+    
+    # 5. Return decision (Ingest already stored the work item vector in Weaviate)
+    return {
+        "id": decision_id,
+        "work_item_id": work_item_id,
+        "primary_human_id": primary["id"],
+        "backup_human_ids": [b["id"] for b in backups],
+        "confidence": confidence,
+        "created_at": datetime.now().isoformat()
+    }
+
+
+def _plan_decision(
+    work_item: Dict[str, Any],
+    candidates: List[Dict[str, Any]],
+    similar_incidents: List[Dict[str, Any]],
+    timings: Optional[Dict[str, float]] = None
+) -> Dict[str, Any]:
+    """
+    Apply constraints, score candidates and select primary + backups for one work item.
+    
+    Args:
+        timings: Optional stage timings dict; "constraints" and "scoring" (ms) are added
+    
+    Raises:
+        ValueError: If every candidate is filtered out
+    """
+    start = time.perf_counter()
     passed_candidates, filtered_candidates = apply_constraints(candidates, work_item)
+    constraints_elapsed = time.perf_counter() - start
+    STAGE_DURATION.observe(constraints_elapsed, stage="constraints")
+    if timings is not None:
+        timings["constraints"] = round(constraints_elapsed * 1000, 2)
     
     if not passed_candidates:
-        raise ValueError(f"All candidates filtered out for work_item {work_item_id}")
+        raise ValueError(f"All candidates filtered out for work_item {work_item['id']}")
     
     logger.info(f"After constraints: {len(passed_candidates)} passed, {len(filtered_candidates)} filtered")
     
-    # 6. Score candidates
+    start = time.perf_counter()
     scored_candidates = score_candidates(passed_candidates, work_item, similar_incidents)
+    scoring_elapsed = time.perf_counter() - start
+    STAGE_DURATION.observe(scoring_elapsed, stage="scoring")
+    if timings is not None:
+        timings["scoring"] = round(scoring_elapsed * 1000, 2)
     
-    # 7. Select primary + backups
     primary = scored_candidates[0]
     backups = scored_candidates[1:3] if len(scored_candidates) > 1 else []  # Top 2 backups
     
-    # 8. Calculate confidence
-    confidence = calculate_confidence(primary, backups, len(candidates))
-    
-    # 9. Create decision ID
-    decision_id = f"dec-{uuid.uuid4().hex[:12]}"
+    return {
+        "passed": passed_candidates,
+        "filtered": filtered_candidates,
+        "scored": scored_candidates,
+        "primary": primary,
+        "backups": backups,
+        "confidence": calculate_confidence(primary, backups, len(candidates))
+    }
+
+
+def _build_audit_rows(plan: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Build decision_candidates and constraint_results rows for a decision plan."""
+    scored_candidates = plan["scored"]
+    filtered_candidates = plan["filtered"]
+    passed_count = len(plan["passed"])
     
-    # 10. Store decision
-    save_decision(
-        decision_id=decision_id,
-        work_item_id=work_item_id,
-        primary_human_id=primary["id"],
-        backup_human_ids=[b["id"] for b in backups],
-        confidence=confidence
+    candidate_rows = [
+        {
+            "human_id": candidate["id"],
+            "score": candidate["final_score"],
+            "rank": candidate["rank"],
+            "filtered": False,
+            "filter_reason": None,
+            "score_breakdown": candidate["score_breakdown"]
+        }
+        for candidate in scored_candidates
+    ]
+    candidate_rows.extend(
+        {
+            "human_id": candidate["id"],
+            "score": 0.0,
+            "rank": len(scored_candidates) + i + 1,
+            "filtered": True,
+            "filter_reason": candidate.get("filter_reason"),
+            "score_breakdown": {}
+        }
+        for i, candidate in enumerate(filtered_candidates)
     )
     
-    # 11. Store audit trail (all candidates)
-    for candidate in scored_candidates:
-        save_decision_candidate(
-            decision_id=decision_id,
-            human_id=candidate["id"],
-            score=candidate["final_score"],
-            rank=candidate["rank"],
-            filtered=False,
-            filter_reason=None,
-            score_breakdown=candidate["score_breakdown"]
-        )
+    constraint_rows = [
+        {
+            "constraint_name": "capacity",
+            "passed": passed_count > 0,
+            "reason": f"{passed_count} candidates passed capacity check" if passed_count > 0 else "All candidates failed capacity check"
+        },
+        {
+            "constraint_name": "availability",
+            "passed": passed_count > 0,
+            "reason": f"{passed_count} candidates are available" if passed_count > 0 else "No available candidates"
+        }
+    ]
     
-    for candidate in filtered_candidates:
-        save_decision_candidate(
-            decision_id=decision_id,
-            human_id=candidate["id"],
-            score=0.0,
-            rank=len(scored_candidates) + filtered_candidates.index(candidate) + 1,
-            filtered=True,
-            filter_reason=candidate.get("filter_reason"),
-            score_breakdown={}
-        )
+    return {"candidates": candidate_rows, "constraints": constraint_rows}
+
+
+async def make_decisions_batch(work_item_ids: List[str]) -> Dict[str, Any]:
+    """
+    Make decisions for many work items in one pass.
     
-    # 12. Store constraint results
-    # Check capacity constraint
-    capacity_passed = len(passed_candidates) > 0
-    save_constraint_result(
-        decision_id=decision_id,
-        constraint_name="capacity",
-        passed=capacity_passed,
-        reason=f"{len(passed_candidates)} candidates passed capacity check" if capacity_passed else "All candidates failed capacity check"
-    )
+    Processing flow:
+    1. Load existing decisions and work items with one query each
+    2. Group work items by service
+    3. Fetch candidates once per service (concurrently)
+    4. Look up stored embeddings with one query (local batch encode for the rest)
+    5. Run the vector similarity searches concurrently
+    6. Constrain + score each service group against its shared candidate pool
+    7. Store all decisions + audit trails in a single transaction
+    
+    Args:
+        work_item_ids: Work item IDs (duplicates are ignored)
     
-    # Check availability constraint
-    availability_passed = len(passed_candidates) > 0
-    save_constraint_result(
-        decision_id=decision_id,
-        constraint_name="availability",
-        passed=availability_passed,
-        reason=f"{len(passed_candidates)} candidates are available" if availability_passed else "No available candidates"
+    Returns:
+        {"decisions": [...], "new_decisions": [...], "errors": [{"work_item_id", "error"}]}
+        Each decision has the make_decision fields plus "constraints_checked";
+        "new_decisions" holds only the decisions created by this call.
+    """
+    unique_ids = list(dict.fromkeys(work_item_ids))
+    decisions: Dict[str, Dict[str, Any]] = {}
+    new_decision_ids: List[str] = []
+    errors: Dict[str, str] = {}
+    
+    # 1. Existing decisions are returned as-is
+    existing = await run_in_db_executor(get_decisions_for_work_items, unique_ids)
+    existing_constraints = await run_in_db_executor(
+        get_constraint_results_for_decisions, [d["id"] for d in existing.values()]
     )
+    for work_item_id, decision in existing.items():
+        created_at = decision["created_at"]
+        decisions[work_item_id] = {
+            **decision,
+            "created_at": created_at.isoformat() if hasattr(created_at, 'isoformat') else str(created_at),
+            "constraints_checked": existing_constraints.get(decision["id"], [])
+        }
+    
+    pending_ids = [wid for wid in unique_ids if wid not in existing]
+    work_items = await run_in_db_executor(get_work_items, pending_ids)
+    
+    # 2. Group by service
+    by_service: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for work_item_id in pending_ids:
+        work_item = work_items.get(work_item_id)
+        if not work_item:
+            errors[work_item_id] = f"Work item {work_item_id} not found"
+            continue
+        by_service[work_item.get("service")].append(work_item)
+    
+    pending_items = [wi for items in by_service.values() for wi in items]
+    if pending_items:
+        logger.info(f"Batch decision: {len(pending_items)} work items across {len(by_service)} services")
     
-    # 13. Store work item in Weaviate for future similarity searches (if embedding exists)
-    # Do this asynchronously - don't block decision return
-    if embedding:
+    # 3. One candidate fetch per service
+    services = list(by_service.keys())
+    candidate_lists = await asyncio.gather(*(get_candidates(service, use_fallback=True) for service in services))
+    candidates_by_service = dict(zip(services, candidate_lists))
+    
+    # 4. Stored embeddings in one lookup (non-blocking - continue without similarity if it fails)
+    embeddings: List[Optional[List[float]]] = [None] * len(pending_items)
+    if pending_items:
         try:
-            store_work_item(
-                work_item_id=work_item_id,
-                description=description,
-                service=service,
-                severity=severity,
-                embedding=embedding
+            embedding_by_id = await asyncio.to_thread(get_work_item_embeddings, pending_items)
+            embeddings = [embedding_by_id.get(wi["id"]) for wi in pending_items]
+        except Exception as e:
+            FAILURES.inc(stage="embedding")
+            logger.warning(f"Batch embedding lookup failed: {e}, continuing without vector similarity")
+    
+    # 5. Concurrent similarity searches
+    async def _search(work_item: Dict[str, Any], embedding: Optional[List[float]]) -> List[Dict[str, Any]]:
+        if not embedding:
+            return []
+        try:
+            return await asyncio.to_thread(
+                search_similar_work_items, embedding, service=work_item.get("service"), limit=20
             )
         except Exception as e:
-            logger.warning(f"Failed to store work item in Weaviate: {e}, continuing")
+            FAILURES.inc(stage="similarity_search")
+            logger.warning(f"Vector similarity search failed for {work_item['id']}: {e}, continuing without similarity data")
+            return []
+    
+    similar_lists = await asyncio.gather(*(_search(wi, emb) for wi, emb in zip(pending_items, embeddings)))
+    similar_by_item = {wi["id"]: similar for wi, similar in zip(pending_items, similar_lists)}
+    
+    # 6. Score each service group against its shared candidate pool
+    records = []
+    for service, items in by_service.items():
+        candidates = candidates_by_service.get(service) or []
+        for work_item in items:
+            work_item_id = work_item["id"]
+            if not candidates:
+                errors[work_item_id] = f"No candidates found for service {service}. Learner Service may be down and no fallback candidates available."
+                continue
+            try:
+                # Constraint/scoring mutate candidate dicts, so each item gets its own copies
+                plan = _plan_decision(work_item, [dict(c) for c in candidates], similar_by_item.get(work_item_id, []))
+            except ValueError as e:
+                errors[work_item_id] = str(e)
+                continue
+            
+            audit = _build_audit_rows(plan)
+            records.append({
+                "id": f"dec-{uuid.uuid4().hex[:12]}",
+                "work_item_id": work_item_id,
+                "primary_human_id": plan["primary"]["id"],
+                "backup_human_ids": [b["id"] for b in plan["backups"]],
+                "confidence": plan["confidence"],
+                "candidates": audit["candidates"],
+                "constraints": audit["constraints"]
+            })
+    
+    # 7. Single transaction for all decisions + audit rows
+    if records:
+        try:
+            persisted_ids = await run_in_db_executor(save_decisions_batch, records)
+        except Exception as e:
+            logger.error(f"Batch decision save failed: {e}", exc_info=True)
+            for record in records:
+                errors[record["work_item_id"]] = f"Failed to store decision: {str(e)}"
+            records = []
+            persisted_ids = {}
+        
+        created_at = datetime.now().isoformat()
+        for record in records:
+            work_item_id = record["work_item_id"]
+            decisions[work_item_id] = {
+                "id": persisted_ids.get(work_item_id, record["id"]),
+                "work_item_id": work_item_id,
+                "primary_human_id": record["primary_human_id"],
+                "backup_human_ids": record["backup_human_ids"],
+                "confidence": record["confidence"],
+                "created_at": created_at,
+                "constraints_checked": record["constraints"]
+            }
+            new_decision_ids.append(work_item_id)
     
-    # 14. Return decision
     return {
-        "id": decision_id,
-        "work_item_id": work_item_id,
-        "primary_human_id": primary["id"],
-        "backup_human_ids": [b["id"] for b in backups],
-        "confidence": confidence,
-        "created_at": datetime.now().isoformat()
+        "decisions": [decisions[wid] for wid in unique_ids if wid in decisions],
+        "new_decisions": [decisions[wid] for wid in new_decision_ids],
+        "errors": [{"work_item_id": wid, "error": errors[wid]} for wid in unique_ids if wid in errors]
     }
-
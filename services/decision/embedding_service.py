@@ -0,0 +1,79 @@
+"""
+Work item embedding lookup - reuses the vector Ingest already stored.
+
+Order of preference:
+1. Vector stored in Weaviate by Ingest (keyed by work item ID)
+2. Local encode with the same model as Ingest (all-MiniLM-L6-v2)
+3. None (decision continues without vector similarity)
+"""
+import logging
+from typing import List, Dict, Any, Optional
+from weaviate_client import get_work_item_vector, get_work_item_vectors
+from embedding_utils import generate_embeddings
+
+logger = logging.getLogger(__name__)
+
+# How often each source produced the embedding for a decision
+_embedding_source_counts = {
+    "weaviate": 0,
+    "local": 0,
+    "none": 0
+}
+
+
+def get_work_item_embedding(work_item: Dict[str, Any]) -> Optional[List[float]]:
+    """
+    Get the embedding for a work item (stored vector first, local model as fallback).
+    
+    Args:
+        work_item: Work item row (id, description)
+    
+    Returns:
+        384-dimensional embedding vector, or None if neither source has one
+    """
+    return get_work_item_embeddings([work_item]).get(work_item["id"])
+
+
+def get_work_item_embeddings(work_items: List[Dict[str, Any]]) -> Dict[str, Optional[List[float]]]:
+    """
+    Get embeddings for many work items: one Weaviate lookup, then one local
+    batch encode for whatever was not stored.
+    
+    Args:
+        work_items: Work item rows (id, description)
+    
+    Returns:
+        Dict of work_item_id -> vector (None when no embedding is available)
+    """
+    if not work_items:
+        return {}
+    
+    ids = [wi["id"] for wi in work_items]
+    if len(ids) == 1:
+        vector = get_work_item_vector(ids[0])
+        stored = {ids[0]: vector} if vector else {}
+    else:
+        stored = get_work_item_vectors(ids)
+    
+    embeddings: Dict[str, Optional[List[float]]] = dict(stored)
+    _embedding_source_counts["weaviate"] += len(stored)
+    
+    missing = [wi for wi in work_items if wi["id"] not in stored]
+    if missing:
+        logger.info(f"No stored vector for {len(missing)} work item(s), encoding locally")
+        vectors = generate_embeddings([wi.get("description") or "" for wi in missing])
+        for work_item, vector in zip(missing, vectors):
+            embeddings[work_item["id"]] = vector
+            _embedding_source_counts["local" if vector else "none"] += 1
+    
+    return embeddings
+
+
+def get_embedding_source_stats() -> Dict[str, Any]:
+    """Counts of embeddings served from Weaviate, computed locally, or unavailable."""
+    total = sum(_embedding_source_counts.values())
+    return {
+        **_embedding_source_counts,
+        "total": total,
+        "weaviate_ratio": _embedding_source_counts["weaviate"] / total if total else 0.0
+    }
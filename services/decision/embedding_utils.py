@@ -0,0 +1,56 @@
+"""
+Local embedding generation for Decision Service.
+
+Uses the same model as Ingest (all-MiniLM-L6-v2, normalized, 384 dimensions) so
+vectors computed here live in the same space as the ones Ingest stores in Weaviate.
+Only used when the stored vector for a work item is missing.
+"""
+import logging
+from typing import List, Optional
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# Global model instance
+_embedding_model: Optional[SentenceTransformer] = None
+
+
+def get_embedding_model() -> SentenceTransformer:
+    """Get or initialize sentence transformer model."""
+    global _embedding_model
+    
+    if _embedding_model is None:
+        try:
+            _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            logger.info("Sentence transformer model loaded")
+        except Exception as e:
+            logger.error(f"Failed to load embedding model: {e}")
+            raise
+    
+    return _embedding_model
+
+
+def generate_embeddings(texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    Generate embeddings for many texts with one model call.
+    
+    Args:
+        texts: Input texts
+    
+    Returns:
+        One 384-dimensional vector per text (None for empty texts or on failure)
+    """
+    results: List[Optional[List[float]]] = [None] * len(texts)
+    indexed = [(i, t) for i, t in enumerate(texts) if t and t.strip()]
+    if not indexed:
+        return results
+    
+    try:
+        model = get_embedding_model()
+        vectors = model.encode([t for _, t in indexed], convert_to_numpy=True, normalize_embeddings=True)
+        for (i, _), vector in zip(indexed, vectors):
+            results[i] = vector.tolist()
+    except Exception as e:
+        logger.error(f"Failed to generate embeddings: {e}")
+    
+    return results
@@ -3,21 +3,53 @@ Decision Service - Core decision engine
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional
 import os
+import asyncio
 import logging
-import httpx
+from contextlib import asynccontextmanager
 from datetime import datetime
 
-from decision_engine import make_decision
-from db import get_decision, get_decision_candidates, get_constraint_results, get_work_item
+from decision_engine import make_decision, make_decisions_batch
+from candidate_service import invalidate_candidates, get_candidate_cache_stats
+from embedding_service import get_embedding_source_stats
+from metrics import render_metrics
+from http_client import close_http_clients, get_http_client_stats
+from orchestration_service import (
+    OrchestrationWorkerPool, ORCHESTRATION_ENABLED, format_job_status, refresh_queue_metrics
+)
+from db import (
+    get_decision, get_decision_candidates, get_constraint_results, get_decision_stage_timings,
+    get_work_item, get_pool_stats, get_orchestration_job, run_in_db_executor
+)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Decision Service", version="0.1.0")
+# Explain + Executor orchestration workers (jobs live in orchestration_jobs)
+orchestration_pool = OrchestrationWorkerPool()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start / stop the orchestration worker pool; close shared HTTP clients."""
+    if ORCHESTRATION_ENABLED:
+        await orchestration_pool.start()
+    else:
+        logger.info("Orchestration worker pool disabled")
+    yield
+    if ORCHESTRATION_ENABLED:
+        await orchestration_pool.stop()
+    await close_http_clients()
+
+
+app = FastAPI(title="Decision Service", version="0.1.0", lifespan=lifespan)
+
+# Maximum number of work items accepted by POST /decide/batch
+DECISION_BATCH_MAX_ITEMS = int(os.getenv("DECISION_BATCH_MAX_ITEMS", "500"))
 
 # CORS middleware
 app.add_middleware(
@@ -51,10 +83,44 @@ class DecisionResponse(BaseModel):
     created_at: str
 
 
+class BatchDecisionRequest(BaseModel):
+    work_item_ids: List[str] = Field(..., min_length=1, max_length=DECISION_BATCH_MAX_ITEMS)
+
+
+class BatchDecisionError(BaseModel):
+    work_item_id: str
+    error: str
+
+
+class BatchDecisionResponse(BaseModel):
+    results: List[DecisionResponse]
+    errors: List[BatchDecisionError]
+
+
+class CandidateCacheInvalidation(BaseModel):
+    service: Optional[str] = None  # None invalidates every service
+    version: Optional[int] = None  # Learner profile version stamp for the change
+
+
 @app.get("/healthz")
 async def health():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "decision"}
+    return {
+        "status": "healthy",
+        "service": "decision",
+        "db_pool": get_pool_stats(),
+        "http_clients": get_http_client_stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage / per-dependency latency histograms, fallback and failure counters, orchestration queue."""
+    try:
+        await refresh_queue_metrics()
+    except Exception as e:
+        logger.warning(f"Failed to sample orchestration queue metrics: {e}")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 @app.post("/decide", response_model=DecisionResponse)
@@ -68,13 +134,16 @@ async def decide(request: DecisionRequest):
     3. Applies constraint filtering
     4. Scores candidates (fit_score + vector similarity + capacity)
     5. Selects primary + backups
-    6. Stores decision + audit trail
+    6. Stores decision + audit trail + orchestration job
+    
+    Returns as soon as the decision is persisted; Explain + Executor run on the
+    orchestration worker pool (see GET /decisions/{decision_id}/status).
     """
     try:
         decision = await make_decision(request.work_item_id)
         
         # Get constraint results
-        constraint_results = get_constraint_results(decision["id"])
+        constraint_results = await run_in_db_executor(get_constraint_results, decision["id"])
         constraints_checked = [
             ConstraintResult(
                 name=cr["constraint_name"],
@@ -84,123 +153,8 @@ async def decide(request: DecisionRequest):
             for cr in constraint_results
         ]
         
-        # AUTOMATIC ORCHESTRATION: Trigger Explain + Executor
-        explain_url = os.getenv("EXPLAIN_SERVICE_URL", "http://explain:8000")
-        executor_url = os.getenv("EXECUTOR_SERVICE_URL", "http://executor:8000")
-        
-        try:
-            # Get WorkItem details for Explain and Executor
-            work_item = get_work_item(request.work_item_id)
-            if not work_item:
-                logger.warning(f"WorkItem {request.work_item_id} not found for orchestration")
-            else:
-                # Get decision candidates for Explain Service (with service for proper stats)
-                candidates = get_decision_candidates(decision["id"], service=work_item["service"])
-                primary_candidate = next((c for c in candidates if c["human_id"] == decision["primary_human_id"]), None)
-                backup_candidates = [c for c in candidates if c["human_id"] in decision["backup_human_ids"]]
-                
-                # Convert candidates to Explain Service format
-                def format_candidate_features(candidate):
-                    """Convert candidate dict to Explain Service CandidateFeature format."""
-                    if not candidate:
-                        return {}
-                    # Get similar_incident_score from score_breakdown if available
-                    score_breakdown = candidate.get("score_breakdown", {})
-                    similar_incident_score = score_breakdown.get("vector_similarity") if isinstance(score_breakdown, dict) else None
-                    
-                    return {
-                        "human_id": candidate.get("human_id", ""),
-                        "display_name": candidate.get("display_name", "Unknown"),
-                        "fit_score": float(candidate.get("fit_score", 0.5)),
-                        "resolves_count": int(candidate.get("resolves_count", 0)),
-                        "transfers_count": int(candidate.get("transfers_count", 0)),
-                        "last_resolved_at": candidate.get("last_resolved_at"),
-                        "on_call": candidate.get("on_call", False),  # Will be False if not available
-                        "pages_7d": int(candidate.get("pages_7d", 0)),
-                        "active_items": int(candidate.get("active_items", 0)),
-                        "similar_incident_score": similar_incident_score,
-                        "score_breakdown": score_breakdown
-                    }
-                
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    # Step 1: Get evidence from Explain Service
-                    evidence = []
-                    try:
-                        logger.info(f"Calling Explain Service for decision {decision['id']}")
-                        explain_request = {
-                            "decision_id": decision["id"],
-                            "work_item": {
-                                "id": work_item["id"],
-                                "service": work_item["service"],
-                                "severity": work_item["severity"],
-                                "description": work_item["description"],
-                                "type": work_item.get("type", "incident")
-                            },
-                            "primary_human_id": decision["primary_human_id"],
-                            "primary_features": format_candidate_features(primary_candidate),
-                            "backup_human_ids": decision["backup_human_ids"],
-                            "backup_features": [format_candidate_features(c) for c in backup_candidates],
-                            "constraints_checked": [
-                                {
-                                    "name": cr["constraint_name"],
-                                    "passed": cr["passed"],
-                                    "reason": cr.get("reason")
-                                }
-                                for cr in constraint_results
-                            ]
-                        }
-                        
-                        explain_response = await client.post(
-                            f"{explain_url}/explainDecision",
-                            json=explain_request
-                        )
-                        explain_response.raise_for_status()
-                        explain_result = explain_response.json()
-                        evidence = explain_result.get("evidence", [])
-                        logger.info(f"Explain Service returned {len(evidence)} evidence bullets")
-                    except httpx.RequestError as e:
-                        logger.warning(f"Explain Service failed (network error): {e}. Continuing without evidence.")
-                    except httpx.HTTPStatusError as e:
-                        logger.warning(f"Explain Service failed (HTTP {e.response.status_code}): {e.response.text}. Continuing without evidence.")
-                    except Exception as e:
-                        logger.warning(f"Explain Service failed (unexpected error): {e}. Continuing without evidence.")
-                    
-                    # Step 2: Execute decision via Executor Service
-                    try:
-                        logger.info(f"Calling Executor Service for decision {decision['id']}")
-                        executor_request = {
-                            "decision_id": decision["id"],
-                            "work_item_id": request.work_item_id,
-                            "primary_human_id": decision["primary_human_id"],
-                            "backup_human_ids": decision["backup_human_ids"],
-                            "evidence": evidence,
-                            "work_item": {
-                                "service": work_item["service"],
-                                "severity": work_item["severity"],
-                                "description": work_item["description"],
-                                "story_points": work_item.get("story_points")
-                            }
-                        }
-                        
-                        executor_response = await client.post(
-                            f"{executor_url}/executeDecision",
-                            json=executor_request
-                        )
-                        executor_response.raise_for_status()
-                        executor_result = executor_response.json()
-                        jira_key = executor_result.get("jira_issue_key")
-                        if jira_key:
-                            logger.info(f"Executor Service created Jira issue: {jira_key}")
-                        else:
-                            logger.warning(f"Executor Service completed but no Jira issue key returned (fallback used?)")
-                    except httpx.RequestError as e:
-                        logger.warning(f"Executor Service failed (network error): {e}. Decision made but not executed.")
-                    except httpx.HTTPStatusError as e:
-                        logger.warning(f"Executor Service failed (HTTP {e.response.status_code}): {e.response.text}. Decision made but not executed.")
-                    except Exception as e:
-                        logger.warning(f"Executor Service failed (unexpected error): {e}. Decision made but not executed.")
-        except Exception as e:
-            logger.warning(f"Orchestration failed: {e}. Decision made but Explain/Executor not called.")
+        # AUTOMATIC ORCHESTRATION: Explain + Executor run from the job committed with the decision
+        orchestration_pool.notify()
         
         return DecisionResponse(
             id=decision["id"],
@@ -220,16 +174,63 @@ async def decide(request: DecisionRequest):
         raise HTTPException(status_code=500, detail=f"Decision engine failed: {str(e)}")
 
 
+@app.post("/decide/batch", response_model=BatchDecisionResponse)
+async def decide_batch(request: BatchDecisionRequest):
+    """
+    Make decisions for many work items in one call (alert storms, replays).
+    
+    Work items are loaded with one query and grouped by service so each service's
+    candidates are fetched once; embeddings and vector searches run together and all
+    decisions + audit rows are written in a single transaction.
+    
+    Explain + Executor orchestration for new decisions runs on the orchestration worker pool.
+    Returns per-item results and per-item errors.
+    """
+    try:
+        batch = await make_decisions_batch(request.work_item_ids)
+    except Exception as e:
+        logger.error(f"Batch decision engine error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch decision engine failed: {str(e)}")
+    
+    results = []
+    for decision in batch["decisions"]:
+        constraint_results = decision["constraints_checked"]
+        results.append(DecisionResponse(
+            id=decision["id"],
+            work_item_id=decision["work_item_id"],
+            primary_human_id=decision["primary_human_id"],
+            backup_human_ids=decision["backup_human_ids"],
+            confidence=decision["confidence"],
+            constraints_checked=[
+                ConstraintResult(
+                    name=cr["constraint_name"],
+                    passed=cr["passed"],
+                    reason=cr.get("reason")
+                )
+                for cr in constraint_results
+            ],
+            created_at=decision["created_at"]
+        ))
+    
+    if batch["new_decisions"]:
+        orchestration_pool.notify()
+    
+    return BatchDecisionResponse(
+        results=results,
+        errors=[BatchDecisionError(**err) for err in batch["errors"]]
+    )
+
+
 @app.get("/decisions/{work_item_id}")
 async def get_decision_endpoint(work_item_id: str):
     """Get decision for a work item."""
     try:
-        decision = get_decision(work_item_id)
+        decision = await run_in_db_executor(get_decision, work_item_id)
         if not decision:
             raise HTTPException(status_code=404, detail=f"Decision not found for work_item {work_item_id}")
         
         # Get constraint results
-        constraint_results = get_constraint_results(decision["id"])
+        constraint_results = await run_in_db_executor(get_constraint_results, decision["id"])
         constraints_checked = [
             {
                 "name": cr["constraint_name"],
@@ -256,6 +257,29 @@ async def get_decision_endpoint(work_item_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to get decision: {str(e)}")
 
 
+@app.get("/decisions/{decision_id}/status")
+async def get_decision_status(decision_id: str):
+    """
+    Get Explain + Executor orchestration status for a decision.
+    
+    Returns:
+    - status: pending | running | succeeded | failed
+    - explain / execute stage status, attempts, Jira issue key
+    - last_error and next_attempt_at while retrying
+    """
+    try:
+        job = await run_in_db_executor(get_orchestration_job, decision_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"No orchestration job for decision {decision_id}")
+        return format_job_status(job)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get decision status failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to get decision status: {str(e)}")
+
+
 @app.get("/audit/{work_item_id}")
 async def get_audit_trail(work_item_id: str):
     """
@@ -266,20 +290,24 @@ async def get_audit_trail(work_item_id: str):
     - All candidates with scores and filter reasons
     - Constraint results
     - Score breakdowns
+    - Per-stage latency and deadline outcome (stage_timings)
     """
     try:
-        decision = get_decision(work_item_id)
+        decision = await run_in_db_executor(get_decision, work_item_id)
         if not decision:
             raise HTTPException(status_code=404, detail=f"Decision not found for work_item {work_item_id}")
         
         # Get all candidates (audit trail)
         # Get service from work_item for proper stats
-        work_item = get_work_item(work_item_id)
+        work_item = await run_in_db_executor(get_work_item, work_item_id)
         service = work_item.get("service") if work_item else None
-        candidates = get_decision_candidates(decision["id"], service=service)
         
-        # Get constraint results
-        constraint_results = get_constraint_results(decision["id"])
+        # Candidates, constraint results and stage timings are independent reads
+        candidates, constraint_results, stage_timings = await asyncio.gather(
+            run_in_db_executor(get_decision_candidates, decision["id"], service=service),
+            run_in_db_executor(get_constraint_results, decision["id"]),
+            run_in_db_executor(get_decision_stage_timings, decision["id"])
+        )
         
         return {
             "work_item_id": work_item_id,
@@ -298,7 +326,8 @@ async def get_audit_trail(work_item_id: str):
                     "reason": cr.get("reason")
                 }
                 for cr in constraint_results
-            ]
+            ],
+            "stage_timings": stage_timings
         }
     
     except HTTPException:
@@ -308,6 +337,29 @@ async def get_audit_trail(work_item_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to get audit trail: {str(e)}")
 
 
+@app.post("/cache/candidates/invalidate")
+async def invalidate_candidate_cache(request: CandidateCacheInvalidation):
+    """
+    Drop cached Learner profiles for a service.
+    
+    Called by Learner after process_outcome changes stats for the service.
+    """
+    invalidated = invalidate_candidates(request.service, request.version)
+    return {"service": request.service, "version": request.version, "invalidated": invalidated}
+
+
+@app.get("/cache/candidates/stats")
+async def candidate_cache_stats():
+    """Candidate profile cache hit/miss/stale counters."""
+    return get_candidate_cache_stats()
+
+
+@app.get("/embeddings/stats")
+async def embedding_source_stats():
+    """How often decision embeddings came from Weaviate (stored by Ingest), the local model, or neither."""
+    return get_embedding_source_stats()
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("DECISION_SERVICE_PORT", "8000"))
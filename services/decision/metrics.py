@@ -0,0 +1,221 @@
+"""
+In-process metrics for the Decision Service, exposed in Prometheus text format.
+
+Deliberately dependency-free: small Counter/Gauge/Histogram types cover what
+GET /metrics needs (per-stage and per-dependency latency, fallback and
+failure counters, orchestration queue depth) without adding prometheus_client
+to the image.
+"""
+import time
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Sequence
+
+# Seconds - tuned for a hot path with a ~1.5s budget
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _label_values(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines for every label set."""
+
+
+class Counter(_Metric):
+    """Monotonic counter with optional labels."""
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Point-in-time value with optional labels."""
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    _samples = Counter._samples
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram (seconds) with optional labels."""
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = [0] * (len(self.buckets) + 1) + [0.0]
+                self._values[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the with-block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels) -> int:
+        series = self._values.get(self._label_values(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    """Render every registered metric in Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Decision hot path
+DECISION_DURATION = Histogram(
+    "decision_duration_seconds",
+    "End-to-end make_decision latency (new decisions only)"
+)
+STAGE_DURATION = Histogram(
+    "decision_stage_duration_seconds",
+    "Latency of each make_decision stage",
+    ["stage"]
+)
+DEPENDENCY_DURATION = Histogram(
+    "decision_dependency_duration_seconds",
+    "Latency of calls to downstream dependencies",
+    ["dependency", "outcome"]
+)
+FALLBACKS = Counter(
+    "decision_fallbacks_total",
+    "Times a degraded path was used (e.g. database fallback candidates, deadline-skipped similarity)",
+    ["kind", "reason"]
+)
+FAILURES = Counter(
+    "decision_failures_total",
+    "Failed optional stages and downstream calls",
+    ["stage"]
+)
+
+# Orchestration job queue (Explain + Executor)
+ORCHESTRATION_QUEUE_DEPTH = Gauge(
+    "decision_orchestration_queue_depth",
+    "Orchestration jobs by status (sampled at scrape time)",
+    ["status"]
+)
+ORCHESTRATION_OLDEST_JOB_AGE = Gauge(
+    "decision_orchestration_oldest_job_age_seconds",
+    "Age of the oldest pending or running orchestration job (sampled at scrape time)"
+)
+ORCHESTRATION_QUEUE_WAIT = Histogram(
+    "decision_orchestration_queue_wait_seconds",
+    "Time from enqueue to a worker claiming the job (includes retry backoff)",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+)
+ORCHESTRATION_JOBS = Counter(
+    "decision_orchestration_jobs_total",
+    "Orchestration job runs by result (succeeded, retried, failed)",
+    ["result"]
+)
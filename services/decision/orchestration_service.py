@@ -0,0 +1,343 @@
+"""
+Orchestration service - runs Explain + Executor for persisted decisions.
+
+/decide returns as soon as a decision is committed. The decision's orchestration
+job is written in the same transaction (see save_decisions_batch), and a pool of
+workers inside this service claims due jobs from orchestration_jobs and runs:
+
+1. Explain (evidence bullets) - retried with backoff; once attempts are exhausted
+   the decision is executed without evidence (same as the old inline behaviour)
+2. Executor (Jira issue) - retried with backoff; the job fails after the last attempt
+
+Jobs survive restarts: a job left "running" by a dead worker is reclaimed once its
+lease (ORCHESTRATION_LEASE_SECONDS) expires. Executor does not dedupe, so every
+Executor attempt first looks for an issue already recorded in executed_actions, then
+records itself (renewing the lease) before the call; a worker whose job was
+reclaimed in the meantime loses that compare-and-set and skips the call.
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+from http_client import http_request
+from db import (
+    get_work_item, get_decision, get_decision_candidates, get_constraint_results,
+    claim_orchestration_jobs, update_orchestration_job, get_orchestration_queue_stats,
+    get_executed_jira_issue_key, start_orchestration_execute, run_in_db_executor
+)
+from metrics import (
+    DEPENDENCY_DURATION, FAILURES, ORCHESTRATION_JOBS, ORCHESTRATION_QUEUE_WAIT,
+    ORCHESTRATION_QUEUE_DEPTH, ORCHESTRATION_OLDEST_JOB_AGE
+)
+
+logger = logging.getLogger(__name__)
+
+ORCHESTRATION_ENABLED = os.getenv("ORCHESTRATION_ENABLED", "true").lower() == "true"
+ORCHESTRATION_WORKERS = int(os.getenv("ORCHESTRATION_WORKERS", "4"))
+ORCHESTRATION_POLL_INTERVAL_SECONDS = float(os.getenv("ORCHESTRATION_POLL_INTERVAL_SECONDS", "2"))
+ORCHESTRATION_MAX_ATTEMPTS = int(os.getenv("ORCHESTRATION_MAX_ATTEMPTS", "5"))
+ORCHESTRATION_BACKOFF_BASE_SECONDS = float(os.getenv("ORCHESTRATION_BACKOFF_BASE_SECONDS", "2"))
+ORCHESTRATION_BACKOFF_MAX_SECONDS = float(os.getenv("ORCHESTRATION_BACKOFF_MAX_SECONDS", "300"))
+ORCHESTRATION_LEASE_SECONDS = float(os.getenv("ORCHESTRATION_LEASE_SECONDS", "120"))
+ORCHESTRATION_HTTP_TIMEOUT_SECONDS = float(os.getenv("ORCHESTRATION_HTTP_TIMEOUT_SECONDS", "30"))
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter for the given (1-based) failed attempt."""
+    delay = min(ORCHESTRATION_BACKOFF_MAX_SECONDS, ORCHESTRATION_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Network errors, 5xx and 429 are retried; other 4xx (bad mappings, validation) are not."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return True
+
+
+def _describe_error(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}: {error.response.text[:500]}"
+    return f"{type(error).__name__}: {error}"
+
+
+def _format_candidate_features(candidate: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert candidate dict to Explain Service CandidateFeature format."""
+    if not candidate:
+        return {}
+    # Get similar_incident_score from score_breakdown if available
+    score_breakdown = candidate.get("score_breakdown", {})
+    similar_incident_score = score_breakdown.get("vector_similarity") if isinstance(score_breakdown, dict) else None
+
+    return {
+        "human_id": candidate.get("human_id", ""),
+        "display_name": candidate.get("display_name", "Unknown"),
+        "fit_score": float(candidate.get("fit_score", 0.5)),
+        "resolves_count": int(candidate.get("resolves_count", 0)),
+        "transfers_count": int(candidate.get("transfers_count", 0)),
+        "last_resolved_at": candidate.get("last_resolved_at"),
+        "on_call": candidate.get("on_call", False),  # Will be False if not available
+        "pages_7d": int(candidate.get("pages_7d", 0)),
+        "active_items": int(candidate.get("active_items", 0)),
+        "similar_incident_score": similar_incident_score,
+        "score_breakdown": score_breakdown
+    }
+
+
+async def _post(dependency: str, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """POST to a downstream service on its shared client, recording its latency."""
+    outcome = "error"
+    start = time.perf_counter()
+    try:
+        # No transport-level retries for non-idempotent calls beyond connect errors -
+        # the job itself is retried with backoff
+        response = await http_request(
+            dependency, "POST", url, json=payload, timeout=ORCHESTRATION_HTTP_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        outcome = "ok"
+        return response.json()
+    finally:
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency=dependency, outcome=outcome)
+
+
+async def _call_explain(
+    decision: Dict[str, Any],
+    work_item: Dict[str, Any]
+) -> List[Any]:
+    """Get evidence bullets for a decision from Explain Service."""
+    explain_url = os.getenv("EXPLAIN_SERVICE_URL", "http://explain:8000")
+
+    # Decision candidates with service for proper stats
+    candidates = await run_in_db_executor(get_decision_candidates, decision["id"], service=work_item["service"])
+    constraint_results = await run_in_db_executor(get_constraint_results, decision["id"])
+    primary_candidate = next((c for c in candidates if c["human_id"] == decision["primary_human_id"]), None)
+    backup_candidates = [c for c in candidates if c["human_id"] in decision["backup_human_ids"]]
+
+    explain_request = {
+        "decision_id": decision["id"],
+        "work_item": {
+            "id": work_item["id"],
+            "service": work_item["service"],
+            "severity": work_item["severity"],
+            "description": work_item["description"],
+            "type": work_item.get("type", "incident")
+        },
+        "primary_human_id": decision["primary_human_id"],
+        "primary_features": _format_candidate_features(primary_candidate),
+        "backup_human_ids": decision["backup_human_ids"],
+        "backup_features": [_format_candidate_features(c) for c in backup_candidates],
+        "constraints_checked": [
+            {
+                "name": cr["constraint_name"],
+                "passed": cr["passed"],
+                "reason": cr.get("reason")
+            }
+            for cr in constraint_results
+        ]
+    }
+
+    logger.info(f"Calling Explain Service for decision {decision['id']}")
+    explain_result = await _post("explain", f"{explain_url}/explainDecision", explain_request)
+    evidence = explain_result.get("evidence", [])
+    logger.info(f"Explain Service returned {len(evidence)} evidence bullets")
+    return evidence
+
+
+async def _call_executor(
+    decision: Dict[str, Any],
+    work_item: Dict[str, Any],
+    evidence: List[Any]
+) -> Optional[str]:
+    """Execute a decision via Executor Service. Returns the Jira issue key (None if Executor fell back)."""
+    executor_url = os.getenv("EXECUTOR_SERVICE_URL", "http://executor:8000")
+
+    executor_request = {
+        "decision_id": decision["id"],
+        "work_item_id": work_item["id"],
+        "primary_human_id": decision["primary_human_id"],
+        "backup_human_ids": decision["backup_human_ids"],
+        "evidence": evidence,
+        "work_item": {
+            "service": work_item["service"],
+            "severity": work_item["severity"],
+            "description": work_item["description"],
+            "story_points": work_item.get("story_points")
+        }
+    }
+
+    logger.info(f"Calling Executor Service for decision {decision['id']}")
+    executor_result = await _post("executor", f"{executor_url}/executeDecision", executor_request)
+    jira_key = executor_result.get("jira_issue_key")
+    if jira_key:
+        logger.info(f"Executor Service created Jira issue: {jira_key}")
+    else:
+        logger.warning(f"Executor Service completed but no Jira issue key returned (fallback used?)")
+    return jira_key
+
+
+async def _save_job(decision_id: str, fields: Dict[str, Any], retry_in_seconds: Optional[float] = None) -> None:
+    await run_in_db_executor(update_orchestration_job, decision_id, fields, retry_in_seconds=retry_in_seconds)
+
+
+async def _retry_later(decision_id: str, fields: Dict[str, Any], attempt: int, error: Exception) -> None:
+    delay = backoff_seconds(attempt)
+    fields.update(status="pending", locked_at=None, last_error=_describe_error(error))
+    await _save_job(decision_id, fields, retry_in_seconds=delay)
+    ORCHESTRATION_JOBS.inc(result="retried")
+    logger.warning(f"Orchestration for decision {decision_id} failed (attempt {attempt}), retrying in {delay:.1f}s: {error}")
+
+
+async def process_job(job: Dict[str, Any]) -> None:
+    """
+    Run the remaining stages of one claimed orchestration job and persist the outcome.
+
+    Args:
+        job: Claimed orchestration_jobs row
+    """
+    decision_id = job["decision_id"]
+    decision = await run_in_db_executor(get_decision, job["work_item_id"])
+    work_item = await run_in_db_executor(get_work_item, job["work_item_id"])
+    if not decision or decision["id"] != decision_id or not work_item:
+        await _save_job(decision_id, {
+            "status": "failed", "locked_at": None,
+            "last_error": f"Decision or WorkItem {job['work_item_id']} not found for orchestration"
+        })
+        ORCHESTRATION_JOBS.inc(result="failed")
+        logger.warning(f"Decision {decision_id} / WorkItem {job['work_item_id']} not found for orchestration")
+        return
+
+    fields: Dict[str, Any] = {}
+    evidence = job.get("evidence") or []
+
+    # Step 1: Evidence from Explain Service (optional - executed without it after the last attempt)
+    if job["explain_status"] == "pending":
+        try:
+            evidence = await _call_explain(decision, work_item)
+            fields.update(explain_status="succeeded", evidence=evidence)
+        except Exception as e:
+            FAILURES.inc(stage="explain")
+            attempt = job["explain_attempts"] + 1
+            fields["explain_attempts"] = attempt
+            if _is_retryable(e) and attempt < ORCHESTRATION_MAX_ATTEMPTS:
+                await _retry_later(decision_id, fields, attempt, e)
+                return
+            logger.warning(f"Explain Service failed for decision {decision_id}: {e}. Continuing without evidence.")
+            fields.update(explain_status="failed", last_error=_describe_error(e))
+            evidence = []
+
+    # Step 2: Execute decision via Executor Service
+    attempt = job["execute_attempts"] + 1
+    try:
+        # A previous attempt may have created the issue before failing, timing out or
+        # crashing its worker - Executor does not dedupe on decision_id
+        jira_key = await run_in_db_executor(get_executed_jira_issue_key, decision_id)
+        if not jira_key:
+            if not await run_in_db_executor(start_orchestration_execute, decision_id, job["execute_attempts"]):
+                # Another worker reclaimed the job (lease expired) and owns this attempt
+                logger.warning(f"Orchestration job {decision_id} was reclaimed by another worker; skipping Executor call")
+                return
+            jira_key = await _call_executor(decision, work_item, evidence)
+        fields.update(execute_status="succeeded", jira_issue_key=jira_key, status="succeeded", locked_at=None)
+        await _save_job(decision_id, fields)
+        ORCHESTRATION_JOBS.inc(result="succeeded")
+    except Exception as e:
+        FAILURES.inc(stage="executor")
+        fields["execute_attempts"] = attempt
+        if _is_retryable(e) and attempt < ORCHESTRATION_MAX_ATTEMPTS:
+            await _retry_later(decision_id, fields, attempt, e)
+            return
+        fields.update(execute_status="failed", status="failed", locked_at=None, last_error=_describe_error(e))
+        await _save_job(decision_id, fields)
+        ORCHESTRATION_JOBS.inc(result="failed")
+        logger.error(f"Executor Service failed for decision {decision_id} after {attempt} attempts: {e}. Decision made but not executed.")
+
+
+def format_job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape an orchestration job for GET /decisions/{id}/status."""
+    def _iso(value):
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    return {
+        "decision_id": job["decision_id"],
+        "work_item_id": job["work_item_id"],
+        "status": job["status"],
+        "explain": {
+            "status": job["explain_status"],
+            "attempts": job["explain_attempts"],
+            "evidence_count": len(job["evidence"]) if job.get("evidence") else 0
+        },
+        "execute": {
+            "status": job["execute_status"],
+            "attempts": job["execute_attempts"],
+            "jira_issue_key": job.get("jira_issue_key")
+        },
+        "last_error": job.get("last_error"),
+        "next_attempt_at": _iso(job.get("next_attempt_at")) if job["status"] == "pending" else None,
+        "created_at": _iso(job.get("created_at")),
+        "updated_at": _iso(job.get("updated_at"))
+    }
+
+
+async def refresh_queue_metrics() -> Dict[str, Any]:
+    """Sample queue depth / oldest job age into the orchestration gauges."""
+    stats = await run_in_db_executor(get_orchestration_queue_stats)
+    for status, count in stats["depth"].items():
+        ORCHESTRATION_QUEUE_DEPTH.set(count, status=status)
+    ORCHESTRATION_OLDEST_JOB_AGE.set(stats["oldest_pending_age_seconds"])
+    return stats
+
+
+class OrchestrationWorkerPool:
+    """Asyncio workers that claim and run orchestration jobs."""
+
+    def __init__(self, workers: int = ORCHESTRATION_WORKERS, poll_interval: float = ORCHESTRATION_POLL_INTERVAL_SECONDS):
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run_worker(i)) for i in range(self.workers)]
+        logger.info(f"Orchestration worker pool started ({self.workers} workers)")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Orchestration worker pool stopped")
+
+    def notify(self) -> None:
+        """Wake idle workers (a new job was just committed)."""
+        self._wakeup.set()
+
+    async def _run_worker(self, index: int) -> None:
+        while True:
+            try:
+                jobs = await run_in_db_executor(claim_orchestration_jobs, 1, ORCHESTRATION_LEASE_SECONDS)
+            except Exception as e:
+                logger.error(f"Orchestration worker {index} failed to claim jobs: {e}")
+                jobs = []
+
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            for job in jobs:
+                ORCHESTRATION_QUEUE_WAIT.observe(job.get("queued_seconds") or 0.0)
+                try:
+                    await process_job(job)
+                except Exception as e:
+                    # Job stays "running" and is reclaimed when its lease expires
+                    logger.error(f"Orchestration job {job['decision_id']} crashed: {e}", exc_info=True)
@@ -2,11 +2,23 @@
 Scoring algorithm for ranking candidates.
 """
 import logging
+import numpy as np
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+SEVERITY_WEIGHTS = {
+    "sev1": 1.2,  # Critical - strongly prefer high fit_score
+    "sev2": 1.1,  # High - prefer high fit_score
+    "sev3": 1.0,  # Medium - neutral
+    "sev4": 0.9   # Low - can use lower fit_score
+}
+
+# calculate_capacity_score thresholds on remaining_pct, as lookup tables for the vectorized path
+_CAPACITY_BUCKET_EDGES = np.array([0.1, 0.2, 0.4])
+_CAPACITY_BUCKET_SCORES = np.array([0.6, 0.8, 1.0, 0.9])
+
 
 def calculate_severity_match_score(
     candidate_fit_score: float,
@@ -23,14 +35,7 @@ def calculate_severity_match_score(
     Returns:
         Severity match multiplier (0.8-1.2)
     """
-    severity_weights = {
-        "sev1": 1.2,  # Critical - strongly prefer high fit_score
-        "sev2": 1.1,  # High - prefer high fit_score
-        "sev3": 1.0,  # Medium - neutral
-        "sev4": 0.9   # Low - can use lower fit_score
-    }
-    
-    weight = severity_weights.get(work_item_severity, 1.0)
+    weight = SEVERITY_WEIGHTS.get(work_item_severity, 1.0)
     
     # Higher fit_score gets more boost for high severity
     if work_item_severity in ["sev1", "sev2"]:
@@ -178,36 +183,249 @@ def calculate_final_score(
     }
 
 
+def load_candidate_features(candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Load candidate fields used for scoring into contiguous float64 arrays.
+    
+    Args:
+        candidates: List of candidate humans
+    
+    Returns:
+        Dict with ids, id_index (id -> position, None if IDs repeat), fit_raw
+        (original fit_score values, echoed in score_breakdown), fit,
+        max_story_points and current_story_points arrays
+    """
+    # One pass over the dicts (this, not the array math, dominates for large teams)
+    ids = []
+    fit_raw = []
+    max_points = []
+    current_points = []
+    for c in candidates:
+        get = c.get
+        ids.append(get("id"))
+        fit_raw.append(get("fit_score", 0.5))
+        max_points.append(get("max_story_points", 21))
+        current_points.append(get("current_story_points", 0))
+    id_index = {cid: i for i, cid in enumerate(ids)}
+    return {
+        "ids": ids,
+        "id_index": id_index if len(id_index) == len(ids) else None,
+        "fit_raw": fit_raw,
+        "fit": np.array(fit_raw, dtype=np.float64),
+        "max_story_points": np.array(max_points, dtype=np.float64),
+        "current_story_points": np.array(current_points, dtype=np.float64)
+    }
+
+
+def aggregate_resolver_similarity(
+    similar_incidents: List[Dict[str, Any]],
+    features: Dict[str, Any]
+) -> Dict[str, np.ndarray]:
+    """
+    Group similar incidents by resolver once and align the totals with candidates.
+    
+    Args:
+        similar_incidents: List of similar work items with resolver_id and similarity
+        features: Output of load_candidate_features
+    
+    Returns:
+        Dict with per-candidate similarity_sum and resolved_count arrays
+    """
+    candidate_ids = features["ids"]
+    n = len(candidate_ids)
+    index = features["id_index"]
+    
+    if index is not None:
+        positions = []
+        similarities = []
+        for inc in similar_incidents:
+            position = index.get(inc.get("resolver_id"))
+            if position is not None:
+                positions.append(position)
+                similarities.append(inc.get("similarity", 0.5))
+        positions = np.array(positions, dtype=np.int64)
+        return {
+            "similarity_sum": np.bincount(positions, weights=np.array(similarities, dtype=np.float64), minlength=n),
+            "resolved_count": np.bincount(positions, minlength=n).astype(np.float64)
+        }
+    
+    # Duplicate candidate IDs: every copy gets the resolver's totals
+    totals: Dict[Any, List[float]] = {}
+    for inc in similar_incidents:
+        entry = totals.setdefault(inc.get("resolver_id"), [0.0, 0.0])
+        entry[0] += inc.get("similarity", 0.5)
+        entry[1] += 1
+    empty = (0.0, 0.0)
+    return {
+        "similarity_sum": np.array([totals.get(cid, empty)[0] for cid in candidate_ids], dtype=np.float64),
+        "resolved_count": np.array([totals.get(cid, empty)[1] for cid in candidate_ids], dtype=np.float64)
+    }
+
+
+def compute_scores(
+    features: Dict[str, Any],
+    resolver_similarity: Optional[Dict[str, np.ndarray]],
+    work_item_severity: str,
+    work_item_story_points: Optional[int]
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized form of calculate_final_score over all candidates at once.
+    
+    Args:
+        features: Output of load_candidate_features
+        resolver_similarity: Output of aggregate_resolver_similarity (None if no similar incidents)
+        work_item_severity: Work item severity (sev1-sev4)
+        work_item_story_points: Story points required
+    
+    Returns:
+        Dict of arrays: fit_score, severity_match, capacity, vector_similarity, final_score
+    """
+    fit = features["fit"]
+    n = len(fit)
+    
+    # Severity match
+    weight = SEVERITY_WEIGHTS.get(work_item_severity, 1.0)
+    if work_item_severity in ["sev1", "sev2"]:
+        severity_match = 1.0 + (weight - 1.0) * fit
+    else:
+        severity_match = np.full(n, weight)
+    
+    # Capacity
+    if not work_item_story_points:
+        capacity = np.ones(n)
+    else:
+        max_points = features["max_story_points"]
+        available = max_points - features["current_story_points"]
+        after_assignment = available - work_item_story_points
+        with np.errstate(divide="ignore", invalid="ignore"):
+            remaining_pct = after_assignment / max_points
+        # Bucket remaining_pct: <0.1 -> 0.6, <0.2 -> 0.8, <0.4 -> 1.0, else 0.9
+        capacity = _CAPACITY_BUCKET_SCORES[np.searchsorted(_CAPACITY_BUCKET_EDGES, remaining_pct, side="right")]
+        capacity[(available <= 0) | (after_assignment < 0)] = 0.0
+    
+    # Vector similarity (0.5 = neutral when nothing similar was resolved by the candidate)
+    if resolver_similarity is None:
+        vector_similarity = np.full(n, 0.5)
+    else:
+        count = resolver_similarity["resolved_count"]
+        avg_similarity = np.divide(
+            resolver_similarity["similarity_sum"], count,
+            out=np.full(n, 0.5), where=count > 0
+        )
+        boosted = np.minimum(1.0, avg_similarity + np.minimum(0.2, count * 0.05))
+        vector_similarity = np.minimum(1.0, np.where(count > 1, boosted, avg_similarity))
+    
+    # Same weights and evaluation order as calculate_final_score
+    final_score = np.clip(
+        fit * 0.4 +
+        vector_similarity * 0.3 +
+        capacity * 0.2 +
+        (fit * severity_match) * 0.1,
+        0.0, 1.0
+    )
+    
+    return {
+        "fit_score": fit,
+        "severity_match": severity_match,
+        "capacity": capacity,
+        "vector_similarity": vector_similarity,
+        "final_score": final_score
+    }
+
+
+def rank_indices(final_scores: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices ordered by final_score descending (ties keep input order).
+    
+    With top_k, only the best k are selected (argpartition, O(n)) and then sorted.
+    
+    Args:
+        final_scores: Final score per candidate
+        top_k: Number of candidates to rank (None = all)
+    
+    Returns:
+        Array of candidate indices, best first
+    """
+    n = len(final_scores)
+    if top_k is None or top_k >= n:
+        return np.argsort(-final_scores, kind="stable")
+    if top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    
+    # Partial sort: find the k-th best score, take everything above it and the
+    # earliest ties at it so the result matches the full stable sort
+    kth_score = final_scores[np.argpartition(-final_scores, top_k - 1)[top_k - 1]]
+    above = np.flatnonzero(final_scores > kth_score)
+    ties = np.flatnonzero(final_scores == kth_score)[:top_k - len(above)]
+    selected = np.concatenate([above, ties])
+    return selected[np.argsort(-final_scores[selected], kind="stable")]
+
+
 def score_candidates(
     candidates: List[Dict[str, Any]],
     work_item: Dict[str, Any],
-    similar_incidents: List[Dict[str, Any]]
+    similar_incidents: List[Dict[str, Any]],
+    top_k: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     """
     Score all candidates and return sorted by final_score (descending).
     
+    Vectorized equivalent of calling calculate_final_score per candidate:
+    similar incidents are grouped by resolver once instead of rescanned per
+    candidate. Candidates are annotated in place with score_breakdown,
+    final_score and rank.
+    
+    The scoring math itself (aggregate_resolver_similarity + compute_scores +
+    rank_indices with a small top_k) stays under 1 ms for 5000 candidates x
+    1000 incidents. End to end this function is bounded by the per-candidate
+    dict work around it - reading the fields and writing the annotations -
+    which is O(candidates) Python: a few ms with top_k, ~10 ms when every
+    candidate is ranked (see scripts/benchmark_scoring.py).
+    
     Args:
         candidates: List of candidate humans (after constraint filtering)
         work_item: Work item details
         similar_incidents: Similar work items from vector search
+        top_k: Only rank and return the best k candidates (None = all)
     
     Returns:
         List of candidates with scores, sorted by final_score descending
     """
-    scored = []
+    if not candidates:
+        return []
     
-    for candidate in candidates:
-        score_breakdown = calculate_final_score(candidate, work_item, similar_incidents)
-        candidate["score_breakdown"] = score_breakdown
-        candidate["final_score"] = score_breakdown["final_score"]
-        scored.append(candidate)
+    features = load_candidate_features(candidates)
+    resolver_similarity = (
+        aggregate_resolver_similarity(similar_incidents, features) if similar_incidents else None
+    )
+    scores = compute_scores(
+        features,
+        resolver_similarity,
+        work_item.get("severity", "sev3"),
+        work_item.get("story_points")
+    )
+    order = rank_indices(scores["final_score"], top_k)
+    
+    severity_match = scores["severity_match"].tolist()
+    capacity = scores["capacity"].tolist()
+    vector_similarity = scores["vector_similarity"].tolist()
+    final_score = scores["final_score"].tolist()
+    fit_raw = features["fit_raw"]
     
-    # Sort by final_score descending
-    scored.sort(key=lambda x: x["final_score"], reverse=True)
+    scored = []
+    for rank, i in enumerate(order.tolist(), start=1):
+        candidate = candidates[i]
+        candidate["score_breakdown"] = {
+            "fit_score": fit_raw[i],
+            "severity_match": severity_match[i],
+            "capacity": capacity[i],
+            "vector_similarity": vector_similarity[i],
+            "final_score": final_score[i]
+        }
+        candidate["final_score"] = final_score[i]
+        candidate["rank"] = rank
+        scored.append(candidate)
     
-    # Add rank
-    for i, candidate in enumerate(scored):
-        candidate["rank"] = i + 1
     
     return scored
 
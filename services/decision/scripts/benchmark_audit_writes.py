@@ -0,0 +1,150 @@
+"""
+Benchmark decision audit-trail writes: per-row commits vs one transaction.
+
+Compares the legacy path (save_decision + one save_decision_candidate per
+candidate + one save_constraint_result per constraint, each committing on its
+own) against save_decision_with_audit, for a range of candidate counts.
+
+Requires a reachable Postgres (POSTGRES_URL) with the schema from
+scripts/init_db.sql applied. Creates a throwaway work item and removes it
+(and its decisions) when finished.
+
+Usage:
+    python scripts/benchmark_audit_writes.py [--runs 20] [--candidates 5,10,20,50,100]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import db  # noqa: E402
+
+
+class _CountingConnection:
+    """Connection proxy that counts commit() calls."""
+
+    def __init__(self, conn, counter):
+        self._conn = conn
+        self._counter = counter
+
+    def commit(self):
+        self._counter["commits"] += 1
+        return self._conn.commit()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _install_commit_counter(counter):
+    """Wrap db.get_db_connection/return_db_connection so commits are counted."""
+    original_get = db.get_db_connection
+    original_return = db.return_db_connection
+
+    def counting_get():
+        return _CountingConnection(original_get(), counter)
+
+    def counting_return(conn):
+        original_return(conn._conn if isinstance(conn, _CountingConnection) else conn)
+
+    db.get_db_connection = counting_get
+    db.return_db_connection = counting_return
+
+    def restore():
+        db.get_db_connection = original_get
+        db.return_db_connection = original_return
+
+    return restore
+
+
+def _audit_rows(n_candidates):
+    candidates = [
+        {
+            "human_id": f"bench-human-{i}",
+            "score": 1.0 - i / (n_candidates + 1),
+            "rank": i + 1,
+            "filtered": False,
+            "filter_reason": None,
+            "score_breakdown": {"fit_score": 0.8, "capacity": 0.5, "total_score": 0.7}
+        }
+        for i in range(n_candidates)
+    ]
+    constraints = [
+        {"constraint_name": "capacity", "passed": True, "reason": "All candidates have capacity"},
+        {"constraint_name": "availability", "passed": True, "reason": "All candidates available"}
+    ]
+    return candidates, constraints
+
+
+def _write_legacy(decision_id, work_item_id, candidates, constraints):
+    db.save_decision(decision_id, work_item_id, candidates[0]["human_id"], [], 0.9)
+    for c in candidates:
+        db.save_decision_candidate(
+            decision_id, c["human_id"], c["score"], c["rank"],
+            c["filtered"], c["filter_reason"], c["score_breakdown"]
+        )
+    for r in constraints:
+        db.save_constraint_result(decision_id, r["constraint_name"], r["passed"], r["reason"])
+
+
+def _write_single_transaction(decision_id, work_item_id, candidates, constraints):
+    db.save_decision_with_audit(
+        decision_id=decision_id,
+        work_item_id=work_item_id,
+        primary_human_id=candidates[0]["human_id"],
+        backup_human_ids=[],
+        confidence=0.9,
+        candidates=candidates,
+        constraints=constraints
+    )
+
+
+def _run(writer, work_item_id, n_candidates, runs, counter):
+    candidates, constraints = _audit_rows(n_candidates)
+    latencies = []
+    commits = 0
+    for _ in range(runs):
+        db.execute_update("DELETE FROM decisions WHERE work_item_id = %s", [work_item_id])
+        counter["commits"] = 0
+        start = time.perf_counter()
+        writer(str(uuid.uuid4()), work_item_id, candidates, constraints)
+        latencies.append((time.perf_counter() - start) * 1000)
+        commits += counter["commits"]
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return statistics.median(latencies), p95, commits / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--candidates", default="5,10,20,50,100")
+    args = parser.parse_args()
+    counts = [int(c) for c in args.candidates.split(",") if c.strip()]
+
+    work_item_id = f"bench-wi-{uuid.uuid4()}"
+    db.execute_update(
+        "INSERT INTO work_items (id, type, service, severity, description) VALUES (%s, %s, %s, %s, %s)",
+        [work_item_id, "incident", "bench-service", "sev3", "audit write benchmark"]
+    )
+
+    counter = {"commits": 0}
+    restore = _install_commit_counter(counter)
+    try:
+        print(f"{'candidates':>10} | {'path':<18} | {'p50 ms':>8} | {'p95 ms':>8} | {'commits/decision':>16}")
+        print("-" * 72)
+        for n in counts:
+            for name, writer in (("per-row", _write_legacy), ("single-transaction", _write_single_transaction)):
+                p50, p95, commits = _run(writer, work_item_id, n, args.runs, counter)
+                print(f"{n:>10} | {name:<18} | {p50:>8.2f} | {p95:>8.2f} | {commits:>16.1f}")
+    finally:
+        restore()
+        db.execute_update("DELETE FROM decisions WHERE work_item_id = %s", [work_item_id])
+        db.execute_update("DELETE FROM work_items WHERE id = %s", [work_item_id])
+
+
+if __name__ == "__main__":
+    main()
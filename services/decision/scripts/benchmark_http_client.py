@@ -0,0 +1,140 @@
+"""
+Benchmark inter-service HTTP calls: a new httpx.AsyncClient per call vs the
+shared keep-alive client (http_client.http_request).
+
+Starts a minimal HTTP/1.1 keep-alive server on 127.0.0.1 (in the same process,
+so no other services are needed), fires N GET requests with bounded
+concurrency through each path and reports latency percentiles, throughput and
+how many TCP connections the server accepted.
+
+Usage:
+    python scripts/benchmark_http_client.py [--requests 2000] [--concurrency 50] [--server-delay-ms 1]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import http_client  # noqa: E402
+
+_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: 15\r\n"
+    b"\r\n"
+    b'{"profiles":[]}'
+)
+
+
+class _KeepAliveServer:
+    """Tiny HTTP/1.1 server: answers every request with a fixed JSON body, counts connections."""
+
+    def __init__(self, delay_ms: float):
+        self.delay = delay_ms / 1000
+        self.connections = 0
+        self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                headers = await reader.readuntil(b"\r\n\r\n")
+                if not headers:
+                    break
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(_RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/profiles"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+async def _per_call(url: str):
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        response = await client.get(url, params={"service": "api-service"})
+        response.raise_for_status()
+
+
+async def _shared(url: str):
+    response = await http_client.http_request("bench", "GET", url, params={"service": "api-service"})
+    response.raise_for_status()
+
+
+async def _run(name, call, url, server, total, concurrency):
+    server.connections = 0
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    wall = time.perf_counter() - wall_start
+    return {
+        "name": name,
+        "p50": statistics.median(latencies),
+        "p99": _percentile(latencies, 99),
+        "rps": total / wall,
+        "connections": server.connections
+    }
+
+
+async def _main(args):
+    server = _KeepAliveServer(args.server_delay_ms)
+    url = await server.start()
+    try:
+        # Warm-up (imports, first connection) outside the measured runs
+        await _per_call(url)
+        await _shared(url)
+
+        print(
+            f"requests={args.requests} concurrency={args.concurrency} server_delay_ms={args.server_delay_ms} "
+            f"max_keepalive={http_client.HTTP_MAX_KEEPALIVE_CONNECTIONS}"
+        )
+        print(f"{'client':<16} | {'p50 ms':>8} | {'p99 ms':>8} | {'req/s':>9} | {'TCP connections':>15}")
+        print("-" * 68)
+        for name, call in (("per-call client", _per_call), ("shared client", _shared)):
+            r = await _run(name, call, url, server, args.requests, args.concurrency)
+            print(f"{r['name']:<16} | {r['p50']:>8.2f} | {r['p99']:>8.2f} | {r['rps']:>9.1f} | {r['connections']:>15}")
+        print(f"\nshared client stats: {http_client.get_http_client_stats()['bench']}")
+    finally:
+        await http_client.close_http_clients()
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--server-delay-ms", type=float, default=1.0)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Pytest configuration and fixtures for Decision Service tests.
+"""
+import pytest
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candidate_service import invalidate_candidates
+
+
+@pytest.fixture(autouse=True)
+def clear_candidate_cache():
+    """Start every test with an empty candidate profile cache."""
+    invalidate_candidates()
+    yield
+    invalidate_candidates()
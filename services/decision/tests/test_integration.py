@@ -12,7 +12,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from decision_engine import make_decision
-from candidate_service import get_candidates
+from candidate_service import get_candidates, invalidate_candidates, get_candidate_cache_stats
 from db import get_work_item, save_decision
 
 
@@ -65,26 +65,26 @@ class TestDecisionToLearnerIntegration:
     @pytest.mark.asyncio
     async def test_get_candidates_calls_learner(self):
         """Decision Service successfully calls Learner Service."""
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             # Mock successful Learner response
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.return_value = MOCK_LEARNER_RESPONSE
             mock_response.raise_for_status = MagicMock()
             
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+            mock_client.return_value.request = AsyncMock(return_value=mock_response)
             
             # Call candidate service
             candidates = await get_candidates("api-service", use_fallback=False)
             
             # Verify Learner was called
             assert mock_client.called
-            get_call = mock_client.return_value.__aenter__.return_value.get
+            get_call = mock_client.return_value.request
             assert get_call.called
             
             # Verify correct URL and params
             call_args = get_call.call_args
-            assert "profiles" in str(call_args[0][0])
+            assert "profiles" in str(call_args[0][1])
             assert call_args[1]["params"]["service"] == "api-service"
             
             # Verify response
@@ -95,9 +95,9 @@ class TestDecisionToLearnerIntegration:
     @pytest.mark.asyncio
     async def test_get_candidates_handles_learner_timeout(self):
         """Decision Service handles Learner Service timeout gracefully."""
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             from httpx import TimeoutException
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.request = AsyncMock(
                 side_effect=TimeoutException("Request timed out")
             )
             
@@ -109,14 +109,14 @@ class TestDecisionToLearnerIntegration:
     @pytest.mark.asyncio
     async def test_get_candidates_handles_learner_error(self):
         """Decision Service handles Learner Service 500 error."""
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 500
             mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
                 "Server error", request=MagicMock(), response=mock_response
             )
             
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+            mock_client.return_value.request = AsyncMock(return_value=mock_response)
             
             candidates = await get_candidates("api-service", use_fallback=False)
             
@@ -125,9 +125,9 @@ class TestDecisionToLearnerIntegration:
     @pytest.mark.asyncio
     async def test_get_candidates_fallback_when_learner_down(self):
         """Decision Service uses fallback when Learner is down."""
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             from httpx import TimeoutException
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.request = AsyncMock(
                 side_effect=TimeoutException("Request timed out")
             )
             
@@ -156,6 +156,262 @@ class TestDecisionToLearnerIntegration:
                 mock_fallback.assert_called_once_with("api-service")
 
 
+# GET /profiles as Learner serves it (profile_snapshots.ProfileSnapshot.body)
+LEARNER_PROFILES_BODY = {
+    "service": "api-service",
+    "version": 7,
+    "humans": [
+        {"human_id": p["id"], **{k: v for k, v in p.items() if k != "id"}}
+        for p in MOCK_LEARNER_RESPONSE["profiles"]
+    ]
+}
+
+
+class TestCandidateCache:
+    """Test the Learner profile cache in front of get_candidates."""
+    
+    def _mock_learner(self, mock_client, body):
+        mock_response = MagicMock()
+        mock_response.json.return_value = body
+        mock_response.raise_for_status = MagicMock()
+        get = AsyncMock(return_value=mock_response)
+        mock_client.return_value.request = get
+        return get
+    
+    @pytest.mark.asyncio
+    async def test_second_call_is_served_from_cache(self):
+        """Repeated lookups for a service hit Learner once and return independent copies."""
+        with patch('http_client.get_http_client') as mock_client:
+            get = self._mock_learner(mock_client, MOCK_LEARNER_RESPONSE)
+            before = get_candidate_cache_stats()
+            
+            first = await get_candidates("api-service", use_fallback=False)
+            first[0]["filtered"] = True
+            second = await get_candidates("api-service", use_fallback=False)
+            
+            assert get.call_count == 1
+            assert "filtered" not in second[0]
+            stats = get_candidate_cache_stats()
+            assert stats["misses"] - before["misses"] == 1
+            assert stats["hits"] - before["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_learner_response_shape_is_cached(self):
+        """Learner's {"service", "version", "humans"} body is used and cached, not sent to the fallback."""
+        with patch('http_client.get_http_client') as mock_client, \
+             patch('candidate_service._get_fallback_candidates') as mock_fallback:
+            get = self._mock_learner(mock_client, LEARNER_PROFILES_BODY)
+            before = get_candidate_cache_stats()
+            
+            first = await get_candidates("api-service")
+            second = await get_candidates("api-service")
+            
+            assert get.call_count == 1
+            mock_fallback.assert_not_called()
+            assert [c["id"] for c in first] == ["human_1", "human_2"]
+            assert second == first
+            assert get_candidate_cache_stats()["hits"] - before["hits"] == 1
+            # Outcome-driven invalidation now has an entry to drop
+            assert invalidate_candidates("api-service", version=8) is True
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_fetch_does_not_cancel_waiters(self):
+        """A caller that disconnects mid-fetch does not fail the decisions sharing its Learner call."""
+        with patch('http_client.get_http_client') as mock_client, \
+             patch('candidate_service._get_fallback_candidates', return_value=[{"id": "fallback_1"}]):
+            started = asyncio.Event()
+            
+            async def hanging_get(*args, **kwargs):
+                started.set()
+                await asyncio.sleep(10)
+            
+            mock_client.return_value.request = AsyncMock(side_effect=hanging_get)
+            
+            leader = asyncio.create_task(get_candidates("api-service"))
+            await started.wait()
+            waiter = asyncio.create_task(get_candidates("api-service"))
+            await asyncio.sleep(0)
+            leader.cancel()
+            
+            assert await waiter == [{"id": "fallback_1"}]
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_learner_call(self):
+        """Concurrent decisions for the same service coalesce into one Learner call."""
+        with patch('http_client.get_http_client') as mock_client:
+            mock_response = MagicMock()
+            mock_response.json.return_value = MOCK_LEARNER_RESPONSE
+            mock_response.raise_for_status = MagicMock()
+            
+            async def slow_get(*args, **kwargs):
+                await asyncio.sleep(0.01)
+                return mock_response
+            
+            get = AsyncMock(side_effect=slow_get)
+            mock_client.return_value.request = get
+            
+            before = get_candidate_cache_stats()
+            results = await asyncio.gather(*(get_candidates("api-service", use_fallback=False) for _ in range(5)))
+            
+            assert get.call_count == 1
+            assert all(len(r) == 2 for r in results)
+            assert get_candidate_cache_stats()["coalesced"] - before["coalesced"] == 4
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_forces_refetch_unless_version_is_current(self):
+        """Learner invalidation drops the entry; an older version stamp is ignored."""
+        with patch('http_client.get_http_client') as mock_client:
+            get = self._mock_learner(mock_client, {**MOCK_LEARNER_RESPONSE, "version": 5})
+            
+            await get_candidates("api-service", use_fallback=False)
+            assert invalidate_candidates("api-service", version=5) is False
+            await get_candidates("api-service", use_fallback=False)
+            assert get.call_count == 1
+            
+            assert invalidate_candidates("api-service", version=6) is True
+            await get_candidates("api-service", use_fallback=False)
+            assert get.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        """A failed Learner call is retried on the next lookup."""
+        with patch('http_client.get_http_client') as mock_client:
+            get = self._mock_learner(mock_client, MOCK_LEARNER_RESPONSE)
+            get.side_effect = [httpx.TimeoutException("Request timed out"), get.return_value]
+            
+            assert await get_candidates("api-service", use_fallback=False) == []
+            assert len(await get_candidates("api-service", use_fallback=False)) == 2
+            assert get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_revalidated_with_etag(self):
+        """An expired entry is revalidated with If-None-Match; a 304 keeps serving it."""
+        import candidate_service
+
+        url = "http://learner/profiles"
+        full = httpx.Response(200, json={**MOCK_LEARNER_RESPONSE, "version": 7},
+                              headers={"ETag": '"7"'}, request=httpx.Request("GET", url))
+        not_modified = httpx.Response(304, headers={"ETag": '"7"'}, request=httpx.Request("GET", url))
+
+        with patch('http_client.get_http_client') as mock_client:
+            get = AsyncMock(side_effect=[full, not_modified])
+            mock_client.return_value.request = get
+            before = get_candidate_cache_stats()
+
+            await get_candidates("api-service", use_fallback=False)
+            candidate_service._profile_cache["api-service"]["expires_at"] = 0
+            candidates = await get_candidates("api-service", use_fallback=False)
+
+            assert len(candidates) == 2
+            assert get.call_args_list[0][1]["headers"] is None
+            assert get.call_args_list[1][1]["headers"] == {"If-None-Match": '"7"'}
+            assert candidate_service._profile_cache["api-service"]["expires_at"] > 0
+            assert get_candidate_cache_stats()["revalidated"] - before["revalidated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_learner_snapshot_etag_round_trip(self):
+        """After TTL expiry Decision revalidates Learner's snapshot ETag; a 304 re-arms the entry."""
+        import candidate_service
+        
+        learner = {"version": 7, "requests": []}
+        
+        async def learner_profiles(method, url, params=None, headers=None, **kwargs):
+            # Learner GET /profiles with snapshots: ETag is the quoted profile version
+            learner["requests"].append(headers)
+            etag = f'"{learner["version"]}"'
+            request = httpx.Request(method, url)
+            if headers and headers.get("If-None-Match") == etag:
+                return httpx.Response(304, headers={"ETag": etag}, request=request)
+            body = {**LEARNER_PROFILES_BODY, "version": learner["version"]}
+            return httpx.Response(200, json=body, headers={"ETag": etag}, request=request)
+        
+        with patch('http_client.get_http_client') as mock_client:
+            mock_client.return_value.request = AsyncMock(side_effect=learner_profiles)
+            before = get_candidate_cache_stats()
+            
+            await get_candidates("api-service", use_fallback=False)
+            assert candidate_service._profile_cache["api-service"]["etag"] == '"7"'
+            
+            candidate_service._profile_cache["api-service"]["expires_at"] = 0
+            revalidated = await get_candidates("api-service", use_fallback=False)
+            await get_candidates("api-service", use_fallback=False)
+            
+            assert learner["requests"] == [None, {"If-None-Match": '"7"'}]
+            assert [c["id"] for c in revalidated] == ["human_1", "human_2"]
+            stats = get_candidate_cache_stats()
+            assert stats["revalidated"] - before["revalidated"] == 1
+            assert stats["hits"] - before["hits"] == 1
+            
+            # A changed snapshot is transferred again under its new ETag
+            learner["version"] = 8
+            candidate_service._profile_cache["api-service"]["expires_at"] = 0
+            await get_candidates("api-service", use_fallback=False)
+            
+            assert learner["requests"][-1] == {"If-None-Match": '"7"'}
+            assert candidate_service._profile_cache["api-service"]["etag"] == '"8"'
+            assert candidate_service._profile_cache["api-service"]["version"] == 8
+
+
+class TestSharedHttpClient:
+    """Test the shared per-downstream HTTP client (http_client.http_request)."""
+    
+    def _client(self, handler):
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    
+    @pytest.mark.asyncio
+    async def test_client_is_reused_per_downstream(self):
+        """One pooled client per downstream on the running loop."""
+        from http_client import get_http_client, close_http_clients
+        try:
+            assert get_http_client("learner") is get_http_client("learner")
+            assert get_http_client("learner") is not get_http_client("explain")
+        finally:
+            await close_http_clients()
+    
+    @pytest.mark.asyncio
+    async def test_connect_errors_are_retried(self):
+        """A request that never reached the server is retried, even for POST."""
+        from http_client import http_request
+        calls = []
+        
+        def handler(request):
+            calls.append(request.method)
+            if len(calls) == 1:
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(200, json={"ok": True})
+        
+        with patch('http_client.HTTP_RETRY_BACKOFF_SECONDS', 0.0), \
+             patch('http_client.get_http_client', return_value=self._client(handler)):
+            response = await http_request("executor", "POST", "http://executor/executeDecision", json={})
+        
+        assert response.status_code == 200
+        assert calls == ["POST", "POST"]
+    
+    @pytest.mark.asyncio
+    async def test_read_timeouts_and_5xx_only_retried_for_idempotent_methods(self):
+        """GET is retried on 503; POST read timeouts are not (the server may have acted on it)."""
+        from http_client import http_request
+        statuses = iter([503, 200])
+        
+        def get_handler(request):
+            return httpx.Response(next(statuses))
+        
+        def post_handler(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+        
+        with patch('http_client.HTTP_RETRY_BACKOFF_SECONDS', 0.0):
+            with patch('http_client.get_http_client', return_value=self._client(get_handler)):
+                response = await http_request("learner", "GET", "http://learner/profiles")
+            assert response.status_code == 200
+            
+            post = MagicMock(wraps=post_handler)
+            with patch('http_client.get_http_client', return_value=self._client(post)):
+                with pytest.raises(httpx.ReadTimeout):
+                    await http_request("executor", "POST", "http://executor/executeDecision", json={})
+            assert post.call_count == 1
+
 class TestEndToEndDecisionFlow:
     """Test complete decision flow with mocked dependencies."""
     
@@ -163,25 +419,25 @@ class TestEndToEndDecisionFlow:
     async def test_make_decision_with_mocked_learner(self):
         """Full decision flow works with mocked Learner Service."""
         # Mock work item in database
-        with patch('decision_engine.get_work_item') as mock_get_work_item:
+        with patch('decision_engine.get_work_item') as mock_get_work_item, \
+             patch('decision_engine.get_decision', return_value=None):
             mock_get_work_item.return_value = MOCK_WORK_ITEM
             
             # Mock Learner Service
-            with patch('candidate_service.get_candidates') as mock_get_candidates:
+            with patch('decision_engine.get_candidates', new_callable=AsyncMock) as mock_get_candidates:
                 mock_get_candidates.return_value = MOCK_LEARNER_RESPONSE["profiles"]
                 
-                # Mock embedding generation (non-blocking)
-                with patch('decision_engine.generate_embedding') as mock_embedding:
+                # Mock embedding lookup (non-blocking)
+                with patch('decision_engine.get_work_item_embedding') as mock_embedding:
                     mock_embedding.return_value = None
                     
                     # Mock Weaviate search
                     with patch('decision_engine.search_similar_work_items') as mock_search:
                         mock_search.return_value = []
                         
-                        # Mock database saves
-                        with patch('decision_engine.save_decision') as mock_save_decision, \
-                             patch('decision_engine.save_decision_candidate') as mock_save_candidate, \
-                             patch('decision_engine.save_constraint_result') as mock_save_constraint:
+                        # Mock database save (decision + audit trail in one transaction)
+                        with patch('decision_engine.save_decision_with_audit') as mock_save_decision:
+                            mock_save_decision.side_effect = lambda **kwargs: kwargs["decision_id"]
                             
                             # Make decision
                             decision = await make_decision("wi_integration_1")
@@ -195,8 +451,11 @@ class TestEndToEndDecisionFlow:
                             # Verify Learner was called
                             mock_get_candidates.assert_called_once_with("api-service", use_fallback=True)
                             
-                            # Verify decision was saved
-                            assert mock_save_decision.called
+                            # Verify decision and its audit trail were saved with one call
+                            assert mock_save_decision.call_count == 1
+                            saved = mock_save_decision.call_args.kwargs
+                            assert len(saved["candidates"]) == len(MOCK_LEARNER_RESPONSE["profiles"])
+                            assert {c["constraint_name"] for c in saved["constraints"]} == {"capacity", "availability"}
 
 
 class TestDecisionServiceEndpoints:
@@ -269,6 +528,174 @@ class TestDecisionServiceEndpoints:
             assert response.status_code in [404, 500]
 
 
+
+class TestMetrics:
+    """Test the /metrics surface and the counters feeding it."""
+    
+    @pytest.mark.asyncio
+    async def test_fallback_usage_is_counted(self):
+        """A Learner timeout that falls back to the database bumps the fallback counter and learner histogram."""
+        from metrics import FALLBACKS, DEPENDENCY_DURATION
+        fallbacks_before = FALLBACKS.get(kind="candidates", reason="timeout")
+        learner_errors_before = DEPENDENCY_DURATION.get_count(dependency="learner", outcome="error")
+        
+        with patch('http_client.get_http_client') as mock_client:
+            mock_client.return_value.request = AsyncMock(
+                side_effect=httpx.TimeoutException("Request timed out")
+            )
+            with patch('candidate_service._get_fallback_candidates', return_value=[]):
+                await get_candidates("api-service", use_fallback=True)
+        
+        assert FALLBACKS.get(kind="candidates", reason="timeout") == fallbacks_before + 1
+        assert DEPENDENCY_DURATION.get_count(dependency="learner", outcome="error") == learner_errors_before + 1
+    
+    def test_metrics_endpoint_renders_prometheus_text(self):
+        """GET /metrics returns histogram buckets and counters in Prometheus text format."""
+        from main import app
+        from fastapi.testclient import TestClient
+        from metrics import STAGE_DURATION, FAILURES
+        
+        STAGE_DURATION.observe(0.003, stage="scoring")
+        FAILURES.inc(stage="explain")
+        
+        response = TestClient(app).get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert "# TYPE decision_stage_duration_seconds histogram" in body
+        assert 'decision_stage_duration_seconds_bucket{stage="scoring",le="0.005"}' in body
+        assert 'decision_stage_duration_seconds_bucket{stage="scoring",le="+Inf"}' in body
+        assert 'decision_failures_total{stage="explain"}' in body
+
+
+MOCK_DECISION = {
+    "id": "dec-orch-1",
+    "work_item_id": "wi_integration_1",
+    "primary_human_id": "human_1",
+    "backup_human_ids": ["human_2"],
+    "confidence": 0.8
+}
+
+
+def _job(**overrides):
+    job = {
+        "decision_id": "dec-orch-1",
+        "work_item_id": "wi_integration_1",
+        "status": "running",
+        "explain_status": "pending",
+        "execute_status": "pending",
+        "explain_attempts": 0,
+        "execute_attempts": 0,
+        "evidence": None,
+        "queued_seconds": 0.1
+    }
+    job.update(overrides)
+    return job
+
+
+def _response(status_code, url, json_body=None):
+    return httpx.Response(status_code, json=json_body or {}, request=httpx.Request("POST", url))
+
+
+class TestOrchestrationJobs:
+    """Test background Explain + Executor orchestration (orchestration_service.process_job)."""
+    
+    def _patches(self):
+        return (
+            patch('orchestration_service.get_decision', return_value=MOCK_DECISION),
+            patch('orchestration_service.get_work_item', return_value=MOCK_WORK_ITEM),
+            patch('orchestration_service.get_decision_candidates', return_value=[]),
+            patch('orchestration_service.get_constraint_results', return_value=[]),
+            patch('orchestration_service.get_executed_jira_issue_key', return_value=None),
+            patch('orchestration_service.start_orchestration_execute', return_value=True),
+            patch('orchestration_service.update_orchestration_job')
+        )
+    
+    async def _run(self, job, responses):
+        from orchestration_service import process_job
+        client = MagicMock()
+        client.request = AsyncMock(side_effect=responses)
+        p_decision, p_work_item, p_candidates, p_constraints, p_executed, p_start, p_update = self._patches()
+        with patch('http_client.get_http_client', return_value=client), \
+             p_decision, p_work_item, p_candidates, p_constraints, p_executed, p_start, p_update as mock_update:
+            await process_job(job)
+        return client, mock_update
+    
+    @pytest.mark.asyncio
+    async def test_explain_then_executor_succeeds(self):
+        """Evidence from Explain is passed to Executor and the job is marked succeeded."""
+        client, mock_update = await self._run(_job(), [
+            _response(200, "http://explain/explainDecision", {"evidence": ["resolved 3 similar incidents"]}),
+            _response(200, "http://executor/executeDecision", {"jira_issue_key": "API-1"})
+        ])
+        
+        assert client.request.await_count == 2
+        assert client.request.await_args_list[1].kwargs["json"]["evidence"] == ["resolved 3 similar incidents"]
+        fields = mock_update.call_args.args[1]
+        assert fields["status"] == "succeeded"
+        assert fields["explain_status"] == "succeeded"
+        assert fields["jira_issue_key"] == "API-1"
+    
+    @pytest.mark.asyncio
+    async def test_explain_network_error_is_retried_with_backoff(self):
+        """A transient Explain failure reschedules the job instead of executing without evidence."""
+        client, mock_update = await self._run(_job(), [httpx.ReadTimeout("timed out")])
+        
+        assert client.request.await_count == 1
+        fields = mock_update.call_args.args[1]
+        assert fields["status"] == "pending"
+        assert fields["explain_attempts"] == 1
+        assert mock_update.call_args.kwargs["retry_in_seconds"] > 0
+    
+    @pytest.mark.asyncio
+    async def test_executor_runs_without_evidence_after_explain_attempts_exhausted(self):
+        """On the last Explain attempt the decision is still executed, without evidence."""
+        from orchestration_service import ORCHESTRATION_MAX_ATTEMPTS
+        client, mock_update = await self._run(_job(explain_attempts=ORCHESTRATION_MAX_ATTEMPTS - 1), [
+            _response(503, "http://explain/explainDecision"),
+            _response(200, "http://executor/executeDecision", {"jira_issue_key": "API-2"})
+        ])
+        
+        assert client.request.await_args_list[1].kwargs["json"]["evidence"] == []
+        fields = mock_update.call_args.args[1]
+        assert fields["explain_status"] == "failed"
+        assert fields["status"] == "succeeded"
+    
+    @pytest.mark.asyncio
+    async def test_executor_client_error_fails_without_retry(self):
+        """Executor 4xx (e.g. missing Jira mapping) is not retried."""
+        client, mock_update = await self._run(_job(explain_status="succeeded", evidence=["e"]), [
+            _response(400, "http://executor/executeDecision", {"detail": "No Jira project mapping"})
+        ])
+        
+        assert client.request.await_count == 1
+        fields = mock_update.call_args.args[1]
+        assert fields["status"] == "failed"
+        assert fields["execute_status"] == "failed"
+        assert mock_update.call_args.kwargs.get("retry_in_seconds") is None
+    
+    def test_status_endpoint(self):
+        """GET /decisions/{id}/status reports stage progress, 404 for unknown decisions."""
+        from main import app
+        from fastapi.testclient import TestClient
+        client = TestClient(app)
+        
+        with patch('main.get_orchestration_job', return_value=_job(
+            status="pending", explain_status="succeeded", evidence=["a", "b"], execute_attempts=1,
+            last_error="HTTP 503: unavailable", jira_issue_key=None, next_attempt_at=None,
+            created_at=None, updated_at=None
+        )):
+            response = client.get("/decisions/dec-orch-1/status")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["explain"] == {"status": "succeeded", "attempts": 0, "evidence_count": 2}
+        assert body["execute"]["attempts"] == 1
+        assert body["last_error"] == "HTTP 503: unavailable"
+        
+        with patch('main.get_orchestration_job', return_value=None):
+            assert client.get("/decisions/dec-missing/status").status_code == 404
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
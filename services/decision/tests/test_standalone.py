@@ -12,10 +12,11 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from decision_engine import make_decision
+from decision_engine import make_decision, make_decisions_batch
 from candidate_service import get_candidates, _get_fallback_candidates
 from constraint_service import apply_constraints
-from scoring_service import score_candidates, calculate_confidence
+from scoring_service import score_candidates, calculate_confidence, calculate_final_score
+from embedding_service import get_work_item_embeddings, get_embedding_source_stats
 # JQL parser is in jira-simulator, not decision service
 # from jql_parser import parse_jql  # Commented out - not in decision service
 
@@ -91,13 +92,13 @@ class TestCandidateService:
     @pytest.mark.asyncio
     async def test_get_candidates_success(self):
         """Should return candidates from Learner Service."""
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.return_value = {"profiles": MOCK_CANDIDATES}
             mock_response.raise_for_status = MagicMock()
             
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+            mock_client.return_value.request = AsyncMock(return_value=mock_response)
             
             candidates = await get_candidates("api-service")
             
@@ -107,9 +108,9 @@ class TestCandidateService:
     @pytest.mark.asyncio
     async def test_get_candidates_timeout_fallback(self):
         """Should use fallback when Learner Service times out."""
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             from httpx import TimeoutException
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(side_effect=TimeoutException("Timeout"))
+            mock_client.return_value.request = AsyncMock(side_effect=TimeoutException("Timeout"))
             
             with patch('candidate_service._get_fallback_candidates') as mock_fallback:
                 mock_fallback.return_value = MOCK_CANDIDATES[:2]
@@ -122,13 +123,13 @@ class TestCandidateService:
     @pytest.mark.asyncio
     async def test_get_candidates_empty_response_fallback(self):
         """Should use fallback when Learner returns empty profiles."""
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.return_value = {"profiles": []}
             mock_response.raise_for_status = MagicMock()
             
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+            mock_client.return_value.request = AsyncMock(return_value=mock_response)
             
             with patch('candidate_service._get_fallback_candidates') as mock_fallback:
                 mock_fallback.return_value = MOCK_CANDIDATES
@@ -200,6 +201,39 @@ class TestScoring:
         
         assert human_1_score >= human_3_score
     
+    def test_vectorized_scores_match_per_candidate_formula(self):
+        """score_candidates produces the same breakdowns and order as calculate_final_score."""
+        import random
+        rng = random.Random(7)
+        candidates = [
+            {
+                "id": f"human_{i}",
+                "fit_score": round(rng.random(), 2),
+                "max_story_points": rng.choice([13, 21, 34]),
+                "current_story_points": rng.randint(0, 30)
+            }
+            for i in range(60)
+        ]
+        similar_incidents = [
+            {"resolver_id": f"human_{rng.randint(0, 80)}", "similarity": round(rng.random(), 3)}
+            for _ in range(200)
+        ] + [{"resolver_id": "human_1"}]  # missing similarity defaults to 0.5
+        
+        for severity, story_points in [("sev1", 5), ("sev2", None), ("sev3", 8), ("sev4", 0)]:
+            work_item = {**MOCK_WORK_ITEM, "severity": severity, "story_points": story_points}
+            
+            expected = [(c["id"], calculate_final_score(c, work_item, similar_incidents)) for c in candidates]
+            expected.sort(key=lambda x: x[1]["final_score"], reverse=True)
+            
+            scored = score_candidates([dict(c) for c in candidates], work_item, similar_incidents)
+            
+            assert [c["id"] for c in scored] == [cid for cid, _ in expected]
+            assert [c["score_breakdown"] for c in scored] == [b for _, b in expected]
+            assert [c["rank"] for c in scored] == list(range(1, len(candidates) + 1))
+            
+            top = score_candidates([dict(c) for c in candidates], work_item, similar_incidents, top_k=5)
+            assert [c["id"] for c in top] == [cid for cid, _ in expected[:5]]
+    
     def test_confidence_calculation(self):
         """Confidence should reflect gap between top1 and top2."""
         primary = {"final_score": 0.9}
@@ -218,10 +252,277 @@ class TestScoring:
         assert confidence2 < confidence
 
 
+class TestBatchDecision:
+    """Test batch decision routing."""
+    
+    @pytest.mark.asyncio
+    async def test_batch_groups_by_service_and_saves_once(self):
+        """Candidates are fetched once per service and all decisions saved in one call."""
+        work_items = {
+            "wi_1": {**MOCK_WORK_ITEM, "id": "wi_1"},
+            "wi_2": {**MOCK_WORK_ITEM, "id": "wi_2", "severity": "sev3"},
+            "wi_3": {**MOCK_WORK_ITEM, "id": "wi_3", "service": "payment-service"},
+        }
+        
+        with patch('decision_engine.get_decisions_for_work_items', return_value={}), \
+             patch('decision_engine.get_constraint_results_for_decisions', return_value={}), \
+             patch('decision_engine.get_work_items', return_value=work_items), \
+             patch('decision_engine.get_candidates', new=AsyncMock(return_value=MOCK_CANDIDATES)) as mock_candidates, \
+             patch('decision_engine.get_work_item_embeddings', return_value={}), \
+             patch('decision_engine.save_decisions_batch') as mock_save:
+            mock_save.side_effect = lambda records: {r["work_item_id"]: r["id"] for r in records}
+            
+            result = await make_decisions_batch(["wi_1", "wi_2", "wi_3", "wi_missing", "wi_1"])
+            
+            assert mock_candidates.await_count == 2
+            assert mock_save.call_count == 1
+            saved = mock_save.call_args[0][0]
+            assert [r["work_item_id"] for r in saved] == ["wi_1", "wi_2", "wi_3"]
+            assert all(len(r["candidates"]) == len(MOCK_CANDIDATES) for r in saved)
+            assert all(len(r["constraints"]) == 2 for r in saved)
+            
+            assert [d["work_item_id"] for d in result["decisions"]] == ["wi_1", "wi_2", "wi_3"]
+            assert len(result["new_decisions"]) == 3
+            assert result["errors"] == [{"work_item_id": "wi_missing", "error": "Work item wi_missing not found"}]
+    
+    @pytest.mark.asyncio
+    async def test_batch_returns_existing_decisions(self):
+        """Work items that already have a decision are not routed again."""
+        existing = {
+            "wi_1": {
+                "id": "dec_existing",
+                "work_item_id": "wi_1",
+                "primary_human_id": "human_1",
+                "backup_human_ids": ["human_2"],
+                "confidence": 0.8,
+                "created_at": datetime(2024, 1, 15, 10, 0)
+            }
+        }
+        constraints = {"dec_existing": [{"constraint_name": "capacity", "passed": True, "reason": None}]}
+        
+        with patch('decision_engine.get_decisions_for_work_items', return_value=existing), \
+             patch('decision_engine.get_constraint_results_for_decisions', return_value=constraints), \
+             patch('decision_engine.get_work_items', return_value={}), \
+             patch('decision_engine.get_candidates', new=AsyncMock()) as mock_candidates, \
+             patch('decision_engine.save_decisions_batch') as mock_save:
+            result = await make_decisions_batch(["wi_1"])
+            
+            mock_candidates.assert_not_called()
+            mock_save.assert_not_called()
+            assert result["decisions"][0]["id"] == "dec_existing"
+            assert result["decisions"][0]["created_at"] == "2024-01-15T10:00:00"
+            assert result["new_decisions"] == []
+            assert result["errors"] == []
+
+
 # JQL parser tests are in jira-simulator/tests/test_jql_parser.py
 # This test file is for Decision Service only
 
 
+class TestDecisionStageGraph:
+    """Test concurrent stages and the per-decision deadline in make_decision."""
+    
+    @pytest.mark.asyncio
+    async def test_slow_similarity_is_cancelled_at_deadline(self):
+        """Similarity past the budget is dropped; the decision still completes and records timings."""
+        import time as time_module
+        
+        def slow_search(*args, **kwargs):
+            time_module.sleep(0.5)
+            return [{"resolver_id": "human_1", "similarity": 0.9}]
+        
+        with patch('decision_engine.DECISION_DEADLINE_MS', 50.0), \
+             patch('decision_engine.get_decision', return_value=None), \
+             patch('decision_engine.get_work_item', return_value=MOCK_WORK_ITEM), \
+             patch('decision_engine.get_candidates', new=AsyncMock(return_value=[dict(c) for c in MOCK_CANDIDATES])), \
+             patch('decision_engine.get_work_item_embedding', return_value=[0.1] * 384), \
+             patch('decision_engine.search_similar_work_items', side_effect=slow_search), \
+             patch('decision_engine.save_decision_with_audit') as mock_save:
+            mock_save.side_effect = lambda **kwargs: kwargs["decision_id"]
+            
+            start = time_module.perf_counter()
+            decision = await make_decision("wi_test_1")
+            elapsed = time_module.perf_counter() - start
+        
+        assert decision["primary_human_id"]
+        assert elapsed < 0.4
+        timings = mock_save.call_args.kwargs["stage_timings"]
+        assert timings["degraded"] == ["similarity"]
+        assert timings["deadline_ms"] == 50.0
+        for stage in ("existing_check", "work_item_load", "candidates", "embedding", "scoring"):
+            assert stage in timings["stages_ms"]
+        # Similarity data never made it into scoring
+        saved_candidates = mock_save.call_args.kwargs["candidates"]
+        assert all(c["score_breakdown"].get("vector_similarity", 0.5) == 0.5 for c in saved_candidates if not c["filtered"])
+    
+    @pytest.mark.asyncio
+    async def test_candidates_and_similarity_run_concurrently(self):
+        """Candidate fetch overlaps the similarity stage instead of waiting for it."""
+        import time as time_module
+        
+        async def slow_candidates(*args, **kwargs):
+            await asyncio.sleep(0.2)
+            return [dict(c) for c in MOCK_CANDIDATES]
+        
+        def slow_search(*args, **kwargs):
+            time_module.sleep(0.2)
+            return []
+        
+        with patch('decision_engine.get_decision', return_value=None), \
+             patch('decision_engine.get_work_item', return_value=MOCK_WORK_ITEM), \
+             patch('decision_engine.get_candidates', new=slow_candidates), \
+             patch('decision_engine.get_work_item_embedding', return_value=[0.1] * 384), \
+             patch('decision_engine.search_similar_work_items', side_effect=slow_search), \
+             patch('decision_engine.save_decision_with_audit') as mock_save:
+            mock_save.side_effect = lambda **kwargs: kwargs["decision_id"]
+            
+            start = time_module.perf_counter()
+            await make_decision("wi_test_1")
+            elapsed = time_module.perf_counter() - start
+        
+        assert elapsed < 0.35
+        assert mock_save.call_args.kwargs["stage_timings"]["degraded"] == []
+
+
+class TestEmbeddingReuse:
+    """Test that decisions reuse Ingest's stored vectors before encoding locally."""
+    
+    def test_stored_vectors_used_and_missing_encoded_locally(self):
+        """One Weaviate lookup for the batch, one local encode for the misses."""
+        work_items = [
+            {"id": "wi_stored", "description": "db timeout"},
+            {"id": "wi_missing", "description": "disk full"},
+            {"id": "wi_empty", "description": ""}
+        ]
+        before = get_embedding_source_stats()
+        
+        with patch('embedding_service.get_work_item_vectors', return_value={"wi_stored": [0.1] * 384}) as mock_lookup, \
+             patch('embedding_service.generate_embeddings', return_value=[[0.2] * 384, None]) as mock_encode:
+            embeddings = get_work_item_embeddings(work_items)
+        
+        mock_lookup.assert_called_once_with(["wi_stored", "wi_missing", "wi_empty"])
+        mock_encode.assert_called_once_with(["disk full", ""])
+        assert embeddings["wi_stored"] == [0.1] * 384
+        assert embeddings["wi_missing"] == [0.2] * 384
+        assert embeddings["wi_empty"] is None
+        
+        after = get_embedding_source_stats()
+        assert after["weaviate"] - before["weaviate"] == 1
+        assert after["local"] - before["local"] == 1
+        assert after["none"] - before["none"] == 1
+
+
+class FakeOrchestrationStore:
+    """In-memory orchestration_jobs row + executed_actions for one decision."""
+    
+    def __init__(self, job):
+        self.row = dict(job)
+        self.jira_issue_keys = []
+    
+    def start_execute(self, decision_id, execute_attempts):
+        if self.row["execute_attempts"] != execute_attempts:
+            return False
+        self.row["execute_attempts"] += 1
+        return True
+    
+    def update(self, decision_id, fields, retry_in_seconds=None):
+        self.row.update(fields)
+    
+    def executed_key(self, decision_id):
+        return self.jira_issue_keys[0] if self.jira_issue_keys else None
+
+
+class TestOrchestrationJobs:
+    """Test that reclaimed orchestration jobs never create a second Jira issue."""
+    
+    JOB = {
+        "decision_id": "dec_1",
+        "work_item_id": "wi_test_1",
+        "status": "running",
+        "explain_status": "succeeded",
+        "execute_status": "pending",
+        "explain_attempts": 1,
+        "execute_attempts": 0,
+        "evidence": ["bullet"]
+    }
+    
+    def _patches(self, store, executor):
+        async def run_inline(func, *args, **kwargs):
+            return func(*args, **kwargs)
+        
+        decision = {"id": "dec_1", "primary_human_id": "human_1", "backup_human_ids": []}
+        return [
+            patch('orchestration_service.run_in_db_executor', side_effect=run_inline),
+            patch('orchestration_service.get_decision', return_value=decision),
+            patch('orchestration_service.get_work_item', return_value=MOCK_WORK_ITEM),
+            patch('orchestration_service.get_executed_jira_issue_key', side_effect=store.executed_key),
+            patch('orchestration_service.start_orchestration_execute', side_effect=store.start_execute),
+            patch('orchestration_service.update_orchestration_job', side_effect=store.update),
+            patch('orchestration_service._call_executor', executor)
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_reclaimed_job_after_crash_does_not_call_executor_again(self):
+        """Worker died after Executor created the issue but before saving the job."""
+        from orchestration_service import process_job
+        store = FakeOrchestrationStore(self.JOB)
+        
+        async def executor(decision, work_item, evidence):
+            store.jira_issue_keys.append("OPS-1")
+            return "OPS-1"
+        
+        executor_mock = AsyncMock(side_effect=executor)
+        patches = self._patches(store, executor_mock)
+        for p in patches:
+            p.start()
+        try:
+            with pytest.raises(RuntimeError):
+                with patch('orchestration_service.update_orchestration_job', side_effect=RuntimeError("worker killed")):
+                    await process_job(dict(self.JOB))
+            
+            # Lease expired: the job is reclaimed as it was claimed, still running with execute_attempts=0
+            await process_job(dict(self.JOB))
+        finally:
+            for p in patches:
+                p.stop()
+        
+        assert executor_mock.await_count == 1
+        assert store.row["status"] == "succeeded"
+        assert store.row["jira_issue_key"] == "OPS-1"
+    
+    @pytest.mark.asyncio
+    async def test_job_reclaimed_during_slow_executor_call_is_not_executed_twice(self):
+        """Two workers holding the same claim: only the first may call Executor."""
+        from orchestration_service import process_job
+        store = FakeOrchestrationStore(self.JOB)
+        call_started = asyncio.Event()
+        release = asyncio.Event()
+        
+        async def executor(decision, work_item, evidence):
+            call_started.set()
+            await release.wait()
+            store.jira_issue_keys.append("OPS-1")
+            return "OPS-1"
+        
+        executor_mock = AsyncMock(side_effect=executor)
+        patches = self._patches(store, executor_mock)
+        for p in patches:
+            p.start()
+        try:
+            first = asyncio.create_task(process_job(dict(self.JOB)))
+            await call_started.wait()
+            await process_job(dict(self.JOB))
+            release.set()
+            await first
+        finally:
+            for p in patches:
+                p.stop()
+        
+        assert executor_mock.await_count == 1
+        assert store.row["execute_attempts"] == 1
+        assert store.row["jira_issue_key"] == "OPS-1"
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -2,11 +2,15 @@
 Weaviate client for vector similarity search.
 """
 import os
+import time
 import logging
 from typing import Optional, List, Dict, Any
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
-from weaviate.classes.query import MetadataQuery
+from weaviate.classes.query import MetadataQuery, Filter
+from weaviate.util import generate_uuid5
+
+from metrics import DEPENDENCY_DURATION, FAILURES
 
 logger = logging.getLogger(__name__)
 
@@ -77,7 +81,7 @@ def search_similar_work_items(
     Search for similar work items using vector similarity.
     
     Args:
-        embedding: 1536-dimensional embedding vector
+        embedding: 384-dimensional embedding vector (same space as Ingest)
         service: Optional service filter
         limit: Maximum number of results
     
@@ -86,14 +90,14 @@ def search_similar_work_items(
     """
     client = get_weaviate_client()
     if not client:
+        FAILURES.inc(stage="similarity_search")
         return []
     
+    start = time.perf_counter()
     try:
         collection = client.collections.get("WorkItem")
         
         # Build query
-        from weaviate.classes.query import Filter
-        
         query_builder = collection.query.near_vector(
             near_vector=embedding,
             limit=limit,
@@ -124,12 +128,91 @@ def search_similar_work_items(
                 "similarity": max(0.0, min(1.0, 1.0 - distance))  # Convert distance to similarity (0-1)
             })
         
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency="weaviate_search", outcome="ok")
         return similar_items
     except Exception as e:
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency="weaviate_search", outcome="error")
+        FAILURES.inc(stage="similarity_search")
         logger.error(f"Vector similarity search failed: {e}")
         return []
 
 
+def work_item_uuid(work_item_id: str) -> str:
+    """Weaviate object UUID Ingest uses for a work item (uuid5 of the work item ID)."""
+    return generate_uuid5(work_item_id)
+
+
+def _object_vector(obj) -> Optional[List[float]]:
+    """Extract the (default) vector from a Weaviate object."""
+    vector = getattr(obj, "vector", None)
+    if isinstance(vector, dict):
+        vector = vector.get("default") or next(iter(vector.values()), None)
+    return list(vector) if vector else None
+
+
+def get_work_item_vector(work_item_id: str) -> Optional[List[float]]:
+    """
+    Get the embedding Ingest stored for a work item.
+    
+    Args:
+        work_item_id: Work item ID
+    
+    Returns:
+        384-dimensional embedding vector, or None if not stored / Weaviate unavailable
+    """
+    client = get_weaviate_client()
+    if not client:
+        return None
+    
+    start = time.perf_counter()
+    try:
+        collection = client.collections.get("WorkItem")
+        obj = collection.query.fetch_object_by_id(work_item_uuid(work_item_id), include_vector=True)
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency="weaviate_fetch", outcome="ok")
+        return _object_vector(obj) if obj else None
+    except Exception as e:
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency="weaviate_fetch", outcome="error")
+        logger.warning(f"Failed to fetch stored vector for {work_item_id}: {e}")
+        return None
+
+
+def get_work_item_vectors(work_item_ids: List[str]) -> Dict[str, List[float]]:
+    """
+    Get stored embeddings for many work items with one query.
+    
+    Args:
+        work_item_ids: Work item IDs
+    
+    Returns:
+        Dict of work_item_id -> vector (IDs with no stored vector are omitted)
+    """
+    client = get_weaviate_client()
+    if not client or not work_item_ids:
+        return {}
+    
+    by_uuid = {work_item_uuid(wid): wid for wid in work_item_ids}
+    start = time.perf_counter()
+    try:
+        collection = client.collections.get("WorkItem")
+        results = collection.query.fetch_objects(
+            filters=Filter.by_id().contains_any(list(by_uuid.keys())),
+            include_vector=True,
+            limit=len(by_uuid)
+        )
+        vectors = {}
+        for obj in results.objects:
+            work_item_id = by_uuid.get(str(obj.uuid))
+            vector = _object_vector(obj)
+            if work_item_id and vector:
+                vectors[work_item_id] = vector
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency="weaviate_fetch", outcome="ok")
+        return vectors
+    except Exception as e:
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency="weaviate_fetch", outcome="error")
+        logger.warning(f"Failed to fetch stored vectors for {len(work_item_ids)} work items: {e}")
+        return {}
+
+
 def store_work_item(
     work_item_id: str,
     description: str,
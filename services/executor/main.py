@@ -5,17 +5,20 @@ import os
 import json
 import uuid
 import logging
+import random
 import asyncio
 import base64
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import httpx
 from contextlib import asynccontextmanager
 
 from db import execute_query, execute_update
+from pagination import decode_cursor, keyset_page, estimate_row_count, exact_row_count
+from http_client import http_request, close_http_clients, get_http_client_stats
 from mappings import validate_mappings, get_jira_project, get_jira_priority, get_jira_account_id
 
 # Configure logging
@@ -72,6 +75,7 @@ async def lifespan(app: FastAPI):
     logger.info("Executor Service starting up...")
     yield
     logger.info("Executor Service shutting down...")
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -189,7 +193,7 @@ async def create_jira_issue_with_retry(
     base_delay: float = 1.0
 ) -> Dict[str, Any]:
     """
-    Create Jira issue with exponential backoff retry.
+    Create Jira issue with jittered exponential backoff retry.
     
     Supports both real Jira (with API keys) and Jira Simulator (no auth).
     
@@ -210,21 +214,23 @@ async def create_jira_issue_with_retry(
     last_error = None
     for attempt in range(max_retries):
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
-                    f"{jira_url}/rest/api/3/issue",
-                    json=jira_issue,
-                    headers=headers
-                )
-                response.raise_for_status()
-                return response.json()
+            # Shared keep-alive client; retries are handled by this loop
+            response = await http_request(
+                "jira", "POST", f"{jira_url}/rest/api/3/issue",
+                json=jira_issue,
+                headers=headers,
+                timeout=timeout,
+                retries=0
+            )
+            response.raise_for_status()
+            return response.json()
         except (httpx.HTTPError, httpx.TimeoutException) as e:
             last_error = e
             if attempt < max_retries - 1:
-                delay = base_delay * (2 ** attempt)
+                delay = base_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
                 logger.warning(
                     f"Jira API call failed (attempt {attempt + 1}/{max_retries}): {e}. "
-                    f"Retrying in {delay}s..."
+                    f"Retrying in {delay:.2f}s..."
                 )
                 await asyncio.sleep(delay)
             else:
@@ -303,21 +309,64 @@ def update_work_item_jira_key(work_item_id: str, jira_issue_key: str) -> None:
 @app.get("/healthz")
 async def health():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "executor"}
+    return {"status": "healthy", "service": "executor", "http_clients": get_http_client_stats()}
 
 
 @app.get("/executed_actions")
-async def get_executed_actions(decision_id: Optional[str] = None):
-    """Get executed actions, optionally filtered by decision_id."""
+async def get_executed_actions(
+    response: Response,
+    decision_id: Optional[str] = None,
+    limit: Optional[int] = Query(
+        None, ge=1, le=500,
+        description="Maximum number of actions to return (default 100; with decision_id, all unless set)"
+    ),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    exact_count: bool = Query(False, description="Run an exact COUNT(*) instead of the planner estimate")
+):
+    """
+    Get executed actions (newest first), optionally filtered by decision_id.
+    
+    The body stays a plain list; paging metadata is returned in headers:
+    X-Next-Cursor (absent on the last page) and X-Total-Count or X-Total-Estimate.
+    A decision has only a handful of actions, so decision_id without limit or
+    cursor returns all of them in one response.
+    """
     try:
+        where_clauses = []
+        params: List[Any] = []
         if decision_id:
-            query = "SELECT * FROM executed_actions WHERE decision_id = %s ORDER BY created_at DESC"
-            actions = execute_query(query, [decision_id])
+            where_clauses.append("decision_id = %s")
+            params.append(decision_id)
+        filter_sql = "FROM executed_actions " + ("WHERE " + " AND ".join(where_clauses) if where_clauses else "")
+        count_params = list(params)
+        
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            where_clauses.append("(created_at, id) < (%s, %s)")
+            params.extend([cursor_created_at, cursor_id])
+        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        
+        query = f"SELECT * FROM executed_actions {where_sql} ORDER BY created_at DESC, id DESC"
+        if decision_id and limit is None and not cursor:
+            actions, next_cursor = execute_query(query, params), None
         else:
-            query = "SELECT * FROM executed_actions ORDER BY created_at DESC LIMIT 100"
-            actions = execute_query(query)
+            limit = limit or 100
+            params.append(limit + 1)
+            actions, next_cursor = keyset_page(execute_query(query + " LIMIT %s", params), limit)
+        
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if exact_count:
+            response.headers["X-Total-Count"] = str(exact_row_count(filter_sql, count_params))
+        elif not decision_id:
+            response.headers["X-Total-Estimate"] = str(estimate_row_count(filter_sql, count_params))
         
         return actions
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get executed actions: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,81 @@
+"""
+Keyset pagination helpers (Executor Service).
+
+List endpoints order by (created_at DESC, id DESC) and page with
+WHERE (created_at, id) < (cursor) instead of OFFSET, so every page costs the
+same index range scan however deep it is. The cursor is the last row's
+(created_at, id), base64url-encoded JSON, and is opaque to clients.
+
+Totals default to the planner's row estimate (EXPLAIN, no table scan); an
+exact COUNT(*) is only run when the caller asks for it.
+"""
+import json
+import base64
+from datetime import datetime
+from typing import Optional, List, Any, Tuple
+
+from db import execute_query
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Opaque cursor pointing just past a row in (created_at DESC, id DESC) order."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_page(
+    rows: List[dict],
+    limit: int,
+    created_at_key: str = "created_at",
+    id_key: str = "id"
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Trim a page fetched with LIMIT limit + 1 and build its next_cursor.
+
+    Returns:
+        (rows of this page, next_cursor or None on the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor(last[created_at_key], last[id_key])
+
+
+def estimate_row_count(from_where_sql: str, params: Optional[List[Any]] = None) -> int:
+    """
+    Planner row estimate for "SELECT 1 FROM ... WHERE ..." (reads statistics only).
+
+    Args:
+        from_where_sql: FROM / WHERE clause, e.g. "FROM work_items WHERE service = %s"
+        params: Parameters for the clause
+
+    Returns:
+        Estimated row count (accuracy depends on how recently the table was ANALYZEd)
+    """
+    results = execute_query(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_where_sql}", params)
+    plan = results[0]["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def exact_row_count(from_where_sql: str, params: Optional[List[Any]] = None) -> int:
+    """Exact COUNT(*) for the same clause (scans every matching row)."""
+    results = execute_query(f"SELECT COUNT(*) AS total {from_where_sql}", params)
+    return results[0]["total"] if results else 0
@@ -239,6 +239,33 @@ class TestExecuteDecision:
             assert work_items[0]["jira_issue_key"] == "API-123"
 
 
+class TestExecutedActionsListing:
+    """GET /executed_actions paging."""
+    
+    def test_decision_scoped_listing_is_not_capped(self, client):
+        """decision_id without limit/cursor returns every action, with no LIMIT and no cursor."""
+        rows = [{"id": f"a{i}", "decision_id": "test_decision_1", "created_at": "2024-01-15T10:00:00"} for i in range(150)]
+        with patch('main.execute_query', return_value=rows) as mock_query:
+            response = client.get("/executed_actions", params={"decision_id": "test_decision_1"})
+        
+        assert response.status_code == 200
+        assert len(response.json()) == 150
+        assert "X-Next-Cursor" not in response.headers
+        assert "LIMIT" not in mock_query.call_args[0][0]
+    
+    def test_unscoped_listing_is_paged(self, client):
+        """Without decision_id the default page size applies and a cursor is returned."""
+        rows = [{"id": f"a{i}", "decision_id": "d", "created_at": datetime(2024, 1, 15, 10, 0, i % 60)} for i in range(101)]
+        with patch('main.execute_query', return_value=rows) as mock_query, \
+             patch('main.estimate_row_count', return_value=1000):
+            response = client.get("/executed_actions")
+        
+        assert response.status_code == 200
+        assert len(response.json()) == 100
+        assert "X-Next-Cursor" in response.headers
+        assert mock_query.call_args[0][1][-1] == 101
+
+
 class TestCorrelationID:
     """Test correlation ID middleware."""
     
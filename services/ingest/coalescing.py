@@ -0,0 +1,238 @@
+"""
+Alert-storm coalescing for Ingest Service.
+
+When a dependency fails, monitoring and PagerDuty send many near-identical
+work items for the same service within seconds. Each new embedding is compared
+against an in-memory ring of recent routed work items for its service; if one
+is at least COALESCE_SIMILARITY_THRESHOLD similar (cosine) and was created
+within COALESCE_WINDOW_SECONDS, the new item is stored as a child of that
+parent (work_items.parent_work_item_id) and is not routed again - no Weaviate
+write, no /decide, no Explain/Executor.
+
+An item more severe than the candidate parent is never coalesced (escalations
+are routed). Only routed items enter the ring, so the window is anchored at the
+parent's creation and a long storm produces a new parent every window.
+
+The lookup and the parent reservation are one step under the ring lock: an item
+that will be routed enters the ring as soon as it is checked, before it is
+stored, so near-identical items arriving together coalesce into the first one
+instead of all missing each other. Callers release the reservation if the item
+is not stored after all.
+
+The ring is per process; with several workers each one coalesces its own share.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+COALESCE_SIMILARITY_THRESHOLD = float(os.getenv("COALESCE_SIMILARITY_THRESHOLD", "0.92"))
+COALESCE_WINDOW_SECONDS = float(os.getenv("COALESCE_WINDOW_SECONDS", "300"))
+COALESCE_RING_SIZE = int(os.getenv("COALESCE_RING_SIZE", "64"))
+
+# Lower rank = more severe
+_SEVERITY_RANK = {"sev1": 1, "sev2": 2, "sev3": 3, "sev4": 4}
+
+
+class StormCoalescer:
+    """Per-service ring of recent routed work item vectors."""
+
+    def __init__(
+        self,
+        threshold: float = COALESCE_SIMILARITY_THRESHOLD,
+        window_seconds: float = COALESCE_WINDOW_SECONDS,
+        ring_size: int = COALESCE_RING_SIZE
+    ):
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.ring_size = ring_size
+        self._lock = threading.Lock()
+        # service -> deque of (work_item_id, unit vector, severity, created monotonic time)
+        self._rings: Dict[str, deque] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        # Downstream work skipped because of coalescing (recorded by the callers)
+        self._suppressed = {"vector_writes": 0, "decisions": 0}
+
+    def _service_stats(self, service: str) -> Dict[str, int]:
+        return self._stats.setdefault(service, {"checked": 0, "coalesced": 0, "routed": 0})
+
+    def find_parent(
+        self,
+        service: str,
+        severity: str,
+        embedding: List[float],
+        work_item_id: Optional[str] = None,
+        now: Optional[float] = None
+    ) -> Optional[Tuple[str, float]]:
+        """
+        Find a recent parent work item this embedding duplicates.
+
+        Args:
+            service: Service of the new work item
+            severity: Severity of the new work item
+            embedding: Normalized 384-dimensional embedding
+            work_item_id: ID of the new work item; if it is not coalesced it is
+                reserved as a parent right away (release it if it is not stored)
+            now: Monotonic time (tests)
+
+        Returns:
+            (parent_work_item_id, similarity) or None if the item should be routed
+        """
+        ids = [work_item_id] if work_item_id is not None else None
+        return self.find_parents_batch([(service, severity, embedding)], ids=ids, now=now)[0]
+
+    def find_parents_batch(
+        self,
+        entries: List[Tuple[str, str, List[float]]],
+        ids: Optional[List[str]] = None,
+        now: Optional[float] = None
+    ) -> List[Optional[Tuple[str, float]]]:
+        """
+        find_parent for a batch, in order. With ids, every item that is not
+        coalesced is reserved as a parent in its service's ring, so later items
+        of the same batch (and concurrent requests) can coalesce into it.
+
+        Args:
+            entries: (service, severity, embedding) per item
+            ids: Work item IDs of the entries (None = lookup only, nothing reserved)
+            now: Monotonic time (tests)
+
+        Returns:
+            (parent_work_item_id, similarity) or None per entry
+        """
+        now = time.monotonic() if now is None else now
+        results: List[Optional[Tuple[str, float]]] = []
+        with self._lock:
+            for index, (service, severity, embedding) in enumerate(entries):
+                vector = _unit(embedding)
+                self._service_stats(service)["checked"] += 1
+                ring = self._rings.get(service)
+                # Expire parents outside the window (ring is in creation order)
+                while ring and now - ring[0][3] > self.window_seconds:
+                    ring.popleft()
+                match = None
+                if vector is not None and ring:
+                    match = self._match(list(ring), severity, vector)
+                if match:
+                    self._service_stats(service)["coalesced"] += 1
+                elif vector is not None and ids is not None:
+                    self._reserve(service, ids[index], severity, vector, now)
+                results.append(match)
+        return results
+
+    def _match(self, candidates: List[tuple], severity: str, vector: np.ndarray) -> Optional[Tuple[str, float]]:
+        rank = _SEVERITY_RANK.get(severity, 3)
+        candidates = [entry for entry in candidates if _SEVERITY_RANK.get(entry[2], 3) <= rank]
+        if not candidates:
+            return None
+        similarities = np.stack([entry[1] for entry in candidates]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return candidates[best][0], float(similarities[best])
+
+    def _reserve(self, service: str, work_item_id: str, severity: str, vector: np.ndarray, now: float) -> None:
+        """Add a routed work item to its service's ring (caller holds the lock)."""
+        ring = self._rings.get(service)
+        if ring is None:
+            ring = self._rings[service] = deque(maxlen=self.ring_size)
+        ring.append((work_item_id, vector, severity, now))
+        self._service_stats(service)["routed"] += 1
+
+    def release(self, service: str, work_item_ids: List[str]) -> None:
+        """Drop reserved parents whose work items were not stored after all."""
+        drop = set(work_item_ids)
+        with self._lock:
+            ring = self._rings.get(service)
+            if not ring:
+                return
+            kept = [entry for entry in ring if entry[0] not in drop]
+            self._service_stats(service)["routed"] -= len(ring) - len(kept)
+            ring.clear()
+            ring.extend(kept)
+
+    def record_suppressed(self, vector_writes: int = 0, decisions: int = 0) -> None:
+        with self._lock:
+            self._suppressed["vector_writes"] += vector_writes
+            self._suppressed["decisions"] += decisions
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_service = {service: dict(stats) for service, stats in self._stats.items()}
+            ring_sizes = {service: len(ring) for service, ring in self._rings.items()}
+            suppressed = dict(self._suppressed)
+        checked = sum(s["checked"] for s in per_service.values())
+        coalesced = sum(s["coalesced"] for s in per_service.values())
+        return {
+            "enabled": COALESCE_ENABLED,
+            "threshold": self.threshold,
+            "window_seconds": self.window_seconds,
+            "checked": checked,
+            "coalesced": coalesced,
+            # Every suppressed decision also skips its Explain + Executor orchestration job
+            "suppressed": suppressed,
+            "coalesce_rate": round(coalesced / checked, 4) if checked else 0.0,
+            "per_service": {
+                service: {**stats, "ring": ring_sizes.get(service, 0)}
+                for service, stats in per_service.items()
+            }
+        }
+
+
+def _unit(embedding: List[float]) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else None
+
+
+_coalescer = StormCoalescer()
+
+
+def find_coalesce_parent(
+    service: str,
+    severity: str,
+    embedding: List[float],
+    work_item_id: str
+) -> Optional[Tuple[str, float]]:
+    """
+    Parent work item to attach a near-duplicate to (None when disabled or no match).
+
+    When there is no match the work item is reserved as a parent for later
+    duplicates; call release_coalesce_reservations if it is not stored.
+    """
+    if not COALESCE_ENABLED:
+        return None
+    return _coalescer.find_parent(service, severity, embedding, work_item_id)
+
+
+def find_coalesce_parents_batch(
+    entries: List[Tuple[str, str, List[float]]],
+    ids: List[str]
+) -> List[Optional[Tuple[str, float]]]:
+    """Batch variant of find_coalesce_parent (items may coalesce into earlier items of the batch)."""
+    if not COALESCE_ENABLED:
+        return [None] * len(entries)
+    return _coalescer.find_parents_batch(entries, ids)
+
+
+def release_coalesce_reservations(service: str, work_item_ids: List[str]) -> None:
+    """Forget reserved parents whose work items were not stored (insert failed or skipped)."""
+    if COALESCE_ENABLED and work_item_ids:
+        _coalescer.release(service, work_item_ids)
+
+
+def record_suppressed(vector_writes: int = 0, decisions: int = 0) -> None:
+    """Count downstream work skipped for coalesced items."""
+    _coalescer.record_suppressed(vector_writes, decisions)
+
+
+def get_coalescing_stats() -> Dict[str, Any]:
+    """Checked / coalesced counts, suppressed downstream work and per-service ring sizes."""
+    return _coalescer.get_stats()
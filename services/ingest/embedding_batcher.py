@@ -0,0 +1,259 @@
+"""
+Micro-batching embedding executor for Ingest Service.
+
+Request handlers used to run MiniLM inference inline, blocking the event loop
+for a whole forward pass with a batch of one per request. Instead, callers
+enqueue texts and await a future; collector tasks drain the queue into batches
+(up to EMBEDDING_MAX_BATCH_SIZE texts, waiting at most EMBEDDING_MAX_WAIT_MS
+for a batch to fill) and run one encode per batch on a small thread pool.
+PyTorch releases the GIL during inference, so threads share one loaded model
+instead of one copy per process.
+
+When the queue is full, callers wait up to EMBEDDING_ENQUEUE_TIMEOUT_SECONDS
+and then get EmbeddingQueueFullError (handlers turn it into 503 + Retry-After).
+"""
+import os
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+
+from embedding_utils import generate_embeddings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "5"))
+EMBEDDING_QUEUE_SIZE = int(os.getenv("EMBEDDING_QUEUE_SIZE", "1000"))
+EMBEDDING_ENQUEUE_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_ENQUEUE_TIMEOUT_SECONDS", "1"))
+# Concurrent inference batches; each batch also uses PyTorch's intra-op threads,
+# so keep workers x torch threads <= CPU cores
+EMBEDDING_WORKERS = int(os.getenv("EMBEDDING_WORKERS", str(max(1, min(4, (os.cpu_count() or 1) // 2)))))
+
+# Upper bounds of the batch size distribution buckets
+_BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+class EmbeddingQueueFullError(Exception):
+    """The embedding queue stayed full for EMBEDDING_ENQUEUE_TIMEOUT_SECONDS."""
+
+
+class EmbeddingBatcher:
+    """Queue + collector tasks + inference thread pool (bound to one event loop)."""
+
+    def __init__(
+        self,
+        max_batch_size: int = EMBEDDING_MAX_BATCH_SIZE,
+        max_wait_ms: float = EMBEDDING_MAX_WAIT_MS,
+        queue_size: int = EMBEDDING_QUEUE_SIZE,
+        workers: int = EMBEDDING_WORKERS
+    ):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.queue_size = queue_size
+        self.workers = max(1, workers)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "batches": 0,
+            "texts": 0,
+            "inference_ms_total": 0.0,
+            "inference_ms_max": 0.0,
+            "queue_wait_ms_total": 0.0,
+            "queue_wait_ms_max": 0.0,
+            "batch_size_buckets": {str(b): 0 for b in _BATCH_SIZE_BUCKETS}
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not self.loop.is_closed()
+
+    def start(self) -> None:
+        """Start collector tasks on the running loop."""
+        if self._tasks:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embed")
+        self._tasks = [asyncio.create_task(self._collect()) for _ in range(self.workers)]
+        logger.info(
+            f"Embedding batcher started (workers={self.workers}, max_batch={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:g}, queue={self.queue_size})"
+        )
+
+    async def stop(self) -> None:
+        """Stop collectors and fail anything still queued."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Embedding batcher stopped"))
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed one text via the next micro-batch.
+
+        Args:
+            text: Input text
+
+        Returns:
+            384-dimensional embedding vector
+
+        Raises:
+            EmbeddingQueueFullError: If the queue stays full past the enqueue timeout
+        """
+        future = self.loop.create_future()
+        item = (text, future, time.perf_counter())
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(item), EMBEDDING_ENQUEUE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self._stats["rejected"] += 1
+                raise EmbeddingQueueFullError(
+                    f"Embedding queue full ({self.queue_size} pending)"
+                ) from None
+        self._stats["enqueued"] += 1
+        return await future
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed an already-batched list of texts (bulk ingestion) on the same
+        inference pool, bypassing the micro-batch queue.
+        """
+        if not texts:
+            return []
+        return await self._infer(list(texts))
+
+    async def _infer(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        embeddings = await self.loop.run_in_executor(self._executor, generate_embeddings, texts)
+        self._record_batch(len(texts), (time.perf_counter() - start) * 1000)
+        return embeddings
+
+    async def _collect(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self.loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Skip callers that gave up while queued
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                continue
+            now = time.perf_counter()
+            for _, _, enqueued_at in batch:
+                self._record_queue_wait((now - enqueued_at) * 1000)
+
+            try:
+                embeddings = await self._infer([text for text, _, _ in batch])
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Embedding batcher stopped"))
+                raise
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future, _), embedding in zip(batch, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+
+    def _record_batch(self, size: int, inference_ms: float) -> None:
+        stats = self._stats
+        stats["batches"] += 1
+        stats["texts"] += size
+        stats["inference_ms_total"] += inference_ms
+        stats["inference_ms_max"] = max(stats["inference_ms_max"], inference_ms)
+        bucket = next((b for b in _BATCH_SIZE_BUCKETS if size <= b), None)
+        key = str(bucket) if bucket is not None else f"{_BATCH_SIZE_BUCKETS[-1]}+"
+        stats["batch_size_buckets"][key] = stats["batch_size_buckets"].get(key, 0) + 1
+
+    def _record_queue_wait(self, wait_ms: float) -> None:
+        self._stats["queue_wait_ms_total"] += wait_ms
+        self._stats["queue_wait_ms_max"] = max(self._stats["queue_wait_ms_max"], wait_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["batch_size_buckets"] = dict(self._stats["batch_size_buckets"])
+        batches = stats["batches"]
+        stats["queue_depth"] = self._queue.qsize() if self._queue is not None else 0
+        stats["queue_size"] = self.queue_size
+        stats["workers"] = self.workers
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait_ms"] = self.max_wait * 1000
+        stats["batch_size_avg"] = round(stats["texts"] / batches, 2) if batches else 0.0
+        stats["inference_ms_avg"] = round(stats["inference_ms_total"] / batches, 2) if batches else 0.0
+        stats["queue_wait_ms_avg"] = (
+            round(stats["queue_wait_ms_total"] / stats["enqueued"], 2) if stats["enqueued"] else 0.0
+        )
+        return stats
+
+
+_batcher: Optional[EmbeddingBatcher] = None
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """
+    Get the shared batcher, starting it on the running loop if needed.
+
+    Like the shared HTTP clients, a batcher started on a loop that is no longer
+    running is replaced.
+    """
+    global _batcher
+    loop = asyncio.get_running_loop()
+    if _batcher is None or _batcher.loop is not loop or not _batcher.running:
+        _batcher = EmbeddingBatcher()
+        _batcher.start()
+    return _batcher
+
+
+async def embed_text(text: str) -> List[float]:
+    """Embed one text through the micro-batching queue (see EmbeddingBatcher.embed)."""
+    return await get_embedding_batcher().embed(text)
+
+
+async def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embed a list of texts as one batch on the inference pool."""
+    return await get_embedding_batcher().embed_many(texts)
+
+
+async def close_embedding_batcher() -> None:
+    """Stop the shared batcher (call on shutdown)."""
+    global _batcher
+    batcher, _batcher = _batcher, None
+    if batcher is not None and batcher.loop is asyncio.get_running_loop():
+        await batcher.stop()
+
+
+def get_embedding_batcher_stats() -> Dict[str, Any]:
+    """Queue depth, batch size distribution, queue wait and inference latency."""
+    return _batcher.get_stats() if _batcher is not None else {}
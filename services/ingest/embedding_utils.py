@@ -1,39 +1,27 @@
 """
 Embedding generation and PCA reduction utilities for Ingest Service.
 """
+import os
 import logging
-import numpy as np
 from typing import List, Tuple
-from sentence_transformers import SentenceTransformer
-from sklearn.decomposition import PCA
+
+from embedding_backend import load_embedding_model
+from projection import project_embeddings
 
 logger = logging.getLogger(__name__)
 
-# Global model instances
-_embedding_model: SentenceTransformer = None
-_pca_model: PCA = None
-_pca_fitted: bool = False
+# Texts per forward pass in generate_embeddings
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
 
 
-def get_embedding_model() -> SentenceTransformer:
-    """Get or initialize sentence transformer model."""
-    global _embedding_model
-    
-    if _embedding_model is None:
-        try:
-            # Use lightweight model for embeddings (384 dimensions)
-            _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Sentence transformer model loaded")
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            raise
-    
-    return _embedding_model
+def get_embedding_model():
+    """Get the embedding model for the configured backend (see embedding_backend)."""
+    return load_embedding_model()
 
 
 def generate_embedding(text: str) -> List[float]:
     """
-    Generate embedding for text using sentence-transformers.
+    Generate embedding for text with the configured embedding backend.
     
     Args:
         text: Input text
@@ -53,37 +41,40 @@ def generate_embedding(text: str) -> List[float]:
         return [0.0] * 384
 
 
-def get_pca_model() -> PCA:
-    """Get or initialize PCA model for 3D reduction."""
-    global _pca_model, _pca_fitted
-    
-    if _pca_model is None:
-        _pca_model = PCA(n_components=3)
-        _pca_fitted = False
+def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Generate embeddings for many texts with one batched encode call.
     
-    return _pca_model
-
-
-def fit_pca_model(embeddings: List[List[float]]) -> None:
-    """Fit PCA model on a set of embeddings."""
-    global _pca_fitted
+    Args:
+        texts: Input texts (empty / whitespace-only texts get a zero vector)
     
-    if not embeddings:
-        return
+    Returns:
+        One 384-dimensional embedding per input text, in input order
+    """
+    embeddings = [[0.0] * 384 for _ in texts]
+    indices = [i for i, text in enumerate(texts) if text and text.strip()]
+    if not indices:
+        return embeddings
     
     try:
-        model = get_pca_model()
-        embeddings_array = np.array(embeddings)
-        model.fit(embeddings_array)
-        _pca_fitted = True
-        logger.info("PCA model fitted on embeddings")
+        model = get_embedding_model()
+        encoded = model.encode(
+            [texts[i] for i in indices],
+            batch_size=EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        for i, vector in zip(indices, encoded.tolist()):
+            embeddings[i] = vector
     except Exception as e:
-        logger.error(f"Failed to fit PCA model: {e}")
+        logger.error(f"Failed to generate batch embeddings: {e}")
+    
+    return embeddings
 
 
 def pca_reduce(embedding: List[float]) -> Tuple[float, float, float]:
     """
-    Reduce embedding from 384D to 3D using PCA.
+    Reduce embedding from 384D to 3D using the shared persisted projection.
     
     Args:
         embedding: 384-dimensional embedding vector
@@ -94,18 +85,24 @@ def pca_reduce(embedding: List[float]) -> Tuple[float, float, float]:
     if not embedding or len(embedding) == 0:
         return (0.0, 0.0, 0.0)
     
+    return pca_reduce_batch([embedding])[0]
+
+
+def pca_reduce_batch(embeddings: List[List[float]]) -> List[Tuple[float, float, float]]:
+    """
+    Reduce many embeddings from 384D to 3D with one matrix multiply.
+    
+    Args:
+        embeddings: 384-dimensional embedding vectors
+    
+    Returns:
+        One (x, y, z) tuple per embedding, in input order
+    """
+    if not embeddings:
+        return []
+    
     try:
-        model = get_pca_model()
-        
-        # If PCA not fitted, fit on this single embedding
-        if not _pca_fitted:
-            fit_pca_model([embedding])
-        
-        embedding_array = np.array([embedding])
-        reduced = model.transform(embedding_array)[0]
-        
-        return (float(reduced[0]), float(reduced[1]), float(reduced[2]))
+        return project_embeddings(embeddings)
     except Exception as e:
-        logger.error(f"Failed to reduce embedding with PCA: {e}")
-        return (0.0, 0.0, 0.0)
-
+        logger.error(f"Failed to reduce embeddings with PCA: {e}")
+        return [(0.0, 0.0, 0.0)] * len(embeddings)
@@ -0,0 +1,247 @@
+"""
+Streaming NDJSON export of work items (Ingest Service).
+
+GET /work-items/export reads work items in a time range (optionally with their
+decision, primary assignee and decision candidates) through a server-side
+cursor, EXPORT_CHUNK_SIZE rows at a time, and streams one JSON object per line,
+optionally gzip-compressed. PostgreSQL builds each line (json_build_object), so
+the service only joins text; memory is bounded by one chunk regardless of how
+many rows are exported.
+
+Each export holds one pooled connection for its duration, so at most
+EXPORT_MAX_CONCURRENT exports run at once. The slot is released when the
+stream ends and, in any case, when the response is closed (ExportResponse) -
+also if the client goes away before the body starts.
+"""
+import os
+import time
+import zlib
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, List, Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from db import ServerSideCursor, run_in_db_executor
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))
+
+EXPORT_INCLUDES = ("decision", "assignee", "candidates")
+
+_export_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENT)
+
+_WORK_ITEM_FIELDS = """
+    'id', w.id,
+    'type', w.type,
+    'service', w.service,
+    'severity', w.severity,
+    'description', w.description,
+    'created_at', w.created_at,
+    'origin_system', w.origin_system,
+    'creator_id', w.creator_id,
+    'jira_issue_key', w.jira_issue_key,
+    'story_points', w.story_points,
+    'impact', w.impact,
+    'parent_work_item_id', w.parent_work_item_id,
+    'embedding_3d', json_build_array(w.embedding_3d_x, w.embedding_3d_y, w.embedding_3d_z)
+"""
+
+_DECISION_FIELD = """,
+    'decision', CASE WHEN d.id IS NULL THEN NULL ELSE json_build_object(
+        'id', d.id,
+        'primary_human_id', d.primary_human_id,
+        'backup_human_ids', d.backup_human_ids::json,
+        'confidence', d.confidence,
+        'created_at', d.created_at
+    ) END
+"""
+
+_ASSIGNEE_FIELD = """,
+    'primary_assignee', CASE WHEN h.id IS NULL THEN NULL ELSE json_build_object(
+        'id', h.id,
+        'display_name', h.display_name,
+        'email', h.email,
+        'jira_account_id', h.jira_account_id
+    ) END
+"""
+
+_CANDIDATES_FIELD = """,
+    'candidates', (
+        SELECT json_agg(json_build_object(
+            'human_id', c.human_id,
+            'score', c.score,
+            'rank', c.rank,
+            'filtered', c.filtered,
+            'filter_reason', c.filter_reason,
+            'score_breakdown', c.score_breakdown::json
+        ) ORDER BY c.rank)
+        FROM decision_candidates c
+        WHERE c.decision_id = d.id
+    )
+"""
+
+
+def parse_includes(include: Optional[str]) -> List[str]:
+    """
+    Parse the comma-separated include parameter.
+
+    Raises:
+        ValueError: On an unknown include
+    """
+    if not include:
+        return []
+    includes = [part.strip() for part in include.split(",") if part.strip()]
+    unknown = [part for part in includes if part not in EXPORT_INCLUDES]
+    if unknown:
+        raise ValueError(f"Unknown include(s): {', '.join(unknown)} (allowed: {', '.join(EXPORT_INCLUDES)})")
+    return includes
+
+
+def build_export_query(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    service: Optional[str] = None,
+    severity: Optional[str] = None,
+    includes: Optional[List[str]] = None
+) -> Tuple[str, List[Any]]:
+    """
+    Build the export query: one JSON text column per work item, oldest first.
+
+    Args:
+        since: Inclusive lower bound on created_at
+        until: Exclusive upper bound on created_at
+        service: Filter by service
+        severity: Filter by severity
+        includes: Any of decision, assignee, candidates
+
+    Returns:
+        (query, params)
+    """
+    includes = includes or []
+    fields = _WORK_ITEM_FIELDS
+    joins = ""
+    if includes:
+        # assignee and candidates hang off the decision
+        joins += " LEFT JOIN decisions d ON d.work_item_id = w.id"
+    if "decision" in includes:
+        fields += _DECISION_FIELD
+    if "assignee" in includes:
+        fields += _ASSIGNEE_FIELD
+        joins += " LEFT JOIN humans h ON h.id = d.primary_human_id"
+    if "candidates" in includes:
+        fields += _CANDIDATES_FIELD
+
+    where_clauses = []
+    params: List[Any] = []
+    if since:
+        where_clauses.append("w.created_at >= %s")
+        params.append(since)
+    if until:
+        where_clauses.append("w.created_at < %s")
+        params.append(until)
+    if service:
+        where_clauses.append("w.service = %s")
+        params.append(service)
+    if severity:
+        where_clauses.append("w.severity = %s")
+        params.append(severity)
+    where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+
+    query = f"""
+        SELECT json_build_object({fields})::text
+        FROM work_items w{joins}
+        {where_sql}
+        ORDER BY w.created_at, w.id
+    """
+    return query, params
+
+
+class ExportSlot:
+    """One held export slot; release() is idempotent, so every exit path may call it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._held = True
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._held:
+                return
+            self._held = False
+        _export_slots.release()
+
+
+def try_acquire_export_slot() -> Optional[ExportSlot]:
+    """Reserve one of EXPORT_MAX_CONCURRENT export slots (None if all are busy)."""
+    return ExportSlot() if _export_slots.acquire(blocking=False) else None
+
+
+async def stream_export(query: str, params: List[Any], slot: ExportSlot, compress: bool = False) -> AsyncIterator[bytes]:
+    """
+    Stream NDJSON (optionally gzip) for an export query built by build_export_query.
+
+    The slot and the connection are released when the stream ends or fails, or
+    when it is closed before finishing (client disconnect).
+    """
+    cursor = None
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    start = time.perf_counter()
+    sent = 0
+    completed = False
+    try:
+        cursor = ServerSideCursor(query, params, chunk_size=EXPORT_CHUNK_SIZE)
+        while True:
+            rows = await run_in_db_executor(cursor.fetch)
+            if not rows:
+                break
+            data = ("\n".join(row[0] for row in rows) + "\n").encode()
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                sent += len(data)
+                yield data
+        if compressor:
+            tail = compressor.flush()
+            sent += len(tail)
+            yield tail
+        completed = True
+    finally:
+        # No awaiting here: this also runs when the client disconnects (task cancelled)
+        if cursor is not None:
+            cursor.close_in_background()
+        slot.release()
+        logger.info(
+            f"Export {'completed' if completed else 'aborted'}: {cursor.rows_fetched if cursor else 0} rows, "
+            f"{sent} bytes{' (gzip)' if compress else ''} in {time.perf_counter() - start:.1f}s"
+        )
+
+
+class ExportResponse(StreamingResponse):
+    """
+    StreamingResponse for a started export stream (first chunk already read).
+
+    Closing the response closes the stream and releases the slot, whether the
+    body was sent, cut off, or never started because the client disconnected.
+    """
+
+    def __init__(self, stream: AsyncIterator[bytes], first: bytes, slot: ExportSlot, **kwargs):
+        self._stream = stream
+        self._slot = slot
+
+        async def body() -> AsyncIterator[bytes]:
+            yield first
+            async for chunk in stream:
+                yield chunk
+
+        super().__init__(body(), **kwargs)
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._slot.release()
+            await self._stream.aclose()
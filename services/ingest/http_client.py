@@ -0,0 +1,183 @@
+"""
+Shared HTTP clients for Ingest Service calls to other services.
+
+One httpx.AsyncClient per downstream (decision, learner) with a
+keep-alive connection pool, created on first use and closed on shutdown, instead
+of a new client (and TCP connection) per request.
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Tuple, Union
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Pool limits / timeouts (per downstream client)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+
+# Retries (on top of the first attempt) with jittered exponential backoff
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_RETRY_BACKOFF_SECONDS = float(os.getenv("HTTP_RETRY_BACKOFF_SECONDS", "0.1"))
+
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+_RETRY_STATUSES = {502, 503, 504}
+
+# downstream -> (client, event loop it was created on)
+_clients: Dict[str, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+_client_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _new_stats() -> Dict[str, Any]:
+    return {
+        "requests": 0,
+        "errors": 0,
+        "retries": 0,
+        "latency_ms_total": 0.0,
+        "latency_ms_max": 0.0
+    }
+
+
+def get_http_client(downstream: str) -> httpx.AsyncClient:
+    """
+    Get the shared client for a downstream service (created on first use).
+
+    Connection pools are bound to an event loop, so a client created on a loop
+    that is no longer running is replaced.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(downstream)
+    if entry and entry[1] is loop and not entry[0].is_closed:
+        return entry[0]
+
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+    )
+    _clients[downstream] = (client, loop)
+    _client_stats.setdefault(downstream, _new_stats())
+    return client
+
+
+def _is_retryable_error(method: str, error: Exception) -> bool:
+    # The request never reached the server - safe to resend any method
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    # The server may have seen the request (stale keep-alive connection, read timeout)
+    if isinstance(error, (httpx.RemoteProtocolError, httpx.ReadError, httpx.ReadTimeout)):
+        return method in _IDEMPOTENT_METHODS
+    return False
+
+
+def _backoff_seconds(attempt: int) -> float:
+    return random.uniform(0, HTTP_RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+
+def _record(downstream: str, elapsed_ms: float, error: bool = False, retry: bool = False) -> None:
+    stats = _client_stats.setdefault(downstream, _new_stats())
+    stats["requests"] += 1
+    stats["latency_ms_total"] += elapsed_ms
+    stats["latency_ms_max"] = max(stats["latency_ms_max"], elapsed_ms)
+    if error:
+        stats["errors"] += 1
+    if retry:
+        stats["retries"] += 1
+
+
+async def http_request(
+    downstream: str,
+    method: str,
+    url: str,
+    *,
+    timeout: Optional[Union[float, httpx.Timeout]] = None,
+    retries: Optional[int] = None,
+    **kwargs
+) -> httpx.Response:
+    """
+    Send a request on the shared client for a downstream service.
+
+    Connection failures are retried for any method; read errors/timeouts and
+    502/503/504 responses only for idempotent methods. Callers still decide what
+    to do with 4xx/5xx (call response.raise_for_status()).
+
+    Args:
+        downstream: Downstream service name (one pooled client per name)
+        method: HTTP method
+        url: Absolute URL
+        timeout: Per-call timeout (seconds or httpx.Timeout); defaults to HTTP_TIMEOUT_SECONDS
+        retries: Retries after the first attempt (defaults to HTTP_RETRIES)
+        **kwargs: Passed to httpx.AsyncClient.request (json, params, headers, ...)
+
+    Returns:
+        The final httpx.Response
+
+    Raises:
+        httpx.HTTPError subclasses when the last attempt fails at the transport level
+    """
+    method = method.upper()
+    retries = HTTP_RETRIES if retries is None else retries
+    if timeout is not None and not isinstance(timeout, httpx.Timeout):
+        timeout = httpx.Timeout(timeout, connect=min(timeout, HTTP_CONNECT_TIMEOUT_SECONDS))
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+
+    client = get_http_client(downstream)
+    attempt = 0
+    while True:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception as e:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            retry = attempt < retries and _is_retryable_error(method, e)
+            _record(downstream, elapsed_ms, error=True, retry=retry)
+            if not retry:
+                raise
+            delay = _backoff_seconds(attempt)
+            logger.warning(f"{downstream} {method} {url} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+        else:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            retry = attempt < retries and method in _IDEMPOTENT_METHODS and response.status_code in _RETRY_STATUSES
+            _record(downstream, elapsed_ms, error=response.is_server_error, retry=retry)
+            if not retry:
+                return response
+            delay = _backoff_seconds(attempt)
+            logger.warning(f"{downstream} {method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def close_http_clients() -> None:
+    """Close every shared client (call on shutdown)."""
+    entries = list(_clients.values())
+    _clients.clear()
+    for client, _ in entries:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close HTTP client: {e}")
+
+
+def get_http_client_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-downstream request / error / retry counts and latency."""
+    result = {}
+    for downstream, stats in _client_stats.items():
+        requests = stats["requests"]
+        result[downstream] = {
+            **stats,
+            "latency_ms_avg": round(stats["latency_ms_total"] / requests, 2) if requests else 0.0,
+            "latency_ms_total": round(stats["latency_ms_total"], 2),
+            "latency_ms_max": round(stats["latency_ms_max"], 2)
+        }
+    return result
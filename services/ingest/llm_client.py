@@ -2,10 +2,13 @@
 LLM client for preprocessing logs and descriptions.
 """
 import os
+import asyncio
 import logging
 from typing import Optional
 from openai import OpenAI
 
+from log_templates import LOG_TEMPLATE_CACHE_ENABLED, get_log_template_cache
+
 logger = logging.getLogger(__name__)
 
 # Global OpenAI client
@@ -33,6 +36,9 @@ async def llm_preprocess_log(raw_log: str, service_name: str) -> str:
     """
     Use LLM to clean and normalize log text before processing.
     Returns cleaned description ready for entity extraction.
+
+    With LOG_TEMPLATE_CACHE_ENABLED the LLM is only called for log templates
+    that have not been cleaned before (see log_templates.py).
     """
     client = get_llm_client()
     
@@ -45,10 +51,22 @@ async def llm_preprocess_log(raw_log: str, service_name: str) -> str:
                 cleaned = cleaned[len(prefix):].strip()
         return cleaned
     
+    if LOG_TEMPLATE_CACHE_ENABLED:
+        return await get_log_template_cache().preprocess(raw_log, service_name, _llm_clean)
+
     try:
-        prompt = f"""Clean and normalize this error log. Return ONLY the cleaned description, no other text.
+        return await _llm_clean(raw_log, service_name)
+    except Exception as e:
+        logger.error(f"LLM preprocessing failed: {e}. Using raw log.")
+        return raw_log.strip()
 
-Raw log: {raw_log}
+
+async def _llm_clean(log_text: str, service_name: str) -> str:
+    """One chat completion cleaning a (possibly templated) log; raises on failure."""
+    client = get_llm_client()
+    prompt = f"""Clean and normalize this error log. Return ONLY the cleaned description, no other text.
+
+Raw log: {log_text}
 Service: {service_name}
 
 Rules:
@@ -58,17 +76,15 @@ Rules:
 - Extract key information (error type, affected component, severity indicators)
 - Keep it concise but informative
 - Return clean, structured description ready for entity extraction
+- Placeholders like <V1:number> stand for values that differ between occurrences: copy a placeholder exactly where its value matters, drop it where it is noise
 
 Cleaned description:"""
-        
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,  # Deterministic
-            timeout=10.0
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        logger.error(f"LLM preprocessing failed: {e}. Using raw log.")
-        return raw_log.strip()
 
+    response = await asyncio.to_thread(
+        client.chat.completions.create,
+        model=OPENAI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0,  # Deterministic
+        timeout=10.0
+    )
+    return response.choices[0].message.content.strip()
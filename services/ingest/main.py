@@ -3,19 +3,61 @@ Ingest Service - Single source of truth for all work items
 """
 from fastapi import FastAPI, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import os
 import uuid
 from datetime import datetime
 import logging
+import asyncio
+import json
 import httpx
+from contextlib import asynccontextmanager
 
-from pagerduty_webhook import process_pagerduty_incident_webhook, validate_pagerduty_signature
-from db import execute_query, execute_update
-from embedding_utils import generate_embedding, pca_reduce
-from weaviate_client import store_work_item
+from pagerduty_webhook import extract_pagerduty_incidents, validate_pagerduty_signature
+from pagerduty_queue import pagerduty_queue, get_pagerduty_queue_stats
+from db import (
+    execute_query,
+    execute_update,
+    get_pool_stats,
+    insert_work_items_batch,
+    record_coalesced_children,
+    requeue_dead_outbox_events,
+    get_outbox_stats,
+    get_pagerduty_spill_stats,
+    run_in_db_executor
+)
+from http_client import http_request, close_http_clients, get_http_client_stats
+from embedding_utils import pca_reduce, pca_reduce_batch
+from projection import get_projection_stats
+from embedding_backend import warm_up_embedding_model, is_embedding_model_ready, get_embedding_backend_stats
+from embedding_batcher import (
+    embed_text,
+    embed_texts,
+    get_embedding_batcher,
+    close_embedding_batcher,
+    get_embedding_batcher_stats,
+    EmbeddingQueueFullError
+)
+from weaviate_client import store_work_items_batch
+from coalescing import (
+    find_coalesce_parent,
+    find_coalesce_parents_batch,
+    release_coalesce_reservations,
+    record_suppressed,
+    get_coalescing_stats
+)
+from outbox import (
+    OutboxDrainer,
+    OUTBOX_ENABLED,
+    vector_upsert_event,
+    decision_event,
+    get_outbox_drainer_stats
+)
+from pagination import decode_cursor, keyset_page, estimate_row_count, exact_row_count
+from export import parse_includes, build_export_query, try_acquire_export_slot, stream_export, ExportResponse
 from llm_client import llm_preprocess_log
+from log_templates import save_log_template_cache, get_log_template_stats
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +67,39 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-app = FastAPI(title="Ingest Service", version="0.1.0")
+
+outbox_drainer = OutboxDrainer()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up the embedding model, start the batcher, the outbox drainer and the
+    PagerDuty queue; stop them, close shared HTTP clients and persist the log
+    template cache on shutdown.
+    """
+    get_embedding_batcher()
+    # Load + warm up in the background; /readyz reports 503 until done
+    warm_up = asyncio.create_task(asyncio.to_thread(warm_up_embedding_model))
+    if OUTBOX_ENABLED:
+        await outbox_drainer.start()
+    else:
+        logger.info("Outbox drainer disabled")
+    await pagerduty_queue.start()
+    yield
+    warm_up.cancel()
+    await pagerduty_queue.stop()
+    if OUTBOX_ENABLED:
+        await outbox_drainer.stop()
+    await close_embedding_batcher()
+    await close_http_clients()
+    save_log_template_cache()
+
+
+app = FastAPI(title="Ingest Service", version="0.1.0", lifespan=lifespan)
+
+# Maximum number of work items accepted by POST /work-items/bulk
+WORK_ITEMS_BULK_MAX_ITEMS = int(os.getenv("WORK_ITEMS_BULK_MAX_ITEMS", "500"))
 
 # CORS middleware
 app.add_middleware(
@@ -57,6 +131,33 @@ class WorkItemResponse(BaseModel):
     origin_system: str
 
 
+class BulkWorkItemCreate(WorkItemCreate):
+    story_points: Optional[int] = None
+    impact: Optional[str] = None
+
+
+class BulkWorkItemRequest(BaseModel):
+    items: List[BulkWorkItemCreate] = Field(..., min_length=1, max_length=WORK_ITEMS_BULK_MAX_ITEMS)
+    trigger_decisions: bool = False  # Route the created items via Decision Service /decide/batch
+    coalesce: bool = False  # Collapse alert-storm near-duplicates (storm replays; off for backfills)
+
+
+class BulkWorkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    status: str  # created | failed
+    error: Optional[str] = None
+    vector_stored: bool = False
+    decision_id: Optional[str] = None
+    coalesced_into: Optional[str] = None
+
+
+class BulkWorkItemResponse(BaseModel):
+    results: List[BulkWorkItemResult]
+    created: int
+    failed: int
+
+
 class OutcomeRequest(BaseModel):
     event_id: str
     decision_id: Optional[str] = None
@@ -66,10 +167,61 @@ class OutcomeRequest(BaseModel):
     new_assignee_id: Optional[str] = None
 
 
+def _overloaded(error: EmbeddingQueueFullError) -> HTTPException:
+    """503 with Retry-After when the embedding queue applies backpressure."""
+    logger.warning(f"Rejecting work item: {error}")
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+
+
 @app.get("/healthz")
 async def health():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "ingest"}
+    return {
+        "status": "healthy",
+        "service": "ingest",
+        "db_pool": get_pool_stats(),
+        "http_clients": get_http_client_stats(),
+        "projection": get_projection_stats(),
+        "embedding": get_embedding_batcher_stats(),
+        "embedding_backend": get_embedding_backend_stats(),
+        "coalescing": get_coalescing_stats(),
+        "outbox": get_outbox_drainer_stats(),
+        "pagerduty_queue": get_pagerduty_queue_stats(),
+        "log_templates": get_log_template_stats()
+    }
+
+
+@app.get("/readyz")
+async def ready():
+    """Readiness check: 503 until the embedding model is loaded and warmed up"""
+    if not is_embedding_model_ready():
+        raise HTTPException(status_code=503, detail="Embedding model is warming up")
+    return {"status": "ready", "service": "ingest", "embedding_backend": get_embedding_backend_stats()}
+
+
+@app.get("/outbox")
+async def outbox_status():
+    """Outbox depth / oldest pending age per kind (from the table) and drainer counters"""
+    try:
+        queue = await run_in_db_executor(get_outbox_stats)
+    except Exception as e:
+        logger.error(f"Failed to read outbox stats: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to read outbox stats: {str(e)}")
+    return {"queue": queue, "drainer": get_outbox_drainer_stats()}
+
+
+@app.post("/outbox/requeue")
+async def requeue_outbox(kind: Optional[str] = Query(None, description="vector_upsert or decision (default: both)")):
+    """Move dead-lettered outbox events back to pending"""
+    try:
+        requeued = await run_in_db_executor(requeue_dead_outbox_events, kind)
+    except Exception as e:
+        logger.error(f"Failed to requeue outbox events: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to requeue outbox events: {str(e)}")
+    if requeued:
+        outbox_drainer.notify()
+    logger.info(f"Requeued {requeued} dead-lettered outbox events (kind: {kind or 'all'})")
+    return {"requeued": requeued}
 
 
 class DemoWorkItemRequest(BaseModel):
@@ -92,8 +244,12 @@ async def create_demo_work_item(request: DemoWorkItemRequest):
     1. LLM preprocess description (if raw_log provided)
     2. Generate embedding
     3. Reduce to 3D for visualization
-    4. Store in PostgreSQL
-    5. Store in Weaviate (for vector similarity search)
+    4. Store in PostgreSQL, with outbox events for steps 5-6 in the same transaction
+    5. Store in Weaviate (for vector similarity search) - outbox drainer
+    6. Trigger decision making - outbox drainer
+    
+    Near-duplicates of a recent work item for the same service (alert storms) are
+    stored as children of that item and skip steps 5-6.
     """
     try:
         # Generate WorkItem ID
@@ -107,79 +263,74 @@ async def create_demo_work_item(request: DemoWorkItemRequest):
             cleaned_description = request.description
         
         # Generate embedding
-        embedding = generate_embedding(cleaned_description)
+        embedding = await embed_text(cleaned_description)
         
         # Reduce to 3D for visualization
         embedding_3d = pca_reduce(embedding)
         
-        # Store in PostgreSQL
+        # Alert-storm coalescing: attach near-duplicates to a recent parent (an item
+        # that will be routed is reserved as a parent right away)
+        parent = find_coalesce_parent(request.service, request.severity, embedding, work_item_id)
+        parent_work_item_id = parent[0] if parent else None
+        
+        # Store in PostgreSQL; the Weaviate upsert and decision trigger are queued in
+        # the same transaction and delivered by the outbox drainer
+        events = [] if parent else [
+            vector_upsert_event(work_item_id, cleaned_description, request.service, request.severity, embedding),
+            decision_event(work_item_id)
+        ]
         try:
-            rows_affected = execute_update("""
-                INSERT INTO work_items (
-                    id, type, service, severity, description, raw_log,
-                    embedding_3d_x, embedding_3d_y, embedding_3d_z,
-                    created_at, origin_system, story_points, impact
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, [
-                work_item_id,
-                request.type or "incident",
-                request.service,
-                request.severity,
-                cleaned_description,
-                request.raw_log,
-                embedding_3d[0],
-                embedding_3d[1],
-                embedding_3d[2],
-                created_at,
-                "demo",  # origin_system
-                request.story_points,
-                request.impact
-            ])
-            logger.info(f"Stored WorkItem {work_item_id} in database ({rows_affected} rows affected)")
+            await run_in_db_executor(insert_work_items_batch, [{
+                "id": work_item_id,
+                "type": request.type or "incident",
+                "service": request.service,
+                "severity": request.severity,
+                "description": cleaned_description,
+                "raw_log": request.raw_log,
+                "embedding_3d": embedding_3d,
+                "created_at": created_at,
+                "origin_system": "demo",
+                "story_points": request.story_points,
+                "impact": request.impact,
+                "parent_work_item_id": parent_work_item_id
+            }], events)
+            logger.info(f"Stored WorkItem {work_item_id} in database")
         except Exception as e:
+            if not parent:
+                release_coalesce_reservations(request.service, [work_item_id])
             logger.error(f"Failed to store WorkItem in database: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"Failed to store WorkItem in database: {str(e)}")
         
-        # Store in Weaviate (for vector similarity search)
-        try:
-            store_work_item(
-                work_item_id=work_item_id,
-                description=cleaned_description,
-                service=request.service,
-                severity=request.severity,
-                embedding=embedding
+        if parent:
+            try:
+                await run_in_db_executor(record_coalesced_children, {parent_work_item_id: 1})
+            except Exception as e:
+                logger.warning(f"Failed to update coalesced count on {parent_work_item_id}: {e}")
+            record_suppressed(vector_writes=1, decisions=1)
+            logger.info(
+                f"Coalesced WorkItem {work_item_id} into {parent_work_item_id} "
+                f"(similarity {parent[1]:.3f}, service {request.service}); not routed"
             )
-            logger.info(f"Stored WorkItem {work_item_id} in Weaviate")
-        except Exception as e:
-            logger.warning(f"Failed to store WorkItem in Weaviate: {e}. Continuing...")
-        
-        logger.info(f"Created WorkItem {work_item_id} for service {request.service}")
+            return {
+                "work_item_id": work_item_id,
+                "created_at": created_at.isoformat(),
+                "coalesced_into": parent_work_item_id,
+                "similarity": round(parent[1], 4),
+                "message": "WorkItem coalesced into an existing work item"
+            }
+        outbox_drainer.notify()
         
-        # AUTOMATIC ORCHESTRATION: Trigger decision making
-        decision_url = os.getenv("DECISION_SERVICE_URL", "http://decision:8000")
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                logger.info(f"Triggering decision for WorkItem {work_item_id}")
-                decision_response = await client.post(
-                    f"{decision_url}/decide",
-                    json={"work_item_id": work_item_id}
-                )
-                decision_response.raise_for_status()
-                decision = decision_response.json()
-                logger.info(f"Decision made successfully: {decision.get('id')} (primary: {decision.get('primary_human_id')})")
-        except httpx.RequestError as e:
-            logger.warning(f"Failed to trigger decision (network error): {e}. WorkItem created but not routed.")
-        except httpx.HTTPStatusError as e:
-            logger.warning(f"Failed to trigger decision (HTTP {e.response.status_code}): {e.response.text}. WorkItem created but not routed.")
-        except Exception as e:
-            logger.warning(f"Failed to trigger decision (unexpected error): {e}. WorkItem created but not routed.")
+        logger.info(f"Created WorkItem {work_item_id} for service {request.service} (routing queued)")
         
         return {
             "work_item_id": work_item_id,
             "created_at": created_at.isoformat(),
             "message": "WorkItem created successfully"
         }
+    except EmbeddingQueueFullError as e:
+        raise _overloaded(e)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to create WorkItem: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to create WorkItem: {str(e)}")
@@ -200,42 +351,25 @@ async def create_work_item(item: WorkItemCreate):
             cleaned_description = item.description
         
         # Generate embedding
-        embedding = generate_embedding(cleaned_description)
+        embedding = await embed_text(cleaned_description)
         
         # Reduce to 3D for visualization
         embedding_3d = pca_reduce(embedding)
         
-        # Store in PostgreSQL
-        execute_update("""
-            INSERT INTO work_items (
-                id, type, service, severity, description, raw_log,
-                embedding_3d_x, embedding_3d_y, embedding_3d_z,
-                created_at, origin_system, creator_id
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """, [
-            work_item_id,
-            item.type,
-            item.service,
-            item.severity,
-            cleaned_description,
-            item.raw_log,
-            embedding_3d[0],
-            embedding_3d[1],
-            embedding_3d[2],
-            created_at,
-            item.origin_system,
-            item.creator_id
-        ])
-        
-        # Store in Weaviate
-        store_work_item(
-            work_item_id=work_item_id,
-            description=cleaned_description,
-            service=item.service,
-            severity=item.severity,
-            embedding=embedding
-        )
+        # Store in PostgreSQL with the Weaviate upsert queued in the same transaction
+        await run_in_db_executor(insert_work_items_batch, [{
+            "id": work_item_id,
+            "type": item.type,
+            "service": item.service,
+            "severity": item.severity,
+            "description": cleaned_description,
+            "raw_log": item.raw_log,
+            "embedding_3d": embedding_3d,
+            "created_at": created_at,
+            "origin_system": item.origin_system,
+            "creator_id": item.creator_id
+        }], [vector_upsert_event(work_item_id, cleaned_description, item.service, item.severity, embedding)])
+        outbox_drainer.notify()
         
         logger.info(f"Created WorkItem {work_item_id} from {item.origin_system}")
         
@@ -248,19 +382,183 @@ async def create_work_item(item: WorkItemCreate):
             "created_at": created_at.isoformat(),
             "origin_system": item.origin_system
         }
+    except EmbeddingQueueFullError as e:
+        raise _overloaded(e)
     except Exception as e:
         logger.error(f"Failed to create WorkItem: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to create WorkItem: {str(e)}")
 
 
+def _release_reserved_parents(rows: List[Dict[str, Any]]) -> None:
+    """Release the coalescing parent reservations of routed rows that were not stored."""
+    by_service: Dict[str, List[str]] = {}
+    for row in rows:
+        if not row["parent_work_item_id"]:
+            by_service.setdefault(row["service"], []).append(row["id"])
+    for service, work_item_ids in by_service.items():
+        release_coalesce_reservations(service, work_item_ids)
+
+
+@app.post("/work-items/bulk", response_model=BulkWorkItemResponse)
+async def create_work_items_bulk(request: BulkWorkItemRequest):
+    """
+    Create many work items in one call (backfills, alert storm replays).
+    
+    Processing is batched end to end:
+    1. LLM preprocess raw logs (concurrently)
+    2. One batched embedding encode for all descriptions
+    3. One PCA transform over the embedding matrix
+    4. One multi-row INSERT into PostgreSQL
+    5. One Weaviate batch import
+    6. Optionally one Decision Service /decide/batch call
+    
+    With coalesce, near-duplicates (of recent items or of earlier items in the batch)
+    are stored as children and skip steps 5-6.
+    
+    Returns per-item status; a failed vector store or decision does not fail the item.
+    """
+    items = request.items
+    created_at = datetime.now()
+    results = [BulkWorkItemResult(index=i, status="failed") for i in range(len(items))]
+    rows: List[Dict[str, Any]] = []
+    
+    try:
+        # LLM preprocess descriptions where raw logs were provided
+        async def _description(item: BulkWorkItemCreate) -> str:
+            if item.raw_log:
+                return await llm_preprocess_log(item.raw_log, item.service)
+            return item.description
+        
+        descriptions = await asyncio.gather(*(_description(item) for item in items))
+        
+        # One batched embedding on the inference pool + 3D reduction off the event loop
+        embeddings = await embed_texts(descriptions)
+        coords = await asyncio.to_thread(pca_reduce_batch, embeddings)
+        
+        ids = [f"wi-{uuid.uuid4().hex[:12]}" for _ in items]
+        if request.coalesce:
+            parents = find_coalesce_parents_batch(
+                [(item.service, item.severity, embedding) for item, embedding in zip(items, embeddings)],
+                ids
+            )
+        else:
+            parents = [None] * len(items)
+        
+        rows = [
+            {
+                "id": work_item_id,
+                "type": item.type,
+                "service": item.service,
+                "severity": item.severity,
+                "description": description,
+                "raw_log": item.raw_log,
+                "embedding_3d": embedding_3d,
+                "created_at": created_at,
+                "origin_system": item.origin_system,
+                "creator_id": item.creator_id,
+                "story_points": item.story_points,
+                "impact": item.impact,
+                "parent_work_item_id": parent[0] if parent else None
+            }
+            for item, work_item_id, description, embedding_3d, parent in zip(items, ids, descriptions, coords, parents)
+        ]
+        
+        # Store in PostgreSQL (single statement, single transaction)
+        inserted = set(await run_in_db_executor(insert_work_items_batch, rows))
+    except EmbeddingQueueFullError as e:
+        raise _overloaded(e)
+    except Exception as e:
+        if request.coalesce:
+            _release_reserved_parents(rows)
+        logger.error(f"Failed to create work items in bulk: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to create work items: {str(e)}")
+    
+    if request.coalesce:
+        _release_reserved_parents([row for row in rows if row["id"] not in inserted])
+    
+    created_indices = []
+    coalesced_counts: Dict[str, int] = {}
+    for i, row in enumerate(rows):
+        results[i].id = row["id"]
+        if row["id"] not in inserted:
+            results[i].error = "Work item ID already exists"
+            continue
+        results[i].status = "created"
+        parent_work_item_id = row["parent_work_item_id"]
+        if parent_work_item_id:
+            results[i].coalesced_into = parent_work_item_id
+            coalesced_counts[parent_work_item_id] = coalesced_counts.get(parent_work_item_id, 0) + 1
+        else:
+            created_indices.append(i)
+    
+    if coalesced_counts:
+        coalesced = sum(coalesced_counts.values())
+        record_suppressed(vector_writes=coalesced, decisions=coalesced if request.trigger_decisions else 0)
+        try:
+            await run_in_db_executor(record_coalesced_children, coalesced_counts)
+        except Exception as e:
+            logger.warning(f"Failed to update coalesced counts: {e}")
+    
+    # Store in Weaviate (batch import; failures are reported per item but not fatal)
+    vector_errors = await asyncio.to_thread(store_work_items_batch, [
+        {**rows[i], "embedding": embeddings[i]} for i in created_indices
+    ])
+    for i in created_indices:
+        error = vector_errors.get(rows[i]["id"])
+        results[i].vector_stored = error is None
+        if error:
+            results[i].error = f"Vector store failed: {error}"
+    
+    if request.trigger_decisions and created_indices:
+        decision_url = os.getenv("DECISION_SERVICE_URL", "http://decision:8000")
+        try:
+            decision_response = await http_request(
+                "decision", "POST", f"{decision_url}/decide/batch",
+                json={"work_item_ids": [rows[i]["id"] for i in created_indices]},
+                timeout=120.0
+            )
+            decision_response.raise_for_status()
+            decision_ids = {
+                decision["work_item_id"]: decision["id"]
+                for decision in decision_response.json().get("results", [])
+            }
+            for i in created_indices:
+                results[i].decision_id = decision_ids.get(rows[i]["id"])
+        except httpx.RequestError as e:
+            logger.warning(f"Failed to trigger batch decision (network error): {e}. WorkItems created but not routed.")
+        except httpx.HTTPStatusError as e:
+            logger.warning(f"Failed to trigger batch decision (HTTP {e.response.status_code}): {e.response.text}. WorkItems created but not routed.")
+        except Exception as e:
+            logger.warning(f"Failed to trigger batch decision (unexpected error): {e}. WorkItems created but not routed.")
+    
+    created = sum(1 for result in results if result.status == "created")
+    logger.info(
+        f"Bulk created {created}/{len(items)} WorkItems "
+        f"({created - len(created_indices)} coalesced)"
+    )
+    return {
+        "results": results,
+        "created": created,
+        "failed": len(items) - created
+    }
+
+
 @app.get("/work-items")
 async def list_work_items(
     service: Optional[str] = Query(None, description="Filter by service"),
     severity: Optional[str] = Query(None, description="Filter by severity"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of items to return"),
-    offset: int = Query(0, ge=0, description="Offset for pagination")
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Legacy offset pagination (ignored when cursor is set)"),
+    exact_count: bool = Query(False, description="Run an exact COUNT(*) instead of the planner estimate")
 ):
-    """List all work items with optional filtering"""
+    """
+    List work items, newest first, with optional filtering.
+    
+    Pages are keyed on (created_at, id): pass the returned next_cursor to get the
+    next page (null on the last page). total is the planner's estimate unless
+    exact_count is set (total_is_estimate says which).
+    """
     try:
         # Build query
         where_clauses = []
@@ -274,25 +572,41 @@ async def list_work_items(
             where_clauses.append("severity = %s")
             params.append(severity)
         
-        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        filter_sql = "FROM work_items " + ("WHERE " + " AND ".join(where_clauses) if where_clauses else "")
+        count_params = list(params)
         
-        # Get total count
-        count_query = f"SELECT COUNT(*) as total FROM work_items {where_sql}"
-        count_result = execute_query(count_query, params)
-        total = count_result[0]["total"] if count_result else 0
+        if cursor:
+            try:
+                cursor_created_at, cursor_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            where_clauses.append("(created_at, id) < (%s, %s)")
+            params.extend([cursor_created_at, cursor_id])
+        
+        where_sql = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
         
-        # Get work items
+        # Get work items (one extra row tells whether there is a next page)
         query = f"""
             SELECT id, type, service, severity, description, created_at, origin_system,
                    jira_issue_key, story_points, impact
             FROM work_items
             {where_sql}
-            ORDER BY created_at DESC
-            LIMIT %s OFFSET %s
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
         """
-        params.extend([limit, offset])
+        params.append(limit + 1)
+        if offset and not cursor:
+            query += " OFFSET %s"
+            params.append(offset)
         
-        work_items = execute_query(query, params)
+        rows = await run_in_db_executor(execute_query, query, params)
+        work_items, next_cursor = keyset_page(rows, limit)
+        
+        # Get total (planner estimate unless asked for an exact count)
+        if exact_count:
+            total = await run_in_db_executor(exact_row_count, filter_sql, count_params)
+        else:
+            total = await run_in_db_executor(estimate_row_count, filter_sql, count_params)
         
         return {
             "work_items": [
@@ -310,15 +624,73 @@ async def list_work_items(
                 }
                 for item in work_items
             ],
+            "next_cursor": next_cursor,
             "total": total,
+            "total_is_estimate": not exact_count,
             "limit": limit,
             "offset": offset
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to list work items: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to list work items: {str(e)}")
 
 
+@app.get("/work-items/export")
+async def export_work_items(
+    since: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at (ISO 8601)"),
+    until: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at (ISO 8601)"),
+    service: Optional[str] = Query(None, description="Filter by service"),
+    severity: Optional[str] = Query(None, description="Filter by severity"),
+    include: Optional[str] = Query("decision,assignee", description="Comma-separated: decision, assignee, candidates"),
+    gzip: bool = Query(False, description="gzip-compress the stream")
+):
+    """
+    Stream work items (oldest first) as NDJSON for offline analysis.
+    
+    Rows are read through a server-side cursor and streamed as they are fetched,
+    so memory stays constant regardless of the size of the range.
+    """
+    try:
+        includes = parse_includes(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    slot = try_acquire_export_slot()
+    if slot is None:
+        raise HTTPException(
+            status_code=429, detail="Too many exports in progress", headers={"Retry-After": "30"}
+        )
+    
+    # Start the stream here so query errors become a 500 rather than a truncated 200.
+    # From here on the slot is released by the stream or, at the latest, when the
+    # response is closed (even if the client left before the body started)
+    stream = None
+    try:
+        query, params = build_export_query(since, until, service, severity, includes)
+        stream = stream_export(query, params, slot, compress=gzip)
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except BaseException as e:
+        slot.release()
+        if stream is not None:
+            await stream.aclose()
+        if not isinstance(e, Exception):
+            raise
+        logger.error(f"Failed to start export: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to start export: {str(e)}")
+    
+    filename = "work_items.ndjson.gz" if gzip else "work_items.ndjson"
+    return ExportResponse(
+        stream,
+        first,
+        slot,
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 @app.get("/work-items/{work_item_id}")
 async def get_work_item(work_item_id: str):
     """Get a specific work item by ID"""
@@ -326,7 +698,7 @@ async def get_work_item(work_item_id: str):
         results = execute_query("""
             SELECT id, type, service, severity, description, raw_log,
                    created_at, origin_system, creator_id, jira_issue_key,
-                   story_points, impact
+                   story_points, impact, parent_work_item_id, coalesced_count
             FROM work_items
             WHERE id = %s
         """, [work_item_id])
@@ -348,7 +720,9 @@ async def get_work_item(work_item_id: str):
             "creator_id": item.get("creator_id"),
             "jira_issue_key": item.get("jira_issue_key"),
             "story_points": item.get("story_points"),
-            "impact": item.get("impact")
+            "impact": item.get("impact"),
+            "parent_work_item_id": item.get("parent_work_item_id"),
+            "coalesced_count": item.get("coalesced_count", 0)
         }
     except HTTPException:
         raise
@@ -404,22 +778,22 @@ async def record_outcome(work_item_id: str, outcome: OutcomeRequest):
         # Forward to Learner Service
         learner_url = os.getenv("LEARNER_SERVICE_URL", "http://learner:8003")
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{learner_url}/outcomes",
-                    json={
-                        "event_id": outcome.event_id,
-                        "decision_id": outcome.decision_id,
-                        "work_item_id": work_item_id,
-                        "type": outcome.type,
-                        "actor_id": outcome.actor_id,
-                        "service": service,
-                        "timestamp": outcome.timestamp,
-                        "new_assignee_id": outcome.new_assignee_id
-                    }
-                )
-                response.raise_for_status()
-                logger.info(f"Forwarded outcome {outcome.event_id} to Learner Service")
+            response = await http_request(
+                "learner", "POST", f"{learner_url}/outcomes",
+                json={
+                    "event_id": outcome.event_id,
+                    "decision_id": outcome.decision_id,
+                    "work_item_id": work_item_id,
+                    "type": outcome.type,
+                    "actor_id": outcome.actor_id,
+                    "service": service,
+                    "timestamp": outcome.timestamp,
+                    "new_assignee_id": outcome.new_assignee_id
+                },
+                timeout=10.0
+            )
+            response.raise_for_status()
+            logger.info(f"Forwarded outcome {outcome.event_id} to Learner Service")
         except httpx.RequestError as e:
             logger.error(f"Failed to forward outcome to Learner Service: {e}")
             # Don't fail the request - outcome is recorded
@@ -439,46 +813,58 @@ async def record_outcome(work_item_id: str, outcome: OutcomeRequest):
         raise HTTPException(status_code=500, detail=f"Failed to record outcome: {str(e)}")
 
 
-@app.post("/webhooks/pagerduty")
+@app.post("/webhooks/pagerduty", status_code=202)
 async def pagerduty_webhook(request: Request):
     """
     Handle PagerDuty webhook events for incident creation (ingestion).
     
     Processes:
-    - incident.triggered: New incident created → creates WorkItem
-    - incident.created: Incident created → creates WorkItem
+    - incident.triggered / incident.created (v3 webhooks)
+    - incident.trigger messages (v2 multi-message payloads)
     
     This is the ingestion point: PagerDuty detects issues and creates incidents,
-    which are then converted to WorkItems for the Decision Engine.
+    which are then converted to WorkItems for the Decision Engine. The handler
+    only validates and queues the incidents (202); WorkItems are created by the
+    PagerDuty queue workers.
     """
+    # Get signature from header (optional, for validation)
+    signature = request.headers.get("X-PagerDuty-Signature")
+    
+    # Read request body (parsed once below)
+    body = await request.body()
+    
+    # Validate signature (if configured)
+    if not validate_pagerduty_signature(body, signature):
+        logger.warning("Invalid PagerDuty webhook signature")
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    
     try:
-        # Get signature from header (optional, for validation)
-        signature = request.headers.get("X-PagerDuty-Signature")
-        
-        # Read request body
-        body = await request.body()
-        
-        # Validate signature (if configured)
-        if not validate_pagerduty_signature(body, signature):
-            logger.warning("Invalid PagerDuty webhook signature")
-            raise HTTPException(status_code=401, detail="Invalid signature")
-        
-        # Parse JSON payload
-        webhook_data = await request.json()
-        
-        # Process webhook (creates WorkItem)
-        result = await process_pagerduty_incident_webhook(webhook_data)
-        
-        if result.get("status") == "error":
-            raise HTTPException(status_code=400, detail=result.get("message", "Webhook processing failed"))
-        
-        return result
+        webhook_data = json.loads(body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON payload: {e}")
+    if not isinstance(webhook_data, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON payload: expected an object")
     
-    except HTTPException:
-        raise
+    incidents = extract_pagerduty_incidents(webhook_data)
+    try:
+        result = await pagerduty_queue.enqueue(incidents)
+    except Exception as e:
+        # Queue full and spill table unavailable: let PagerDuty redeliver
+        logger.error(f"Failed to queue PagerDuty webhook: {e}", exc_info=True)
+        raise HTTPException(status_code=503, detail="Webhook queue unavailable", headers={"Retry-After": "5"})
+    
+    return {"status": "accepted", "incidents": len(incidents), **result}
+
+
+@app.get("/webhooks/pagerduty/queue")
+async def pagerduty_queue_status():
+    """PagerDuty queue depth / lag (in memory) and spill table depth"""
+    try:
+        spill = await run_in_db_executor(get_pagerduty_spill_stats)
     except Exception as e:
-        logger.error(f"Failed to process PagerDuty webhook: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Webhook processing failed: {str(e)}")
+        logger.error(f"Failed to read PagerDuty spill stats: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to read PagerDuty spill stats: {str(e)}")
+    return {"queue": get_pagerduty_queue_stats(), "spill": spill}
 
 
 if __name__ == "__main__":
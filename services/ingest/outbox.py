@@ -0,0 +1,262 @@
+"""
+Transactional outbox drainer for Ingest Service.
+
+Work item endpoints write the PostgreSQL row and its follow-up work in one
+transaction (insert_work_items_batch with outbox_events) and return; the
+ingest_outbox table is drained here in the background:
+
+1. vector_upsert - claimed in batches of up to OUTBOX_VECTOR_BATCH_SIZE and written
+   with one Weaviate batch import per claim (objects use the deterministic work item
+   UUID, so a redelivered event overwrites rather than duplicates)
+2. decision - POST /decide per work item, at most OUTBOX_DECISION_CONCURRENCY in flight
+
+Failed events are retried with exponential backoff; after OUTBOX_MAX_ATTEMPTS (or a
+non-retryable 4xx from Decision) they are dead-lettered (status 'dead') and can be
+requeued with POST /outbox/requeue. Events left "running" by a dead process are
+reclaimed once their lease (OUTBOX_LEASE_SECONDS) expires.
+"""
+import os
+import random
+import asyncio
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+from http_client import http_request
+from weaviate_client import store_work_items_batch
+from db import claim_outbox_events, complete_outbox_events, fail_outbox_events, run_in_db_executor
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+OUTBOX_POLL_INTERVAL_SECONDS = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "1"))
+OUTBOX_VECTOR_BATCH_SIZE = int(os.getenv("OUTBOX_VECTOR_BATCH_SIZE", "100"))
+OUTBOX_DECISION_BATCH_SIZE = int(os.getenv("OUTBOX_DECISION_BATCH_SIZE", "50"))
+OUTBOX_DECISION_CONCURRENCY = int(os.getenv("OUTBOX_DECISION_CONCURRENCY", "8"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE_SECONDS = float(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "1"))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "300"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+OUTBOX_DECISION_TIMEOUT_SECONDS = float(os.getenv("OUTBOX_DECISION_TIMEOUT_SECONDS", "30"))
+
+VECTOR_UPSERT = "vector_upsert"
+DECISION = "decision"
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, Any]] = {
+    kind: {
+        "claimed": 0,
+        "succeeded": 0,
+        "retried": 0,
+        "dead": 0,
+        "batches": 0,
+        "last_batch_size": 0,
+        "queued_ms_max": 0.0
+    }
+    for kind in (VECTOR_UPSERT, DECISION)
+}
+
+
+def vector_upsert_event(work_item_id: str, description: str, service: str, severity: str, embedding: List[float]) -> Dict[str, Any]:
+    """Outbox event storing a work item's vector in Weaviate."""
+    return {
+        "work_item_id": work_item_id,
+        "kind": VECTOR_UPSERT,
+        "payload": {
+            "description": description,
+            "service": service,
+            "severity": severity,
+            "embedding": [float(x) for x in embedding]
+        }
+    }
+
+
+def decision_event(work_item_id: str) -> Dict[str, Any]:
+    """Outbox event routing a work item via Decision Service /decide."""
+    return {"work_item_id": work_item_id, "kind": DECISION, "payload": None}
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter for the given (1-based) failed attempt."""
+    delay = min(OUTBOX_BACKOFF_MAX_SECONDS, OUTBOX_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Network errors, 5xx and 429 are retried; other 4xx (e.g. unknown work item) are not."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status == 429
+    return True
+
+
+def _describe_error(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}: {error.response.text[:500]}"
+    return f"{type(error).__name__}: {error}"
+
+
+def _failure(event: Dict[str, Any], error: str, retryable: bool = True) -> Dict[str, Any]:
+    attempt = event["attempts"] + 1
+    retry = retryable and attempt < OUTBOX_MAX_ATTEMPTS
+    return {
+        "id": event["id"],
+        "attempts": attempt,
+        "error": error,
+        "retry_in_seconds": backoff_seconds(attempt) if retry else None
+    }
+
+
+def _record(kind: str, events: List[Dict[str, Any]], succeeded: int, failures: List[Dict[str, Any]]) -> None:
+    dead = sum(1 for f in failures if f["retry_in_seconds"] is None)
+    with _stats_lock:
+        stats = _stats[kind]
+        stats["claimed"] += len(events)
+        stats["succeeded"] += succeeded
+        stats["retried"] += len(failures) - dead
+        stats["dead"] += dead
+        stats["batches"] += 1
+        stats["last_batch_size"] = len(events)
+        stats["queued_ms_max"] = max(
+            stats["queued_ms_max"],
+            max((e.get("queued_seconds") or 0.0) * 1000 for e in events)
+        )
+    if dead:
+        logger.error(f"Dead-lettered {dead} {kind} outbox events after {OUTBOX_MAX_ATTEMPTS} attempts or a non-retryable error")
+
+
+async def _finish(kind: str, events: List[Dict[str, Any]], done: List[int], failures: List[Dict[str, Any]]) -> None:
+    await run_in_db_executor(complete_outbox_events, done)
+    await run_in_db_executor(fail_outbox_events, failures)
+    _record(kind, events, len(done), failures)
+
+
+async def drain_vector_upserts(events: List[Dict[str, Any]]) -> None:
+    """
+    Write a claimed batch of vector_upsert events with one Weaviate batch import.
+
+    Args:
+        events: Claimed ingest_outbox rows of kind vector_upsert
+    """
+    errors = await asyncio.to_thread(store_work_items_batch, [
+        {"id": event["work_item_id"], **event["payload"]} for event in events
+    ])
+    done, failures = [], []
+    for event in events:
+        error = errors.get(event["work_item_id"])
+        if error is None:
+            done.append(event["id"])
+        else:
+            failures.append(_failure(event, f"Weaviate: {error}"))
+    await _finish(VECTOR_UPSERT, events, done, failures)
+
+
+async def _trigger_decision(work_item_id: str) -> Dict[str, Any]:
+    decision_url = os.getenv("DECISION_SERVICE_URL", "http://decision:8000")
+    # No transport-level retries beyond connect errors - the event itself is retried with backoff
+    response = await http_request(
+        "decision", "POST", f"{decision_url}/decide",
+        json={"work_item_id": work_item_id},
+        timeout=OUTBOX_DECISION_TIMEOUT_SECONDS
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def drain_decisions(events: List[Dict[str, Any]], semaphore: asyncio.Semaphore) -> None:
+    """
+    Trigger /decide for a claimed batch of decision events (bounded by the semaphore).
+
+    Args:
+        events: Claimed ingest_outbox rows of kind decision
+        semaphore: Limits in-flight /decide calls
+    """
+    async def _one(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                decision = await _trigger_decision(event["work_item_id"])
+                logger.info(
+                    f"Decision made for WorkItem {event['work_item_id']}: {decision.get('id')} "
+                    f"(primary: {decision.get('primary_human_id')})"
+                )
+                return None
+            except Exception as e:
+                logger.warning(f"Failed to trigger decision for WorkItem {event['work_item_id']}: {_describe_error(e)}")
+                return _failure(event, _describe_error(e), retryable=_is_retryable(e))
+
+    outcomes = await asyncio.gather(*(_one(event) for event in events))
+    done = [event["id"] for event, failure in zip(events, outcomes) if failure is None]
+    failures = [failure for failure in outcomes if failure is not None]
+    await _finish(DECISION, events, done, failures)
+
+
+class OutboxDrainer:
+    """Background loops that drain ingest_outbox (one per event kind)."""
+
+    def __init__(self, poll_interval: float = OUTBOX_POLL_INTERVAL_SECONDS):
+        self.poll_interval = poll_interval
+        self._wakeup = {VECTOR_UPSERT: asyncio.Event(), DECISION: asyncio.Event()}
+        self._semaphore = asyncio.Semaphore(max(1, OUTBOX_DECISION_CONCURRENCY))
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._tasks = [
+            asyncio.create_task(self._run(VECTOR_UPSERT, OUTBOX_VECTOR_BATCH_SIZE, drain_vector_upserts)),
+            asyncio.create_task(self._run(
+                DECISION, OUTBOX_DECISION_BATCH_SIZE, lambda events: drain_decisions(events, self._semaphore)
+            ))
+        ]
+        logger.info(
+            f"Outbox drainer started (vector batch {OUTBOX_VECTOR_BATCH_SIZE}, "
+            f"decision concurrency {OUTBOX_DECISION_CONCURRENCY})"
+        )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Outbox drainer stopped")
+
+    def notify(self) -> None:
+        """Wake idle loops (new events were just committed)."""
+        for event in self._wakeup.values():
+            event.set()
+
+    async def _run(self, kind: str, batch_size: int, drain) -> None:
+        wakeup = self._wakeup[kind]
+        while True:
+            try:
+                events = await run_in_db_executor(claim_outbox_events, kind, batch_size, OUTBOX_LEASE_SECONDS)
+            except Exception as e:
+                logger.error(f"Outbox drainer failed to claim {kind} events: {e}")
+                events = []
+
+            if not events:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+                continue
+
+            try:
+                await drain(events)
+            except Exception as e:
+                # Events stay "running" and are reclaimed when their lease expires
+                logger.error(f"Outbox drain of {len(events)} {kind} events crashed: {e}", exc_info=True)
+
+
+def get_outbox_drainer_stats() -> Dict[str, Any]:
+    """Per-kind claimed / succeeded / retried / dead-lettered counts since startup."""
+    with _stats_lock:
+        stats = {kind: dict(values) for kind, values in _stats.items()}
+    return {
+        "enabled": OUTBOX_ENABLED,
+        "vector_batch_size": OUTBOX_VECTOR_BATCH_SIZE,
+        "decision_concurrency": OUTBOX_DECISION_CONCURRENCY,
+        "max_attempts": OUTBOX_MAX_ATTEMPTS,
+        **stats
+    }
@@ -0,0 +1,243 @@
+"""
+Bounded processing queue for PagerDuty webhooks (Ingest Service).
+
+POST /webhooks/pagerduty validates and parses the payload, enqueues its
+incident creation events and returns 202; WorkItems are created by a pool of
+PAGERDUTY_WORKERS workers. PagerDuty therefore never waits on embedding or the
+database, and a burst is absorbed instead of exhausting the DB pool.
+
+- The in-memory queue holds PAGERDUTY_QUEUE_SIZE events; overflow is written
+  to the pagerduty_event_queue spill table (one multi-row insert per webhook)
+  and claimed by the workers with FOR UPDATE SKIP LOCKED. Events still queued
+  in memory at shutdown are spilled too.
+- Dedupe on pagerduty_incident_id: incidents queued / in flight / recently
+  processed are dropped in memory, the spill table's primary key dedupes
+  spilled ones, and the WorkItem insert skips incidents that already have one.
+- Failed events are retried with backoff through the spill table and marked
+  failed after PAGERDUTY_MAX_ATTEMPTS.
+- Queue lag (receipt -> processing start) and depth are reported under
+  pagerduty_queue in /healthz; GET /webhooks/pagerduty/queue adds the spill table.
+"""
+import os
+import time
+import random
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from db import (
+    spill_pagerduty_events, claim_pagerduty_events, complete_pagerduty_event,
+    fail_pagerduty_event, run_in_db_executor
+)
+from pagerduty_webhook import process_pagerduty_incident
+
+logger = logging.getLogger(__name__)
+
+PAGERDUTY_QUEUE_SIZE = int(os.getenv("PAGERDUTY_QUEUE_SIZE", "1000"))
+PAGERDUTY_WORKERS = int(os.getenv("PAGERDUTY_WORKERS", "4"))
+PAGERDUTY_MAX_ATTEMPTS = int(os.getenv("PAGERDUTY_MAX_ATTEMPTS", "5"))
+PAGERDUTY_BACKOFF_BASE_SECONDS = float(os.getenv("PAGERDUTY_BACKOFF_BASE_SECONDS", "2"))
+PAGERDUTY_BACKOFF_MAX_SECONDS = float(os.getenv("PAGERDUTY_BACKOFF_MAX_SECONDS", "300"))
+PAGERDUTY_POLL_INTERVAL_SECONDS = float(os.getenv("PAGERDUTY_POLL_INTERVAL_SECONDS", "1"))
+PAGERDUTY_LEASE_SECONDS = float(os.getenv("PAGERDUTY_LEASE_SECONDS", "120"))
+PAGERDUTY_DEDUPE_CACHE_SIZE = int(os.getenv("PAGERDUTY_DEDUPE_CACHE_SIZE", "10000"))
+PAGERDUTY_SPILL_CLAIM_BATCH = int(os.getenv("PAGERDUTY_SPILL_CLAIM_BATCH", "10"))
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter for the given (1-based) failed attempt."""
+    delay = min(PAGERDUTY_BACKOFF_MAX_SECONDS, PAGERDUTY_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class PagerDutyQueue:
+    """In-memory incident queue with a spill table, dedupe and a worker pool."""
+
+    def __init__(self, maxsize: int = PAGERDUTY_QUEUE_SIZE, workers: int = PAGERDUTY_WORKERS):
+        self.maxsize = maxsize
+        self.workers = max(1, workers)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # incident_id -> received_at for events queued in memory or being processed
+        self._pending: Dict[str, float] = {}
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._spill_pending = True  # check the spill table once at startup
+        self._lag_ms: deque = deque(maxlen=1000)
+        self._stats = {
+            "received": 0,
+            "enqueued": 0,
+            "spilled": 0,
+            "duplicates": 0,
+            "processed": 0,
+            "retried": 0,
+            "failed": 0,
+            "lost": 0
+        }
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.create_task(self._run_worker(i)) for i in range(self.workers)]
+        logger.info(f"PagerDuty queue started (size {self.maxsize}, {self.workers} workers)")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Keep what is still queued in memory
+        remaining = []
+        while self._queue is not None and not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        if remaining:
+            try:
+                await run_in_db_executor(spill_pagerduty_events, remaining)
+                logger.info(f"Spilled {len(remaining)} queued PagerDuty incidents at shutdown")
+            except Exception as e:
+                self._stats["lost"] += len(remaining)
+                logger.error(f"Failed to spill {len(remaining)} PagerDuty incidents at shutdown: {e}")
+        logger.info("PagerDuty queue stopped")
+
+    def _is_duplicate(self, incident_id: str) -> bool:
+        return incident_id in self._pending or incident_id in self._recent
+
+    def _remember(self, incident_id: str) -> None:
+        self._recent[incident_id] = None
+        self._recent.move_to_end(incident_id)
+        while len(self._recent) > PAGERDUTY_DEDUPE_CACHE_SIZE:
+            self._recent.popitem(last=False)
+
+    async def enqueue(self, incidents: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Queue normalized incidents (see extract_pagerduty_incidents).
+
+        Args:
+            incidents: Incidents from one webhook payload
+
+        Returns:
+            Counts of accepted, spilled and duplicate incidents
+
+        Raises:
+            Exception: If overflow could not be written to the spill table
+                       (the webhook should fail so PagerDuty redelivers)
+        """
+        received_at = time.time()
+        accepted, duplicates = 0, 0
+        overflow = []
+        for incident in incidents:
+            incident_id = incident["incident_id"]
+            self._stats["received"] += 1
+            if self._is_duplicate(incident_id):
+                duplicates += 1
+                continue
+            event = {"incident_id": incident_id, "incident": incident, "received_at": received_at, "attempts": 0}
+            try:
+                self._queue.put_nowait(event)
+                self._pending[incident_id] = received_at
+                accepted += 1
+            except asyncio.QueueFull:
+                overflow.append(event)
+
+        spilled = 0
+        if overflow:
+            inserted = await run_in_db_executor(spill_pagerduty_events, overflow)
+            spilled = len(inserted)
+            duplicates += len(overflow) - spilled
+            self._spill_pending = True
+            logger.warning(f"PagerDuty queue full, spilled {spilled} incidents to the spill table")
+
+        self._stats["enqueued"] += accepted
+        self._stats["spilled"] += spilled
+        self._stats["duplicates"] += duplicates
+        return {"accepted": accepted + spilled, "spilled": spilled, "duplicates": duplicates}
+
+    async def _next_event(self) -> Optional[tuple]:
+        """Next (events, from_spill): spilled rows first while any are due, else one from memory."""
+        if self._spill_pending:
+            try:
+                claimed = await run_in_db_executor(claim_pagerduty_events, PAGERDUTY_SPILL_CLAIM_BATCH, PAGERDUTY_LEASE_SECONDS)
+            except Exception as e:
+                logger.error(f"Failed to claim spilled PagerDuty incidents: {e}")
+                claimed = []
+            if claimed:
+                return claimed, True
+            self._spill_pending = False
+        try:
+            event = await asyncio.wait_for(self._queue.get(), timeout=PAGERDUTY_POLL_INTERVAL_SECONDS)
+            return [event], False
+        except asyncio.TimeoutError:
+            # Idle: look for retries that became due (and rows spilled by other replicas)
+            self._spill_pending = True
+            return None
+
+    async def _process(self, event: Dict[str, Any], from_spill: bool) -> None:
+        incident_id = event["incident_id"]
+        self._pending.setdefault(incident_id, event["received_at"])
+        self._lag_ms.append(max(0.0, (time.time() - event["received_at"]) * 1000))
+        try:
+            result = await process_pagerduty_incident(event["incident"])
+            if from_spill:
+                await run_in_db_executor(complete_pagerduty_event, incident_id)
+            self._stats["processed"] += 1
+            if result["status"] == "duplicate":
+                self._stats["duplicates"] += 1
+            self._remember(incident_id)
+        except Exception as e:
+            attempt = event["attempts"] + 1
+            retry_in = backoff_seconds(attempt) if attempt < PAGERDUTY_MAX_ATTEMPTS else None
+            try:
+                await run_in_db_executor(fail_pagerduty_event, event, attempt, f"{type(e).__name__}: {e}", retry_in)
+                if retry_in is None:
+                    self._stats["failed"] += 1
+                    logger.error(f"PagerDuty incident {incident_id} failed after {attempt} attempts: {e}")
+                else:
+                    self._stats["retried"] += 1
+                    logger.warning(f"PagerDuty incident {incident_id} failed (attempt {attempt}), retrying in {retry_in:.1f}s: {e}")
+            except Exception as spill_error:
+                self._stats["lost"] += 1
+                logger.error(f"Dropping PagerDuty incident {incident_id}: {e} (could not record retry: {spill_error})")
+        finally:
+            self._pending.pop(incident_id, None)
+
+    async def _run_worker(self, index: int) -> None:
+        while True:
+            try:
+                batch = await self._next_event()
+                if batch is None:
+                    continue
+                events, from_spill = batch
+                for event in events:
+                    await self._process(event, from_spill)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"PagerDuty worker {index} crashed: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and lag (receipt -> processing start) percentiles."""
+        lag = np.array(self._lag_ms) if self._lag_ms else None
+        now = time.time()
+        oldest = min(self._pending.values()) if self._pending else None
+        return {
+            "depth": self._queue.qsize() if self._queue else 0,
+            "capacity": self.maxsize,
+            "in_flight": len(self._pending) - (self._queue.qsize() if self._queue else 0),
+            "workers": self.workers,
+            **self._stats,
+            "oldest_pending_age_seconds": round(now - oldest, 3) if oldest else 0.0,
+            "lag_ms": {
+                "p50": round(float(np.percentile(lag, 50)), 1),
+                "p95": round(float(np.percentile(lag, 95)), 1),
+                "max": round(float(lag.max()), 1)
+            } if lag is not None else None
+        }
+
+
+pagerduty_queue = PagerDutyQueue()
+
+
+def get_pagerduty_queue_stats() -> Dict[str, Any]:
+    """In-memory queue depth, counters and lag for /healthz."""
+    return pagerduty_queue.get_stats()
@@ -1,14 +1,22 @@
 """
 PagerDuty webhook handler for incident creation (ingestion).
-Processes incident.triggered and incident.created events to create WorkItems.
+Processes incident.triggered and incident.created events (v3 webhooks) and
+incident.trigger messages (v2 multi-message payloads) to create WorkItems.
+Incident WorkItems are routed like /ingest/demo ones: the Weaviate upsert and
+the decision trigger are queued in the outbox with the insert, unless the
+incident is coalesced into a recent parent (alert storms).
 """
 import os
 import json
 import logging
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from datetime import datetime
-from db import execute_query, execute_update
+from db import run_in_db_executor, record_coalesced_children, insert_work_item_with_outbox
+from coalescing import find_coalesce_parent, release_coalesce_reservations, record_suppressed
+from embedding_batcher import embed_text
+from embedding_utils import pca_reduce
+from outbox import vector_upsert_event, decision_event
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +49,16 @@ def _parse_datetime(dt_str: str) -> datetime:
         return datetime.now()
 
 
+def new_work_item_id() -> str:
+    """WorkItem ID for a PagerDuty incident."""
+    return f"wi-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def incident_text(title: str, description: str) -> str:
+    """WorkItem description (and embedding text) of an incident: title, then details."""
+    return f"{title}\n\n{description}" if description else title
+
+
 # Service mapping: PagerDuty service name → Goliath service name
 # Can be configured via environment variable or defaults
 PAGERDUTY_SERVICE_MAP: Dict[str, str] = {
@@ -108,8 +126,11 @@ def create_work_item_from_pagerduty_incident(
     description: str,
     service_name: str,
     urgency: str,
-    created_at: str
-) -> Dict[str, Any]:
+    created_at: str,
+    parent_work_item_id: Optional[str] = None,
+    work_item_id: Optional[str] = None,
+    embedding: Optional[List[float]] = None
+) -> Optional[Dict[str, Any]]:
     """
     Create a WorkItem from PagerDuty incident data.
     
@@ -121,11 +142,14 @@ def create_work_item_from_pagerduty_incident(
         service_name: PagerDuty service name
         urgency: PagerDuty urgency
         created_at: ISO 8601 timestamp
+        parent_work_item_id: Work item this incident was coalesced into (alert storms)
+        work_item_id: ID to store the WorkItem under (generated if not given)
+        embedding: Embedding of the incident text (stored in Weaviate when routed)
     
     Returns:
-        Created work item data
+        Created work item data, or None if the incident already has a WorkItem
     """
-    work_item_id = f"wi-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    work_item_id = work_item_id or new_work_item_id()
     
     # Map PagerDuty service → Goliath service
     goliath_service = map_pagerduty_service(service_name)
@@ -134,16 +158,28 @@ def create_work_item_from_pagerduty_incident(
     severity = map_pagerduty_urgency_to_severity(urgency)
     
     # Combine title and description for work item description
-    work_item_description = f"{title}\n\n{description}" if description else title
+    work_item_description = incident_text(title, description)
+    embedding_3d = pca_reduce(embedding) if embedding is not None else (None, None, None)
+    
+    # Routed incidents queue the Weaviate upsert (when embedded) and the decision
+    # trigger with the insert; Decision encodes the text itself if no vector is stored
+    events = []
+    if not parent_work_item_id:
+        if embedding is not None:
+            events.append(vector_upsert_event(work_item_id, work_item_description, goliath_service, severity, embedding))
+        events.append(decision_event(work_item_id))
     
     # Store in database
     try:
         query = """
             INSERT INTO work_items (
                 id, type, service, severity, description, raw_log,
-                created_at, origin_system, pagerduty_incident_id, raw_payload
+                embedding_3d_x, embedding_3d_y, embedding_3d_z,
+                created_at, origin_system, pagerduty_incident_id, raw_payload,
+                parent_work_item_id
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            SELECT %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+            WHERE NOT EXISTS (SELECT 1 FROM work_items WHERE pagerduty_incident_id = %s)
         """
         params = [
             work_item_id,
@@ -152,12 +188,19 @@ def create_work_item_from_pagerduty_incident(
             severity,
             work_item_description,
             description,  # Store original description as raw_log
+            embedding_3d[0],
+            embedding_3d[1],
+            embedding_3d[2],
             _parse_datetime(created_at) if created_at else datetime.now(),
             f"PAGERDUTY-{incident_number}",  # Store PagerDuty incident number in origin_system
             incident_id,  # Store PagerDuty incident ID for tracking
-            json.dumps({"incident_id": incident_id, "incident_number": str(incident_number)})  # Store incident metadata as JSON
+            json.dumps({"incident_id": incident_id, "incident_number": str(incident_number)}),  # Store incident metadata as JSON
+            parent_work_item_id,
+            incident_id  # PagerDuty redelivers webhooks: one WorkItem per incident
         ]
-        execute_update(query, params)
+        if not insert_work_item_with_outbox(query, params, events):
+            logger.info(f"PagerDuty incident {incident_number} already has a WorkItem, skipping")
+            return None
         
         logger.info(
             f"Created WorkItem {work_item_id} from PagerDuty incident {incident_number} "
@@ -170,7 +213,8 @@ def create_work_item_from_pagerduty_incident(
             "severity": severity,
             "description": work_item_description,
             "created_at": created_at,
-            "origin_system": f"PAGERDUTY-{incident_number}"
+            "origin_system": f"PAGERDUTY-{incident_number}",
+            "parent_work_item_id": parent_work_item_id
         }
     
     except Exception as e:
@@ -178,84 +222,164 @@ def create_work_item_from_pagerduty_incident(
         raise
 
 
-async def process_pagerduty_incident_webhook(webhook_data: Dict[str, Any]) -> Dict[str, Any]:
+# Incident creation event types: v3 webhooks, v2 webhook messages
+_CREATION_EVENT_TYPES = {"incident.triggered", "incident.created", "incident.trigger"}
+
+
+def _dict(value: Any) -> Dict[str, Any]:
+    """value if it is a JSON object, else {} (malformed payload sections are skipped)."""
+    return value if isinstance(value, dict) else {}
+
+
+def _normalize_incident(event_type: Optional[str], incident: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Flatten a v2/v3 incident into the fields needed to create a WorkItem (None if not handled)."""
+    if not isinstance(event_type, str) or event_type not in _CREATION_EVENT_TYPES:
+        logger.info(f"Ignoring event type: {event_type} (only processing incident creation)")
+        return None
+    incident_id = incident.get("id")
+    if not incident_id:
+        logger.warning("No incident ID in webhook payload")
+        return None
+    
+    # Get service information
+    service = incident.get("service", {})
+    service_name = service.get("name", service.get("summary", "unknown")) if isinstance(service, dict) else str(service)
+    
+    # Title: v3 "title"; v2 "summary" or trigger_summary_data.subject
+    trigger_summary = _dict(incident.get("trigger_summary_data"))
+    title = incident.get("title") or incident.get("summary") or trigger_summary.get("subject", "")
+    
+    # Get incident body/description
+    body = incident.get("body", {})
+    description = body.get("details", "") if isinstance(body, dict) else ""
+    description = description or incident.get("description") or ""
+    
+    return {
+        "incident_id": incident_id,
+        "incident_number": str(incident.get("incident_number") or incident_id),
+        "title": title,
+        "description": description,
+        "service_name": service_name,
+        "urgency": incident["urgency"] if isinstance(incident.get("urgency"), str) else "low",
+        "created_at": incident.get("created_at") or incident.get("created_on") or datetime.now().isoformat()
+    }
+
+
+def extract_pagerduty_incidents(webhook_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
-    Process PagerDuty webhook event for incident creation.
+    Extract incident creation events from a PagerDuty webhook payload.
     
     Handles:
-    - incident.triggered: New incident created
-    - incident.created: Incident created (alternative event type)
+    - v3: {"event": {"event_type": "incident.triggered", "data": {...incident}}}
+      (older simulators nest the incident under data.incident)
+    - v2: {"messages": [{"event": "incident.trigger", "incident": {...}}, ...]}
     
     Args:
-        webhook_data: PagerDuty webhook payload
+        webhook_data: Parsed PagerDuty webhook payload
     
     Returns:
-        Processing result with work_item_id
+        Normalized incidents (incident_id, incident_number, title, description,
+        service_name, urgency, created_at); other event types are skipped
+    """
+    incidents = []
+    if not isinstance(webhook_data, dict):
+        logger.warning(f"Ignoring PagerDuty payload of type {type(webhook_data).__name__}")
+        return incidents
+    if isinstance(webhook_data.get("messages"), list):
+        for message in webhook_data["messages"]:
+            if not isinstance(message, dict):
+                continue
+            incident = message.get("incident") or _dict(message.get("data")).get("incident")
+            normalized = _normalize_incident(message.get("event") or message.get("type"), _dict(incident))
+            if normalized:
+                incidents.append(normalized)
+        return incidents
+    
+    event = _dict(webhook_data.get("event"))
+    data = _dict(event.get("data"))
+    incident = data.get("incident") or (data if data.get("type") == "incident" else {})
+    normalized = _normalize_incident(event.get("event_type"), _dict(incident))
+    return [normalized] if normalized else []
+
+
+async def process_pagerduty_incident(incident: Dict[str, Any]) -> Dict[str, Any]:
     """
+    Create and route a WorkItem for one normalized PagerDuty incident (see
+    extract_pagerduty_incidents).
+    
+    Args:
+        incident: Normalized incident
+    
+    Returns:
+        Processing result with work_item_id ("duplicate" status if the incident
+        already has a WorkItem)
+    
+    Raises:
+        Exception: If the WorkItem could not be stored (the caller retries)
+    """
+    incident_id = incident["incident_id"]
+    incident_number = incident["incident_number"]
+    title = incident["title"]
+    description = incident["description"]
+    work_item_id = new_work_item_id()
+    
+    # Alert storms: attach near-duplicate incidents to the recent parent (an incident
+    # that will be routed is reserved as a parent right away)
+    goliath_service = map_pagerduty_service(incident["service_name"])
+    severity = map_pagerduty_urgency_to_severity(incident["urgency"])
+    embedding = None
+    parent = None
     try:
-        # Extract event data from PagerDuty webhook format
-        event = webhook_data.get("event", {})
-        event_type = event.get("event_type")
-        incident = event.get("data", {}).get("incident", {})
-        
-        if not incident:
-            logger.warning("No incident data in webhook payload")
-            return {"status": "error", "message": "No incident data"}
-        
-        # Only process incident creation events
-        if event_type not in ["incident.triggered", "incident.created"]:
-            logger.info(f"Ignoring event type: {event_type} (only processing incident.triggered/created)")
-            return {"status": "skipped", "message": f"Event type {event_type} not handled"}
-        
-        incident_id = incident.get("id")
-        incident_number = incident.get("incident_number")
-        title = incident.get("title", "")
-        urgency = incident.get("urgency", "low")
-        
-        # Get service information
-        service = incident.get("service", {})
-        service_name = service.get("name", "unknown") if isinstance(service, dict) else str(service)
-        
-        # Get incident body/description
-        body = incident.get("body", {})
-        description = ""
-        if isinstance(body, dict):
-            description = body.get("details", "")
-        
-        # Get created timestamp
-        created_at = incident.get("created_at") or datetime.now().isoformat()
-        
-        if not incident_id:
-            logger.warning("No incident ID in webhook payload")
-            return {"status": "error", "message": "No incident ID"}
-        
-        # Create WorkItem
-        work_item = create_work_item_from_pagerduty_incident(
+        embedding = await embed_text(incident_text(title, description))
+        parent = find_coalesce_parent(goliath_service, severity, embedding, work_item_id)
+    except Exception as e:
+        logger.warning(f"Routing PagerDuty incident {incident_id} without a stored vector or coalescing: {e}")
+    
+    # Create WorkItem (with its outbox events when routed)
+    try:
+        work_item = await run_in_db_executor(
+            create_work_item_from_pagerduty_incident,
             incident_id=incident_id,
-            incident_number=str(incident_number) if incident_number else incident_id,
+            incident_number=incident_number,
             title=title,
             description=description,
-            service_name=service_name,
-            urgency=urgency,
-            created_at=created_at
-        )
-        
-        logger.info(
-            f"Processed PagerDuty incident creation: {incident_number} → WorkItem {work_item['work_item_id']}"
+            service_name=incident["service_name"],
+            urgency=incident["urgency"],
+            created_at=incident["created_at"],
+            parent_work_item_id=parent[0] if parent else None,
+            work_item_id=work_item_id,
+            embedding=embedding
         )
-        
-        return {
-            "status": "success",
-            "work_item_id": work_item["work_item_id"],
-            "incident_id": incident_id,
-            "incident_number": incident_number,
-            "service": work_item["service"],
-            "severity": work_item["severity"]
-        }
+    except Exception:
+        if not parent:
+            release_coalesce_reservations(goliath_service, [work_item_id])
+        raise
+    if work_item is None:
+        if not parent:
+            release_coalesce_reservations(goliath_service, [work_item_id])
+        return {"status": "duplicate", "incident_id": incident_id, "incident_number": incident_number}
     
-    except Exception as e:
-        logger.error(f"Failed to process PagerDuty incident webhook: {e}", exc_info=True)
-        return {"status": "error", "message": str(e)}
+    if parent:
+        try:
+            await run_in_db_executor(record_coalesced_children, {parent[0]: 1})
+        except Exception as e:
+            logger.warning(f"Failed to update coalesced count on {parent[0]}: {e}")
+        record_suppressed(vector_writes=1, decisions=1)
+    
+    logger.info(
+        f"Processed PagerDuty incident creation: {incident_number} → WorkItem {work_item['work_item_id']}"
+        + (f" (coalesced into {parent[0]})" if parent else " (routing queued)")
+    )
+    
+    return {
+        "status": "success",
+        "work_item_id": work_item["work_item_id"],
+        "incident_id": incident_id,
+        "incident_number": incident_number,
+        "service": work_item["service"],
+        "severity": work_item["severity"],
+        "coalesced_into": parent[0] if parent else None
+    }
 
 
 def validate_pagerduty_signature(payload: bytes, signature: Optional[str]) -> bool:
@@ -0,0 +1,275 @@
+"""
+Persisted 384D -> 3D projection for embedding_3d_* coordinates (Ingest Service).
+
+The projection is an IncrementalPCA state (mean + 3 components + the
+statistics needed to keep partial-fitting) saved as a small .npz file at
+PROJECTION_PATH. Ingest and Learner mount the same file, so every worker and
+both services project into the same space, and startup is a file load rather
+than a fit. Projecting is a plain (X - mean) @ components.T over the batch.
+
+Until a projection has been fitted, a fixed seeded random orthonormal basis is
+used (deterministic across processes) and recent embeddings are kept in a
+rolling sample; once PROJECTION_MIN_FIT_SAMPLES are collected the first fit is
+saved. With PROJECTION_UPDATE_EVERY > 0 the saved projection is also
+partial-fitted on the rolling sample every N new embeddings. Full refits and
+re-projection of stored coordinates: scripts/refit_projection.py.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+from sklearn.decomposition import IncrementalPCA
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_PATH = os.getenv("PROJECTION_PATH", "/data/projection/pca_3d.npz")
+PROJECTION_MIN_FIT_SAMPLES = int(os.getenv("PROJECTION_MIN_FIT_SAMPLES", "50"))
+PROJECTION_SAMPLE_SIZE = int(os.getenv("PROJECTION_SAMPLE_SIZE", "2000"))
+PROJECTION_UPDATE_EVERY = int(os.getenv("PROJECTION_UPDATE_EVERY", "0"))  # 0 = only the first fit
+PROJECTION_RELOAD_SECONDS = float(os.getenv("PROJECTION_RELOAD_SECONDS", "30"))
+
+EMBEDDING_DIM = 384
+N_COMPONENTS = 3
+_SEED = 384
+
+# IncrementalPCA attributes needed to resume partial_fit
+_STATE_ARRAYS = (
+    "components_", "mean_", "var_", "singular_values_",
+    "explained_variance_", "explained_variance_ratio_"
+)
+
+
+class Projection:
+    """Mean + components of a 3D linear projection, with optional IncrementalPCA state."""
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        components: np.ndarray,
+        version: int = 0,
+        state: Optional[Dict[str, Any]] = None,
+        fitted_at: Optional[str] = None
+    ):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.components = np.asarray(components, dtype=np.float64)
+        self.version = version
+        self.state = state or {}
+        self.fitted_at = fitted_at
+
+    @property
+    def fitted(self) -> bool:
+        return self.version > 0
+
+    @property
+    def n_samples_seen(self) -> int:
+        return int(self.state.get("n_samples_seen_", 0))
+
+    def project(self, embeddings: np.ndarray) -> np.ndarray:
+        """Project an (n, 384) matrix to (n, 3)."""
+        return (np.asarray(embeddings, dtype=np.float64) - self.mean) @ self.components.T
+
+    @classmethod
+    def seeded(cls) -> "Projection":
+        """Deterministic random orthonormal basis used before the first fit (version 0)."""
+        rng = np.random.default_rng(_SEED)
+        q, _ = np.linalg.qr(rng.standard_normal((EMBEDDING_DIM, N_COMPONENTS)))
+        return cls(np.zeros(EMBEDDING_DIM), q.T, version=0)
+
+    @classmethod
+    def from_ipca(cls, ipca: IncrementalPCA, version: int) -> "Projection":
+        state = {name: np.array(getattr(ipca, name)) for name in _STATE_ARRAYS}
+        state["n_samples_seen_"] = int(np.max(ipca.n_samples_seen_))
+        state["noise_variance_"] = float(ipca.noise_variance_)
+        return cls(
+            ipca.mean_, ipca.components_, version=version, state=state,
+            fitted_at=datetime.now().isoformat()
+        )
+
+    def to_ipca(self) -> IncrementalPCA:
+        """Rebuild an IncrementalPCA that continues partial_fit from this state."""
+        ipca = IncrementalPCA(n_components=N_COMPONENTS)
+        if self.fitted and self.state:
+            for name in _STATE_ARRAYS:
+                setattr(ipca, name, np.array(self.state[name]))
+            ipca.n_samples_seen_ = int(self.state["n_samples_seen_"])
+            ipca.noise_variance_ = float(self.state["noise_variance_"])
+            ipca.n_components_ = N_COMPONENTS
+            ipca.n_features_in_ = EMBEDDING_DIM
+        return ipca
+
+
+def fit_projection(
+    embeddings: np.ndarray,
+    base: Optional[Projection] = None,
+    batch_size: int = 1000
+) -> Projection:
+    """
+    Fit (or, with base, continue fitting) a projection with IncrementalPCA.
+
+    Args:
+        embeddings: (n, 384) sample; n must be >= 3
+        base: Existing fitted projection to partial-fit on top of (None = fresh fit)
+        batch_size: Rows per partial_fit call (bounds memory for large samples)
+
+    Returns:
+        New Projection with version = base version + 1
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    base = base if base is not None and base.fitted else None
+    ipca = base.to_ipca() if base else IncrementalPCA(n_components=N_COMPONENTS)
+    for start in range(0, len(embeddings), batch_size):
+        chunk = embeddings[start:start + batch_size]
+        if len(chunk) >= N_COMPONENTS:
+            ipca.partial_fit(chunk)
+    if not hasattr(ipca, "components_"):
+        raise ValueError(f"Need at least {N_COMPONENTS} embeddings to fit a projection")
+    return Projection.from_ipca(ipca, version=(base.version if base else 0) + 1)
+
+
+def save_projection(projection: Projection, path: str = PROJECTION_PATH) -> None:
+    """Atomically write a projection (temp file + rename) so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            mean=projection.mean,
+            components=projection.components,
+            version=np.array(projection.version),
+            fitted_at=np.array(projection.fitted_at or ""),
+            n_samples_seen=np.array(projection.n_samples_seen),
+            noise_variance=np.array(projection.state.get("noise_variance_", 0.0)),
+            **{f"state_{name}": projection.state[name] for name in _STATE_ARRAYS if name in projection.state}
+        )
+    os.replace(tmp_path, path)
+    logger.info(f"Saved projection v{projection.version} to {path}")
+
+
+def load_projection(path: str = PROJECTION_PATH) -> Optional[Projection]:
+    """Load a saved projection, or None if there is none (or it is unreadable)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            state = {
+                name: data[f"state_{name}"] for name in _STATE_ARRAYS if f"state_{name}" in data
+            }
+            if state:
+                state["n_samples_seen_"] = int(data["n_samples_seen"])
+                state["noise_variance_"] = float(data["noise_variance"])
+            return Projection(
+                data["mean"],
+                data["components"],
+                version=int(data["version"]),
+                state=state,
+                fitted_at=str(data["fitted_at"]) or None
+            )
+    except Exception as e:
+        logger.error(f"Failed to load projection from {path}: {e}")
+        return None
+
+
+_lock = threading.Lock()
+_projection: Optional[Projection] = None
+_projection_mtime: Optional[float] = None
+_last_reload_check = 0.0
+_sample: deque = deque(maxlen=PROJECTION_SAMPLE_SIZE)
+_since_update = 0
+
+
+def _file_mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def get_projection() -> Projection:
+    """
+    Current projection: the saved one if present (reloaded when the file changes,
+    checked every PROJECTION_RELOAD_SECONDS), otherwise the seeded fallback.
+    """
+    global _projection, _projection_mtime, _last_reload_check
+    now = time.monotonic()
+    if _projection is not None and now - _last_reload_check < PROJECTION_RELOAD_SECONDS:
+        return _projection
+    with _lock:
+        _last_reload_check = now
+        mtime = _file_mtime(PROJECTION_PATH)
+        if _projection is None or (mtime is not None and mtime != _projection_mtime):
+            loaded = load_projection(PROJECTION_PATH) if mtime is not None else None
+            if loaded is not None:
+                _projection, _projection_mtime = loaded, mtime
+                logger.info(f"Loaded projection v{loaded.version} from {PROJECTION_PATH}")
+            elif _projection is None:
+                _projection = Projection.seeded()
+        return _projection
+
+
+def _observe(embeddings: np.ndarray) -> None:
+    """Add embeddings to the rolling sample; fit / partial-fit and save when due."""
+    global _projection, _projection_mtime, _since_update
+    if _projection is not None and _projection.fitted and PROJECTION_UPDATE_EVERY <= 0:
+        return
+    embeddings = embeddings[np.any(embeddings != 0, axis=1)]
+    if not len(embeddings):
+        return
+    with _lock:
+        _sample.extend(embeddings)
+        _since_update += len(embeddings)
+        current = _projection
+        first_fit = not current.fitted and len(_sample) >= PROJECTION_MIN_FIT_SAMPLES
+        update = current.fitted and PROJECTION_UPDATE_EVERY > 0 and _since_update >= PROJECTION_UPDATE_EVERY
+        if not (first_fit or update):
+            return
+        sample = np.array(_sample)
+        _since_update = 0
+        # The rolling sample feeds exactly one fit
+        _sample.clear()
+        try:
+            _projection = fit_projection(sample, base=current if update else None)
+            save_projection(_projection, PROJECTION_PATH)
+            _projection_mtime = _file_mtime(PROJECTION_PATH)
+        except Exception as e:
+            logger.error(f"Failed to fit/save projection: {e}")
+
+
+def project_embeddings(embeddings: List[List[float]]) -> List[Tuple[float, float, float]]:
+    """
+    Project a batch of 384D embeddings to 3D with one matrix multiply.
+
+    Args:
+        embeddings: 384-dimensional embedding vectors
+
+    Returns:
+        One (x, y, z) tuple per embedding, in input order
+    """
+    if not embeddings:
+        return []
+    matrix = np.asarray(embeddings, dtype=np.float64)
+    projection = get_projection()
+    _observe(matrix)
+    # Re-read: _observe may have produced the first fitted projection
+    if _projection is not projection:
+        projection = _projection
+    return [(float(x), float(y), float(z)) for x, y, z in projection.project(matrix)]
+
+
+def get_projection_stats() -> Dict[str, Any]:
+    """Version, fit time and sample state of the active projection."""
+    projection = get_projection()
+    return {
+        "path": PROJECTION_PATH,
+        "version": projection.version,
+        "fitted": projection.fitted,
+        "fitted_at": projection.fitted_at,
+        "n_samples_seen": projection.n_samples_seen,
+        "rolling_sample": len(_sample),
+        "min_fit_samples": PROJECTION_MIN_FIT_SAMPLES,
+        "update_every": PROJECTION_UPDATE_EVERY
+    }
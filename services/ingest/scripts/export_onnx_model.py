@@ -0,0 +1,145 @@
+"""
+Export all-MiniLM-L6-v2 to ONNX (+ int8 dynamic quantization) for EMBEDDING_BACKEND=onnx,
+then check cosine parity and throughput against the PyTorch model.
+
+Writes to --output-dir:
+- model.onnx       fp32 transformer (token embeddings; pooling is done in embedding_backend)
+- model_int8.onnx  dynamically quantized (int8 weights) copy
+- tokenizer.json   fast tokenizer
+
+Point EMBEDDING_ONNX_DIR at the directory (Ingest and Learner). Needs network
+access (or a warm Hugging Face cache) for the source model.
+
+Usage:
+    python scripts/export_onnx_model.py [--output-dir /app/models/all-MiniLM-L6-v2-onnx]
+                                        [--threads 1] [--min-cosine 0.99]
+"""
+import argparse
+import inspect
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embedding_backend import EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_DIR, OnnxSentenceEncoder  # noqa: E402
+
+# Representative work item descriptions (short alerts to multi-sentence logs)
+PARITY_TEXTS = [
+    "Database connection pool exhausted in api-service",
+    "High latency on checkout endpoint, p99 above 2s for 10 minutes",
+    "NullPointerException in PaymentProcessor.charge when card token is missing",
+    "Kubernetes pod payments-7f9c restarted 12 times (CrashLoopBackOff)",
+    "Disk usage on postgres-primary above 90%",
+    "TLS certificate for auth.example.com expires in 3 days",
+    "Error rate spike on /v1/orders after deploy 2024.11.3; rollback recommended. "
+    "Upstream inventory-service returning 503 intermittently.",
+    "Memory leak suspected in search indexer: RSS grows 200MB/hour",
+    "",
+    "OOMKilled",
+]
+
+
+def export(output_dir: str) -> None:
+    import torch
+
+    class _TokenEmbeddings(torch.nn.Module):
+        """Fixed positional signature (forward() argument order varies across transformers versions)."""
+
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.transformer(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            ).last_hidden_state
+
+    from sentence_transformers import SentenceTransformer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(output_dir, exist_ok=True)
+    st_model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    # Newer torch defaults to the dynamo exporter; the TorchScript one handles dynamic_axes
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            _TokenEmbeddings(transformer),
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "token_type_ids": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+            do_constant_folding=True,
+            **legacy
+        )
+    quantize_dynamic(fp32_path, os.path.join(output_dir, "model_int8.onnx"), weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(output_dir)
+    print(f"Exported {EMBEDDING_MODEL_NAME} to {output_dir}")
+
+
+def _throughput(model, texts, runs=3):
+    model.encode(texts[:8], normalize_embeddings=True)
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        model.encode(texts, batch_size=32, normalize_embeddings=True)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def check(output_dir: str, threads: int, min_cosine: float) -> bool:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if threads > 0:
+        torch.set_num_threads(threads)
+    reference_model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+    reference = reference_model.encode(PARITY_TEXTS, normalize_embeddings=True)
+    bench_texts = [PARITY_TEXTS[i % len(PARITY_TEXTS)] + f" #{i}" for i in range(512)]
+
+    ok = True
+    print(f"{'backend':<10} | {'min cosine':>10} | {'mean cosine':>11} | {'emb/s':>8} (threads={threads or 'default'})")
+    print("-" * 52)
+    print(f"{'torch':<10} | {1.0:>10.5f} | {1.0:>11.5f} | {_throughput(reference_model, bench_texts):>8.1f}")
+    for quantized in (False, True):
+        model = OnnxSentenceEncoder(output_dir, quantized=quantized, threads=threads)
+        vectors = model.encode(PARITY_TEXTS, normalize_embeddings=True)
+        cosine = np.sum(vectors * reference, axis=1)
+        name = "onnx-int8" if quantized else "onnx"
+        print(f"{name:<10} | {cosine.min():>10.5f} | {cosine.mean():>11.5f} | {_throughput(model, bench_texts):>8.1f}")
+        ok = ok and cosine.min() >= min_cosine
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-dir", default=EMBEDDING_ONNX_DIR)
+    parser.add_argument("--threads", type=int, default=1, help="Intra-op threads for the parity/throughput check")
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--skip-export", action="store_true", help="Only run the parity check")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export(args.output_dir)
+    if not check(args.output_dir, args.threads, args.min_cosine):
+        print(f"Cosine parity below {args.min_cosine} - do not enable EMBEDDING_BACKEND=onnx")
+        sys.exit(1)
+    print("Parity check passed")
+
+
+if __name__ == "__main__":
+    main()
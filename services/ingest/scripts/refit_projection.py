@@ -0,0 +1,181 @@
+"""
+Refit the shared 3D projection and re-project stored embedding_3d_* columns.
+
+1. Streams WorkItem vectors from Weaviate and keeps a uniform reservoir sample
+   (--sample-size)
+2. Fits IncrementalPCA on the sample in --batch-size chunks (or, with
+   --incremental, partial-fits on top of the saved projection) and saves it to
+   PROJECTION_PATH (Ingest and Learner pick it up within PROJECTION_RELOAD_SECONDS)
+3. Streams the vectors again and rewrites work_items.embedding_3d_* with one
+   multi-row UPDATE per batch
+4. Re-projects humans.embedding_3d_* from the Weaviate Human vectors (mean of a
+   human's per-service capability vectors)
+
+Run inside the ingest container (needs POSTGRES_URL, WEAVIATE_URL, PROJECTION_PATH).
+
+Usage:
+    python scripts/refit_projection.py [--sample-size 20000] [--batch-size 1000] [--incremental]
+                                       [--no-reproject] [--skip-humans]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from db import get_db_connection, return_db_connection  # noqa: E402
+from weaviate_client import get_weaviate_client  # noqa: E402
+from projection import (  # noqa: E402
+    PROJECTION_PATH,
+    fit_projection,
+    load_projection,
+    save_projection
+)
+
+
+def _vector(obj):
+    vector = obj.vector
+    # Newer clients return named vectors ({"default": [...]})
+    if isinstance(vector, dict):
+        vector = vector.get("default") or next(iter(vector.values()), None)
+    return vector
+
+
+def _iter_vectors(collection_name):
+    """Yield (properties, vector) for every object in a Weaviate collection."""
+    client = get_weaviate_client()
+    if client is None:
+        raise RuntimeError("Weaviate is not available")
+    if not client.collections.exists(collection_name):
+        return
+    for obj in client.collections.get(collection_name).iterator(include_vector=True):
+        vector = _vector(obj)
+        if vector:
+            yield obj.properties, vector
+
+
+def _reservoir_sample(vectors, size, seed=42):
+    rng = random.Random(seed)
+    sample = []
+    for seen, vector in enumerate(vectors):
+        if seen < size:
+            sample.append(vector)
+        else:
+            j = rng.randint(0, seen)
+            if j < size:
+                sample[j] = vector
+    return sample
+
+
+def _bulk_update(table, rows):
+    """UPDATE <table> SET embedding_3d_* FROM (VALUES ...) in one statement."""
+    if not rows:
+        return 0
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        execute_values(cur, f"""
+            UPDATE {table} AS t
+            SET embedding_3d_x = v.x, embedding_3d_y = v.y, embedding_3d_z = v.z
+            FROM (VALUES %s) AS v(id, x, y, z)
+            WHERE t.id = v.id
+        """, rows, page_size=len(rows))
+        conn.commit()
+        return cur.rowcount
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        return_db_connection(conn)
+
+
+def _reproject_work_items(projection, batch_size):
+    updated = 0
+    ids, vectors = [], []
+
+    def flush():
+        nonlocal updated
+        coords = projection.project(np.array(vectors))
+        updated += _bulk_update("work_items", [
+            (work_item_id, float(x), float(y), float(z)) for work_item_id, (x, y, z) in zip(ids, coords)
+        ])
+        ids.clear()
+        vectors.clear()
+
+    for properties, vector in _iter_vectors("WorkItem"):
+        ids.append(properties["id"])
+        vectors.append(vector)
+        if len(ids) >= batch_size:
+            flush()
+    if ids:
+        flush()
+    return updated
+
+
+def _reproject_humans(projection, batch_size):
+    per_human = defaultdict(list)
+    for properties, vector in _iter_vectors("Human"):
+        per_human[properties["id"]].append(vector)
+    if not per_human:
+        return 0
+
+    human_ids = list(per_human)
+    centroids = np.array([np.mean(per_human[h], axis=0) for h in human_ids])
+    norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+    centroids = np.divide(centroids, norms, out=np.zeros_like(centroids), where=norms > 0)
+    coords = projection.project(centroids)
+
+    updated = 0
+    rows = [(h, float(x), float(y), float(z)) for h, (x, y, z) in zip(human_ids, coords)]
+    for start in range(0, len(rows), batch_size):
+        updated += _bulk_update("humans", rows[start:start + batch_size])
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample-size", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--incremental", action="store_true", help="Partial-fit on top of the saved projection")
+    parser.add_argument("--no-reproject", action="store_true", help="Only fit and save the projection")
+    parser.add_argument("--skip-humans", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sample = _reservoir_sample((vector for _, vector in _iter_vectors("WorkItem")), args.sample_size)
+    if len(sample) < 3:
+        print(f"Only {len(sample)} WorkItem vectors in Weaviate - need at least 3 to fit")
+        sys.exit(1)
+
+    base = load_projection(PROJECTION_PATH) if args.incremental else None
+    if args.incremental and base is None:
+        print(f"No saved projection at {PROJECTION_PATH} - doing a full fit")
+    projection = fit_projection(np.array(sample), base=base, batch_size=args.batch_size)
+    save_projection(projection, PROJECTION_PATH)
+    explained = projection.state["explained_variance_ratio_"]
+    print(
+        f"Fitted projection v{projection.version} on {len(sample)} vectors in {time.perf_counter() - start:.2f}s "
+        f"(explained variance {', '.join(f'{r:.3f}' for r in explained)}) -> {PROJECTION_PATH}"
+    )
+
+    if args.no_reproject:
+        return
+
+    start = time.perf_counter()
+    work_items = _reproject_work_items(projection, args.batch_size)
+    print(f"Re-projected {work_items} work items in {time.perf_counter() - start:.2f}s")
+
+    if not args.skip_humans:
+        start = time.perf_counter()
+        humans = _reproject_humans(projection, args.batch_size)
+        print(f"Re-projected {humans} humans in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Tests for POST /work-items/bulk (main.create_work_items_bulk).
+Embedding, PostgreSQL, Weaviate and coalescing state are mocked.
+"""
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from fastapi import HTTPException
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coalescing
+from coalescing import StormCoalescer
+from embedding_batcher import EmbeddingQueueFullError
+from main import create_work_items_bulk, BulkWorkItemRequest, BulkWorkItemResponse
+
+
+async def _run_inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+def _request(descriptions, **kwargs):
+    return BulkWorkItemRequest(
+        items=[
+            {"type": "incident", "service": "api-service", "severity": "sev2", "description": description,
+             "origin_system": "alertmanager"}
+            for description in descriptions
+        ],
+        **kwargs
+    )
+
+
+async def _bulk(request):
+    """Call the endpoint and validate the result as FastAPI's response_model would."""
+    return BulkWorkItemResponse(**await create_work_items_bulk(request))
+
+
+@pytest.fixture
+def env():
+    coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+    embed = AsyncMock(side_effect=lambda texts: [[1.0, 0.0, 0.0] if "pool" in t else [0.0, 1.0, 0.0] for t in texts])
+    insert = MagicMock(side_effect=lambda rows: [row["id"] for row in rows])
+    store = MagicMock(return_value={})
+    with patch.object(coalescing, "COALESCE_ENABLED", True), \
+         patch.object(coalescing, "_coalescer", coalescer), \
+         patch("main.embed_texts", embed), \
+         patch("main.pca_reduce_batch", side_effect=lambda embeddings: [(0.0, 0.0, 0.0)] * len(embeddings)), \
+         patch("main.run_in_db_executor", side_effect=_run_inline), \
+         patch("main.insert_work_items_batch", insert), \
+         patch("main.store_work_items_batch", store), \
+         patch("main.record_coalesced_children") as children, \
+         patch("main.record_suppressed") as suppressed:
+        yield {
+            "coalescer": coalescer, "embed": embed, "insert": insert, "store": store,
+            "children": children, "suppressed": suppressed
+        }
+
+
+class TestBulkCreate:
+
+    @pytest.mark.asyncio
+    async def test_items_are_embedded_and_written_in_one_batch(self, env):
+        response = await _bulk(_request(["pool exhausted", "disk full", "cert expired"]))
+
+        assert response.created == 3 and response.failed == 0
+        env["embed"].assert_awaited_once()
+        assert len(env["embed"].call_args[0][0]) == 3
+        env["insert"].assert_called_once()
+        assert len(env["store"].call_args[0][0]) == 3
+        assert all(result.vector_stored for result in response.results)
+
+    @pytest.mark.asyncio
+    async def test_existing_ids_are_reported_per_item(self, env):
+        env["insert"].side_effect = lambda rows: [rows[0]["id"]]
+
+        response = await _bulk(_request(["pool exhausted", "disk full"]))
+
+        assert [result.status for result in response.results] == ["created", "failed"]
+        assert response.results[1].error == "Work item ID already exists"
+        assert len(env["store"].call_args[0][0]) == 1
+
+    @pytest.mark.asyncio
+    async def test_embedding_backpressure_is_503(self, env):
+        env["embed"].side_effect = EmbeddingQueueFullError("queue full")
+
+        with pytest.raises(HTTPException) as excinfo:
+            await _bulk(_request(["pool exhausted"]))
+
+        assert excinfo.value.status_code == 503
+        env["insert"].assert_not_called()
+
+
+class TestBulkCoalesce:
+
+    @pytest.mark.asyncio
+    async def test_duplicates_in_batch_are_stored_as_children(self, env):
+        response = await _bulk(
+            _request(["pool exhausted", "pool exhausted again", "disk full"], coalesce=True)
+        )
+
+        parent_id = response.results[0].id
+        assert response.created == 3
+        assert response.results[1].coalesced_into == parent_id
+        assert [row["id"] for row in env["store"].call_args[0][0]] == [parent_id, response.results[2].id]
+        env["children"].assert_called_once_with({parent_id: 1})
+        env["suppressed"].assert_called_once_with(vector_writes=1, decisions=0)
+
+    @pytest.mark.asyncio
+    async def test_failed_insert_releases_reserved_parents(self, env):
+        env["insert"].side_effect = RuntimeError("db down")
+        with pytest.raises(HTTPException):
+            await _bulk(_request(["pool exhausted"], coalesce=True))
+
+        env["insert"].side_effect = lambda rows: [row["id"] for row in rows]
+        response = await _bulk(_request(["pool exhausted"], coalesce=True))
+
+        assert response.results[0].coalesced_into is None
+
+    @pytest.mark.asyncio
+    async def test_rows_not_inserted_release_their_reservation(self, env):
+        env["insert"].side_effect = lambda rows: []
+        await _bulk(_request(["pool exhausted"], coalesce=True))
+
+        env["insert"].side_effect = lambda rows: [row["id"] for row in rows]
+        response = await _bulk(_request(["pool exhausted"], coalesce=True))
+
+        assert response.results[0].coalesced_into is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
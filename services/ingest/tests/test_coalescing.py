@@ -0,0 +1,181 @@
+"""
+Tests for alert-storm coalescing (coalescing.py).
+Pure ring logic - no database, Weaviate or embedding model.
+"""
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coalescing
+from coalescing import StormCoalescer
+
+
+BASE = [1.0, 0.0, 0.0]
+NEAR = [1.0, 0.05, 0.0]  # cosine ~0.999 with BASE
+FAR = [0.0, 1.0, 0.0]
+
+
+class TestFindParent:
+    """Threshold, window and severity rules for a single item."""
+
+    def test_near_duplicate_coalesces_into_reserved_parent(self):
+        """The first item is routed and reserved; a near-duplicate coalesces into it."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+
+        assert coalescer.find_parent("api", "sev2", BASE, "wi-1", now=0) is None
+        parent = coalescer.find_parent("api", "sev2", NEAR, "wi-2", now=1)
+
+        assert parent[0] == "wi-1"
+        assert parent[1] >= 0.9
+
+    def test_below_threshold_is_routed(self):
+        """A dissimilar item is not coalesced and becomes a parent itself."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        coalescer.find_parent("api", "sev2", BASE, "wi-1", now=0)
+
+        assert coalescer.find_parent("api", "sev2", FAR, "wi-2", now=1) is None
+        assert coalescer.find_parent("api", "sev2", FAR, "wi-3", now=2)[0] == "wi-2"
+
+    def test_other_service_never_matches(self):
+        """Rings are per service."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        coalescer.find_parent("api", "sev2", BASE, "wi-1", now=0)
+
+        assert coalescer.find_parent("payments", "sev2", BASE, "wi-2", now=1) is None
+
+    def test_parent_expires_after_window(self):
+        """The window is measured from the parent's creation."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        coalescer.find_parent("api", "sev2", BASE, "wi-1", now=0)
+
+        assert coalescer.find_parent("api", "sev2", NEAR, "wi-2", now=60)[0] == "wi-1"
+        # Outside the window: routed, and it becomes the new parent
+        assert coalescer.find_parent("api", "sev2", NEAR, "wi-3", now=61) is None
+        assert coalescer.find_parent("api", "sev2", BASE, "wi-4", now=62)[0] == "wi-3"
+
+    def test_more_severe_item_never_coalesces(self):
+        """Escalations are routed even when they duplicate a less severe parent."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        coalescer.find_parent("api", "sev3", BASE, "wi-1", now=0)
+
+        assert coalescer.find_parent("api", "sev1", NEAR, "wi-2", now=1) is None
+        # A less (or equally) severe duplicate may coalesce into the escalation
+        assert coalescer.find_parent("api", "sev4", NEAR, "wi-3", now=2)[0] == "wi-2"
+
+    def test_lookup_without_id_reserves_nothing(self):
+        """Without a work item ID the lookup does not add a parent."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+
+        assert coalescer.find_parent("api", "sev2", BASE, now=0) is None
+        assert coalescer.find_parent("api", "sev2", BASE, "wi-1", now=1) is None
+
+    def test_zero_vector_is_routed_without_reservation(self):
+        """An all-zero embedding can neither match nor become a parent."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+
+        assert coalescer.find_parent("api", "sev2", [0.0, 0.0, 0.0], "wi-1", now=0) is None
+        assert coalescer.get_stats()["per_service"]["api"]["ring"] == 0
+
+
+class TestReservations:
+    """Parents are reserved at lookup time and released when the item is not stored."""
+
+    def test_burst_collapses_into_first_item(self):
+        """Items checked before the first one is stored still coalesce into it."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+
+        results = [coalescer.find_parent("api", "sev2", NEAR, f"wi-{i}", now=0) for i in range(10)]
+
+        assert results[0] is None
+        assert all(result[0] == "wi-0" for result in results[1:])
+        stats = coalescer.get_stats()
+        assert stats["coalesced"] == 9
+        assert stats["per_service"]["api"]["routed"] == 1
+
+    def test_released_reservation_is_not_a_parent(self):
+        """A parent whose insert failed is dropped from the ring."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        coalescer.find_parent("api", "sev2", BASE, "wi-1", now=0)
+
+        coalescer.release("api", ["wi-1"])
+
+        assert coalescer.find_parent("api", "sev2", NEAR, "wi-2", now=1) is None
+        assert coalescer.get_stats()["per_service"]["api"]["routed"] == 1
+
+    def test_ring_size_bounds_parents(self):
+        """Only the newest ring_size parents are kept per service."""
+        coalescer = StormCoalescer(threshold=0.99, window_seconds=60, ring_size=2)
+        for i, vector in enumerate(([1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])):
+            coalescer.find_parent("api", "sev2", vector, f"wi-{i}", now=i)
+
+        assert coalescer.get_stats()["per_service"]["api"]["ring"] == 2
+        assert coalescer.find_parent("api", "sev2", [1.0, 0.0, 0.0], now=3) is None
+
+
+class TestFindParentsBatch:
+    """Batch lookup (POST /work-items/bulk with coalesce)."""
+
+    def test_items_coalesce_into_earlier_items_of_the_batch(self):
+        """In-batch parents are used, in order."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        entries = [("api", "sev2", BASE), ("api", "sev2", NEAR), ("api", "sev2", FAR), ("api", "sev2", FAR)]
+
+        results = coalescer.find_parents_batch(entries, ids=["a", "b", "c", "d"], now=0)
+
+        assert results[0] is None
+        assert results[1][0] == "a"
+        assert results[2] is None
+        assert results[3][0] == "c"
+
+    def test_batch_parents_serve_later_requests(self):
+        """Routed batch items stay reserved as parents for later items."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        coalescer.find_parents_batch([("api", "sev2", BASE)], ids=["a"], now=0)
+
+        assert coalescer.find_parent("api", "sev2", NEAR, "b", now=1)[0] == "a"
+
+    def test_batch_without_ids_only_matches_existing_parents(self):
+        """Without IDs nothing in the batch can serve as a parent."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+
+        results = coalescer.find_parents_batch([("api", "sev2", BASE), ("api", "sev2", NEAR)], now=0)
+
+        assert results == [None, None]
+
+
+class TestModuleFunctions:
+    """Module-level wrappers honour COALESCE_ENABLED."""
+
+    def test_disabled_never_coalesces_or_reserves(self):
+        """With coalescing disabled every item is routed and the ring stays empty."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        with patch.object(coalescing, "COALESCE_ENABLED", False), patch.object(coalescing, "_coalescer", coalescer):
+            assert coalescing.find_coalesce_parent("api", "sev2", BASE, "wi-1") is None
+            assert coalescing.find_coalesce_parent("api", "sev2", BASE, "wi-2") is None
+            assert coalescing.find_coalesce_parents_batch([("api", "sev2", BASE)] * 2, ["a", "b"]) == [None, None]
+
+        assert coalescer.get_stats()["checked"] == 0
+
+    def test_enabled_reserves_through_module_functions(self):
+        """find_coalesce_parent reserves; release_coalesce_reservations drops the reservation."""
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        with patch.object(coalescing, "COALESCE_ENABLED", True), patch.object(coalescing, "_coalescer", coalescer):
+            assert coalescing.find_coalesce_parent("api", "sev2", BASE, "wi-1") is None
+            assert coalescing.find_coalesce_parent("api", "sev2", NEAR, "wi-2")[0] == "wi-1"
+
+            coalescing.release_coalesce_reservations("api", ["wi-1"])
+            assert coalescing.find_coalesce_parent("api", "sev2", NEAR, "wi-3") is None
+
+    def test_suppressed_work_is_counted(self):
+        """record_suppressed feeds the suppressed counters in the stats."""
+        coalescer = StormCoalescer()
+        coalescer.record_suppressed(vector_writes=2, decisions=1)
+
+        assert coalescer.get_stats()["suppressed"] == {"vector_writes": 2, "decisions": 1}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
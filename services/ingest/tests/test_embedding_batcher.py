@@ -0,0 +1,150 @@
+"""
+Tests for the micro-batching embedding executor (embedding_batcher.py).
+The model is replaced by a fake generate_embeddings that records batch sizes.
+"""
+import pytest
+import asyncio
+import threading
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_batcher import EmbeddingBatcher, EmbeddingQueueFullError
+
+
+class FakeModel:
+    """generate_embeddings stand-in: embedding = [len(text)], optionally blocking or failing."""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+        self.error = None
+
+    def __call__(self, texts):
+        self.batches.append(len(texts))
+        self.started.set()
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.fixture
+def model():
+    fake = FakeModel()
+    with patch("embedding_batcher.generate_embeddings", fake):
+        yield fake
+
+
+async def _started(batcher):
+    batcher.start()
+    return batcher
+
+
+class TestBatching:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_batches(self, model):
+        """Concurrent callers are encoded together, at most max_batch_size per batch, each getting its own vector."""
+        batcher = await _started(EmbeddingBatcher(max_batch_size=4, max_wait_ms=50, queue_size=100, workers=1))
+        try:
+            texts = ["x" * n for n in range(1, 11)]
+            results = await asyncio.gather(*(batcher.embed(text) for text in texts))
+        finally:
+            await batcher.stop()
+
+        assert results == [[float(n)] for n in range(1, 11)]
+        assert max(model.batches) <= 4
+        assert len(model.batches) < len(texts)
+        assert batcher.get_stats()["texts"] == 10
+
+    @pytest.mark.asyncio
+    async def test_lone_request_waits_at_most_max_wait(self, model):
+        """A single caller is not held waiting for a full batch."""
+        batcher = await _started(EmbeddingBatcher(max_batch_size=32, max_wait_ms=20, queue_size=100, workers=1))
+        try:
+            result = await asyncio.wait_for(batcher.embed("hello"), timeout=1)
+        finally:
+            await batcher.stop()
+
+        assert result == [5.0]
+        assert model.batches == [1]
+
+    @pytest.mark.asyncio
+    async def test_embed_many_bypasses_the_queue(self, model):
+        """Bulk texts are encoded as one batch."""
+        batcher = await _started(EmbeddingBatcher(max_batch_size=4, max_wait_ms=5, queue_size=100, workers=1))
+        try:
+            results = await batcher.embed_many(["a", "bb", "ccc", "dddd", "eeeee", "ffffff"])
+        finally:
+            await batcher.stop()
+
+        assert results == [[1.0], [2.0], [3.0], [4.0], [5.0], [6.0]]
+        assert model.batches == [6]
+        assert batcher.get_stats()["enqueued"] == 0
+
+
+class TestFailures:
+
+    @pytest.mark.asyncio
+    async def test_full_queue_raises_after_enqueue_timeout(self, model):
+        """When inference is stuck and the queue is full, callers get EmbeddingQueueFullError."""
+        model.release.clear()
+        batcher = await _started(EmbeddingBatcher(max_batch_size=1, max_wait_ms=0, queue_size=1, workers=1))
+        try:
+            first = asyncio.ensure_future(batcher.embed("a"))
+            await asyncio.get_running_loop().run_in_executor(None, model.started.wait, 5)
+            second = asyncio.ensure_future(batcher.embed("b"))  # fills the queue
+            await asyncio.sleep(0)
+
+            with patch("embedding_batcher.EMBEDDING_ENQUEUE_TIMEOUT_SECONDS", 0.05):
+                with pytest.raises(EmbeddingQueueFullError):
+                    await batcher.embed("c")
+            assert batcher.get_stats()["rejected"] == 1
+
+            model.release.set()
+            assert await first == [1.0]
+            assert await second == [1.0]
+        finally:
+            model.release.set()
+            await batcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_inference_error_reaches_every_caller_in_the_batch(self, model):
+        """A failed encode fails the whole batch; the collector keeps serving afterwards."""
+        model.error = RuntimeError("CUDA out of memory")
+        batcher = await _started(EmbeddingBatcher(max_batch_size=8, max_wait_ms=20, queue_size=100, workers=1))
+        try:
+            results = await asyncio.gather(*(batcher.embed(t) for t in ("a", "b", "c")), return_exceptions=True)
+            assert all(isinstance(result, RuntimeError) for result in results)
+
+            model.error = None
+            assert await batcher.embed("ok") == [2.0]
+        finally:
+            await batcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_fails_queued_requests(self, model):
+        """Requests still queued at shutdown get an error instead of hanging."""
+        model.release.clear()
+        batcher = await _started(EmbeddingBatcher(max_batch_size=1, max_wait_ms=0, queue_size=10, workers=1))
+        first = asyncio.ensure_future(batcher.embed("a"))
+        await asyncio.get_running_loop().run_in_executor(None, model.started.wait, 5)
+        queued = asyncio.ensure_future(batcher.embed("b"))
+        await asyncio.sleep(0)
+
+        await batcher.stop()
+        model.release.set()
+
+        with pytest.raises(RuntimeError):
+            await queued
+        with pytest.raises(RuntimeError):
+            await first
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,118 @@
+"""
+Tests for the streaming work item export (export.py).
+Query building and export slot handling with the server-side cursor mocked.
+"""
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import export
+from export import (
+    parse_includes, build_export_query, try_acquire_export_slot, stream_export, ExportResponse,
+    EXPORT_MAX_CONCURRENT
+)
+
+
+class FakeCursor:
+    """ServerSideCursor stand-in returning preset chunks."""
+
+    def __init__(self, query, params, chunk_size=5000):
+        self.chunks = [[('{"id": "wi-1"}',), ('{"id": "wi-2"}',)], []]
+        self.rows_fetched = 0
+        self.closed = False
+
+    def fetch(self):
+        rows = self.chunks.pop(0)
+        self.rows_fetched += len(rows)
+        return rows
+
+    def close_in_background(self):
+        self.closed = True
+
+
+async def _run_inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+@pytest.fixture
+def fake_db():
+    with patch("export.ServerSideCursor", FakeCursor), patch("export.run_in_db_executor", side_effect=_run_inline):
+        yield
+
+
+def _free_slots():
+    return export._export_slots._value
+
+
+class TestQueryBuilding:
+
+    def test_unknown_include_is_rejected(self):
+        with pytest.raises(ValueError):
+            parse_includes("decision,salary")
+
+    def test_includes_add_joins(self):
+        query, params = build_export_query(service="api", includes=["assignee", "candidates"])
+
+        assert "LEFT JOIN decisions d" in query
+        assert "LEFT JOIN humans h" in query
+        assert "decision_candidates" in query
+        assert params == ["api"]
+
+
+class TestExportSlots:
+    """Every exit path returns the export slot exactly once."""
+
+    @pytest.mark.asyncio
+    async def test_completed_stream_releases_slot(self, fake_db):
+        slot = try_acquire_export_slot()
+        body = b"".join([chunk async for chunk in stream_export("SELECT 1", [], slot)])
+
+        assert body == b'{"id": "wi-1"}\n{"id": "wi-2"}\n'
+        assert _free_slots() == EXPORT_MAX_CONCURRENT
+
+    @pytest.mark.asyncio
+    async def test_slots_are_bounded(self):
+        slots = [try_acquire_export_slot() for _ in range(EXPORT_MAX_CONCURRENT)]
+        assert try_acquire_export_slot() is None
+
+        for slot in slots:
+            slot.release()
+            slot.release()  # idempotent
+        assert _free_slots() == EXPORT_MAX_CONCURRENT
+
+    @pytest.mark.asyncio
+    async def test_response_never_sent_releases_slot(self, fake_db):
+        """A client that disconnects before the body starts does not leak the slot."""
+        slot = try_acquire_export_slot()
+        stream = stream_export("SELECT 1", [], slot)
+        first = await stream.__anext__()
+        response = ExportResponse(stream, first, slot, media_type="application/x-ndjson")
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise OSError("client went away")
+
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with pytest.raises(Exception):
+            await response(scope, receive, send)
+
+        assert _free_slots() == EXPORT_MAX_CONCURRENT
+
+    @pytest.mark.asyncio
+    async def test_cursor_failure_releases_slot(self):
+        """A stream that fails before its first row still returns the slot."""
+        slot = try_acquire_export_slot()
+        with patch("export.ServerSideCursor", side_effect=RuntimeError("no connection")):
+            with pytest.raises(RuntimeError):
+                await stream_export("SELECT 1", [], slot).__anext__()
+
+        assert _free_slots() == EXPORT_MAX_CONCURRENT
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,215 @@
+"""
+Tests for the log-template cache (log_templates.py).
+Masking, Drain-style mining and cache hits with the LLM call replaced by a fake.
+"""
+import pytest
+import asyncio
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_templates import (
+    mask_log, TemplateMiner, template_values, number_placeholders, fill_placeholders, LogTemplateCache
+)
+
+
+class FakeLLM:
+    """clean() stand-in: prefixes the templated log and keeps its placeholders."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = []
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, log_text, service_name):
+        self.calls.append(log_text)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        return "Cleaned: " + log_text
+
+
+def _mine(miner, raw_log):
+    tokens, masked = mask_log(raw_log)
+    cluster = miner.add(tokens)
+    return cluster, template_values(cluster.tokens, tokens, masked)
+
+
+class TestMasking:
+
+    def test_variable_values_are_masked_in_order(self):
+        tokens, values = mask_log(
+            "2024-01-15T10:00:00Z ERROR user 1234 from 10.0.0.1:8080 "
+            "req 0xdeadbeef id 3f2a1b4c-1234-5678-9abc-def012345678"
+        )
+
+        assert tokens == ["<*>", "ERROR", "user", "<*>", "from", "<*>", "req", "<*>", "id", "<*>"]
+        assert [kind for _, kind in values] == ["timestamp", "number", "ip", "hex", "uuid"]
+        assert values[2] == ("10.0.0.1:8080", "ip")
+
+    def test_digits_inside_identifiers_are_kept(self):
+        tokens, values = mask_log("worker_3 on node2 restarted")
+
+        assert tokens == ["worker_3", "on", "node2", "restarted"]
+        assert values == []
+
+
+class TestTemplateMiner:
+
+    def test_logs_differing_in_values_share_a_template(self):
+        miner = TemplateMiner(similarity=0.5)
+
+        first, _ = _mine(miner, "Connection to db-1 failed after 3 retries")
+        second, values = _mine(miner, "Connection to db-2 failed after 5 retries")
+
+        assert first is second
+        assert second.template == "Connection to db-<*> failed after <*> retries"
+        assert values == [("2", "number"), ("5", "number")]
+        assert len(miner) == 1
+
+    def test_differing_word_generalizes_to_wildcard(self):
+        """A position that differs between member logs becomes <*> and its word becomes a value."""
+        miner = TemplateMiner(similarity=0.5)
+        _mine(miner, "Payment declined for card visa")
+
+        cluster, values = _mine(miner, "Payment declined for card amex")
+
+        assert cluster.template == "Payment declined for card <*>"
+        assert values == [("amex", "value")]
+
+    def test_dissimilar_logs_get_separate_templates(self):
+        miner = TemplateMiner(similarity=0.5)
+
+        first, _ = _mine(miner, "Disk usage high on volume data")
+        second, _ = _mine(miner, "Disk quota exceeded by user alice")
+
+        assert first is not second
+        assert len(miner) == 2
+
+    def test_group_size_is_bounded(self):
+        miner = TemplateMiner(similarity=1.0, max_clusters_per_group=2)
+        for word in ("alpha", "beta", "gamma"):
+            _mine(miner, f"job failed {word}")
+
+        assert len(miner) == 2
+
+
+class TestPlaceholders:
+
+    def test_number_and_fill_round_trip(self):
+        values = [("db-7", "value"), ("30", "number")]
+
+        numbered = number_placeholders("Lost connection to <*> after <*> s", values)
+        filled = fill_placeholders(numbered, values)
+
+        assert numbered == "Lost connection to <V1:value> after <V2:number> s"
+        assert filled == "Lost connection to db-7 after 30 s"
+
+    def test_unknown_placeholders_are_dropped(self):
+        assert fill_placeholders("host <V1> code <V9>", [("web-1", "value")]) == "host web-1 code "
+
+
+class TestLogTemplateCache:
+
+    @pytest.mark.asyncio
+    async def test_repeat_template_is_served_without_llm(self):
+        """Only the first log of a template calls the LLM; later ones get their own values filled in."""
+        cache = LogTemplateCache(path=None)
+        llm = FakeLLM()
+
+        first = await cache.preprocess("timeout calling host-1 after 100 ms", "api", llm)
+        second = await cache.preprocess("timeout calling host-2 after 250 ms", "api", llm)
+
+        assert first == "Cleaned: timeout calling host-1 after 100 ms"
+        assert second == "Cleaned: timeout calling host-2 after 250 ms"
+        assert llm.calls == ["timeout calling host-<V1:number> after <V2:number> ms"]
+        stats = cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_is_per_service(self):
+        cache = LogTemplateCache(path=None)
+        llm = FakeLLM()
+
+        await cache.preprocess("timeout calling host-1 after 100 ms", "api", llm)
+        await cache.preprocess("timeout calling host-1 after 100 ms", "payments", llm)
+
+        assert len(llm.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_llm_call(self):
+        cache = LogTemplateCache(path=None)
+        llm = FakeLLM(delay=0.02)
+
+        results = await asyncio.gather(*(
+            cache.preprocess(f"timeout calling host-{i} after {i * 10} ms", "api", llm) for i in range(1, 6)
+        ))
+
+        assert len(llm.calls) == 1
+        assert results[3] == "Cleaned: timeout calling host-4 after 40 ms"
+        assert cache.get_stats()["shared_misses"] == 4
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_falls_back_to_raw_log_and_is_not_cached(self):
+        cache = LogTemplateCache(path=None)
+        llm = FakeLLM(fail=True)
+
+        result = await cache.preprocess("  timeout calling host-1 after 100 ms ", "api", llm)
+
+        assert result == "timeout calling host-1 after 100 ms"
+        assert cache.get_stats()["cached"] == 0
+        llm.fail = False
+        await cache.preprocess("timeout calling host-2 after 100 ms", "api", llm)
+        assert len(llm.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_literal_wildcard_bypasses_the_cache(self):
+        cache = LogTemplateCache(path=None)
+        llm = FakeLLM()
+
+        await cache.preprocess("glob <*> matched nothing", "api", llm)
+
+        assert llm.calls == ["glob <*> matched nothing"]
+        assert cache.get_stats()["bypassed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_capacity_evicts_least_recently_used(self):
+        cache = LogTemplateCache(path=None, capacity=1)
+        llm = FakeLLM()
+
+        await cache.preprocess("disk full on volume 1", "api", llm)
+        await cache.preprocess("queue depth 5 exceeds limit", "api", llm)
+        await cache.preprocess("disk full on volume 2", "api", llm)
+
+        assert len(llm.calls) == 3
+        assert cache.get_stats()["evictions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_saved_cache_is_reloaded(self, tmp_path):
+        """A restarted process serves known templates from the persisted file."""
+        path = str(tmp_path / "templates.json")
+        cache = LogTemplateCache(path=path)
+        await cache.preprocess("timeout calling host-1 after 100 ms", "api", FakeLLM())
+        cache.save()
+
+        with open(path) as f:
+            assert len(json.load(f)["entries"]) == 1
+
+        reloaded = LogTemplateCache(path=path)
+        llm = FakeLLM()
+        result = await reloaded.preprocess("timeout calling host-9 after 900 ms", "api", llm)
+
+        assert result == "Cleaned: timeout calling host-9 after 900 ms"
+        assert llm.calls == []
+
+    def test_corrupt_cache_file_is_ignored(self, tmp_path):
+        path = tmp_path / "templates.json"
+        path.write_text("{not json")
+
+        assert LogTemplateCache(path=str(path)).get_stats()["cached"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,218 @@
+"""
+Tests for the PagerDuty webhook handler (pagerduty_webhook.py).
+Payload parsing and incident processing with the database and embedding model mocked.
+"""
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import coalescing
+from coalescing import StormCoalescer
+from pagerduty_webhook import extract_pagerduty_incidents, process_pagerduty_incident
+
+
+def _incident(incident_id, title="Database connection pool exhausted", urgency="high"):
+    return {
+        "incident_id": incident_id,
+        "incident_number": incident_id,
+        "title": title,
+        "description": "",
+        "service_name": "api-service",
+        "urgency": urgency,
+        "created_at": "2024-01-15T10:00:00Z"
+    }
+
+
+async def _run_inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+class TestProcessIncident:
+    """Incident WorkItems are routed through the outbox unless coalesced."""
+
+    @pytest.fixture
+    def env(self):
+        coalescer = StormCoalescer(threshold=0.9, window_seconds=60)
+        insert = MagicMock(return_value=True)
+        suppressed = MagicMock()
+        with patch.object(coalescing, "COALESCE_ENABLED", True), \
+             patch.object(coalescing, "_coalescer", coalescer), \
+             patch("pagerduty_webhook.embed_text", AsyncMock(return_value=[1.0, 0.0, 0.0])), \
+             patch("pagerduty_webhook.pca_reduce", return_value=(0.1, 0.2, 0.3)), \
+             patch("pagerduty_webhook.run_in_db_executor", side_effect=_run_inline), \
+             patch("pagerduty_webhook.insert_work_item_with_outbox", insert), \
+             patch("pagerduty_webhook.record_coalesced_children") as children, \
+             patch("pagerduty_webhook.record_suppressed", suppressed):
+            yield {"coalescer": coalescer, "insert": insert, "children": children, "suppressed": suppressed}
+
+    @pytest.mark.asyncio
+    async def test_routed_incident_queues_vector_and_decision(self, env):
+        """A new incident is stored with its Weaviate upsert and decision trigger."""
+        result = await process_pagerduty_incident(_incident("P1"))
+
+        assert result["status"] == "success" and result["coalesced_into"] is None
+        events = env["insert"].call_args[0][2]
+        assert {event["kind"] for event in events} == {"vector_upsert", "decision"}
+        assert all(event["work_item_id"] == result["work_item_id"] for event in events)
+        env["suppressed"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_incident_coalesces_and_counts_suppressed_work(self, env):
+        """A near-duplicate is stored without outbox events and counted as suppressed."""
+        first = await process_pagerduty_incident(_incident("P1"))
+        second = await process_pagerduty_incident(_incident("P2"))
+
+        assert second["coalesced_into"] == first["work_item_id"]
+        assert env["insert"].call_args[0][2] == []
+        env["children"].assert_called_once_with({first["work_item_id"]: 1})
+        env["suppressed"].assert_called_once_with(vector_writes=1, decisions=1)
+
+    @pytest.mark.asyncio
+    async def test_failed_insert_releases_parent_reservation(self, env):
+        """An incident that could not be stored is not a parent for later ones."""
+        env["insert"].side_effect = RuntimeError("db down")
+        with pytest.raises(RuntimeError):
+            await process_pagerduty_incident(_incident("P1"))
+
+        env["insert"].side_effect = None
+        result = await process_pagerduty_incident(_incident("P2"))
+        assert result["coalesced_into"] is None
+
+    @pytest.mark.asyncio
+    async def test_already_stored_incident_releases_parent_reservation(self, env):
+        """A redelivered incident (insert skipped) does not leave a phantom parent."""
+        env["insert"].return_value = False
+        result = await process_pagerduty_incident(_incident("P1"))
+        assert result["status"] == "duplicate"
+
+        env["insert"].return_value = True
+        result = await process_pagerduty_incident(_incident("P2"))
+        assert result["coalesced_into"] is None
+
+    @pytest.mark.asyncio
+    async def test_embedding_failure_still_routes_the_incident(self, env):
+        """Without an embedding the incident is routed (decision only) and not coalesced."""
+        with patch("pagerduty_webhook.embed_text", AsyncMock(side_effect=RuntimeError("queue full"))):
+            result = await process_pagerduty_incident(_incident("P1"))
+
+        assert result["coalesced_into"] is None
+        assert [event["kind"] for event in env["insert"].call_args[0][2]] == ["decision"]
+
+
+class TestExtractIncidents:
+    """v3 single-event and v2 multi-message payloads normalize to the same fields."""
+
+    def test_v3_event_with_incident_as_data(self):
+        payload = {"event": {
+            "event_type": "incident.triggered",
+            "data": {
+                "type": "incident",
+                "id": "Q1ABC",
+                "title": "Checkout latency above SLO",
+                "service": {"summary": "Payments API"},
+                "urgency": "high",
+                "created_at": "2024-01-15T10:00:00Z"
+            }
+        }}
+
+        incidents = extract_pagerduty_incidents(payload)
+
+        assert incidents == [{
+            "incident_id": "Q1ABC",
+            "incident_number": "Q1ABC",
+            "title": "Checkout latency above SLO",
+            "description": "",
+            "service_name": "Payments API",
+            "urgency": "high",
+            "created_at": "2024-01-15T10:00:00Z"
+        }]
+
+    def test_v3_event_with_nested_incident(self):
+        payload = {"event": {
+            "event_type": "incident.created",
+            "data": {"incident": {
+                "id": "Q2",
+                "incident_number": 42,
+                "title": "Disk full",
+                "body": {"details": "/var at 100%"},
+                "service": {"name": "storage"},
+                "urgency": "low"
+            }}
+        }}
+
+        [incident] = extract_pagerduty_incidents(payload)
+
+        assert incident["incident_number"] == "42"
+        assert incident["description"] == "/var at 100%"
+        assert incident["service_name"] == "storage"
+
+    def test_v3_non_creation_event_is_skipped(self):
+        payload = {"event": {"event_type": "incident.resolved", "data": {"type": "incident", "id": "Q1"}}}
+
+        assert extract_pagerduty_incidents(payload) == []
+
+    def test_v2_messages_yield_every_triggered_incident(self):
+        """Each creation message becomes an incident; acknowledge/resolve messages are skipped."""
+        payload = {"messages": [
+            {"event": "incident.trigger", "incident": {
+                "id": "P1",
+                "incident_number": 1,
+                "trigger_summary_data": {"subject": "CPU high on web-1"},
+                "service": {"name": "web"},
+                "urgency": "high",
+                "created_on": "2024-01-15T10:00:00Z"
+            }},
+            {"event": "incident.acknowledge", "incident": {"id": "P1"}},
+            {"type": "incident.trigger", "data": {"incident": {"id": "P2", "summary": "CPU high on web-2"}}},
+            {"event": "incident.resolve", "incident": {"id": "P0"}}
+        ]}
+
+        incidents = extract_pagerduty_incidents(payload)
+
+        assert [incident["incident_id"] for incident in incidents] == ["P1", "P2"]
+        assert incidents[0]["title"] == "CPU high on web-1"
+        assert incidents[0]["created_at"] == "2024-01-15T10:00:00Z"
+        assert incidents[1]["title"] == "CPU high on web-2"
+        assert incidents[1]["urgency"] == "low"
+
+    def test_incident_without_id_is_skipped(self):
+        payload = {"messages": [{"event": "incident.trigger", "incident": {"title": "no id"}}]}
+
+        assert extract_pagerduty_incidents(payload) == []
+
+
+class TestMalformedPayloads:
+    """Valid JSON with the wrong shape is skipped, not a 500."""
+
+    @pytest.mark.parametrize("payload", [
+        {"event": "incident.triggered"},
+        {"event": None},
+        {"event": {"event_type": "incident.triggered", "data": "oops"}},
+        {"event": {"event_type": "incident.triggered", "data": {"incident": ["P1"]}}},
+        {"event": {"event_type": ["incident.triggered"], "data": {}}},
+        {"messages": ["oops", None, {"event": "incident.trigger", "data": "oops"}]},
+        [],
+        None
+    ])
+    def test_malformed_payload_yields_no_incidents(self, payload):
+        assert extract_pagerduty_incidents(payload) == []
+
+    def test_malformed_nested_fields_fall_back_to_defaults(self):
+        """Bad optional fields do not drop an otherwise valid incident."""
+        payload = {"messages": [{
+            "event": "incident.trigger",
+            "incident": {"id": "P1", "trigger_summary_data": "oops", "body": "oops", "urgency": 3}
+        }]}
+
+        incidents = extract_pagerduty_incidents(payload)
+
+        assert len(incidents) == 1
+        assert incidents[0]["urgency"] == "low"
+        assert incidents[0]["title"] == ""
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
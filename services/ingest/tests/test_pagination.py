@@ -0,0 +1,105 @@
+"""
+Tests for keyset pagination helpers (pagination.py).
+"""
+import pytest
+import base64
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pagination import encode_cursor, decode_cursor, keyset_page, estimate_row_count, exact_row_count
+
+
+def _b64(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+class TestCursor:
+
+    def test_round_trip(self):
+        created_at = datetime(2024, 1, 15, 10, 30, 45, 123456)
+        cursor = encode_cursor(created_at, "wi-abc")
+
+        assert decode_cursor(cursor) == (created_at, "wi-abc")
+
+    def test_cursor_is_url_safe_without_padding(self):
+        cursor = encode_cursor(datetime(2024, 1, 15), "wi-?/+=")
+
+        assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+        assert decode_cursor(cursor)[1] == "wi-?/+="
+
+    @pytest.mark.parametrize("cursor", [
+        "",
+        "not base64 at all!",
+        _b64("not json"),
+        _b64(json.dumps({"created_at": "2024-01-15"})),
+        _b64(json.dumps(["2024-01-15T10:00:00"])),
+        _b64(json.dumps(["2024-01-15T10:00:00", "wi-1", "extra"])),
+        _b64(json.dumps(["yesterday", "wi-1"])),
+        _b64(json.dumps([1705312800, "wi-1"])),
+        _b64(json.dumps("2024-01-15T10:00:00")),
+    ])
+    def test_malformed_or_tampered_cursor_raises_value_error(self, cursor):
+        """Anything but a cursor we issued is a ValueError (the endpoints turn it into 400)."""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestKeysetPage:
+
+    def _rows(self, n):
+        start = datetime(2024, 1, 15, 12, 0)
+        return [{"id": f"wi-{i}", "created_at": start - timedelta(minutes=i)} for i in range(n)]
+
+    def test_last_page_has_no_cursor(self):
+        rows = self._rows(3)
+
+        page, next_cursor = keyset_page(rows, limit=3)
+
+        assert page == rows
+        assert next_cursor is None
+
+    def test_extra_row_is_trimmed_and_cursor_points_at_last_returned_row(self):
+        rows = self._rows(4)
+
+        page, next_cursor = keyset_page(rows, limit=3)
+
+        assert page == rows[:3]
+        assert decode_cursor(next_cursor) == (rows[2]["created_at"], "wi-2")
+
+    def test_custom_key_names(self):
+        rows = [{"key": "a", "ts": datetime(2024, 1, 2)}, {"key": "b", "ts": datetime(2024, 1, 1)}]
+
+        _, next_cursor = keyset_page(rows, limit=1, created_at_key="ts", id_key="key")
+
+        assert decode_cursor(next_cursor) == (datetime(2024, 1, 2), "a")
+
+
+class TestCounts:
+
+    @pytest.mark.parametrize("plan", [
+        [{"Plan": {"Plan Rows": 1234}}],
+        json.dumps([{"Plan": {"Plan Rows": 1234}}]),
+    ])
+    def test_estimate_reads_planner_rows(self, plan):
+        """The estimate comes from EXPLAIN; psycopg2 may return the plan parsed or as text."""
+        with patch("pagination.execute_query", return_value=[{"QUERY PLAN": plan}]) as mock_query:
+            total = estimate_row_count("FROM work_items WHERE service = %s", ["api"])
+
+        assert total == 1234
+        query, params = mock_query.call_args[0]
+        assert query.startswith("EXPLAIN (FORMAT JSON) SELECT 1 FROM work_items")
+        assert params == ["api"]
+
+    def test_exact_count(self):
+        with patch("pagination.execute_query", return_value=[{"total": 42}]) as mock_query:
+            assert exact_row_count("FROM work_items", None) == 42
+        assert "COUNT(*)" in mock_query.call_args[0][0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
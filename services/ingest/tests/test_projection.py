@@ -0,0 +1,154 @@
+"""
+Tests for the persisted 3D projection (projection.py).
+Parity with the per-process sklearn PCA it replaced, persistence and the first fit.
+"""
+import pytest
+import numpy as np
+from collections import deque
+from unittest.mock import patch
+from sklearn.decomposition import PCA
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import projection
+from projection import Projection, fit_projection, save_projection, load_projection, EMBEDDING_DIM
+from embedding_utils import pca_reduce, pca_reduce_batch
+
+
+def _embeddings(n, seed=0):
+    """Unit-norm 384D vectors with most variance in a few directions, like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    latent = rng.standard_normal((n, 5)) * [5.0, 3.0, 2.0, 0.5, 0.5]
+    basis = rng.standard_normal((5, EMBEDDING_DIM))
+    vectors = latent @ basis + rng.standard_normal((n, EMBEDDING_DIM)) * 0.1
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _assert_same_up_to_sign(actual, expected, atol):
+    """PCA components are defined up to sign; align each axis before comparing."""
+    signs = np.sign(np.sum(actual * expected, axis=0))
+    np.testing.assert_allclose(actual * signs, expected, atol=atol)
+
+
+@pytest.fixture
+def fresh_state(tmp_path):
+    """Empty module state with PROJECTION_PATH in a temp directory."""
+    path = str(tmp_path / "pca_3d.npz")
+    with patch.object(projection, "PROJECTION_PATH", path), \
+         patch.object(projection, "_projection", None), \
+         patch.object(projection, "_projection_mtime", None), \
+         patch.object(projection, "_last_reload_check", 0.0), \
+         patch.object(projection, "_sample", deque(maxlen=projection.PROJECTION_SAMPLE_SIZE)), \
+         patch.object(projection, "_since_update", 0):
+        yield path
+
+
+class TestParityWithPCA:
+    """A single-batch fit gives the same coordinates as sklearn PCA on that batch."""
+
+    def test_single_batch_fit_matches_pca(self):
+        sample = _embeddings(200)
+
+        fitted = fit_projection(sample)
+        expected = PCA(n_components=3).fit(sample).transform(sample)
+
+        _assert_same_up_to_sign(fitted.project(sample), expected, atol=1e-8)
+
+    def test_chunked_fit_stays_close_to_pca(self):
+        """Partial fits over chunks recover the same dominant axes."""
+        sample = _embeddings(3000, seed=1)
+
+        fitted = fit_projection(sample, batch_size=500)
+        expected = PCA(n_components=3).fit(sample).transform(sample)
+
+        _assert_same_up_to_sign(fitted.project(sample), expected, atol=1e-3)
+
+    def test_batch_and_single_projection_agree(self):
+        fitted = fit_projection(_embeddings(100))
+        batch = _embeddings(10, seed=2)
+
+        single = np.vstack([fitted.project(row[None, :]) for row in batch])
+
+        np.testing.assert_allclose(fitted.project(batch), single)
+
+    def test_too_few_embeddings_cannot_be_fitted(self):
+        with pytest.raises(ValueError):
+            fit_projection(_embeddings(2))
+
+
+class TestPersistence:
+
+    def test_saved_projection_round_trips(self, tmp_path):
+        path = str(tmp_path / "pca_3d.npz")
+        fitted = fit_projection(_embeddings(100))
+
+        save_projection(fitted, path)
+        loaded = load_projection(path)
+
+        batch = _embeddings(5, seed=3)
+        np.testing.assert_allclose(loaded.project(batch), fitted.project(batch))
+        assert loaded.version == 1
+        assert loaded.n_samples_seen == 100
+
+    def test_loaded_projection_continues_partial_fit(self, tmp_path):
+        """A reloaded state resumes fitting exactly as if it had never been saved."""
+        path = str(tmp_path / "pca_3d.npz")
+        first, more = _embeddings(100), _embeddings(100, seed=4)
+        fitted = fit_projection(first)
+        save_projection(fitted, path)
+
+        resumed = fit_projection(more, base=load_projection(path))
+        in_memory = fit_projection(more, base=fitted)
+
+        assert resumed.version == 2
+        assert resumed.n_samples_seen == 200
+        np.testing.assert_allclose(resumed.components, in_memory.components)
+
+    def test_unreadable_file_is_ignored(self, tmp_path):
+        path = tmp_path / "pca_3d.npz"
+        path.write_bytes(b"not an npz")
+
+        assert load_projection(str(path)) is None
+        assert load_projection(str(tmp_path / "missing.npz")) is None
+
+
+class TestSharedProjection:
+
+    def test_seeded_basis_is_deterministic_and_orthonormal(self):
+        first, second = Projection.seeded(), Projection.seeded()
+
+        np.testing.assert_array_equal(first.components, second.components)
+        np.testing.assert_allclose(first.components @ first.components.T, np.eye(3), atol=1e-12)
+        assert not first.fitted
+
+    def test_first_fit_is_saved_after_min_samples(self, fresh_state):
+        with patch.object(projection, "PROJECTION_MIN_FIT_SAMPLES", 20):
+            pca_reduce_batch(_embeddings(10).tolist())
+            assert not os.path.exists(fresh_state)
+
+            pca_reduce_batch(_embeddings(10, seed=5).tolist())
+
+        saved = load_projection(fresh_state)
+        assert saved is not None and saved.version == 1
+        assert projection.get_projection_stats()["fitted"]
+
+    def test_same_embedding_gets_same_coordinates_across_calls(self, fresh_state):
+        """Unlike the per-process PCA, the batch path and the single path share one projection."""
+        vectors = _embeddings(5, seed=6).tolist()
+
+        batch = pca_reduce_batch(vectors)
+        single = [pca_reduce(vector) for vector in vectors]
+
+        np.testing.assert_allclose(batch, single)
+
+    def test_zero_vectors_do_not_feed_the_fit(self, fresh_state):
+        pca_reduce_batch([[0.0] * EMBEDDING_DIM] * 5)
+
+        assert projection.get_projection_stats()["rolling_sample"] == 0
+        assert pca_reduce([]) == (0.0, 0.0, 0.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -3,9 +3,11 @@ Weaviate client for storing WorkItems as vectors.
 """
 import os
 import logging
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
+from weaviate.classes.data import DataObject
+from weaviate.util import generate_uuid5
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +67,15 @@ def _ensure_schema():
         logger.error(f"Failed to create Weaviate schema: {e}")
 
 
+def work_item_uuid(work_item_id: str) -> str:
+    """
+    Deterministic Weaviate object UUID for a work item ID.
+    
+    Decision Service derives the same UUID to read the stored vector back.
+    """
+    return generate_uuid5(work_item_id)
+
+
 def store_work_item(
     work_item_id: str,
     description: str,
@@ -100,7 +111,7 @@ def store_work_item(
                 "severity": severity,
             },
             vector=embedding,
-            uuid=work_item_id  # Use work_item_id as UUID
+            uuid=work_item_uuid(work_item_id)  # Deterministic UUID derived from work_item_id
         )
         logger.debug(f"Stored WorkItem {work_item_id} in Weaviate")
         return True
@@ -108,3 +119,49 @@ def store_work_item(
         logger.error(f"Failed to store WorkItem in Weaviate: {e}")
         return False
 
+
+
+def store_work_items_batch(items: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """
+    Store many WorkItems in Weaviate with one batch import.
+    
+    Args:
+        items: Dicts with id, description, service, severity and embedding
+    
+    Returns:
+        Work item ID -> None if stored, else the error message
+    """
+    if not items:
+        return {}
+    
+    client = get_weaviate_client()
+    if not client:
+        logger.warning("Weaviate client not available, skipping vector storage")
+        return {item["id"]: "Weaviate client not available" for item in items}
+    
+    try:
+        collection = client.collections.get("WorkItem")
+        result = collection.data.insert_many([
+            DataObject(
+                properties={
+                    "id": item["id"],
+                    "description": item["description"],
+                    "service": item["service"],
+                    "severity": item["severity"],
+                },
+                vector=item["embedding"],
+                uuid=work_item_uuid(item["id"])
+            )
+            for item in items
+        ])
+    except Exception as e:
+        logger.error(f"Failed to batch store WorkItems in Weaviate: {e}")
+        return {item["id"]: str(e) for item in items}
+    
+    errors = {item["id"]: None for item in items}
+    for index, error in (result.errors or {}).items():
+        errors[items[index]["id"]] = getattr(error, "message", str(error))
+    if result.errors:
+        logger.warning(f"{len(result.errors)}/{len(items)} WorkItems failed Weaviate batch import")
+    logger.debug(f"Batch stored {len(items) - len(result.errors or {})} WorkItems in Weaviate")
+    return errors
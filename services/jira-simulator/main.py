@@ -10,8 +10,9 @@ from datetime import datetime, timedelta
 import logging
 
 from jql_parser import parse_jql
-from db import execute_query, execute_update, get_next_issue_key
+from db import execute_query, execute_update, execute_query_async, get_next_issue_key, get_pool_stats
 from outcome_generator import OutcomeGenerator
+from http_client import close_http_clients, get_http_client_stats
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -39,7 +40,12 @@ class SearchResponse(BaseModel):
 @app.get("/healthz")
 async def health():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "jira-simulator"}
+    return {
+        "status": "healthy",
+        "service": "jira-simulator",
+        "db_pool": get_pool_stats(),
+        "http_clients": get_http_client_stats()
+    }
 
 
 @app.get("/rest/api/3/search")
@@ -60,17 +66,14 @@ async def search_issues(
         # Parse JQL into SQL WHERE clause
         where_clause, params = parse_jql(jql)
         
-        # Build SQL query
-        # First, get total count
+        # Build SQL queries: total count + the requested page
         count_query = f"""
             SELECT COUNT(*) as total
             FROM jira_issues
             WHERE {where_clause}
         """
-        count_result = execute_query(count_query, params)
-        total = count_result[0]['total'] if count_result else 0
         
-        # Then get the actual issues with pagination
+        # key breaks created_at ties, so pages fetched concurrently neither overlap nor skip issues
         query = f"""
             SELECT 
                 id,
@@ -89,14 +92,19 @@ async def search_issues(
                 resolved_at
             FROM jira_issues
             WHERE {where_clause}
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, key
             LIMIT %s OFFSET %s
         """
         
         # Add pagination parameters
         params_with_pagination = params + [maxResults, startAt]
         
-        results = execute_query(query, params_with_pagination)
+        # Run both off the event loop, concurrently
+        count_result, results = await asyncio.gather(
+            execute_query_async(count_query, params),
+            execute_query_async(query, params_with_pagination)
+        )
+        total = count_result[0]['total'] if count_result else 0
         
         # Convert to Jira API format
         issues = []
@@ -107,7 +115,7 @@ async def search_issues(
             
             if row['assignee_account_id']:
                 assignee_query = "SELECT account_id, display_name, email_address FROM jira_users WHERE account_id = %s"
-                assignee_result = execute_query(assignee_query, [row['assignee_account_id']])
+                assignee_result = await execute_query_async(assignee_query, [row['assignee_account_id']])
                 if assignee_result:
                     assignee = {
                         "accountId": assignee_result[0]['account_id'],
@@ -117,7 +125,7 @@ async def search_issues(
             
             if row['reporter_account_id']:
                 reporter_query = "SELECT account_id, display_name, email_address FROM jira_users WHERE account_id = %s"
-                reporter_result = execute_query(reporter_query, [row['reporter_account_id']])
+                reporter_result = await execute_query_async(reporter_query, [row['reporter_account_id']])
                 if reporter_result:
                     reporter = {
                         "accountId": reporter_result[0]['account_id'],
@@ -127,7 +135,7 @@ async def search_issues(
             
             # Get project details
             project_query = "SELECT key, name FROM jira_projects WHERE key = %s"
-            project_result = execute_query(project_query, [row['project_key']])
+            project_result = await execute_query_async(project_query, [row['project_key']])
             project = None
             if project_result:
                 project = {
@@ -574,6 +582,7 @@ async def shutdown_event():
     if outcome_generator:
         await outcome_generator.stop()
         logger.info("Outcome generator stopped")
+    await close_http_clients()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,13 @@
 """
 Outcome Generator - Automatically generates outcomes when Jira issues are completed or reassigned.
 """
-import os
 import asyncio
-import httpx
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import logging
 
 from db import execute_query, execute_update
+from http_client import http_request
 
 logger = logging.getLogger(__name__)
 
@@ -55,26 +54,26 @@ class OutcomeGenerator:
         
         logger.info(f"Found {len(all_outcomes)} new outcomes")
         
-        # Send to Ingest service
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            for outcome in all_outcomes:
-                try:
-                    # Store outcome in database (for dedupe)
-                    self._store_outcome(outcome)
-                    
-                    # Send to Ingest
-                    response = await client.post(
-                        f"{self.ingest_url}/webhooks/jira",
-                        json={"outcome": outcome}
-                    )
-                    response.raise_for_status()
-                    
-                    # Mark as processed
-                    self._mark_outcome_processed(outcome['event_id'])
-                    
-                    logger.info(f"Outcome {outcome['event_id']} sent to Ingest")
-                except Exception as e:
-                    logger.error(f"Failed to send outcome {outcome['event_id']}: {e}")
+        # Send to Ingest service (shared keep-alive client)
+        for outcome in all_outcomes:
+            try:
+                # Store outcome in database (for dedupe)
+                self._store_outcome(outcome)
+                
+                # Send to Ingest
+                response = await http_request(
+                    "ingest", "POST", f"{self.ingest_url}/webhooks/jira",
+                    json={"outcome": outcome},
+                    timeout=10.0
+                )
+                response.raise_for_status()
+                
+                # Mark as processed
+                self._mark_outcome_processed(outcome['event_id'])
+                
+                logger.info(f"Outcome {outcome['event_id']} sent to Ingest")
+            except Exception as e:
+                logger.error(f"Failed to send outcome {outcome['event_id']}: {e}")
         
         # Update last check time
         self.last_check_time = datetime.now()
@@ -0,0 +1,118 @@
+"""
+Concurrency benchmark for the async DB layer.
+
+Fires N parallel GET /rest/api/3/search requests at the in-process app (via
+httpx's ASGI transport, so only the event loop + Postgres are measured) and
+reports request latency percentiles and event-loop lag for:
+
+- blocking: search_issues' queries run the sync psycopg2 helpers directly on
+  the event loop (the behaviour before the async DB layer)
+- async:    queries go through execute_query_async (bounded DB executor)
+
+Requires a reachable Postgres (POSTGRES_URL) with the Jira simulator schema
+and some seeded issues (python ../../scripts/seed_jira_data.py).
+
+Usage:
+    python scripts/benchmark_db_concurrency.py [--concurrency 100] [--requests 500]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import db  # noqa: E402
+import main  # noqa: E402
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def _blocking_execute_query(query, params=None, commit=False):
+    """Pre-async behaviour: run the sync helper on the event loop."""
+    return db.execute_query(query, params, commit)
+
+
+async def _heartbeat(stop: asyncio.Event, lags: list, interval: float = 0.005):
+    """Measure how late the event loop wakes a sleeping task."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1000)
+
+
+async def _run(mode: str, jql: str, concurrency: int, total_requests: int):
+    original = main.execute_query_async
+    if mode == "blocking":
+        main.execute_query_async = _blocking_execute_query
+
+    latencies = []
+    lags = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=main.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def one():
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.get(
+                        "/rest/api/3/search", params={"jql": jql, "maxResults": 20}
+                    )
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    response.raise_for_status()
+
+            stop = asyncio.Event()
+            heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+            wall_start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(total_requests)))
+            wall = time.perf_counter() - wall_start
+            stop.set()
+            await heartbeat
+    finally:
+        main.execute_query_async = original
+
+    return {
+        "mode": mode,
+        "p50": statistics.median(latencies),
+        "p99": _percentile(latencies, 99),
+        "rps": total_requests / wall,
+        "loop_lag_p99": _percentile(lags, 99),
+        "loop_lag_max": max(lags) if lags else 0.0
+    }
+
+
+async def _main(args):
+    # Warm the pool so connection setup isn't counted against the first mode
+    await db.execute_query_async("SELECT 1")
+
+    print(f"concurrency={args.concurrency} requests={args.requests} pool_max={db.DB_POOL_MAX_SIZE} jql={args.jql!r}")
+    print(f"{'mode':<9} | {'p50 ms':>8} | {'p99 ms':>8} | {'req/s':>8} | {'loop lag p99 ms':>15} | {'loop lag max ms':>15}")
+    print("-" * 80)
+    for mode in ("blocking", "async"):
+        r = await _run(mode, args.jql, args.concurrency, args.requests)
+        print(
+            f"{r['mode']:<9} | {r['p50']:>8.1f} | {r['p99']:>8.1f} | {r['rps']:>8.1f} | "
+            f"{r['loop_lag_p99']:>15.1f} | {r['loop_lag_max']:>15.1f}"
+        )
+    print(f"\npool stats: {db.get_pool_stats()}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--jql", default="status=Done")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
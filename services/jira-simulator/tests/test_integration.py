@@ -33,12 +33,12 @@ class TestJiraToIngestIntegration:
             mock_query.return_value = mock_outcomes
             
             # Mock Ingest Service call
-            with patch('httpx.AsyncClient') as mock_client:
+            with patch('http_client.get_http_client') as mock_client:
                 mock_response = MagicMock()
                 mock_response.status_code = 200
                 mock_response.raise_for_status = MagicMock()
                 
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+                mock_client.return_value.request = AsyncMock(return_value=mock_response)
                 
                 # Create outcome generator
                 generator = OutcomeGenerator(
@@ -55,12 +55,12 @@ class TestJiraToIngestIntegration:
                     
                     # Verify Ingest was called
                     assert mock_client.called
-                    post_call = mock_client.return_value.__aenter__.return_value.post
+                    post_call = mock_client.return_value.request
                     assert post_call.called
                     
                     # Verify correct URL
                     call_args = post_call.call_args
-                    assert "webhooks/jira" in str(call_args[0][0])
+                    assert "webhooks/jira" in str(call_args[0][1])
                     
                     # Verify payload structure
                     payload = call_args[1]["json"]
@@ -84,9 +84,9 @@ class TestJiraToIngestIntegration:
         with patch('outcome_generator.execute_query') as mock_query:
             mock_query.return_value = mock_outcomes
             
-            with patch('httpx.AsyncClient') as mock_client:
+            with patch('http_client.get_http_client') as mock_client:
                 from httpx import TimeoutException
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+                mock_client.return_value.request = AsyncMock(
                     side_effect=TimeoutException("Request timed out")
                 )
                 
@@ -120,14 +120,14 @@ class TestJiraToIngestIntegration:
         with patch('outcome_generator.execute_query') as mock_query:
             mock_query.return_value = mock_outcomes
             
-            with patch('httpx.AsyncClient') as mock_client:
+            with patch('http_client.get_http_client') as mock_client:
                 mock_response = MagicMock()
                 mock_response.status_code = 500
                 mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
                     "Server error", request=MagicMock(), response=mock_response
                 )
                 
-                mock_client.return_value.__aenter__.return_value.post = AsyncMock(return_value=mock_response)
+                mock_client.return_value.request = AsyncMock(return_value=mock_response)
                 
                 generator = OutcomeGenerator(
                     ingest_url="http://ingest:8000",
@@ -206,6 +206,25 @@ class TestOutcomePollingEndpoint:
             assert len(call_args[0][1]) >= 1  # Should have timestamp param
 
 
+class TestSearchPagination:
+    """Test GET /rest/api/3/search paging."""
+    
+    def test_pages_have_a_unique_sort_order(self):
+        """Pages are ordered by created_at with key as tiebreaker (pages are fetched concurrently)."""
+        from main import app
+        from fastapi.testclient import TestClient
+        
+        client = TestClient(app)
+        
+        with patch('main.execute_query_async', new=AsyncMock(side_effect=[[{"total": 0}], []])) as mock_query:
+            response = client.get("/rest/api/3/search?jql=status=Done&startAt=100&maxResults=100")
+        
+        assert response.status_code == 200
+        page_query, page_params = mock_query.await_args_list[1].args
+        assert "ORDER BY created_at DESC, key" in page_query
+        assert page_params[-2:] == [100, 100]
+
+
 class TestEndToEndOutcomeFlow:
     """Test complete outcome generation flow."""
     
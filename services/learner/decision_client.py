@@ -6,6 +6,8 @@ import httpx
 import logging
 from typing import Optional, Dict, Any
 
+from http_client import http_request
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,12 +24,12 @@ async def get_decision_by_work_item(work_item_id: str) -> Optional[Dict[str, Any
     decision_url = os.getenv("DECISION_SERVICE_URL", "http://decision:8002")
     
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                f"{decision_url}/decisions/{work_item_id}"
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http_request(
+            "decision", "GET", f"{decision_url}/decisions/{work_item_id}",
+            timeout=5.0
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.TimeoutException:
         logger.warning(f"Decision Service timeout when fetching decision for {work_item_id}")
         return None
@@ -54,3 +56,31 @@ async def get_decision_by_id(decision_id: str) -> Optional[Dict[str, Any]]:
     # For now, return None
     return None
 
+
+
+async def invalidate_candidate_cache(service: str, version: int) -> bool:
+    """
+    Tell Decision Service that profiles for a service changed so it drops its
+    cached copy.
+    
+    Args:
+        service: Service whose stats changed
+        version: New profile version stamp (see stats_service.bump_profile_version)
+    
+    Returns:
+        True if Decision Service acknowledged the invalidation
+    """
+    decision_url = os.getenv("DECISION_SERVICE_URL", "http://decision:8002")
+    
+    try:
+        response = await http_request(
+            "decision", "POST", f"{decision_url}/cache/candidates/invalidate",
+            json={"service": service, "version": version},
+            timeout=2.0
+        )
+        response.raise_for_status()
+        return True
+    except Exception as e:
+        # Decision's cache TTL bounds staleness if this is missed
+        logger.warning(f"Failed to invalidate Decision candidate cache for {service}: {e}")
+        return False
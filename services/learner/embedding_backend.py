@@ -0,0 +1,183 @@
+"""
+Selectable CPU embedding backend for Learner Service.
+
+EMBEDDING_BACKEND=torch (default) runs SentenceTransformer('all-MiniLM-L6-v2')
+in PyTorch. EMBEDDING_BACKEND=onnx runs the same model exported to ONNX
+(ingest scripts/export_onnx_model.py; int8 dynamic quantization by default) on
+onnxruntime with a `tokenizers` fast tokenizer - mean pooling + L2
+normalization as in the sentence-transformers pipeline, so vectors stay
+comparable (cosine parity is checked by the export script and the learner
+tests). Both backends expose the same encode() used by embedding_utils.
+
+The model is loaded and warmed up at startup (warm_up_embedding_model, called
+from the lifespan) and GET /readyz stays 503 until that finishes, so the first
+request no longer pays the model load.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Dict, Any, List, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "/app/models/all-MiniLM-L6-v2-onnx")
+EMBEDDING_ONNX_QUANTIZED = os.getenv("EMBEDDING_ONNX_QUANTIZED", "true").lower() == "true"
+# Intra-op threads per inference call (0 = runtime default, i.e. all cores)
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "256"))
+
+_WARM_UP_TEXT = "Database connection pool exhausted in api-service"
+
+
+class OnnxSentenceEncoder:
+    """all-MiniLM-L6-v2 on onnxruntime with a SentenceTransformer-compatible encode()."""
+
+    def __init__(self, model_dir: str, quantized: bool = True, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = "model_int8.onnx" if quantized else "model.onnx"
+        self.model_path = os.path.join(model_dir, model_file)
+        self.quantized = quantized
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=EMBEDDING_MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over non-padding tokens
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 384), dtype=np.float32)
+
+        # Sort by length so each batch pads to similar lengths (as sentence-transformers does)
+        order = np.argsort([-len(t) for t in texts])
+        out = np.empty((len(texts), 384), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            out[idx] = self._encode_batch([texts[i] for i in idx])
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out = out / np.clip(norms, 1e-12, None)
+        return out[0] if single else out
+
+
+_model = None
+_model_lock = threading.Lock()
+_state: Dict[str, Any] = {
+    "backend": None,
+    "requested_backend": EMBEDDING_BACKEND,
+    "ready": False,
+    "load_ms": None,
+    "warmup_ms": None,
+    "error": None
+}
+
+
+def _load_torch():
+    from sentence_transformers import SentenceTransformer
+    if EMBEDDING_THREADS > 0:
+        import torch
+        torch.set_num_threads(EMBEDDING_THREADS)
+    return SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+
+
+def load_embedding_model():
+    """
+    Load the configured backend once (thread-safe).
+
+    Falls back to the PyTorch model if the ONNX runtime or exported files are
+    missing, so a misconfigured node still serves embeddings.
+
+    Returns:
+        Model object with a SentenceTransformer-compatible encode()
+    """
+    global _model
+    if _model is not None:
+        return _model
+    with _model_lock:
+        if _model is not None:
+            return _model
+        start = time.perf_counter()
+        model, backend = None, "torch"
+        if EMBEDDING_BACKEND == "onnx":
+            try:
+                model = OnnxSentenceEncoder(EMBEDDING_ONNX_DIR, EMBEDDING_ONNX_QUANTIZED, EMBEDDING_THREADS)
+                backend = "onnx-int8" if EMBEDDING_ONNX_QUANTIZED else "onnx"
+            except Exception as e:
+                _state["error"] = f"ONNX backend unavailable, using torch: {e}"
+                logger.error(_state["error"])
+        if model is None:
+            model = _load_torch()
+        _state["backend"] = backend
+        _state["load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"Embedding model loaded ({backend}, threads={EMBEDDING_THREADS or 'default'}) in {_state['load_ms']}ms")
+        _model = model
+    return _model
+
+
+def warm_up_embedding_model() -> bool:
+    """
+    Load the model and run one inference (allocations, kernel selection), then
+    mark the service ready. Safe to call more than once.
+
+    Returns:
+        True if the model is ready
+    """
+    if _state["ready"]:
+        return True
+    try:
+        model = load_embedding_model()
+        start = time.perf_counter()
+        model.encode([_WARM_UP_TEXT] * 4, convert_to_numpy=True, normalize_embeddings=True)
+        _state["warmup_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        _state["ready"] = True
+        logger.info(f"Embedding model warmed up in {_state['warmup_ms']}ms")
+    except Exception as e:
+        _state["error"] = f"Embedding warm-up failed: {e}"
+        logger.error(_state["error"])
+    return _state["ready"]
+
+
+def is_embedding_model_ready() -> bool:
+    """True once warm_up_embedding_model has completed."""
+    return _state["ready"]
+
+
+def get_embedding_backend_stats() -> Dict[str, Any]:
+    """Active backend, thread setting, load / warm-up time and readiness."""
+    return {**_state, "threads": EMBEDDING_THREADS, "model": EMBEDDING_MODEL_NAME}
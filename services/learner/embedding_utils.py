@@ -4,38 +4,21 @@ Embedding generation and PCA reduction utilities.
 import logging
 import numpy as np
 from typing import List, Optional, Tuple
-from sentence_transformers import SentenceTransformer
-from sklearn.decomposition import PCA
-import pickle
-import os
 
-logger = logging.getLogger(__name__)
+from embedding_backend import load_embedding_model
+from projection import project_embeddings
 
-# Global model instances
-_embedding_model: Optional[SentenceTransformer] = None
-_pca_model: Optional[PCA] = None
-_pca_fitted: bool = False
+logger = logging.getLogger(__name__)
 
 
-def get_embedding_model() -> SentenceTransformer:
-    """Get or initialize sentence transformer model."""
-    global _embedding_model
-    
-    if _embedding_model is None:
-        try:
-            # Use a lightweight model for embeddings (768 dimensions)
-            _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Sentence transformer model loaded")
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            raise
-    
-    return _embedding_model
+def get_embedding_model():
+    """Get the embedding model for the configured backend (see embedding_backend)."""
+    return load_embedding_model()
 
 
 def generate_embedding(text: str) -> List[float]:
     """
-    Generate embedding for text using sentence-transformers.
+    Generate embedding for text with the configured embedding backend.
     
     Args:
         text: Input text
@@ -95,42 +78,9 @@ def aggregate_embeddings(embeddings: List[List[float]], weights: Optional[List[f
     return aggregated.tolist()
 
 
-def get_pca_model() -> PCA:
-    """Get or initialize PCA model for 3D reduction."""
-    global _pca_model, _pca_fitted
-    
-    if _pca_model is None:
-        _pca_model = PCA(n_components=3)
-        _pca_fitted = False
-    
-    return _pca_model
-
-
-def fit_pca_model(embeddings: List[List[float]]) -> None:
-    """
-    Fit PCA model on a set of embeddings.
-    
-    Args:
-        embeddings: List of embedding vectors to fit on
-    """
-    global _pca_fitted
-    
-    if not embeddings:
-        return
-    
-    try:
-        model = get_pca_model()
-        embeddings_array = np.array(embeddings)
-        model.fit(embeddings_array)
-        _pca_fitted = True
-        logger.info("PCA model fitted on embeddings")
-    except Exception as e:
-        logger.error(f"Failed to fit PCA model: {e}")
-
-
 def pca_reduce(embedding: List[float]) -> Tuple[float, float, float]:
     """
-    Reduce embedding from 384D to 3D using PCA.
+    Reduce embedding from 384D to 3D using the projection shared with Ingest.
     
     Args:
         embedding: 384-dimensional embedding vector
@@ -142,16 +92,7 @@ def pca_reduce(embedding: List[float]) -> Tuple[float, float, float]:
         return (0.0, 0.0, 0.0)
     
     try:
-        model = get_pca_model()
-        
-        # If PCA not fitted, fit on this single embedding (not ideal but works)
-        if not _pca_fitted:
-            fit_pca_model([embedding])
-        
-        embedding_array = np.array([embedding])
-        reduced = model.transform(embedding_array)[0]
-        
-        return (float(reduced[0]), float(reduced[1]), float(reduced[2]))
+        return project_embeddings([embedding])[0]
     except Exception as e:
         logger.error(f"Failed to reduce embedding with PCA: {e}")
         # Return zero coordinates on error
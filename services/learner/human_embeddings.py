@@ -0,0 +1,231 @@
+"""
+Incremental human capability embeddings (Learner Service).
+
+Each human x service keeps a running centroid in human_embedding_centroids: an
+exponentially time-decayed sum of the embeddings of the work items they
+resolved, its total weight and the time both are expressed at. A resolution
+decays the sum to the resolution time and adds the work item's embedding -
+the one Ingest already stored in Weaviate - so it costs one vector add, not a
+re-encode of the human's history. An item older than the centroid's reference
+time is added with its own decayed weight instead.
+
+The Weaviate Human objects (and the humans' 3D coordinates) are refreshed by
+HumanEmbeddingFlusher: resolutions only mark the human x service dirty, and
+every HUMAN_EMBEDDING_FLUSH_SECONDS the latest centroid of each dirty pair is
+written with one batch import. Repeated resolutions in between coalesce.
+"""
+import os
+import math
+import time
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+from db import (
+    run_in_db_executor,
+    update_human_embedding_centroid,
+    get_display_names,
+    get_resolved_work_items,
+    update_human_3d_coords
+)
+from embedding_utils import pca_reduce, generate_capability_summary
+from weaviate_client import update_human_embeddings_batch
+
+logger = logging.getLogger(__name__)
+
+HUMAN_EMBEDDING_HALF_LIFE_DAYS = float(os.getenv("HUMAN_EMBEDDING_HALF_LIFE_DAYS", "30"))
+HUMAN_EMBEDDING_FLUSH_SECONDS = float(os.getenv("HUMAN_EMBEDDING_FLUSH_SECONDS", "5"))
+
+
+def fold_into_centroid(
+    state: Optional[Dict[str, Any]],
+    vector: List[float],
+    observed_at: datetime,
+    half_life_days: float = HUMAN_EMBEDDING_HALF_LIFE_DAYS
+) -> Dict[str, Any]:
+    """
+    Add one embedding to a running centroid state.
+
+    Args:
+        state: sum_vector, weight, count, reference_at - or None to start a new one
+        vector: Embedding of the resolved work item
+        observed_at: When it was resolved
+        half_life_days: Age at which an item counts half as much as a new one
+
+    Returns:
+        The new state (reference_at = the newest resolution folded in so far)
+    """
+    vector = np.asarray(vector, dtype=float)
+    if state is None or len(state["sum_vector"]) != len(vector):
+        # Nothing yet (or the embedding model changed dimensions): start over
+        return {"sum_vector": vector.tolist(), "weight": 1.0, "count": 1, "reference_at": observed_at}
+
+    decay_per_day = math.log(2) / half_life_days
+    age_days = (observed_at - state["reference_at"]).total_seconds() / 86400
+    total = np.asarray(state["sum_vector"], dtype=float)
+    if age_days >= 0:
+        # Newer than everything so far: decay the sum to observed_at, add at weight 1
+        decay = math.exp(-decay_per_day * age_days)
+        total = total * decay + vector
+        weight = state["weight"] * decay + 1.0
+        reference_at = observed_at
+    else:
+        # Older (outcomes arriving out of order): add it at its own decayed weight
+        item_weight = math.exp(decay_per_day * age_days)
+        total = total + vector * item_weight
+        weight = state["weight"] + item_weight
+        reference_at = state["reference_at"]
+
+    return {
+        "sum_vector": total.tolist(),
+        "weight": weight,
+        "count": state["count"] + 1,
+        "reference_at": reference_at
+    }
+
+
+def centroid_vector(state: Dict[str, Any]) -> Optional[List[float]]:
+    """The state's weighted mean embedding, L2-normalized (None if it is all zeros)."""
+    total = np.asarray(state["sum_vector"], dtype=float)
+    norm = np.linalg.norm(total)
+    if norm == 0:
+        return None
+    return (total / norm).tolist()
+
+
+def record_resolution(human_id: str, service: str, vector: List[float], resolved_at: datetime) -> Dict[str, Any]:
+    """
+    Fold a resolved work item's embedding into the human's centroid for the service
+    and queue the Weaviate update (blocking - one DB transaction).
+
+    Returns:
+        The new centroid state
+    """
+    state = update_human_embedding_centroid(
+        human_id, service, lambda current: fold_into_centroid(current, vector, resolved_at)
+    )
+    embedding = centroid_vector(state)
+    if embedding is not None:
+        human_embedding_flusher.mark(human_id, service, embedding)
+    return state
+
+
+class HumanEmbeddingFlusher:
+    """Dirty human x service centroids, written to Weaviate in batches."""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "marked": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "flushed": 0,
+            "failed": 0,
+            "flush_ms_max": 0.0
+        }
+
+    def mark(self, human_id: str, service: str, embedding: List[float]) -> None:
+        """Queue the latest centroid for a human x service (replaces one already queued)."""
+        with self._lock:
+            if (human_id, service) in self._pending:
+                self._stats["coalesced"] += 1
+            self._pending[(human_id, service)] = embedding
+            self._stats["marked"] += 1
+
+    def flush(self) -> int:
+        """
+        Write every queued centroid (blocking - run on the DB executor).
+
+        Returns:
+            Number of human x service vectors written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        start = time.perf_counter()
+        try:
+            errors = self._write(pending)
+        except Exception:
+            self._requeue(pending)
+            raise
+        finally:
+            self._stats["flush_ms_max"] = max(self._stats["flush_ms_max"], (time.perf_counter() - start) * 1000)
+        failed = {key: pending[key] for key, error in errors.items() if error}
+        self._requeue(failed)
+
+        written = len(pending) - len(failed)
+        self._stats["flushes"] += 1
+        self._stats["flushed"] += written
+        self._stats["failed"] += len(failed)
+        logger.debug(f"Flushed {written} human embeddings ({len(failed)} failed)")
+        return written
+
+    def _requeue(self, items: Dict[Tuple[str, str], List[float]]) -> None:
+        """Retry on the next flush, unless a newer centroid was queued meanwhile."""
+        with self._lock:
+            for key, embedding in items.items():
+                self._pending.setdefault(key, embedding)
+
+    def _write(self, pending: Dict[Tuple[str, str], List[float]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """3D coordinates and one Weaviate batch import for the given centroids."""
+        display_names = get_display_names(sorted({human_id for human_id, _ in pending}))
+        items = []
+        summaries: Dict[str, str] = {}
+        for (human_id, service), embedding in pending.items():
+            if human_id not in summaries:
+                summaries[human_id] = generate_capability_summary(get_resolved_work_items(human_id, limit=10))
+                # One 3D position per human (visualization), from their latest centroid
+                x, y, z = pca_reduce(embedding)
+                update_human_3d_coords(human_id, x, y, z)
+            items.append({
+                "human_id": human_id,
+                "display_name": display_names.get(human_id, human_id),
+                "service": service,
+                "embedding": embedding,
+                "capability_summary": summaries[human_id]
+            })
+        return update_human_embeddings_batch(items)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(HUMAN_EMBEDDING_FLUSH_SECONDS)
+            try:
+                await run_in_db_executor(self.flush)
+            except Exception as e:
+                logger.error(f"Human embedding flush failed: {e}")
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Human embedding flusher started (every {HUMAN_EMBEDDING_FLUSH_SECONDS}s)")
+
+    async def stop(self) -> None:
+        """Stop the background flush and write whatever is still queued."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await run_in_db_executor(self.flush)
+        except Exception as e:
+            logger.error(f"Final human embedding flush failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {"pending": pending, "flush_seconds": HUMAN_EMBEDDING_FLUSH_SECONDS, **self._stats}
+
+
+human_embedding_flusher = HumanEmbeddingFlusher()
+
+
+def get_human_embedding_stats() -> Dict[str, Any]:
+    """Flusher counters (marked, coalesced, flushed, failed, pending) for /healthz."""
+    return human_embedding_flusher.get_stats()
@@ -2,20 +2,28 @@
 Jira Simulator client - calls Person 1's Jira Simulator service.
 """
 import os
+import asyncio
 import httpx
 import logging
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import Dict, Any, Optional, AsyncIterator, Awaitable, Deque, Tuple
 from datetime import datetime, timedelta
-from jira_utils import service_to_project_key
+from jira_utils import service_to_project_key, PRIORITY_TO_SEVERITY
+from http_client import http_request
 
 logger = logging.getLogger(__name__)
 
+# Closed-ticket pagination: page size (the Jira search maximum) and pages in flight
+JIRA_PAGE_SIZE = 100
+JIRA_FETCH_CONCURRENCY = int(os.getenv("JIRA_FETCH_CONCURRENCY", "8"))
+
 
 async def search_closed_tickets(
     project: Optional[str] = None,
     days_back: int = 90,
     start_at: int = 0,
-    max_results: int = 100
+    max_results: int = 100,
+    updated_since: Optional[datetime] = None
 ) -> Dict[str, Any]:
     """
     Search for closed Jira tickets using JQL.
@@ -25,6 +33,7 @@ async def search_closed_tickets(
         days_back: Number of days to look back (default: 90)
         start_at: Pagination offset
         max_results: Maximum results per page
+        updated_since: Only tickets updated at or after this time (minute precision, as in JQL)
     
     Returns:
         Jira API response with issues array
@@ -35,21 +44,23 @@ async def search_closed_tickets(
     jql_parts = ["status=Done", f"resolved >= -{days_back}d"]
     if project:
         jql_parts.insert(0, f"project={project}")
+    if updated_since:
+        jql_parts.append(f'updated >= "{updated_since.strftime("%Y-%m-%d %H:%M")}"')
     
     jql = " AND ".join(jql_parts)
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{jira_url}/rest/api/3/search",
-                params={
-                    "jql": jql,
-                    "startAt": start_at,
-                    "maxResults": max_results
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await http_request(
+            "jira", "GET", f"{jira_url}/rest/api/3/search",
+            params={
+                "jql": jql,
+                "startAt": start_at,
+                "maxResults": max_results
+            },
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.TimeoutException:
         logger.error(f"Jira Simulator timeout when searching closed tickets")
         return {"issues": [], "total": 0, "startAt": 0, "maxResults": 0}
@@ -63,44 +74,78 @@ async def search_closed_tickets(
 
 async def get_all_closed_tickets(
     project: Optional[str] = None,
-    days_back: int = 90
-) -> List[Dict[str, Any]]:
+    days_back: int = 90,
+    updated_since: Optional[datetime] = None,
+    concurrency: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
     """
-    Get all closed tickets (handles pagination automatically).
+    Stream all closed tickets (handles pagination automatically).
+    
+    The first page gives the total; the remaining pages are fetched concurrently
+    (at most `concurrency` requests in flight on the shared Jira client) and
+    issues are yielded in page order. Only the pages in flight are buffered.
+    Each page is a separate offset query, so this relies on the search order being
+    unique (the simulator orders by created_at, key).
     
     Args:
         project: Project key (optional)
         days_back: Number of days to look back
+        updated_since: Only tickets updated at or after this time
+        concurrency: Max page requests in flight (default JIRA_FETCH_CONCURRENCY)
     
-    Returns:
-        List of all closed issues
+    Yields:
+        Closed issues
+    
+    Raises:
+        RuntimeError: If a page comes back empty before the reported total was read
+            (a sync must not advance its watermark past tickets it never saw)
     """
-    all_issues = []
-    start_at = 0
-    max_results = 100
+    concurrency = max(1, concurrency or JIRA_FETCH_CONCURRENCY)
     
-    while True:
-        response = await search_closed_tickets(
+    def fetch_page(start_at: int) -> Awaitable[Dict[str, Any]]:
+        return search_closed_tickets(
             project=project,
             days_back=days_back,
             start_at=start_at,
-            max_results=max_results
+            max_results=JIRA_PAGE_SIZE,
+            updated_since=updated_since
         )
-        
-        issues = response.get("issues", [])
-        if not issues:
-            break
-        
-        all_issues.extend(issues)
-        
-        total = response.get("total", 0)
-        if start_at + len(issues) >= total:
-            break
-        
-        start_at += max_results
     
-    logger.info(f"Retrieved {len(all_issues)} closed tickets from Jira Simulator")
-    return all_issues
+    first = await fetch_page(0)
+    total = first.get("total", 0)
+    retrieved = 0
+    for issue in first.get("issues", []):
+        retrieved += 1
+        yield issue
+    
+    offsets = iter(range(JIRA_PAGE_SIZE, total, JIRA_PAGE_SIZE))
+    pending: Deque[Tuple[int, asyncio.Task]] = deque()
+    
+    def schedule() -> None:
+        while len(pending) < concurrency:
+            start_at = next(offsets, None)
+            if start_at is None:
+                return
+            pending.append((start_at, asyncio.create_task(fetch_page(start_at))))
+    
+    schedule()
+    try:
+        while pending:
+            start_at, task = pending.popleft()
+            response = await task
+            # Refill before yielding so the pool stays busy while the caller works
+            schedule()
+            issues = response.get("issues", [])
+            if not issues:
+                raise RuntimeError(f"Jira search returned no issues at startAt={start_at} of {total}")
+            for issue in issues:
+                retrieved += 1
+                yield issue
+    finally:
+        for _, task in pending:
+            task.cancel()
+    
+    logger.info(f"Retrieved {retrieved} closed tickets from Jira Simulator")
 
 
 async def get_user_story_points(user_account_id: str) -> Dict[str, int]:
@@ -147,14 +192,6 @@ async def get_user_resolved_by_severity(user_account_id: str, service: str, days
     Returns:
         Dict with sev1, sev2, sev3, sev4 counts
     """
-    # Map Jira priority to severity
-    priority_to_severity = {
-        "Critical": "sev1",
-        "High": "sev2",
-        "Medium": "sev3",
-        "Low": "sev4"
-    }
-    
     jira_url = os.getenv("JIRA_SIMULATOR_URL", "http://jira-simulator:8080")
     
     # Map service name to project key
@@ -164,25 +201,25 @@ async def get_user_resolved_by_severity(user_account_id: str, service: str, days
     jql = f"assignee={user_account_id} AND project={project_key} AND status=Done AND resolved >= -{days}d"
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{jira_url}/rest/api/3/search",
-                params={
-                    "jql": jql,
-                    "maxResults": 1000  # Should be enough for 90 days
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            resolved_by_severity = {"sev1": 0, "sev2": 0, "sev3": 0, "sev4": 0}
-            
-            for issue in data.get("issues", []):
-                priority = issue.get("fields", {}).get("priority", {}).get("name", "")
-                severity = priority_to_severity.get(priority, "sev4")
-                resolved_by_severity[severity] = resolved_by_severity.get(severity, 0) + 1
-            
-            return resolved_by_severity
+        response = await http_request(
+            "jira", "GET", f"{jira_url}/rest/api/3/search",
+            params={
+                "jql": jql,
+                "maxResults": 1000  # Should be enough for 90 days
+            },
+            timeout=30.0
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        resolved_by_severity = {"sev1": 0, "sev2": 0, "sev3": 0, "sev4": 0}
+        
+        for issue in data.get("issues", []):
+            priority = issue.get("fields", {}).get("priority", {}).get("name", "")
+            severity = PRIORITY_TO_SEVERITY.get(priority, "sev4")
+            resolved_by_severity[severity] = resolved_by_severity.get(severity, 0) + 1
+        
+        return resolved_by_severity
     except Exception as e:
         logger.warning(f"Failed to get resolved by severity for user {user_account_id}: {e}")
         return {"sev1": 0, "sev2": 0, "sev3": 0, "sev4": 0}
@@ -0,0 +1,148 @@
+"""
+Incremental Jira sync for POST /sync/jira - counts closed tickets into human_service_stats.
+
+Each sync scope (a project key, or '*' for all projects) keeps a watermark: the
+newest Jira `updated` timestamp it has seen (jira_sync_state). The next run
+only searches tickets updated since then, minus JIRA_SYNC_OVERLAP_MINUTES (JQL
+dates have minute precision, and clocks drift). Every counted ticket is recorded
+in jira_synced_issues, so the overlap - or a full resync - never counts a ticket
+twice.
+
+Tickets are streamed from the Jira client and applied in batches of
+JIRA_SYNC_BATCH_SIZE as they arrive; each batch is one transaction with one
+bulk upsert for humans and one for stats (db.apply_jira_ticket_batch). The
+watermark only advances once every batch of the run has been applied.
+"""
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, AsyncIterable
+
+from db import (
+    run_in_db_executor,
+    apply_jira_ticket_batch,
+    get_jira_sync_watermark,
+    set_jira_sync_watermark
+)
+from jira_utils import project_key_to_service
+
+logger = logging.getLogger(__name__)
+
+JIRA_SYNC_BATCH_SIZE = int(os.getenv("JIRA_SYNC_BATCH_SIZE", "1000"))
+JIRA_SYNC_OVERLAP_MINUTES = int(os.getenv("JIRA_SYNC_OVERLAP_MINUTES", "5"))
+
+
+def _parse_jira_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Jira timestamp into a naive datetime (None if missing or malformed)."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def sync_scope(project: Optional[str]) -> str:
+    """Watermark key for a sync: the project key, or '*' for all projects."""
+    return project.upper() if project else "*"
+
+
+def parse_closed_ticket(issue: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Extract what the sync counts from a Jira issue.
+
+    Returns:
+        Dict with issue_key, human_id, display_name, service, resolved_at - or None
+        for tickets without an assignee or project
+    """
+    fields = issue.get("fields", {})
+    assignee = fields.get("assignee")
+    if not assignee:
+        return None
+
+    account_id = assignee.get("accountId")
+    project_key = (fields.get("project") or {}).get("key", "")
+    if not account_id or not project_key or not issue.get("key"):
+        return None
+
+    return {
+        "issue_key": issue["key"],
+        "human_id": account_id,
+        "display_name": assignee.get("displayName", ""),
+        # Stats are keyed by service name, not project key
+        "service": project_key_to_service(project_key),
+        "resolved_at": _parse_jira_datetime(fields.get("resolutiondate")) or datetime.now()
+    }
+
+
+def ticket_updated_at(issue: Dict[str, Any]) -> Optional[datetime]:
+    """Jira `updated` timestamp of an issue (falls back to the resolution date)."""
+    fields = issue.get("fields", {})
+    return _parse_jira_datetime(fields.get("updated")) or _parse_jira_datetime(fields.get("resolutiondate"))
+
+
+async def get_updated_since(project: Optional[str]) -> Optional[datetime]:
+    """Lower bound on `updated` for the next incremental search (None = no watermark yet)."""
+    watermark = await run_in_db_executor(get_jira_sync_watermark, sync_scope(project))
+    if watermark is None:
+        return None
+    return watermark - timedelta(minutes=JIRA_SYNC_OVERLAP_MINUTES)
+
+
+async def apply_closed_tickets(issues: AsyncIterable[Dict[str, Any]], project: Optional[str]) -> Dict[str, Any]:
+    """
+    Count streamed closed tickets into human_service_stats and advance the scope's watermark.
+
+    Batches are applied as they fill up, so only one batch is held in memory.
+
+    Args:
+        issues: Jira issues from the search (get_all_closed_tickets)
+        project: Project key the search was scoped to (None = all projects)
+
+    Returns:
+        Dict with synced (tickets counted now), skipped (already counted or
+        unassigned), humans_updated / services_updated (sets) and watermark
+    """
+    seen = 0
+    synced = 0
+    humans_updated = set()
+    services_updated = set()
+    watermark = None
+    batch: List[Dict[str, Any]] = []
+
+    async def flush() -> None:
+        nonlocal synced
+        counted = await run_in_db_executor(apply_jira_ticket_batch, batch)
+        synced += len(counted)
+        humans_updated.update(t["human_id"] for t in counted)
+        services_updated.update(t["service"] for t in counted)
+        batch.clear()
+
+    async for issue in issues:
+        seen += 1
+        updated_at = ticket_updated_at(issue)
+        if updated_at and (watermark is None or updated_at > watermark):
+            watermark = updated_at
+        try:
+            ticket = parse_closed_ticket(issue)
+        except Exception as e:
+            logger.warning(f"Failed to parse ticket {issue.get('key', 'unknown')}: {e}")
+            continue
+        if ticket:
+            batch.append(ticket)
+            if len(batch) >= JIRA_SYNC_BATCH_SIZE:
+                await flush()
+    if batch:
+        await flush()
+
+    if watermark:
+        await run_in_db_executor(set_jira_sync_watermark, sync_scope(project), watermark)
+
+    return {
+        "synced": synced,
+        "skipped": seen - synced,
+        "humans_updated": humans_updated,
+        "services_updated": services_updated,
+        "watermark": watermark
+    }
@@ -3,6 +3,14 @@ Jira utility functions for mapping between project keys and service names.
 """
 from typing import Optional
 
+# Jira priority -> Goliath severity (unknown priorities count as sev4)
+PRIORITY_TO_SEVERITY = {
+    "Critical": "sev1",
+    "High": "sev2",
+    "Medium": "sev3",
+    "Low": "sev4"
+}
+
 
 def project_key_to_service(project_key: str) -> str:
     """
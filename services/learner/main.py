@@ -1,28 +1,32 @@
 """
 Learner Service - Capability profiles and learning loop
 """
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import os
+import asyncio
 import logging
-from datetime import datetime
+from contextlib import asynccontextmanager
 
 from db import (
-    get_service_stats,
     get_human_stats,
-    get_or_create_human
+    run_in_db_executor,
+    get_pool_stats
 )
-from stats_service import calculate_fit_score
-from outcome_service import process_outcome as process_outcome_service
-from jira_client import (
-    get_all_closed_tickets,
-    get_user_story_points,
-    get_user_resolved_by_severity,
-    get_user_on_call_status
+from stats_service import get_profile_version
+from profile_service import assemble_profiles
+from profile_snapshots import (
+    PROFILE_SNAPSHOTS_ENABLED, profile_snapshots, etag_matches, get_profile_snapshot_stats
 )
-from jira_utils import project_key_to_service
+from human_embeddings import human_embedding_flusher, get_human_embedding_stats
+from outcome_service import process_outcome as process_outcome_service
+from jira_client import get_all_closed_tickets
+from jira_sync import get_updated_since, apply_closed_tickets
+from http_client import close_http_clients, get_http_client_stats
+from projection import get_projection_stats
+from embedding_backend import warm_up_embedding_model, is_embedding_model_ready, get_embedding_backend_stats
 
 # Setup logging
 logging.basicConfig(
@@ -31,7 +35,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Learner Service", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the embedding model and start the background tasks (profile snapshots, human embedding flusher); stop them and close shared HTTP clients on shutdown."""
+    # Load + warm up in the background; /readyz reports 503 until done
+    warm_up = asyncio.create_task(asyncio.to_thread(warm_up_embedding_model))
+    if PROFILE_SNAPSHOTS_ENABLED:
+        await profile_snapshots.start()
+    await human_embedding_flusher.start()
+    yield
+    warm_up.cancel()
+    await profile_snapshots.stop()
+    await human_embedding_flusher.stop()
+    await close_http_clients()
+
+
+app = FastAPI(title="Learner Service", version="0.1.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -58,86 +78,79 @@ class OutcomeRequest(BaseModel):
 class SyncJiraRequest(BaseModel):
     project: Optional[str] = None
     days_back: int = 90
+    full: bool = False  # ignore the watermark and re-read the whole days_back window
 
 
 @app.get("/healthz")
 async def health():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "learner"}
+    return {
+        "status": "healthy",
+        "service": "learner",
+        "db_pool": get_pool_stats(),
+        "http_clients": get_http_client_stats(),
+        "projection": get_projection_stats(),
+        "embedding_backend": get_embedding_backend_stats(),
+        "profile_snapshots": get_profile_snapshot_stats(),
+        "human_embeddings": get_human_embedding_stats()
+    }
+
+
+@app.get("/readyz")
+async def ready():
+    """Readiness check: 503 until the embedding model is loaded and warmed up"""
+    if not is_embedding_model_ready():
+        raise HTTPException(status_code=503, detail="Embedding model is warming up")
+    return {"status": "ready", "service": "learner", "embedding_backend": get_embedding_backend_stats()}
 
 
 @app.get("/profiles")
-async def get_profiles(service: str = Query(..., description="Service name")):
+async def get_profiles_endpoint(
+    service: str = Query(..., description="Service name"),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get human profiles for a service with full stats.
     
     Returns humans with fit_score, resolves, transfers, load metrics, story points, and severity breakdown.
+    Served from the service's in-memory snapshot with an ETag (the profile version);
+    a matching If-None-Match gets 304 Not Modified.
     """
     if not service:
         raise HTTPException(status_code=400, detail="service parameter is required")
     
+    if not PROFILE_SNAPSHOTS_ENABLED:
+        return await get_profiles(service)
+    
     try:
-        # Get service stats from database
-        stats_list = get_service_stats(service, days=90)
-        
-        # Get jira_account_id for each human
-        from db import execute_query
-        human_ids = [s["human_id"] for s in stats_list]
-        jira_account_map = {}
-        if human_ids:
-            placeholders = ",".join(["%s"] * len(human_ids))
-            jira_query = f"SELECT id, jira_account_id FROM humans WHERE id IN ({placeholders})"
-            jira_results = execute_query(jira_query, human_ids)
-            jira_account_map = {r["id"]: r.get("jira_account_id") for r in jira_results}
-        
-        humans = []
-        for stats in stats_list:
-            human_id = stats["human_id"]
-            display_name = stats["display_name"]
-            
-            # Calculate current fit_score (with decay)
-            fit_score = calculate_fit_score(human_id, service, stats)
-            
-            # Get load data
-            from db import get_or_create_load
-            load = get_or_create_load(human_id)
-            pages_7d = load.get("pages_7d", 0)
-            active_items = load.get("active_items", 0)
-            
-            # Get story points from Jira Simulator
-            jira_account_id = jira_account_map.get(human_id)
-            story_points_data = {"max_story_points": 21, "current_story_points": 0}
-            resolved_by_severity = {"sev1": 0, "sev2": 0, "sev3": 0, "sev4": 0}
-            on_call = False
-            
-            if jira_account_id:
-                try:
-                    story_points_data = await get_user_story_points(jira_account_id)
-                    resolved_by_severity = await get_user_resolved_by_severity(jira_account_id, service, days=90)
-                    on_call = await get_user_on_call_status(jira_account_id)
-                except Exception as e:
-                    logger.warning(f"Failed to get Jira data for {human_id}: {e}")
-            
-            humans.append({
-                "human_id": human_id,
-                "display_name": display_name,
-                "fit_score": fit_score,
-                "resolves_count": stats.get("resolves_count", 0),
-                "transfers_count": stats.get("transfers_count", 0),
-                "last_resolved_at": stats.get("last_resolved_at").isoformat() if stats.get("last_resolved_at") else None,
-                "on_call": on_call,
-                "pages_7d": pages_7d,
-                "active_items": active_items,
-                "max_story_points": story_points_data.get("max_story_points", 21),
-                "current_story_points": story_points_data.get("current_story_points", 0),
-                "resolved_by_severity": resolved_by_severity
-            })
+        snapshot = await profile_snapshots.get(service)
+    except Exception as e:
+        logger.error(f"Failed to get profiles for service {service}: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, snapshot.etag):
+        profile_snapshots.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+async def get_profiles(service: str) -> Dict[str, Any]:
+    """
+    Assemble human profiles for a service directly from the database.
+    
+    Used by GET /profiles when snapshots are disabled.
+    """
+    try:
+        # Stamp before reading so a concurrent outcome makes this response look stale, not fresh
+        version = get_profile_version(service)
         
-        # Sort by fit_score descending
-        humans.sort(key=lambda x: x["fit_score"], reverse=True)
+        # Two set-based queries, independent of team size
+        humans = await run_in_db_executor(assemble_profiles, service, days=90)
         
         return {
             "service": service,
+            "version": version,
             "humans": humans
         }
     
@@ -210,93 +223,41 @@ async def sync_jira_endpoint(request: Optional[SyncJiraRequest] = None):
     Sync closed Jira tickets to build capability profiles.
     
     Reads closed tickets from Jira Simulator and updates human capability profiles.
+    Incremental: only tickets updated since the last sync of the same project are
+    fetched (full=true ignores the watermark), and tickets counted before are skipped.
     """
     project = request.project if request else None
     days_back = request.days_back if request else 90
+    full = request.full if request else False
     
     try:
-        # Get all closed tickets from Jira Simulator
-        logger.info(f"Syncing Jira tickets (project={project}, days_back={days_back})")
-        closed_tickets = await get_all_closed_tickets(project=project, days_back=days_back)
+        updated_since = None if full else await get_updated_since(project)
         
-        synced_count = 0
-        humans_updated = set()
+        # Stream closed tickets from Jira Simulator
+        logger.info(
+            f"Syncing Jira tickets (project={project}, days_back={days_back}, "
+            f"updated_since={updated_since.isoformat() if updated_since else None})"
+        )
+        closed_tickets = get_all_closed_tickets(
+            project=project, days_back=days_back, updated_since=updated_since
+        )
         
-        # Map Jira priority to severity
-        priority_to_severity = {
-            "Critical": "sev1",
-            "High": "sev2",
-            "Medium": "sev3",
-            "Low": "sev4"
-        }
+        # Batches are applied while later pages are still being fetched
+        result = await apply_closed_tickets(closed_tickets, project)
         
-        for issue in closed_tickets:
-            try:
-                fields = issue.get("fields", {})
-                assignee = fields.get("assignee")
-                
-                if not assignee:
-                    continue
-                
-                account_id = assignee.get("accountId")
-                display_name = assignee.get("displayName", "")
-                project_key = fields.get("project", {}).get("key", "")
-                resolution_date = fields.get("resolutiondate")
-                priority_name = fields.get("priority", {}).get("name", "Low")
-                
-                if not account_id or not project_key:
-                    continue
-                
-                # Map project key to service name
-                service_name = project_key_to_service(project_key)
-                
-                # Get or create human
-                human = get_or_create_human(
-                    human_id=account_id,
-                    display_name=display_name,
-                    jira_account_id=account_id
-                )
-                
-                # Parse resolution date
-                resolved_at = None
-                if resolution_date:
-                    try:
-                        resolved_at = datetime.fromisoformat(resolution_date.replace('Z', '+00:00'))
-                        if resolved_at.tzinfo:
-                            resolved_at = resolved_at.replace(tzinfo=None)
-                    except Exception:
-                        pass
-                
-                # Update stats (use service name, not project key)
-                from db import get_or_create_stats, update_stats
-                stats = get_or_create_stats(account_id, service_name)
-                
-                # Calculate initial fit_score based on resolve count + recency
-                resolves_count = stats.get("resolves_count", 0) + 1
-                
-                # Update stats
-                update_stats(
-                    human_id=account_id,
-                    service=service_name,
-                    resolves_count_delta=1,
-                    last_resolved_at=resolved_at or datetime.now()
-                )
-                
-                # Track resolved_by_severity (stored in a separate table or calculated on demand)
-                # For now, we'll calculate it on demand in get_profiles
-                
-                humans_updated.add(account_id)
-                synced_count += 1
-                
-            except Exception as e:
-                logger.warning(f"Failed to process ticket {issue.get('key', 'unknown')}: {e}")
-                continue
+        logger.info(
+            f"Jira sync completed: {result['synced']} tickets synced, {result['skipped']} skipped, "
+            f"{len(result['humans_updated'])} humans updated"
+        )
         
-        logger.info(f"Jira sync completed: {synced_count} tickets synced, {len(humans_updated)} humans updated")
+        if PROFILE_SNAPSHOTS_ENABLED:
+            await profile_snapshots.rebuild(result["services_updated"])
         
         return {
-            "synced": synced_count,
-            "humans_updated": len(humans_updated),
+            "synced": result["synced"],
+            "skipped": result["skipped"],
+            "humans_updated": len(result["humans_updated"]),
+            "watermark": result["watermark"].isoformat() if result["watermark"] else None,
             "message": "Sync completed successfully"
         }
     
@@ -13,19 +13,15 @@ from db import (
     update_load,
     create_resolved_edge,
     create_transferred_edge,
-    get_resolved_work_items,
+    get_work_item_description,
     get_or_create_human
 )
-from stats_service import calculate_fit_score
-from embedding_utils import (
-    generate_embedding,
-    aggregate_embeddings,
-    pca_reduce,
-    generate_capability_summary
-)
-from weaviate_client import update_human_embedding
-from db import update_human_3d_coords
-from decision_client import get_decision_by_work_item
+from stats_service import calculate_fit_score, bump_profile_version
+from embedding_utils import generate_embedding
+from weaviate_client import get_work_item_vector
+from human_embeddings import record_resolution
+from decision_client import get_decision_by_work_item, invalidate_candidate_cache
+from profile_snapshots import profile_snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -146,6 +142,13 @@ async def process_outcome(outcome: Dict[str, Any]) -> Dict[str, Any]:
         # Mark as processed
         mark_outcome_processed(event_id, timestamp)
         
+        # Profiles for this service changed - bump the version, refresh the snapshot
+        # for the humans touched and let Decision drop its cache
+        if updates:
+            version = bump_profile_version(service)
+            await profile_snapshots.refresh_humans(service, [u["human_id"] for u in updates], version)
+            await invalidate_candidate_cache(service, version)
+        
         logger.info(f"Processed outcome {event_id} ({outcome_type}) with {len(updates)} updates")
         
         return {
@@ -188,7 +191,7 @@ def _process_resolved_outcome(
     
     # Update human embedding in Weaviate (non-blocking, don't fail if it errors)
     try:
-        _update_human_embedding_from_resolution(actor_id, service, work_item_id)
+        _update_human_embedding_from_resolution(actor_id, service, work_item_id, timestamp)
     except Exception as e:
         logger.warning(f"Failed to update human embedding: {e}")
     
@@ -290,58 +293,29 @@ def _process_escalated_outcome(
     return updates
 
 
-def _update_human_embedding_from_resolution(human_id: str, service: str, work_item_id: str) -> None:
-    """Update human embedding when they resolve a work item."""
+def _update_human_embedding_from_resolution(
+    human_id: str,
+    service: str,
+    work_item_id: str,
+    resolved_at: Optional[datetime] = None
+) -> None:
+    """
+    Fold the resolved work item into the human's capability embedding for the service.
+    
+    Uses the embedding Ingest stored for the work item (encodes its description
+    only if none is stored) - one vector add on the persisted centroid. The
+    Weaviate write is deferred to the batched flusher (human_embeddings).
+    """
     try:
-        # Get all resolved work items for this human
-        resolved_items = get_resolved_work_items(human_id, limit=50)
-        
-        if not resolved_items:
-            return
-        
-        # Generate embeddings for all resolved items
-        embeddings = []
-        weights = []
-        
-        for i, item in enumerate(resolved_items):
-            description = item.get("description", "")
-            if description:
-                embedding = generate_embedding(description)
-                embeddings.append(embedding)
-                # More recent = higher weight
-                weights.append(1.0 / (i + 1))
-        
-        if not embeddings:
-            return
-        
-        # Aggregate embeddings (weighted average)
-        aggregated_embedding = aggregate_embeddings(embeddings, weights)
-        
-        # Reduce to 3D for visualization
-        x, y, z = pca_reduce(aggregated_embedding)
-        
-        # Update PostgreSQL with 3D coordinates
-        update_human_3d_coords(human_id, x, y, z)
-        
-        # Generate capability summary
-        capability_summary = generate_capability_summary(resolved_items)
-        
-        # Get human display name
-        from db import execute_query
-        human_query = "SELECT display_name FROM humans WHERE id = %s"
-        human_results = execute_query(human_query, [human_id])
-        display_name = human_results[0].get("display_name", human_id) if human_results else human_id
-        
-        # Update Weaviate
-        update_human_embedding(
-            human_id=human_id,
-            display_name=display_name,
-            service=service,
-            embedding=aggregated_embedding,
-            capability_summary=capability_summary
-        )
+        vector = get_work_item_vector(work_item_id)
+        if vector is None:
+            description = get_work_item_description(work_item_id)
+            if not description:
+                return
+            vector = generate_embedding(description)
         
-        logger.info(f"Updated human embedding for {human_id} in service {service}")
+        record_resolution(human_id, service, vector, resolved_at or datetime.now())
+        logger.debug(f"Folded {work_item_id} into human embedding for {human_id} in service {service}")
     
     except Exception as e:
         logger.error(f"Failed to update human embedding: {e}")
@@ -0,0 +1,80 @@
+"""
+Profile assembly for GET /profiles - builds a service's profiles from set-based queries.
+
+Instead of per-human load, story point and Jira search round-trips, a profile
+request runs two queries regardless of team size:
+
+1. get_service_profile_rows - stats + humans + human_load + jira_users in one join
+2. get_resolved_by_priority - one GROUP BY assignee, priority over jira_issues
+"""
+import logging
+from typing import Optional, Dict, Any, List
+
+import psycopg2
+
+from db import get_service_profile_rows, get_resolved_by_priority
+from stats_service import calculate_fit_score
+from jira_utils import service_to_project_key, PRIORITY_TO_SEVERITY
+
+logger = logging.getLogger(__name__)
+
+
+def _empty_severity_counts() -> Dict[str, int]:
+    return {"sev1": 0, "sev2": 0, "sev3": 0, "sev4": 0}
+
+
+def assemble_profiles(service: str, days: int = 90, human_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Build the profile list for a service (blocking - run on the DB executor).
+
+    Args:
+        service: Service name
+        days: Stats and resolved-ticket window
+        human_ids: Only these humans (None = everyone in the service)
+
+    Returns:
+        Humans with fit_score, resolves, transfers, load, story points and
+        resolved_by_severity, sorted by fit_score descending
+    """
+    jira_available = True
+    try:
+        rows = get_service_profile_rows(service, days=days, human_ids=human_ids)
+    except psycopg2.errors.UndefinedTable:
+        # Jira Simulator tables not seeded yet: serve profiles with default story points
+        logger.warning("jira_users table not found, assembling profiles without Jira data")
+        jira_available = False
+        rows = get_service_profile_rows(service, days=days, include_jira=False, human_ids=human_ids)
+
+    resolved_by_severity: Dict[str, Dict[str, int]] = {}
+    account_ids = [row["jira_account_id"] for row in rows if row.get("jira_account_id")]
+    if jira_available and account_ids:
+        try:
+            for count in get_resolved_by_priority(account_ids, service_to_project_key(service), days=days):
+                severity = PRIORITY_TO_SEVERITY.get(count["priority_name"], "sev4")
+                counts = resolved_by_severity.setdefault(count["assignee_account_id"], _empty_severity_counts())
+                counts[severity] += count["resolved"]
+        except Exception as e:
+            logger.warning(f"Failed to get resolved-by-severity counts for {service}: {e}")
+
+    humans = []
+    for row in rows:
+        last_resolved_at = row.get("last_resolved_at")
+        humans.append({
+            "human_id": row["human_id"],
+            "display_name": row["display_name"],
+            # Current fit_score (with decay)
+            "fit_score": calculate_fit_score(row["human_id"], service, row),
+            "resolves_count": row.get("resolves_count", 0),
+            "transfers_count": row.get("transfers_count", 0),
+            "last_resolved_at": last_resolved_at.isoformat() if last_resolved_at else None,
+            # TODO: Integrate with actual on-call system (see jira_client.get_user_on_call_status)
+            "on_call": False,
+            "pages_7d": row["pages_7d"],
+            "active_items": row["active_items"],
+            "max_story_points": row["max_story_points"],
+            "current_story_points": row["current_story_points"],
+            "resolved_by_severity": resolved_by_severity.get(row.get("jira_account_id"), _empty_severity_counts())
+        })
+
+    humans.sort(key=lambda x: x["fit_score"], reverse=True)
+    return humans
@@ -0,0 +1,247 @@
+"""
+In-memory per-service profile snapshots for GET /profiles (Learner Service).
+
+Profiles only change when outcomes or a Jira sync write stats, so each service
+keeps a snapshot: the sorted profile list, its JSON body pre-encoded to bytes
+and an ETag. GET /profiles returns the bytes as-is (or 304 Not Modified when
+the client's If-None-Match matches) without touching the database.
+
+- First request for a service builds its snapshot (assemble_profiles).
+- process_outcome re-reads only the humans it updated and re-sorts/re-encodes.
+- /sync/jira rebuilds the services it touched in full; so does the background
+  tick for snapshots older than PROFILE_SNAPSHOT_MAX_AGE_SECONDS (picks up
+  writes made by other services, e.g. load or story points).
+- The tick also re-applies time decay to fit_score from the cached stats every
+  PROFILE_SNAPSHOT_TICK_SECONDS and drops humans who fell out of the 90-day
+  window.
+
+Every content change bumps the service's profile version (stats_service), which
+is also the ETag. Snapshots are per process.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Iterable
+
+from db import run_in_db_executor
+from profile_service import assemble_profiles
+from stats_service import calculate_fit_score, get_profile_version, bump_profile_version
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SNAPSHOTS_ENABLED = os.getenv("PROFILE_SNAPSHOTS_ENABLED", "true").lower() == "true"
+PROFILE_SNAPSHOT_TICK_SECONDS = float(os.getenv("PROFILE_SNAPSHOT_TICK_SECONDS", "60"))
+PROFILE_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("PROFILE_SNAPSHOT_MAX_AGE_SECONDS", "300"))
+PROFILE_WINDOW_DAYS = 90
+
+
+def format_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison, * matches anything)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ProfileSnapshot:
+    """One service's profiles, sorted and pre-encoded."""
+
+    __slots__ = ("service", "version", "etag", "humans", "body", "built_at")
+
+    def __init__(self, service: str, version: int, humans: List[Dict[str, Any]]):
+        self.service = service
+        self.version = version
+        self.etag = format_etag(version)
+        self.humans = humans
+        self.body = json.dumps(
+            {"service": service, "version": version, "humans": humans},
+            separators=(",", ":")
+        ).encode()
+        self.built_at = time.monotonic()
+
+
+def _sorted(humans: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return sorted(humans, key=lambda x: x["fit_score"], reverse=True)
+
+
+def _in_window(human: Dict[str, Any], cutoff: datetime) -> bool:
+    last_resolved_at = human.get("last_resolved_at")
+    return last_resolved_at is None or datetime.fromisoformat(last_resolved_at) >= cutoff
+
+
+class ProfileSnapshotStore:
+    """Snapshots for every service requested so far, plus the background tick."""
+
+    def __init__(self):
+        self._snapshots: Dict[str, ProfileSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "served": 0,
+            "not_modified": 0,
+            "builds": 0,
+            "refreshes": 0,
+            "decayed": 0,
+            "build_ms_max": 0.0
+        }
+
+    def _lock(self, service: str) -> asyncio.Lock:
+        lock = self._locks.get(service)
+        if lock is None:
+            lock = self._locks[service] = asyncio.Lock()
+        return lock
+
+    def _publish(self, service: str, humans: List[Dict[str, Any]], version: Optional[int] = None) -> ProfileSnapshot:
+        """Install a new snapshot, bumping the version if the content changed."""
+        current = self._snapshots.get(service)
+        if version is None:
+            if current is not None and current.humans == humans:
+                current.built_at = time.monotonic()
+                return current
+            version = bump_profile_version(service) if current is not None else get_profile_version(service)
+        snapshot = ProfileSnapshot(service, version, humans)
+        self._snapshots[service] = snapshot
+        return snapshot
+
+    async def _build(self, service: str) -> ProfileSnapshot:
+        # Stamp before reading so a concurrent outcome makes this snapshot look stale, not fresh
+        version = get_profile_version(service)
+        start = time.perf_counter()
+        humans = await run_in_db_executor(assemble_profiles, service, days=PROFILE_WINDOW_DAYS)
+        self._stats["builds"] += 1
+        self._stats["build_ms_max"] = max(self._stats["build_ms_max"], (time.perf_counter() - start) * 1000)
+        current = self._snapshots.get(service)
+        if current is None:
+            return self._publish(service, humans, version)
+        return self._publish(service, humans)
+
+    async def get(self, service: str) -> ProfileSnapshot:
+        """Current snapshot for a service (built on first use)."""
+        snapshot = self._snapshots.get(service)
+        if snapshot is None:
+            async with self._lock(service):
+                snapshot = self._snapshots.get(service)
+                if snapshot is None:
+                    snapshot = await self._build(service)
+        self._stats["served"] += 1
+        return snapshot
+
+    def record_not_modified(self) -> None:
+        self._stats["not_modified"] += 1
+
+    async def refresh_humans(self, service: str, human_ids: List[str], version: int) -> None:
+        """
+        Re-read the given humans after an outcome updated their stats.
+
+        Args:
+            service: Service whose stats changed
+            human_ids: Humans whose entries changed
+            version: Profile version stamped for the change (bump_profile_version)
+        """
+        if service not in self._snapshots and not self._lock(service).locked():
+            return  # Built from scratch on first request
+        # A build in progress may have read before this change: wait for it, then refresh
+        async with self._lock(service):
+            snapshot = self._snapshots.get(service)
+            if snapshot is None:
+                return
+            try:
+                updated = await run_in_db_executor(
+                    assemble_profiles, service, days=PROFILE_WINDOW_DAYS, human_ids=list(set(human_ids))
+                )
+            except Exception as e:
+                # Serve a rebuilt snapshot next time rather than a wrong one
+                logger.warning(f"Failed to refresh profile snapshot for {service}, dropping it: {e}")
+                self._snapshots.pop(service, None)
+                return
+            changed = set(human_ids)
+            humans = [h for h in snapshot.humans if h["human_id"] not in changed] + updated
+            self._publish(service, _sorted(humans), max(version, snapshot.version + 1))
+            self._stats["refreshes"] += 1
+
+    async def rebuild(self, services: Iterable[str]) -> None:
+        """Rebuild the given services' snapshots in full (e.g. after /sync/jira touched many humans)."""
+        for service in set(services):
+            if service not in self._snapshots:
+                continue
+            try:
+                async with self._lock(service):
+                    await self._build(service)
+            except Exception as e:
+                logger.warning(f"Failed to rebuild profile snapshot for {service}, dropping it: {e}")
+                self._snapshots.pop(service, None)
+
+    def _apply_decay(self, service: str) -> None:
+        snapshot = self._snapshots[service]
+        cutoff = datetime.now() - timedelta(days=PROFILE_WINDOW_DAYS)
+        humans = []
+        for human in snapshot.humans:
+            if not _in_window(human, cutoff):
+                continue
+            fit_score = calculate_fit_score(human["human_id"], service, human)
+            humans.append(human if fit_score == human["fit_score"] else {**human, "fit_score": fit_score})
+        if humans != snapshot.humans:
+            self._publish(service, _sorted(humans))
+            self._stats["decayed"] += 1
+
+    async def tick(self) -> None:
+        """Rebuild snapshots older than the max age and re-apply time decay to the rest."""
+        now = time.monotonic()
+        for service in list(self._snapshots):
+            snapshot = self._snapshots.get(service)
+            if snapshot is None:
+                continue
+            try:
+                async with self._lock(service):
+                    if now - snapshot.built_at >= PROFILE_SNAPSHOT_MAX_AGE_SECONDS:
+                        await self._build(service)
+                    elif service in self._snapshots:
+                        self._apply_decay(service)
+            except Exception as e:
+                logger.error(f"Profile snapshot tick failed for {service}: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(PROFILE_SNAPSHOT_TICK_SECONDS)
+            await self.tick()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Profile snapshots enabled (tick {PROFILE_SNAPSHOT_TICK_SECONDS}s, "
+            f"max age {PROFILE_SNAPSHOT_MAX_AGE_SECONDS}s)"
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": PROFILE_SNAPSHOTS_ENABLED,
+            "services": {
+                service: {"version": s.version, "humans": len(s.humans), "bytes": len(s.body)}
+                for service, s in self._snapshots.items()
+            },
+            **self._stats
+        }
+
+
+profile_snapshots = ProfileSnapshotStore()
+
+
+def get_profile_snapshot_stats() -> Dict[str, Any]:
+    """Per-service snapshot versions and sizes, builds / refreshes / decay counts for /healthz."""
+    return profile_snapshots.get_stats()
@@ -0,0 +1,91 @@
+"""
+Backfill human_embedding_centroids from the resolution history.
+
+Rebuilds the running centroid of every human x service (or of one --human)
+by folding the stored work item embeddings of their resolved_edges in
+resolution order, replaces the persisted centroid with the result, and then
+writes the Weaviate Human objects with one flush. Run it once after applying
+scripts/migrations/add_human_embedding_centroids.sql; afterwards resolutions
+keep the centroids up to date incrementally.
+
+Work items without a stored vector in Weaviate are encoded from their
+description (or skipped with --no-encode).
+
+Requires a reachable Postgres (POSTGRES_URL) with the schema from
+scripts/init_db.sql applied, and Weaviate (WEAVIATE_URL) with the WorkItem
+vectors Ingest stored.
+
+Usage:
+    python scripts/backfill_human_centroids.py [--human HUMAN_ID] [--no-encode] [--dry-run]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import db  # noqa: E402
+from embedding_utils import generate_embedding  # noqa: E402
+from weaviate_client import get_work_item_vector  # noqa: E402
+from human_embeddings import fold_into_centroid, centroid_vector, human_embedding_flusher  # noqa: E402
+
+
+def _resolutions(human_id=None):
+    """Resolved work items per (human, service), oldest first."""
+    query = """
+        SELECT re.human_id, wi.service, re.work_item_id, re.resolved_at, wi.description
+        FROM resolved_edges re
+        JOIN work_items wi ON wi.id = re.work_item_id
+        WHERE %s::text IS NULL OR re.human_id = %s
+        ORDER BY re.human_id, wi.service, re.resolved_at ASC
+    """
+    grouped = defaultdict(list)
+    for row in db.execute_query(query, [human_id, human_id]):
+        grouped[(row["human_id"], row["service"])].append(row)
+    return grouped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--human", default=None, help="Only rebuild this human's centroids")
+    parser.add_argument("--no-encode", action="store_true", help="Skip work items without a stored vector")
+    parser.add_argument("--dry-run", action="store_true", help="Fold and report, but write nothing")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    folded = encoded = skipped = 0
+    centroids = 0
+    for (human_id, service), rows in _resolutions(args.human).items():
+        state = None
+        for row in rows:
+            vector = get_work_item_vector(row["work_item_id"])
+            if vector is None:
+                if args.no_encode or not row["description"]:
+                    skipped += 1
+                    continue
+                vector = generate_embedding(row["description"])
+                encoded += 1
+            state = fold_into_centroid(state, vector, row["resolved_at"])
+            folded += 1
+        if state is None:
+            continue
+
+        centroids += 1
+        if args.dry_run:
+            continue
+        # Replace whatever is persisted: the history is the source of truth here
+        db.update_human_embedding_centroid(human_id, service, lambda _current, rebuilt=state: rebuilt)
+        embedding = centroid_vector(state)
+        if embedding is not None:
+            human_embedding_flusher.mark(human_id, service, embedding)
+
+    written = 0 if args.dry_run else human_embedding_flusher.flush()
+    print(f"centroids: {centroids}  folded: {folded}  encoded: {encoded}  skipped: {skipped}")
+    print(f"weaviate objects written: {written}  pending (failed): {human_embedding_flusher.get_stats()['pending']}")
+    print(f"elapsed: {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
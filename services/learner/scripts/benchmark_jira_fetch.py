@@ -0,0 +1,67 @@
+"""
+Benchmark streaming closed tickets from the Jira Simulator at different page concurrencies.
+
+Runs jira_client.get_all_closed_tickets end to end for each concurrency level
+(1 = the old one-page-at-a-time loop) and reports wall-clock time and the
+number of tickets read.
+
+Requires a running Jira Simulator (JIRA_SIMULATOR_URL) seeded with closed
+tickets (scripts/seed_jira_data.py). Read-only.
+
+Usage:
+    python scripts/benchmark_jira_fetch.py [--runs 3] [--concurrency 1,2,4,8,16] [--days-back 90] [--project API]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from jira_client import get_all_closed_tickets  # noqa: E402
+from http_client import close_http_clients  # noqa: E402
+
+
+async def _fetch(project, days_back, concurrency):
+    count = 0
+    start = time.perf_counter()
+    async for _ in get_all_closed_tickets(project=project, days_back=days_back, concurrency=concurrency):
+        count += 1
+    return (time.perf_counter() - start) * 1000, count
+
+
+async def _main(args):
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    try:
+        print(f"{'concurrency':>11} | {'tickets':>8} | {'p50 ms':>10} | {'p95 ms':>10} | {'speedup':>7}")
+        print("-" * 58)
+        baseline = None
+        for concurrency in levels:
+            latencies = []
+            count = 0
+            for _ in range(args.runs):
+                ms, count = await _fetch(args.project, args.days_back, concurrency)
+                latencies.append(ms)
+            latencies.sort()
+            p50 = statistics.median(latencies)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            baseline = baseline or p50
+            print(f"{concurrency:>11} | {count:>8} | {p50:>10.1f} | {p95:>10.1f} | {baseline / p50:>6.1f}x")
+    finally:
+        await close_http_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--days-back", type=int, default=90)
+    parser.add_argument("--project", default=None)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark POST /sync/jira ticket processing: per-ticket round-trips vs batched upserts.
+
+Feeds synthetic closed Jira issues (no Jira Simulator involved) through the
+legacy per-ticket loop (get_or_create_human + get_or_create_stats +
+update_stats for every ticket) and through jira_sync.apply_closed_tickets
+(one transaction and two bulk upserts per JIRA_SYNC_BATCH_SIZE tickets), then
+re-runs the batched path over the same tickets to time a resync where
+everything was already counted.
+
+The legacy loop is timed on --legacy-tickets tickets and extrapolated, since
+running it over 100k tickets takes a long time.
+
+Requires a reachable Postgres (POSTGRES_URL) with the schema from
+scripts/init_db.sql applied (jira_synced_issues / jira_sync_state included).
+Creates throwaway humans under a dedicated prefix and removes them when finished.
+
+Usage:
+    python scripts/benchmark_jira_sync.py [--tickets 100000] [--humans 500] [--legacy-tickets 2000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import db  # noqa: E402
+from jira_sync import apply_closed_tickets, parse_closed_ticket  # noqa: E402
+
+PROJECTS = ["API", "PAYMENT", "FRONTEND", "DATA", "INFRA"]
+
+
+def _issues(prefix, n_tickets, n_humans):
+    now = datetime.now()
+    issues = []
+    for i in range(n_tickets):
+        resolved_at = (now - timedelta(minutes=i)).isoformat()
+        human = i % n_humans
+        issues.append({
+            "id": f"{prefix}-{i}",
+            "key": f"{prefix.upper()}-{i}",
+            "fields": {
+                "assignee": {"accountId": f"{prefix}-{human}", "displayName": f"Bench Human {human}"},
+                "project": {"key": PROJECTS[i % len(PROJECTS)]},
+                "resolutiondate": resolved_at,
+                "updated": resolved_at,
+                "status": {"name": "Done"},
+                "priority": {"name": "Medium"}
+            }
+        })
+    return issues
+
+
+async def _stream(issues):
+    for issue in issues:
+        yield issue
+
+
+def _sync_per_ticket(issues):
+    """The legacy loop: three round-trips per ticket, no dedupe."""
+    for issue in issues:
+        ticket = parse_closed_ticket(issue)
+        db.get_or_create_human(ticket["human_id"], ticket["display_name"], ticket["human_id"])
+        db.get_or_create_stats(ticket["human_id"], ticket["service"])
+        db.update_stats(
+            human_id=ticket["human_id"],
+            service=ticket["service"],
+            resolves_count_delta=1,
+            last_resolved_at=ticket["resolved_at"]
+        )
+
+
+def _cleanup(prefix):
+    like = f"{prefix}-%"
+    db.execute_update("DELETE FROM jira_synced_issues WHERE human_id LIKE %s", [like])
+    db.execute_update("DELETE FROM jira_sync_state WHERE scope = %s", [prefix.upper()])
+    db.execute_update("DELETE FROM humans WHERE id LIKE %s", [like])  # cascades to stats
+
+
+def _row(path, tickets, seconds):
+    print(f"{path:<28} | {tickets:>8} | {seconds:>9.2f} | {tickets / seconds:>11.0f}")
+
+
+async def _main(args):
+    prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    legacy_prefix = f"{prefix}-legacy"
+    issues = _issues(prefix, args.tickets, args.humans)
+    try:
+        print(f"{'path':<28} | {'tickets':>8} | {'seconds':>9} | {'tickets/s':>11}")
+        print("-" * 66)
+
+        legacy = _issues(legacy_prefix, args.legacy_tickets, args.humans)
+        start = time.perf_counter()
+        _sync_per_ticket(legacy)
+        seconds = time.perf_counter() - start
+        _row("per-ticket", len(legacy), seconds)
+        _row("per-ticket (extrapolated)", args.tickets, seconds * args.tickets / len(legacy))
+
+        start = time.perf_counter()
+        result = await apply_closed_tickets(_stream(issues), prefix)
+        _row("batched, first sync", result["synced"], time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = await apply_closed_tickets(_stream(issues), prefix)
+        assert result["synced"] == 0
+        _row("batched, resync (all seen)", len(issues), time.perf_counter() - start)
+    finally:
+        _cleanup(legacy_prefix)
+        _cleanup(prefix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=100000)
+    parser.add_argument("--humans", type=int, default=500)
+    parser.add_argument("--legacy-tickets", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
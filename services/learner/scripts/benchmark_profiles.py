@@ -0,0 +1,172 @@
+"""
+Benchmark GET /profiles assembly: per-human queries vs set-based queries.
+
+Compares the legacy per-human path (get_or_create_load + a jira_users lookup +
+a jira_issues search per human - the old code ran that search as an HTTP JQL
+call against the Jira Simulator, so real latency was higher still) against
+profile_service.assemble_profiles, for a range of team sizes.
+
+Requires a reachable Postgres (POSTGRES_URL) with the schema from
+scripts/init_db.sql applied and the jira_users / jira_issues tables
+(scripts/seed_jira_data.py). Creates throwaway humans and tickets under a
+dedicated service and removes them when finished.
+
+Usage:
+    python scripts/benchmark_profiles.py [--runs 10] [--humans 10,50,200,1000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import db  # noqa: E402
+from profile_service import assemble_profiles  # noqa: E402
+from stats_service import calculate_fit_score  # noqa: E402
+from jira_utils import service_to_project_key, PRIORITY_TO_SEVERITY  # noqa: E402
+
+SERVICE = "bench-profiles"
+PRIORITIES = list(PRIORITY_TO_SEVERITY)
+TICKETS_PER_HUMAN = 5
+
+
+def _seed(prefix, n_humans):
+    """Insert n humans with stats, load, a Jira user and resolved tickets."""
+    now = datetime.now()
+    project_key = service_to_project_key(SERVICE)
+    db.execute_update(
+        "INSERT INTO jira_projects (key, name, project_type_key) VALUES (%s, %s, 'software') ON CONFLICT DO NOTHING",
+        [project_key, SERVICE]
+    )
+    queries = []
+    for i in range(n_humans):
+        human_id = f"{prefix}-{i}"
+        queries.append((
+            "INSERT INTO humans (id, display_name, jira_account_id) VALUES (%s, %s, %s)",
+            [human_id, f"Bench Human {i}", human_id]
+        ))
+        queries.append((
+            """INSERT INTO human_service_stats (human_id, service, fit_score, resolves_count, transfers_count, last_resolved_at)
+               VALUES (%s, %s, 0.5, %s, %s, %s)""",
+            [human_id, SERVICE, i % 12, i % 3, now - timedelta(days=i % 60)]
+        ))
+        queries.append((
+            "INSERT INTO human_load (human_id, pages_7d, active_items) VALUES (%s, %s, %s)",
+            [human_id, i % 5, i % 4]
+        ))
+        queries.append((
+            "INSERT INTO jira_users (account_id, display_name, max_story_points, current_story_points) VALUES (%s, %s, 21, %s)",
+            [human_id, f"Bench Human {i}", i % 21]
+        ))
+        for t in range(TICKETS_PER_HUMAN):
+            key = f"{prefix.upper()}-{i}-{t}"
+            queries.append((
+                """INSERT INTO jira_issues (id, key, project_key, summary, issuetype_name, priority_name, status_name,
+                   assignee_account_id, created_at, updated_at, resolved_at)
+                   VALUES (%s, %s, %s, 'benchmark', 'Bug', %s, 'Done', %s, %s, %s, %s)""",
+                [key, key, project_key, PRIORITIES[(i + t) % 4], human_id,
+                 now - timedelta(days=30), now, now - timedelta(days=t)]
+            ))
+    db.execute_transaction(queries)
+
+
+def _cleanup(prefix):
+    like = f"{prefix}-%"
+    db.execute_update("DELETE FROM jira_issues WHERE assignee_account_id LIKE %s", [like])
+    db.execute_update("DELETE FROM jira_users WHERE account_id LIKE %s", [like])
+    db.execute_update("DELETE FROM humans WHERE id LIKE %s", [like])  # cascades to stats and load
+
+
+def _assemble_per_human(service):
+    """The legacy loop: one stats query, then three lookups per human."""
+    project_key = service_to_project_key(service)
+    cutoff = datetime.now() - timedelta(days=90)
+    humans = []
+    for stats in db.get_service_stats(service, days=90):
+        human_id = stats["human_id"]
+        load = db.get_or_create_load(human_id)
+        account = db.execute_query("SELECT jira_account_id FROM humans WHERE id = %s", [human_id])[0]["jira_account_id"]
+        story_points = db.execute_query(
+            "SELECT max_story_points, current_story_points FROM jira_users WHERE account_id = %s", [account]
+        )
+        issues = db.execute_query(
+            """SELECT priority_name FROM jira_issues
+               WHERE assignee_account_id = %s AND project_key = %s AND status_name = 'Done' AND resolved_at >= %s
+               LIMIT 1000""",
+            [account, project_key, cutoff]
+        )
+        resolved_by_severity = {"sev1": 0, "sev2": 0, "sev3": 0, "sev4": 0}
+        for issue in issues:
+            resolved_by_severity[PRIORITY_TO_SEVERITY.get(issue["priority_name"], "sev4")] += 1
+        humans.append({
+            "human_id": human_id,
+            "fit_score": calculate_fit_score(human_id, service, stats),
+            "pages_7d": load.get("pages_7d", 0),
+            "story_points": story_points[0] if story_points else None,
+            "resolved_by_severity": resolved_by_severity
+        })
+    humans.sort(key=lambda x: x["fit_score"], reverse=True)
+    return humans
+
+
+def _run(assemble, runs, counter):
+    latencies = []
+    queries = 0
+    for _ in range(runs):
+        counter["queries"] = 0
+        start = time.perf_counter()
+        assemble(SERVICE)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries += counter["queries"]
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    return statistics.median(latencies), p95, queries / runs
+
+
+def _install_query_counter(counter):
+    """Count db.execute_query calls (every helper used here goes through it)."""
+    original = db.execute_query
+
+    def counting_execute_query(*args, **kwargs):
+        counter["queries"] += 1
+        return original(*args, **kwargs)
+
+    db.execute_query = counting_execute_query
+
+    def restore():
+        db.execute_query = original
+
+    return restore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--humans", default="10,50,200,1000")
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.humans.split(",") if n.strip()]
+
+    counter = {"queries": 0}
+    restore = _install_query_counter(counter)
+    try:
+        print(f"{'humans':>6} | {'path':<10} | {'p50 ms':>9} | {'p95 ms':>9} | {'queries':>8}")
+        print("-" * 55)
+        for n in sizes:
+            prefix = f"bench-{uuid.uuid4().hex[:8]}"
+            _seed(prefix, n)
+            try:
+                for name, assemble in (("per-human", _assemble_per_human), ("set-based", assemble_profiles)):
+                    p50, p95, queries = _run(assemble, args.runs, counter)
+                    print(f"{n:>6} | {name:<10} | {p50:>9.2f} | {p95:>9.2f} | {queries:>8.0f}")
+            finally:
+                _cleanup(prefix)
+    finally:
+        restore()
+
+
+if __name__ == "__main__":
+    main()
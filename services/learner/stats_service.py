@@ -1,6 +1,7 @@
 """
 Stats calculation service - fit_score, time-windowed calculations, and decay.
 """
+import time
 import logging
 from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
@@ -8,6 +9,28 @@ from db import get_or_create_stats, get_service_stats
 
 logger = logging.getLogger(__name__)
 
+# Per-service profile version stamps (ms since epoch of the last stats change).
+# Services with no change since startup report the startup time.
+_STARTED_AT_MS = int(time.time() * 1000)
+_profile_versions: Dict[str, int] = {}
+
+
+def get_profile_version(service: str) -> int:
+    """Current profile version stamp for a service (returned by GET /profiles)."""
+    return _profile_versions.get(service, _STARTED_AT_MS)
+
+
+def bump_profile_version(service: str) -> int:
+    """
+    Record that stats for a service changed.
+    
+    Returns:
+        New version stamp (strictly increasing per service)
+    """
+    version = max(int(time.time() * 1000), get_profile_version(service) + 1)
+    _profile_versions[service] = version
+    return version
+
 
 def calculate_fit_score(
     human_id: str,
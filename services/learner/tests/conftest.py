@@ -117,6 +117,62 @@ def init_database_schema(db_connection):
           FOREIGN KEY (to_human_id) REFERENCES humans(id)
         );
 
+        -- Jira Simulator tables read by GET /profiles (same database)
+        CREATE TABLE IF NOT EXISTS jira_users (
+          account_id TEXT PRIMARY KEY,
+          display_name TEXT NOT NULL,
+          email_address TEXT,
+          active BOOLEAN DEFAULT TRUE,
+          max_story_points INTEGER DEFAULT 21,
+          current_story_points INTEGER DEFAULT 0,
+          role TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS jira_issues (
+          id TEXT PRIMARY KEY,
+          key TEXT UNIQUE NOT NULL,
+          project_key TEXT NOT NULL,
+          summary TEXT NOT NULL,
+          description TEXT,
+          issuetype_name TEXT NOT NULL,
+          priority_name TEXT NOT NULL,
+          status_name TEXT NOT NULL,
+          assignee_account_id TEXT,
+          reporter_account_id TEXT,
+          story_points INTEGER,
+          created_at TIMESTAMP NOT NULL,
+          updated_at TIMESTAMP NOT NULL,
+          resolved_at TIMESTAMP
+        );
+
+        -- Incremental Jira sync
+        CREATE TABLE IF NOT EXISTS jira_synced_issues (
+          issue_key TEXT PRIMARY KEY,
+          human_id TEXT NOT NULL,
+          service TEXT NOT NULL,
+          resolved_at TIMESTAMP,
+          synced_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+
+        CREATE TABLE IF NOT EXISTS jira_sync_state (
+          scope TEXT PRIMARY KEY,
+          watermark TIMESTAMP NOT NULL,
+          last_synced_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+
+        -- Running human capability embeddings
+        CREATE TABLE IF NOT EXISTS human_embedding_centroids (
+          human_id TEXT NOT NULL,
+          service TEXT NOT NULL,
+          sum_vector DOUBLE PRECISION[] NOT NULL,
+          weight DOUBLE PRECISION NOT NULL,
+          count INTEGER NOT NULL DEFAULT 0,
+          reference_at TIMESTAMP NOT NULL,
+          updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+          PRIMARY KEY (human_id, service),
+          FOREIGN KEY (human_id) REFERENCES humans(id) ON DELETE CASCADE
+        );
+
         -- Indexes
         CREATE INDEX IF NOT EXISTS idx_human_service_stats_human_id ON human_service_stats(human_id);
         CREATE INDEX IF NOT EXISTS idx_human_service_stats_service ON human_service_stats(service);
@@ -145,9 +201,14 @@ def init_database_schema(db_connection):
     try:
         cursor.execute("""
             TRUNCATE TABLE 
+                jira_sync_state,
+                jira_synced_issues,
+                jira_issues,
+                jira_users,
                 outcomes_dedupe,
                 transferred_edges,
                 resolved_edges,
+                human_embedding_centroids,
                 human_load,
                 human_service_stats,
                 humans,
@@ -165,9 +226,14 @@ def clean_database(db_connection):
     cursor = db_connection.cursor()
     cursor.execute("""
         TRUNCATE TABLE 
+            jira_sync_state,
+            jira_synced_issues,
+            jira_issues,
+            jira_users,
             outcomes_dedupe,
             transferred_edges,
             resolved_edges,
+            human_embedding_centroids,
             human_load,
             human_service_stats
         CASCADE;
@@ -180,9 +246,14 @@ def clean_database(db_connection):
     cursor = db_connection.cursor()
     cursor.execute("""
         TRUNCATE TABLE 
+            jira_sync_state,
+            jira_synced_issues,
+            jira_issues,
+            jira_users,
             outcomes_dedupe,
             transferred_edges,
             resolved_edges,
+            human_embedding_centroids,
             human_load,
             human_service_stats
         CASCADE;
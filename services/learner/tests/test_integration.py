@@ -6,6 +6,7 @@ import pytest
 import asyncio
 from unittest.mock import patch, AsyncMock, MagicMock
 import httpx
+from datetime import datetime
 import sys
 import os
 
@@ -16,6 +17,11 @@ from outcome_service import process_outcome
 from decision_client import get_decision_by_work_item
 
 
+async def _stream(items):
+    for item in items:
+        yield item
+
+
 class TestLearnerToDecisionIntegration:
     """Test Learner Service → Decision Service communication."""
     
@@ -30,13 +36,13 @@ class TestLearnerToDecisionIntegration:
             "confidence": 0.85
         }
         
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 200
             mock_response.json.return_value = mock_decision
             mock_response.raise_for_status = MagicMock()
             
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+            mock_client.return_value.request = AsyncMock(return_value=mock_response)
             
             decision = await get_decision_by_work_item("wi_test_1")
             
@@ -47,14 +53,14 @@ class TestLearnerToDecisionIntegration:
     @pytest.mark.asyncio
     async def test_get_decision_handles_404(self):
         """Learner Service handles Decision Service 404 gracefully."""
-        with patch('httpx.AsyncClient') as mock_client:
+        with patch('http_client.get_http_client') as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 404
             mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
                 "Not found", request=MagicMock(), response=mock_response
             )
             
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+            mock_client.return_value.request = AsyncMock(return_value=mock_response)
             
             decision = await get_decision_by_work_item("wi_nonexistent")
             
@@ -89,8 +95,8 @@ class TestLearnerToJiraIntegration:
         # Mock Jira client (external service)
         # Need to patch at the import site in main.py
         with patch('main.get_all_closed_tickets') as mock_get_tickets:
-            # Return the list of issues directly (get_all_closed_tickets returns List[Dict])
-            mock_get_tickets.return_value = mock_jira_response["issues"]
+            # get_all_closed_tickets streams issues (async generator)
+            mock_get_tickets.return_value = _stream(mock_jira_response["issues"])
             
             request = SyncJiraRequest(project="API", days_back=90)
             result = await sync_jira_endpoint(request)
@@ -110,6 +116,88 @@ class TestLearnerToJiraIntegration:
             stats = get_or_create_stats("557058:user1", "api-service")
             assert stats["resolves_count"] > 0
 
+    @pytest.mark.asyncio
+    async def test_sync_jira_is_incremental_and_counts_tickets_once(self):
+        """A second sync searches from the watermark and does not recount tickets it already saw."""
+        from main import SyncJiraRequest, sync_jira_endpoint
+        from db import get_or_create_stats
+
+        def issue(key, updated):
+            return {
+                "id": key,
+                "key": key,
+                "fields": {
+                    "assignee": {"accountId": "557058:user2", "displayName": "Bob"},
+                    "project": {"key": "API"},
+                    "resolutiondate": "2024-01-10T14:20:00Z",
+                    "updated": updated,
+                    "status": {"name": "Done"},
+                    "priority": {"name": "High"}
+                }
+            }
+
+        first_run = [issue("API-1", "2024-01-10T14:20:00"), issue("API-2", "2024-01-11T09:00:00")]
+        second_run = [issue("API-2", "2024-01-11T09:00:00"), issue("API-3", "2024-01-12T10:30:00")]
+
+        with patch('main.get_all_closed_tickets') as mock_get_tickets:
+            mock_get_tickets.side_effect = [_stream(first_run), _stream(second_run), _stream(first_run + second_run)]
+            request = SyncJiraRequest(project="API", days_back=90)
+
+            first = await sync_jira_endpoint(request)
+            second = await sync_jira_endpoint(request)
+            full = await sync_jira_endpoint(SyncJiraRequest(project="API", days_back=90, full=True))
+
+            assert first["synced"] == 2
+            assert second["synced"] == 1 and second["skipped"] == 1
+            assert full["synced"] == 0
+            assert mock_get_tickets.call_args_list[0][1]["updated_since"] is None
+            # Watermark (newest `updated` seen) minus the overlap
+            assert mock_get_tickets.call_args_list[1][1]["updated_since"] < datetime(2024, 1, 11, 9, 0)
+            assert mock_get_tickets.call_args_list[2][1]["updated_since"] is None
+
+        stats = get_or_create_stats("557058:user2", "api-service")
+        assert stats["resolves_count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_closed_tickets_are_fetched_concurrently_and_streamed_in_order(self):
+        """Pages after the first are fetched with bounded concurrency and yielded in page order."""
+        from jira_client import get_all_closed_tickets
+
+        total = 950
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_search(start_at=0, max_results=100, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            # Later pages answer first, to check ordering
+            await asyncio.sleep(0.001 * (total - start_at) / max_results)
+            in_flight -= 1
+            keys = range(start_at, min(start_at + max_results, total))
+            return {"issues": [{"key": f"API-{i}"} for i in keys], "total": total}
+
+        with patch('jira_client.search_closed_tickets', side_effect=fake_search) as mock_search:
+            keys = [issue["key"] async for issue in get_all_closed_tickets(project="API", concurrency=3)]
+
+        assert keys == [f"API-{i}" for i in range(total)]
+        assert mock_search.call_count == 10
+        assert 1 < max_in_flight <= 3
+
+    @pytest.mark.asyncio
+    async def test_closed_tickets_short_page_raises(self):
+        """An empty page before the reported total is an error, not the end of the results."""
+        from jira_client import get_all_closed_tickets
+
+        async def fake_search(start_at=0, max_results=100, **kwargs):
+            issues = [{"key": f"API-{start_at}"}] * max_results if start_at < 200 else []
+            return {"issues": issues, "total": 500}
+
+        with patch('jira_client.search_closed_tickets', side_effect=fake_search):
+            with pytest.raises(RuntimeError):
+                async for _ in get_all_closed_tickets(project="API", concurrency=2):
+                    pass
+
 
 class TestOutcomeProcessingIntegration:
     """Test outcome processing with real dependencies."""
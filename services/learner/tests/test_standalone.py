@@ -301,6 +301,218 @@ class TestProfilesEndpoint:
             assert result["humans"][0]["fit_score"] > 0
             assert result["humans"][0]["resolves_count"] == 5
 
+    @pytest.mark.asyncio
+    async def test_get_profiles_reads_load_story_points_and_severity_from_tables(self):
+        """Load, story points and resolved_by_severity come from human_load / jira_users / jira_issues."""
+        from main import get_profiles
+        from db import execute_update
+
+        get_or_create_human("human_1", "Alice", "test_account_1")
+        get_or_create_stats("human_1", "api-service")
+        update_stats("human_1", "api-service", resolves_count_delta=3, last_resolved_at=datetime.now() - timedelta(days=1))
+        get_or_create_load("human_1")
+        execute_update("UPDATE human_load SET pages_7d = 4, active_items = 2 WHERE human_id = %s", ["human_1"])
+        execute_update(
+            "INSERT INTO jira_users (account_id, display_name, max_story_points, current_story_points) VALUES (%s, %s, %s, %s)",
+            ["test_account_1", "Alice", 34, 13]
+        )
+        now = datetime.now()
+        issues = [
+            ("API-1", "API", "Critical", "Done", now - timedelta(days=2)),
+            ("API-2", "API", "Critical", "Done", now - timedelta(days=5)),
+            ("API-3", "API", "Medium", "Done", now - timedelta(days=5)),
+            ("API-4", "API", "High", "In Progress", None),            # not resolved
+            ("API-5", "API", "High", "Done", now - timedelta(days=120)),  # outside window
+            ("PAYMENT-1", "PAYMENT", "Low", "Done", now - timedelta(days=1))  # other service
+        ]
+        for key, project, priority, status, resolved_at in issues:
+            execute_update(
+                """INSERT INTO jira_issues (id, key, project_key, summary, issuetype_name, priority_name, status_name,
+                   assignee_account_id, created_at, updated_at, resolved_at)
+                   VALUES (%s, %s, %s, 'test', 'Bug', %s, %s, %s, %s, %s, %s)""",
+                [key, key, project, priority, status, "test_account_1", now - timedelta(days=200), now, resolved_at]
+            )
+
+        result = await get_profiles("api-service")
+
+        human = result["humans"][0]
+        assert human["pages_7d"] == 4
+        assert human["active_items"] == 2
+        assert human["max_story_points"] == 34
+        assert human["current_story_points"] == 13
+        assert human["resolved_by_severity"] == {"sev1": 2, "sev2": 0, "sev3": 1, "sev4": 0}
+
+    @pytest.mark.asyncio
+    async def test_get_profiles_query_count_independent_of_team_size(self):
+        """GET /profiles runs the same number of queries for 2 or 20 humans."""
+        from main import get_profiles
+        import db
+
+        async def count_queries(n_humans):
+            for i in range(n_humans):
+                get_or_create_human(f"human_{i}", f"Human {i}", f"test_account_{i}")
+                get_or_create_stats(f"human_{i}", "api-service")
+            calls = []
+            original = db.execute_query
+
+            def counting_execute_query(*args, **kwargs):
+                calls.append(args[0])
+                return original(*args, **kwargs)
+
+            with patch('db.execute_query', side_effect=counting_execute_query):
+                result = await get_profiles("api-service")
+            assert len(result["humans"]) == n_humans
+            return len(calls)
+
+        assert await count_queries(2) == await count_queries(20) <= 2
+
+    @pytest.mark.asyncio
+    async def test_profiles_endpoint_serves_snapshot_with_etag(self):
+        """GET /profiles returns the snapshot body with an ETag and 304 for a matching If-None-Match."""
+        import json
+        from main import get_profiles_endpoint
+        from profile_snapshots import ProfileSnapshotStore
+
+        get_or_create_human("human_1", "Alice", "test_account_1")
+        get_or_create_stats("human_1", "api-service")
+
+        with patch('main.PROFILE_SNAPSHOTS_ENABLED', True), \
+             patch('main.profile_snapshots', ProfileSnapshotStore()):
+            response = await get_profiles_endpoint("api-service", if_none_match=None)
+            etag = response.headers["etag"]
+            assert response.status_code == 200
+            assert json.loads(response.body)["humans"][0]["human_id"] == "human_1"
+
+            not_modified = await get_profiles_endpoint("api-service", if_none_match=etag)
+            assert not_modified.status_code == 304
+            assert not_modified.headers["etag"] == etag
+
+    @pytest.mark.asyncio
+    async def test_snapshot_refresh_rereads_updated_humans(self):
+        """refresh_humans picks up new stats for the given humans and bumps the version."""
+        from profile_snapshots import ProfileSnapshotStore
+        from stats_service import bump_profile_version
+
+        for human_id in ("human_1", "human_2"):
+            get_or_create_human(human_id, human_id, None)
+            get_or_create_stats(human_id, "api-service")
+        store = ProfileSnapshotStore()
+        before = await store.get("api-service")
+
+        update_stats("human_2", "api-service", fit_score=0.9, resolves_count_delta=4, last_resolved_at=datetime.now())
+        await store.refresh_humans("api-service", ["human_2"], bump_profile_version("api-service"))
+
+        after = await store.get("api-service")
+        assert after.version > before.version
+        assert after.etag != before.etag
+        assert after.humans[0]["human_id"] == "human_2"
+        assert after.humans[0]["resolves_count"] == 4
+
+
+
+class TestIncrementalHumanEmbeddings:
+    """Resolutions fold one stored vector into a persisted centroid; Weaviate writes are batched."""
+
+    def test_fold_weights_by_recency_and_ignores_arrival_order(self):
+        """An item one half-life older counts half; folding order does not change the centroid."""
+        from human_embeddings import fold_into_centroid, centroid_vector
+
+        t0 = datetime(2024, 1, 1)
+        old, new = [1.0, 0.0], [0.0, 1.0]
+        in_order = fold_into_centroid(fold_into_centroid(None, old, t0, 30), new, t0 + timedelta(days=30), 30)
+        out_of_order = fold_into_centroid(fold_into_centroid(None, new, t0 + timedelta(days=30), 30), old, t0, 30)
+
+        assert in_order["count"] == out_of_order["count"] == 2
+        assert in_order["reference_at"] == out_of_order["reference_at"] == t0 + timedelta(days=30)
+        assert in_order["weight"] == pytest.approx(1.5)
+        assert in_order["sum_vector"] == pytest.approx([0.5, 1.0])
+        assert out_of_order["sum_vector"] == pytest.approx(in_order["sum_vector"])
+        assert centroid_vector(in_order)[1] > centroid_vector(in_order)[0]
+
+    def test_resolution_uses_stored_vector_and_persists_centroid(self):
+        """Each resolve is one fold of the stored work item vector - nothing is re-encoded."""
+        from outcome_service import _update_human_embedding_from_resolution
+        from human_embeddings import HumanEmbeddingFlusher
+        from db import execute_query
+
+        get_or_create_human("human_1", "Test Human", None)
+        flusher = HumanEmbeddingFlusher()
+        with patch('outcome_service.get_work_item_vector', return_value=[0.6, 0.8]), \
+             patch('outcome_service.generate_embedding') as mock_encode, \
+             patch('human_embeddings.human_embedding_flusher', flusher):
+            _update_human_embedding_from_resolution("human_1", "api-service", "wi_emb_1", datetime(2024, 1, 1))
+            _update_human_embedding_from_resolution("human_1", "api-service", "wi_emb_2", datetime(2024, 1, 2))
+
+        mock_encode.assert_not_called()
+        rows = execute_query(
+            "SELECT count, weight FROM human_embedding_centroids WHERE human_id = %s AND service = %s",
+            ["human_1", "api-service"]
+        )
+        assert rows[0]["count"] == 2
+        assert 1.0 < rows[0]["weight"] < 2.0
+        # Both resolves coalesce into one pending Weaviate write
+        stats = flusher.get_stats()
+        assert stats["pending"] == 1 and stats["coalesced"] == 1
+
+    def test_flusher_writes_one_batch_and_requeues_failures(self):
+        """A flush is one batch import; failed objects are retried on the next flush."""
+        from human_embeddings import HumanEmbeddingFlusher
+
+        for human_id in ("human_1", "human_2"):
+            get_or_create_human(human_id, human_id, None)
+        flusher = HumanEmbeddingFlusher()
+        flusher.mark("human_1", "api-service", [1.0, 0.0])
+        flusher.mark("human_2", "api-service", [0.0, 1.0])
+
+        def batch(items):
+            return {(i["human_id"], i["service"]): ("boom" if i["human_id"] == "human_2" else None) for i in items}
+
+        with patch('human_embeddings.update_human_embeddings_batch', side_effect=batch) as mock_batch, \
+             patch('human_embeddings.pca_reduce', return_value=(0.0, 0.0, 0.0)):
+            assert flusher.flush() == 1
+            assert mock_batch.call_count == 1
+            assert len(mock_batch.call_args[0][0]) == 2
+            assert flusher.get_stats()["pending"] == 1
+
+            mock_batch.side_effect = lambda items: {(i["human_id"], i["service"]): None for i in items}
+            assert flusher.flush() == 1
+            assert flusher.get_stats()["pending"] == 0
+
+
+class TestEmbeddingBackendParity:
+    """The ONNX backend must produce the same vectors as the PyTorch model."""
+    
+    TEXTS = [
+        "Database connection pool exhausted in api-service",
+        "High latency on checkout endpoint, p99 above 2s for 10 minutes",
+        "NullPointerException in PaymentProcessor.charge when card token is missing",
+        "Kubernetes pod payments-7f9c restarted 12 times (CrashLoopBackOff)",
+        "OOMKilled"
+    ]
+    
+    @pytest.mark.parametrize("quantized,min_cosine", [(False, 0.9999), (True, 0.99)])
+    def test_onnx_cosine_parity(self, quantized, min_cosine):
+        """fp32 ONNX is numerically equivalent; int8 stays within cosine 0.99 per text."""
+        pytest.importorskip("onnxruntime")
+        import numpy as np
+        from embedding_backend import EMBEDDING_ONNX_DIR, EMBEDDING_MODEL_NAME, OnnxSentenceEncoder
+        
+        model_file = "model_int8.onnx" if quantized else "model.onnx"
+        if not os.path.exists(os.path.join(EMBEDDING_ONNX_DIR, model_file)):
+            pytest.skip(f"{model_file} not exported (run ingest scripts/export_onnx_model.py)")
+        
+        from sentence_transformers import SentenceTransformer
+        reference = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu").encode(
+            self.TEXTS, normalize_embeddings=True
+        )
+        model = OnnxSentenceEncoder(EMBEDDING_ONNX_DIR, quantized=quantized, threads=1)
+        vectors = model.encode(self.TEXTS, batch_size=2, normalize_embeddings=True)
+        
+        cosine = np.sum(reference * vectors, axis=1)
+        assert cosine.min() >= min_cosine
+        # Batched encode (length-sorted) keeps input order
+        assert np.allclose(model.encode(self.TEXTS[1], normalize_embeddings=True), vectors[1], atol=1e-5)
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -3,9 +3,11 @@ Weaviate client for human capability embeddings.
 """
 import os
 import logging
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
 import weaviate
 from weaviate.classes.config import Configure, Property, DataType
+from weaviate.classes.data import DataObject
+from weaviate.util import generate_uuid5
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +67,92 @@ def _ensure_schema():
         logger.error(f"Failed to create Weaviate Human schema: {e}")
 
 
+def human_uuid(human_id: str, service: str) -> str:
+    """Weaviate object UUID for a human's capability vector in a service (uuid5 of human_id_service)."""
+    return generate_uuid5(f"{human_id}_{service}")
+
+
+def work_item_uuid(work_item_id: str) -> str:
+    """Weaviate object UUID Ingest uses for a work item (uuid5 of the work item ID)."""
+    return generate_uuid5(work_item_id)
+
+
+def _object_vector(obj) -> Optional[List[float]]:
+    """Extract the (default) vector from a Weaviate object."""
+    vector = getattr(obj, "vector", None)
+    if isinstance(vector, dict):
+        vector = vector.get("default") or next(iter(vector.values()), None)
+    return list(vector) if vector else None
+
+
+def get_work_item_vector(work_item_id: str) -> Optional[List[float]]:
+    """
+    Get the embedding Ingest stored for a work item.
+    
+    Args:
+        work_item_id: Work item ID
+    
+    Returns:
+        384-dimensional embedding vector, or None if not stored / Weaviate unavailable
+    """
+    client = get_weaviate_client()
+    if not client:
+        return None
+    
+    try:
+        collection = client.collections.get("WorkItem")
+        obj = collection.query.fetch_object_by_id(work_item_uuid(work_item_id), include_vector=True)
+        return _object_vector(obj) if obj else None
+    except Exception as e:
+        logger.warning(f"Failed to fetch stored vector for {work_item_id}: {e}")
+        return None
+
+
+def update_human_embeddings_batch(items: List[Dict[str, Any]]) -> Dict[Tuple[str, str], Optional[str]]:
+    """
+    Upsert many human capability vectors with one batch import.
+    
+    Args:
+        items: Dicts with human_id, display_name, service, embedding and capability_summary
+    
+    Returns:
+        (human_id, service) -> None if stored, else the error message
+    """
+    if not items:
+        return {}
+    
+    client = get_weaviate_client()
+    if not client:
+        return {(item["human_id"], item["service"]): "Weaviate client not available" for item in items}
+    
+    try:
+        collection = client.collections.get("Human")
+        # Batch import replaces objects that already exist
+        result = collection.data.insert_many([
+            DataObject(
+                properties={
+                    "id": item["human_id"],
+                    "display_name": item["display_name"],
+                    "service": item["service"],
+                    "capability_summary": item["capability_summary"]
+                },
+                vector=item["embedding"],
+                uuid=human_uuid(item["human_id"], item["service"])
+            )
+            for item in items
+        ])
+    except Exception as e:
+        logger.error(f"Failed to batch update human embeddings in Weaviate: {e}")
+        return {(item["human_id"], item["service"]): str(e) for item in items}
+    
+    errors = {(item["human_id"], item["service"]): None for item in items}
+    for index, error in (result.errors or {}).items():
+        errors[(items[index]["human_id"], items[index]["service"])] = getattr(error, "message", str(error))
+    if result.errors:
+        logger.warning(f"{len(result.errors)}/{len(items)} human embeddings failed Weaviate batch import")
+    return errors
+
+
 def update_human_embedding(
     human_id: str,
     display_name: str,
@@ -93,11 +181,11 @@ def update_human_embedding(
         collection = client.collections.get("Human")
         
         # Use human_id + service as unique identifier
-        object_id = f"{human_id}_{service}"
+        object_id = human_uuid(human_id, service)
         
         # Check if object exists
         try:
-            existing = collection.data.fetch_by_id(object_id)
+            existing = collection.query.fetch_object_by_id(object_id)
             if existing:
                 # Update existing
                 collection.data.update(
@@ -163,12 +251,10 @@ def get_human_embedding(human_id: str, service: str) -> Optional[List[float]]:
     
     try:
         collection = client.collections.get("Human")
-        object_id = f"{human_id}_{service}"
+        object_id = human_uuid(human_id, service)
         
-        result = collection.data.fetch_by_id(object_id, include_vector=True)
-        if result and hasattr(result, 'vector'):
-            return result.vector
-        return None
+        result = collection.query.fetch_object_by_id(object_id, include_vector=True)
+        return _object_vector(result) if result else None
     except Exception as e:
         logger.warning(f"Failed to get human embedding: {e}")
         return None
@@ -0,0 +1,374 @@
+"""
+Log-template cache in front of LLM log preprocessing (Monitoring Service).
+
+Raw error logs are mostly a handful of templates with different IDs, numbers
+and timestamps, so llm_preprocess_log only calls the LLM for templates it has
+not seen before:
+
+1. Variable tokens (timestamps, UUIDs, IPs, hex IDs, numbers) are masked.
+2. A Drain-style miner groups the masked log with earlier logs of the same
+   length and leading tokens; positions that differ within a group become
+   wildcards, so the group's template generalizes as more logs arrive.
+3. The LLM cleans the template with numbered placeholders (<V1>, <V2>, ...)
+   instead of the values. The cleaned template is kept in an LRU cache keyed
+   by (service, template), persisted to LOG_TEMPLATE_CACHE_PATH, and filled in
+   with each log's own values - a hit never touches the network.
+
+Concurrent misses for the same template share one LLM call. The miner and
+cache are only used from the event loop. Hit rate and latency are reported
+under log_templates in /healthz.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+LOG_TEMPLATE_CACHE_ENABLED = os.getenv("LOG_TEMPLATE_CACHE_ENABLED", "true").lower() == "true"
+LOG_TEMPLATE_CACHE_PATH = os.getenv("LOG_TEMPLATE_CACHE_PATH", "/data/log_templates/monitoring.json")
+LOG_TEMPLATE_CACHE_SIZE = int(os.getenv("LOG_TEMPLATE_CACHE_SIZE", "5000"))
+LOG_TEMPLATE_SIMILARITY = float(os.getenv("LOG_TEMPLATE_SIMILARITY", "0.5"))
+LOG_TEMPLATE_MAX_CLUSTERS_PER_GROUP = int(os.getenv("LOG_TEMPLATE_MAX_CLUSTERS_PER_GROUP", "100"))
+LOG_TEMPLATE_SAVE_INTERVAL_SECONDS = float(os.getenv("LOG_TEMPLATE_SAVE_INTERVAL_SECONDS", "10"))
+
+WILDCARD = "<*>"
+PREFIX_TOKENS = 2  # leading tokens used to pick a cluster group (Drain tree depth)
+
+_MASK_PATTERN = re.compile(
+    r"(?P<timestamp>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)"
+    r"|(?P<uuid>\b[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}\b)"
+    r"|(?P<ip>\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b)"
+    r"|(?P<hex>\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{8,}\b)"
+    r"|(?P<number>(?<![A-Za-z0-9_.])\d+(?:\.\d+)?)"
+)
+_PLACEHOLDER_PATTERN = re.compile(r"<V(\d+)(?::\w+)?>")
+
+
+def mask_log(raw_log: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Mask variable values in a log line.
+
+    Returns:
+        (tokens with values replaced by <*>, [(value, kind)] in order of appearance)
+    """
+    values: List[Tuple[str, str]] = []
+
+    def _mask(match: re.Match) -> str:
+        values.append((match.group(0), match.lastgroup))
+        return WILDCARD
+
+    return _MASK_PATTERN.sub(_mask, raw_log.strip()).split(), values
+
+
+class LogCluster:
+    """One template: tokens, with <*> where member logs differ."""
+
+    __slots__ = ("tokens", "size", "last_matched")
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = list(tokens)
+        self.size = 1
+        self.last_matched = time.monotonic()
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+
+class TemplateMiner:
+    """
+    Drain-style online template miner.
+
+    Clusters are grouped by token count and the first PREFIX_TOKENS tokens (a
+    token containing a digit or a wildcard counts as a wildcard); within a
+    group a log joins the most similar cluster if at least `similarity` of its
+    positions match, otherwise it starts a new one.
+    """
+
+    def __init__(
+        self,
+        similarity: float = LOG_TEMPLATE_SIMILARITY,
+        max_clusters_per_group: int = LOG_TEMPLATE_MAX_CLUSTERS_PER_GROUP
+    ):
+        self.similarity = similarity
+        self.max_clusters_per_group = max(1, max_clusters_per_group)
+        self._groups: Dict[tuple, List[LogCluster]] = {}
+
+    @staticmethod
+    def _group_key(tokens: List[str]) -> tuple:
+        prefix = tuple(
+            WILDCARD if WILDCARD in token or any(c.isdigit() for c in token) else token
+            for token in tokens[:PREFIX_TOKENS]
+        )
+        return (len(tokens),) + prefix
+
+    @staticmethod
+    def _score(template: List[str], tokens: List[str]) -> Tuple[float, int]:
+        exact, wildcards = 0, 0
+        for t, m in zip(template, tokens):
+            if t == m:
+                exact += 1
+            elif t == WILDCARD:
+                wildcards += 1
+        return (exact + wildcards) / max(1, len(tokens)), exact
+
+    def add(self, tokens: List[str]) -> LogCluster:
+        """Match masked tokens to a cluster (generalizing its template) or start a new one."""
+        group = self._groups.setdefault(self._group_key(tokens), [])
+        best, best_score = None, (-1.0, -1)
+        for cluster in group:
+            score = self._score(cluster.tokens, tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+
+        if best is not None and best_score[0] >= self.similarity:
+            best.tokens = [t if t == m else WILDCARD for t, m in zip(best.tokens, tokens)]
+            best.size += 1
+            best.last_matched = time.monotonic()
+            return best
+
+        cluster = LogCluster(tokens)
+        group.append(cluster)
+        if len(group) > self.max_clusters_per_group:
+            group.remove(min(group, key=lambda c: c.last_matched))
+        return cluster
+
+    def seed(self, template: str) -> None:
+        """Restore a known template (from the persisted cache) as a cluster."""
+        tokens = template.split()
+        group = self._groups.setdefault(self._group_key(tokens), [])
+        if not any(cluster.tokens == tokens for cluster in group) and len(group) < self.max_clusters_per_group:
+            group.append(LogCluster(tokens))
+
+    def __len__(self) -> int:
+        return sum(len(group) for group in self._groups.values())
+
+
+def template_values(template: List[str], tokens: List[str], masked: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """
+    Values of a log for each <*> of its cluster's template, in order.
+
+    Args:
+        template: Cluster template tokens
+        tokens: The log's masked tokens (same length)
+        masked: The log's masked values from mask_log
+
+    Returns:
+        [(value, kind)] - one per wildcard in the template
+    """
+    values: List[Tuple[str, str]] = []
+    remaining = iter(masked)
+    for t, m in zip(template, tokens):
+        own = [next(remaining) for _ in range(m.count(WILDCARD))]
+        if t == m:
+            values.extend(own)
+            continue
+        # The template generalized this whole token: its value is the original token
+        parts = m.split(WILDCARD)
+        original = parts[0] + "".join(value + part for (value, _), part in zip(own, parts[1:]))
+        values.append((original, "value"))
+        values.extend(("", "value") for _ in range(t.count(WILDCARD) - 1))
+    return values
+
+
+def number_placeholders(template: str, values: List[Tuple[str, str]]) -> str:
+    """Replace each <*> with <Vn:kind> for the LLM prompt."""
+    parts = template.split(WILDCARD)
+    numbered = [parts[0]]
+    for index, part in enumerate(parts[1:]):
+        kind = values[index][1] if index < len(values) else "value"
+        numbered.append(f"<V{index + 1}:{kind}>{part}")
+    return "".join(numbered)
+
+
+def fill_placeholders(cleaned: str, values: List[Tuple[str, str]]) -> str:
+    """Substitute a log's values into a cleaned template's <Vn> placeholders (unknown ones are dropped)."""
+    def _fill(match: re.Match) -> str:
+        index = int(match.group(1)) - 1
+        return values[index][0] if 0 <= index < len(values) else ""
+
+    return _PLACEHOLDER_PATTERN.sub(_fill, cleaned)
+
+
+class LogTemplateCache:
+    """Template miner + persistent LRU of cleaned templates, with single-flight misses."""
+
+    def __init__(self, path: str = LOG_TEMPLATE_CACHE_PATH, capacity: int = LOG_TEMPLATE_CACHE_SIZE):
+        self.path = path
+        self.capacity = max(1, capacity)
+        self.miner = TemplateMiner()
+        self._entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._dirty = False
+        self._last_saved = 0.0
+        self._last_saved_at: Optional[str] = None
+        self._hit_seconds = 0.0
+        self._stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "shared_misses": 0,
+            "llm_calls": 0,
+            "llm_errors": 0,
+            "bypassed": 0,
+            "evictions": 0
+        }
+        self._load()
+
+    @staticmethod
+    def _key(service_name: str, template: str) -> str:
+        return f"{service_name}\x1f{template}"
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)["entries"]
+            for entry in entries[-self.capacity:]:
+                self._entries[self._key(entry["service"], entry["template"])] = entry
+                self.miner.seed(entry["template"])
+            logger.info(f"Loaded {len(self._entries)} cached log templates from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load log template cache from {self.path}: {e}")
+
+    def save(self) -> None:
+        """Write the cache (least recently used first) atomically to self.path."""
+        if not self.path or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"entries": list(self._entries.values())}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._last_saved = time.monotonic()
+            self._last_saved_at = datetime.now().isoformat()
+        except Exception as e:
+            logger.warning(f"Could not save log template cache to {self.path}: {e}")
+
+    def _store(self, key: str, service_name: str, template: str, cleaned: str) -> None:
+        self._entries[key] = {"service": service_name, "template": template, "cleaned": cleaned}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+        self._dirty = True
+        if time.monotonic() - self._last_saved >= LOG_TEMPLATE_SAVE_INTERVAL_SECONDS:
+            self.save()
+
+    async def preprocess(
+        self,
+        raw_log: str,
+        service_name: str,
+        clean: Callable[[str, str], Awaitable[str]]
+    ) -> str:
+        """
+        Cleaned description for a raw log, calling `clean` only for unseen templates.
+
+        Args:
+            raw_log: Raw log line
+            service_name: Service the log came from (part of the cache key)
+            clean: LLM call cleaning a templated log; receives (log with <Vn:kind>
+                   placeholders, service_name) and raises on failure
+
+        Returns:
+            Cleaned description with this log's values filled in (the stripped raw
+            log if the LLM call failed)
+        """
+        start = time.perf_counter()
+        self._stats["lookups"] += 1
+        if WILDCARD in raw_log:
+            # Literal wildcards would shift the value positions
+            self._stats["bypassed"] += 1
+            return await self._call(clean, raw_log, service_name) or raw_log.strip()
+
+        tokens, masked = mask_log(raw_log)
+        cluster = self.miner.add(tokens)
+        template = cluster.template
+        values = template_values(cluster.tokens, tokens, masked)
+        key = self._key(service_name, template)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self._stats["hits"] += 1
+            cleaned = fill_placeholders(entry["cleaned"], values)
+            self._hit_seconds += time.perf_counter() - start
+            return cleaned
+
+        self._stats["misses"] += 1
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["shared_misses"] += 1
+            cleaned_template = await asyncio.shield(inflight)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            cleaned_template = None
+            try:
+                cleaned_template = await self._call(clean, number_placeholders(template, values), service_name)
+                if cleaned_template:
+                    self._store(key, service_name, template, cleaned_template)
+            finally:
+                self._inflight.pop(key, None)
+                future.set_result(cleaned_template)
+
+        if not cleaned_template:
+            return raw_log.strip()
+        return fill_placeholders(cleaned_template, values)
+
+    async def _call(self, clean: Callable[[str, str], Awaitable[str]], log_text: str, service_name: str) -> Optional[str]:
+        self._stats["llm_calls"] += 1
+        try:
+            return (await clean(log_text, service_name)).strip() or None
+        except Exception as e:
+            self._stats["llm_errors"] += 1
+            logger.error(f"LLM preprocessing failed: {e}. Using raw log.")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups, hits = self._stats["lookups"], self._stats["hits"]
+        return {
+            "enabled": LOG_TEMPLATE_CACHE_ENABLED,
+            "templates": len(self.miner),
+            "cached": len(self._entries),
+            "capacity": self.capacity,
+            **self._stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "avg_hit_us": round(self._hit_seconds / hits * 1e6, 1) if hits else None,
+            "path": self.path,
+            "last_saved_at": self._last_saved_at
+        }
+
+
+_cache: Optional[LogTemplateCache] = None
+
+
+def get_log_template_cache() -> LogTemplateCache:
+    """Process-wide cache, loaded from LOG_TEMPLATE_CACHE_PATH on first use."""
+    global _cache
+    if _cache is None:
+        _cache = LogTemplateCache()
+    return _cache
+
+
+def save_log_template_cache() -> None:
+    """Persist the cache (on shutdown)."""
+    if _cache is not None:
+        _cache.save()
+
+
+def get_log_template_stats() -> Dict[str, Any]:
+    """Template count, hit rate and LLM calls for /healthz."""
+    if _cache is None:
+        return {"enabled": LOG_TEMPLATE_CACHE_ENABLED, "templates": 0, "cached": 0, "lookups": 0, "hit_rate": 0.0}
+    return _cache.get_stats()
@@ -15,6 +15,11 @@ from pydantic import BaseModel
 import httpx
 from openai import OpenAI
 
+from http_client import http_request, close_http_clients, get_http_client_stats
+from log_templates import (
+    LOG_TEMPLATE_CACHE_ENABLED, get_log_template_cache, save_log_template_cache, get_log_template_stats
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -214,6 +219,9 @@ async def llm_preprocess_log(raw_log: str, service_name: str) -> str:
     """
     Use LLM to clean and normalize log text before processing.
     Returns cleaned description ready for entity extraction.
+
+    With LOG_TEMPLATE_CACHE_ENABLED the LLM is only called for log templates
+    that have not been cleaned before (see log_templates.py).
     """
     if not openai_client:
         # Fallback: basic cleaning without LLM
@@ -224,10 +232,21 @@ async def llm_preprocess_log(raw_log: str, service_name: str) -> str:
                 cleaned = cleaned[len(prefix):].strip()
         return cleaned
     
+    if LOG_TEMPLATE_CACHE_ENABLED:
+        return await get_log_template_cache().preprocess(raw_log, service_name, _llm_clean)
+
     try:
-        prompt = f"""Clean and normalize this error log. Return ONLY the cleaned description, no other text.
+        return await _llm_clean(raw_log, service_name)
+    except Exception as e:
+        logger.error(f"LLM preprocessing failed: {e}. Using raw log.")
+        return raw_log.strip()
+
+
+async def _llm_clean(log_text: str, service_name: str) -> str:
+    """One chat completion cleaning a (possibly templated) log; raises on failure."""
+    prompt = f"""Clean and normalize this error log. Return ONLY the cleaned description, no other text.
 
-Raw log: {raw_log}
+Raw log: {log_text}
 Service: {service_name}
 
 Rules:
@@ -237,19 +256,18 @@ Rules:
 - Extract key information (error type, affected component, severity indicators)
 - Keep it concise but informative
 - Return clean, structured description ready for entity extraction
+- Placeholders like <V1:number> stand for values that differ between occurrences: copy a placeholder exactly where its value matters, drop it where it is noise
 
 Cleaned description:"""
-        
-        response = openai_client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,  # Deterministic
-            timeout=10.0
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        logger.error(f"LLM preprocessing failed: {e}. Using raw log.")
-        return raw_log.strip()
+
+    response = await asyncio.to_thread(
+        openai_client.chat.completions.create,
+        model=OPENAI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0,  # Deterministic
+        timeout=10.0
+    )
+    return response.choices[0].message.content.strip()
 
 
 def generate_error_message(error_type_config: Dict[str, Any], service_name: str) -> tuple[str, str]:
@@ -374,24 +392,24 @@ async def create_work_item_via_ingest(
 ) -> Optional[Dict[str, Any]]:
     """Create a work item by calling the Ingest service."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            payload = {
-                "service": service,
-                "severity": severity,
-                "description": description,
-                "type": "incident",
-                "raw_log": raw_log
-            }
-            
-            response = await client.post(
-                f"{INGEST_URL}/ingest/demo",
-                json=payload
-            )
-            response.raise_for_status()
-            result = response.json()
-            
-            logger.info(f"WorkItem created successfully: {result.get('work_item_id', 'unknown')}")
-            return result
+        payload = {
+            "service": service,
+            "severity": severity,
+            "description": description,
+            "type": "incident",
+            "raw_log": raw_log
+        }
+        
+        response = await http_request(
+            "ingest", "POST", f"{INGEST_URL}/ingest/demo",
+            json=payload,
+            timeout=10.0
+        )
+        response.raise_for_status()
+        result = response.json()
+        
+        logger.info(f"WorkItem created successfully: {result.get('work_item_id', 'unknown')}")
+        return result
     except httpx.HTTPStatusError as e:
         logger.error(f"Ingest service returned error: {e.response.status_code} - {e.response.text}")
         return None
@@ -482,6 +500,8 @@ async def lifespan(app: FastAPI):
             await monitoring_task
         except asyncio.CancelledError:
             pass
+    await close_http_clients()
+    save_log_template_cache()
     logger.info("Monitoring service shut down")
 
 
@@ -499,6 +519,8 @@ async def health():
         "status": "healthy",
         "service": "monitoring",
         "monitoring_active": monitoring_active,
+        "http_clients": get_http_client_stats(),
+        "log_templates": get_log_template_stats(),
         "uptime_seconds": (
             (datetime.now() - datetime.fromisoformat(monitoring_stats["started_at"])).total_seconds()
             if monitoring_stats.get("started_at")